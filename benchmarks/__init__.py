@@ -0,0 +1 @@
+"""Benchmarks for the Forex AI Agent; run with `python -m benchmarks`."""
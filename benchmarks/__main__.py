@@ -0,0 +1,64 @@
+"""
+Run the benchmark suite and compare results between commits.
+
+    python -m benchmarks                        # run everything, save results/<commit>.json
+    python -m benchmarks --quick -k news        # a subset of the smaller cases
+    python -m benchmarks --compare benchmarks/results/<baseline>.json
+"""
+
+import argparse
+import os
+import sys
+
+from . import suite  # noqa: F401  (registers the benchmarks)
+from .harness import DEFAULT_MIN_TIME, DEFAULT_THRESHOLD, REGISTRY, compare, format_seconds, load, run_all, save
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def _print_comparison(comparison: dict) -> None:
+    print(f"\nCompared with {comparison['baseline_commit'] or 'baseline'} "
+          f"(threshold {comparison['threshold']:.0%}):")
+    for name, row in comparison["benchmarks"].items():
+        flag = ("  REGRESSION" if name in comparison["regressions"]
+                else "  improved" if name in comparison["improvements"] else "")
+        print(f"{name:<45} {format_seconds(row['baseline']):>10} -> {format_seconds(row['current']):>10}  "
+              f"x{row['ratio']:.2f}{flag}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Run the Forex AI Agent benchmarks.")
+    parser.add_argument("-k", "--filter", help="only run benchmarks whose name contains this text")
+    parser.add_argument("--quick", action="store_true", help="run the smaller parameter set of each benchmark")
+    parser.add_argument("--list", action="store_true", help="list the benchmarks and exit")
+    parser.add_argument("--min-time", type=float, default=DEFAULT_MIN_TIME, help="seconds to time each benchmark for")
+    parser.add_argument("--output", help="results file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", metavar="BASELINE", help="results file to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="median slowdown reported as a regression (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for bench in REGISTRY:
+            for name, _ in bench.cases(args.quick):
+                if not args.filter or args.filter in name:
+                    print(name)
+        return 0
+
+    document = run_all(REGISTRY, select=args.filter, quick=args.quick, min_time=args.min_time)
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{(document['commit'] or 'unknown')[:12]}{'-dirty' if document['dirty'] else ''}.json")
+    save(document, output)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        comparison = compare(load(args.compare), document, args.threshold)
+        _print_comparison(comparison)
+        if comparison["regressions"]:
+            print(f"\n{len(comparison['regressions'])} regression(s)")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
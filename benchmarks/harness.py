@@ -0,0 +1,196 @@
+"""
+Minimal benchmark harness.
+
+Benchmarks are registered with `benchmark`, which takes a group name and a
+list of parameters. The decorated factory is called once per parameter to
+set up, and returns the callable to time. A factory may instead be a
+generator that yields the callable and tears down after timing. Each
+callable is warmed up, then timed for at least `min_rounds` rounds and
+`min_time` seconds.
+
+Results are written as JSON with the commit and machine they were measured
+on. Two result files can be compared by median time to spot regressions
+between commits.
+"""
+
+import inspect
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+RESULTS_VERSION = 1
+DEFAULT_MIN_ROUNDS = 3
+DEFAULT_MAX_ROUNDS = 1000
+DEFAULT_MIN_TIME = 1.0
+DEFAULT_THRESHOLD = 0.2
+
+
+@dataclass
+class Benchmark:
+    group: str
+    factory: Callable[[Any], Any]
+    params: Sequence[Any]
+    quick_params: Optional[Sequence[Any]] = None
+
+    def cases(self, quick: bool = False) -> List[tuple]:
+        """(name, param) pairs, e.g. ("encode_frame[720p]", "720p")."""
+        params = self.quick_params if quick and self.quick_params is not None else self.params
+        return [(self.group if param is None else f"{self.group}[{_param_id(param)}]", param) for param in params]
+
+
+REGISTRY: List[Benchmark] = []
+
+
+def _param_id(param: Any) -> str:
+    if isinstance(param, dict):
+        return "-".join(f"{value}" for value in param.values())
+    if isinstance(param, (list, tuple)):
+        return "-".join(map(str, param))
+    return str(param)
+
+
+def benchmark(group: str, params: Sequence[Any] = (None,), quick: Optional[Sequence[Any]] = None):
+    """Register a benchmark factory; `quick` lists the parameters run in quick mode."""
+    def register(factory):
+        REGISTRY.append(Benchmark(group, factory, list(params), None if quick is None else list(quick)))
+        return factory
+    return register
+
+
+def measure(
+    func: Callable[[], Any],
+    min_rounds: int = DEFAULT_MIN_ROUNDS,
+    max_rounds: int = DEFAULT_MAX_ROUNDS,
+    min_time: float = DEFAULT_MIN_TIME,
+    clock: Callable[[], float] = time.perf_counter,
+) -> Dict[str, Any]:
+    """Time `func` after one warm-up call; statistics are in seconds per call."""
+    func()
+    timings = []
+    started = clock()
+    while len(timings) < max_rounds and (len(timings) < min_rounds or clock() - started < min_time):
+        begin = clock()
+        func()
+        timings.append(clock() - begin)
+    median = statistics.median(timings)
+    return {
+        "rounds": len(timings),
+        "min": min(timings),
+        "max": max(timings),
+        "mean": statistics.fmean(timings),
+        "median": median,
+        "stdev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        "ops_per_second": 1 / median if median > 0 else None,
+    }
+
+
+def run_benchmark(bench: Benchmark, param: Any, **options) -> Dict[str, Any]:
+    """Set up, time and tear down one case."""
+    made = bench.factory() if param is None else bench.factory(param)
+    if inspect.isgenerator(made):
+        try:
+            return measure(next(made), **options)
+        finally:
+            made.close()
+    return measure(made, **options)
+
+
+def environment() -> Dict[str, Any]:
+    """Commit and machine details stored with results."""
+    def git(*args: str) -> Optional[str]:
+        try:
+            return subprocess.run(["git", *args], capture_output=True, text=True, check=True,
+                                  cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    return {
+        "commit": git("rev-parse", "HEAD"),
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "machine": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "processor": platform.processor() or platform.machine(),
+            "cpus": os.cpu_count(),
+        },
+    }
+
+
+def run_all(
+    benchmarks: Iterable[Benchmark],
+    select: Optional[str] = None,
+    quick: bool = False,
+    report: Callable[[str], None] = print,
+    **options,
+) -> Dict[str, Any]:
+    """Run every case whose name contains `select`; returns the results document."""
+    results: Dict[str, Any] = {}
+    for bench in benchmarks:
+        for name, param in bench.cases(quick):
+            if select and select not in name:
+                continue
+            try:
+                stats = run_benchmark(bench, param, **options)
+            except Exception as e:
+                results[name] = {"group": bench.group, "error": f"{type(e).__name__}: {e}"}
+                report(f"{name:<45} failed: {e}")
+                continue
+            results[name] = {"group": bench.group, **stats}
+            report(f"{name:<45} median {format_seconds(stats['median']):>10}  "
+                   f"min {format_seconds(stats['min']):>10}  rounds {stats['rounds']}")
+    return {"version": RESULTS_VERSION, **environment(), "quick": quick, "benchmarks": results}
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = DEFAULT_THRESHOLD) -> Dict[str, Any]:
+    """
+    Median time ratios (current / baseline) of the benchmarks both documents measured.
+
+    Ratios above 1 + `threshold` are regressions, below 1 - `threshold`
+    improvements.
+    """
+    rows, regressions, improvements = {}, [], []
+    for name, result in current["benchmarks"].items():
+        before = baseline.get("benchmarks", {}).get(name)
+        if not before or "median" not in before or "median" not in result or not before["median"]:
+            continue
+        ratio = result["median"] / before["median"]
+        rows[name] = {"baseline": before["median"], "current": result["median"], "ratio": round(ratio, 4)}
+        if ratio > 1 + threshold:
+            regressions.append(name)
+        elif ratio < 1 - threshold:
+            improvements.append(name)
+    return {
+        "baseline_commit": baseline.get("commit"),
+        "current_commit": current.get("commit"),
+        "threshold": threshold,
+        "benchmarks": rows,
+        "regressions": regressions,
+        "improvements": improvements,
+    }
+
+
+def format_seconds(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3f}{unit}"
+    return f"{seconds / 1e-9:.0f}ns"
+
+
+def load(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save(document: Dict[str, Any], path: str) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2)
@@ -0,0 +1,235 @@
+"""
+Benchmarks for the tool and crew hot paths.
+
+- Frame extraction from synthetic chart videos of several lengths (up to a
+  30-minute recording) and resolutions, by scene change and uniform sampling.
+- Frame encoding: the plain base64 JPEG and the preprocessed (cropped,
+  tiled, budgeted) JPEG sent to the vision model.
+- News aggregation of 50 and 1000 article feeds, decoded whole or streamed.
+- Serialization of large tool results in each output mode.
+- End-to-end crew runs against the local mock LLM (forex_ai_agent.mock_server).
+
+Inputs are generated deterministically, so results are comparable between
+commits on the same machine.
+"""
+
+import atexit
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+from contextlib import redirect_stdout
+from typing import Dict, Tuple
+
+# Keep crew runs offline, free of telemetry and of the first-run trace prompt (it waits 20s on stdin)
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+os.environ.setdefault("CREWAI_TESTING", "true")
+
+_workdir = tempfile.mkdtemp(prefix="forex-ai-bench-")
+atexit.register(shutil.rmtree, _workdir, True)
+# Caches and stores start empty and stay out of the user's cache directory
+os.environ.setdefault("FOREX_AI_CACHE_DIR", os.path.join(_workdir, "cache"))
+
+# Add the src directory to the path so we can import our tools
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import cv2
+import numpy as np
+
+from forex_ai_agent.mock_server import MockServer, news_sentiment
+from forex_ai_agent.tools.frame_preprocess import preprocess_frame
+from forex_ai_agent.tools.historical_data import OUTPUT_PROFILE as BARS_PROFILE
+from forex_ai_agent.tools.json_stream import StreamingObjectParser
+from forex_ai_agent.tools.news_data import OUTPUT_PROFILE as NEWS_PROFILE
+from forex_ai_agent.tools.news_data import NewsAndSentimentFetcher, _StreamedFeed
+from forex_ai_agent.tools.output import OUTPUT_MODES, render
+from forex_ai_agent.tools.video_analysis import VideoAnalysisTool
+
+from .harness import benchmark
+
+RESOLUTIONS: Dict[str, Tuple[int, int]] = {"360p": (640, 360), "720p": (1280, 720), "1080p": (1920, 1080)}
+VIDEO_FPS = 25
+VISIBLE_CANDLES = 60
+SCENE_SECONDS = 20           # the synthetic chart switches symbol and palette this often
+LIVE_TICK_SECONDS = 300      # longer videos redraw once per second, which keeps generating them fast
+CHUNK_SIZE = 64 * 1024
+
+_videos: Dict[Tuple[int, str], str] = {}
+
+
+def chart_frame(size: Tuple[int, int], candles: np.ndarray, end: int, tick: float, scene: int) -> np.ndarray:
+    """A candlestick chart of the candles before `end`, the last one moved by `tick`."""
+    width, height = size
+    background = (18, 18, 24) if scene % 2 == 0 else (236, 236, 240)
+    frame = np.empty((height, width, 3), dtype=np.uint8)
+    frame[:] = background
+    for i in range(1, 8):
+        cv2.line(frame, (0, height * i // 8), (width, height * i // 8), (70, 70, 80), 1)
+    visible = candles[max(0, end - VISIBLE_CANDLES):end].copy()
+    visible[-1, 3] += tick
+    visible[-1, 1:3] = [max(visible[-1, 1], visible[-1, 3]), min(visible[-1, 2], visible[-1, 3])]
+    low, high = visible[:, 2].min(), visible[:, 1].max()
+    y = lambda price: int((high - price) / (high - low + 1e-12) * (height * 0.8) + height * 0.1)
+    step = width * 0.9 / VISIBLE_CANDLES
+    for i, (open_, top, bottom, close) in enumerate(visible):
+        x = int(width * 0.02 + i * step)
+        color = (80, 200, 80) if close >= open_ else (60, 60, 220)
+        cv2.line(frame, (x + int(step / 2), y(top)), (x + int(step / 2), y(bottom)), color, 1)
+        cv2.rectangle(frame, (x, y(max(open_, close))), (x + max(1, int(step * 0.7)), y(min(open_, close))), color, -1)
+    label = ("EUR/USD", "GBP/JPY", "BTC/USD")[scene % 3] + "  5m"
+    cv2.putText(frame, label, (int(width * 0.02), int(height * 0.07)), cv2.FONT_HERSHEY_SIMPLEX,
+                height / 720, (200, 200, 200), max(1, height // 360))
+    return frame
+
+
+def _candles(count: int, seed: int = 7) -> np.ndarray:
+    """OHLC rows of a seeded random walk."""
+    rng = np.random.default_rng(seed)
+    close = 1.08 * np.exp(np.cumsum(rng.normal(0, 0.002, count)))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    spread = np.abs(rng.normal(0, 0.001, count)) * close
+    return np.column_stack([open_, np.maximum(open_, close) + spread, np.minimum(open_, close) - spread, close])
+
+
+def synthetic_video(seconds: int, resolution: str) -> str:
+    """An mp4 chart recording: a new candle every second, a moving last price, scene switches."""
+    key = (seconds, resolution)
+    if key not in _videos:
+        size = RESOLUTIONS[resolution]
+        path = os.path.join(_workdir, f"chart-{seconds}s-{resolution}.mp4")
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), VIDEO_FPS, size)
+        candles = _candles(VISIBLE_CANDLES + seconds)
+        ticks = np.random.default_rng(seconds).normal(0, 0.0005, seconds * VIDEO_FPS)
+        live = seconds <= LIVE_TICK_SECONDS
+        for index in range(seconds * VIDEO_FPS):
+            second = index // VIDEO_FPS
+            if live or index % VIDEO_FPS == 0:
+                frame = chart_frame(size, candles, VISIBLE_CANDLES + second, ticks[index], second // SCENE_SECONDS)
+            writer.write(frame)
+        writer.release()
+        _videos[key] = path
+    return _videos[key]
+
+
+@benchmark(
+    "extract_frames",
+    params=[{"seconds": seconds, "resolution": resolution, "selection": selection}
+            for selection in ("scene", "uniform") for seconds in (10, 60) for resolution in RESOLUTIONS]
+    # A 30-minute recording, where the scene scan must seek rather than decode every frame
+    + [{"seconds": 1800, "resolution": "360p", "selection": selection} for selection in ("scene", "uniform")],
+    quick=[{"seconds": 10, "resolution": "720p", "selection": "scene"}],
+)
+def extract_frames(case):
+    path = synthetic_video(case["seconds"], case["resolution"])
+    tool = VideoAnalysisTool()
+    tool.frame_selection = case["selection"]
+    return lambda: tool._extract_frames(path, max_frames=10)
+
+
+def _frame(resolution: str) -> np.ndarray:
+    return chart_frame(RESOLUTIONS[resolution], _candles(VISIBLE_CANDLES + 1), VISIBLE_CANDLES, 0.0, 0)
+
+
+@benchmark("encode_frame", params=list(RESOLUTIONS), quick=["720p"])
+def encode_frame(resolution):
+    frame, tool = _frame(resolution), VideoAnalysisTool()
+    return lambda: tool._encode_frame_to_base64(frame)
+
+
+@benchmark("preprocess_frame", params=list(RESOLUTIONS), quick=["720p"])
+def preprocess(resolution):
+    frame = _frame(resolution)
+    return lambda: preprocess_frame(frame)
+
+
+def _news_body(limit: int) -> bytes:
+    return json.dumps(news_sentiment({"limit": str(limit), "tickers": "FOREX:EUR,FOREX:USD"})).encode("utf-8")
+
+
+@benchmark(
+    "news_aggregate",
+    params=[{"limit": limit, "parse": parse} for parse in ("whole", "streamed") for limit in (50, 1000)],
+    quick=[{"limit": 1000, "parse": "whole"}, {"limit": 1000, "parse": "streamed"}],
+)
+def news_aggregate(case):
+    limit, body = case["limit"], _news_body(case["limit"])
+    fetcher = NewsAndSentimentFetcher(output_mode="full")
+    if case["parse"] == "whole":
+        # Decoding is included, as response.json() is on the tool's path
+        return lambda: fetcher._format_response(json.loads(body), "FOREX:EUR,FOREX:USD", None, limit, "LATEST")
+
+    def streamed():
+        parser, feed = StreamingObjectParser("feed"), _StreamedFeed(None, None, limit)
+        for start in range(0, len(body), CHUNK_SIZE):
+            feed.add(parser.feed(body[start:start + CHUNK_SIZE]))
+        feed.add(parser.close())
+        return fetcher._format_stream(parser, feed, "FOREX:EUR,FOREX:USD", None, limit, "LATEST")
+    return streamed
+
+
+def _results() -> Dict[str, tuple]:
+    """Large tool results with their output profiles and indentation."""
+    fetcher = NewsAndSentimentFetcher()
+    articles = [fetcher._project(article) for article in news_sentiment({"limit": "1000"})["feed"]]
+    news = fetcher._result(articles, "FOREX:EUR", None, 1000, "LATEST", render_output=False)
+    candles = _candles(5000)
+    times = np.arange(5000) * 300 + 1_700_000_000
+    bars = {
+        "pair": "EUR/USD", "timeframe": "5min", "count": 5000, "success": True,
+        "bars": {"time": np.array(times, dtype="datetime64[s]").astype(str).tolist(),
+                 **{column: np.round(candles[:, i], 6).tolist() for i, column in enumerate(("open", "high", "low", "close"))},
+                 "volume": [0.0] * 5000},
+    }
+    return {"news-1000": (news, NEWS_PROFILE, 2), "bars-5000": (bars, BARS_PROFILE, None)}
+
+
+@benchmark(
+    "serialize",
+    params=[{"result": result, "mode": mode} for result in ("news-1000", "bars-5000") for mode in OUTPUT_MODES],
+    quick=[{"result": "news-1000", "mode": mode} for mode in OUTPUT_MODES],
+)
+def serialize(case):
+    result, profile, indent = _results()[case["result"]]
+    return lambda: render(result, profile, case["mode"], indent=indent)
+
+
+_mock_server = None
+
+
+def _mock_llm() -> MockServer:
+    """One mock server for every crew run: the crew's LLM reads its base URL at import."""
+    global _mock_server
+    if _mock_server is None:
+        _mock_server = MockServer().start()
+        atexit.register(_mock_server.stop)
+        os.environ.update(_mock_server.env())
+    return _mock_server
+
+
+@benchmark(
+    "crew_kickoff",
+    params=[{"process": "sequential", "llm_latency": 0.0}, {"process": "sequential", "llm_latency": 0.05},
+            {"process": "parallel", "llm_latency": 0.05}],
+    quick=[{"process": "sequential", "llm_latency": 0.0}],
+)
+def crew_kickoff(case):
+    server = _mock_llm()
+    from forex_ai_agent.crew import ForexAiAgent
+    from forex_ai_agent.main import _inputs
+
+    server.settings.latency = case["llm_latency"]
+    cwd = os.getcwd()
+    os.chdir(_workdir)       # the crew writes trading_strategy.md and outputs/
+    inputs = _inputs()
+
+    def kickoff():
+        with redirect_stdout(io.StringIO()):
+            return ForexAiAgent(parallel=case["process"] == "parallel").crew().kickoff(inputs=inputs)
+    try:
+        yield kickoff
+    finally:
+        os.chdir(cwd)
+        server.settings.latency = 0.0
@@ -1,13 +1,19 @@
 from crewai import Agent, Crew, Process, Task
-from crewai.project import CrewBase, agent, crew, task
+from crewai.project import CrewBase, agent, crew, task, after_kickoff
 from crewai.agents.agent_builder.base_agent import BaseAgent
-from typing import List
-from crewai import LLM 
+from typing import List, Optional
+from crewai import LLM
 from forex_ai_agent.tools.video_analysis import video_analysis_tool
 from forex_ai_agent.tools.crypto_data import crypto_api_connector
 from forex_ai_agent.tools.forex_data import forex_data_fetcher
-from forex_ai_agent.tools.strategy_tools import risk_calculator, strategy_validator
-import os  
+from forex_ai_agent.tools.batch_quotes import batch_quote_fetcher
+from forex_ai_agent.tools.historical_data import historical_ohlc_fetcher
+from forex_ai_agent.tools.news_data import news_sentiment_fetcher, ticker_sentiment_series
+from forex_ai_agent.tools.strategy_tools import monte_carlo_risk_simulator, risk_calculator, strategy_validator
+from forex_ai_agent.tools.indicators import technical_indicator_calculator
+from forex_ai_agent.timing import TaskTimer
+import json
+import os
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -25,13 +31,27 @@ class ForexAiAgent():
 
     llm = LLM(
     model="openrouter/google/gemini-2.5-flash-preview-05-20",
-    base_url="https://openrouter.ai/api/v1",
+    base_url=os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1"),
     max_tokens=2000,
     temperature=0.1,
     stream=True,
     api_key=os.getenv("OPENROUTER_API_KEY")
 )
-    
+
+    def __init__(self, parallel: Optional[bool] = None):
+        """
+        Args:
+            parallel: Fan out chart analysis, market data and news sentiment
+                concurrently and join them before strategy formulation. Market
+                data then uses the user-supplied {trading_pair} input instead
+                of waiting for the chart analysis. Defaults to the
+                FOREX_AI_PARALLEL environment variable.
+        """
+        if parallel is None:
+            parallel = os.getenv("FOREX_AI_PARALLEL", "0") == "1"
+        self.parallel = parallel
+        self.timer = TaskTimer()
+
     @agent
     def chart_analyst(self) -> Agent:
         """Chart Analyst Agent - Analyzes trading chart videos using multimodal LLMs"""
@@ -41,7 +61,7 @@ class ForexAiAgent():
             verbose=True,
             max_rpm=26,
             max_iter=3,
-            llm=llm,
+            llm=self.llm,
         )
 
     @agent
@@ -49,11 +69,23 @@ class ForexAiAgent():
         """Financial Data Agent - Gathers real-time market data"""
         return Agent(
             config=self.agents_config['financial_data_agent'], # type: ignore[index]
-            tools=[crypto_api_connector, forex_data_fetcher],
+            tools=[crypto_api_connector, forex_data_fetcher, batch_quote_fetcher, historical_ohlc_fetcher],
+            verbose=True,
+            max_rpm=26,
+            max_iter=3,
+            llm=self.llm,
+        )
+
+    @agent
+    def news_analyst(self) -> Agent:
+        """News Analyst Agent - Gathers market news and sentiment"""
+        return Agent(
+            config=self.agents_config['news_analyst'], # type: ignore[index]
+            tools=[news_sentiment_fetcher, ticker_sentiment_series],
             verbose=True,
             max_rpm=26,
             max_iter=3,
-            llm=llm,
+            llm=self.llm,
         )
 
     @agent
@@ -61,20 +93,21 @@ class ForexAiAgent():
         """Strategy Agent - Formulates comprehensive trading strategies"""
         return Agent(
             config=self.agents_config['strategy_agent'], # type: ignore[index]
-            tools=[risk_calculator, strategy_validator],
+            tools=[risk_calculator, monte_carlo_risk_simulator, strategy_validator, technical_indicator_calculator, ticker_sentiment_series],
             verbose=True,
             max_rpm=26,
             max_iter=3,
-            llm=llm,
+            llm=self.llm,
         )
 
-    
+
     @task
     def chart_analysis_task(self) -> Task:
         """Task for analyzing trading chart videos"""
         return Task(
             config=self.tasks_config['chart_analysis_task'], # type: ignore[index]
-            agent=self.chart_analyst
+            agent=self.chart_analyst(),
+            async_execution=self.parallel  # Runs alongside market data and news in parallel mode
         )
 
     @task
@@ -82,27 +115,58 @@ class ForexAiAgent():
         """Task for gathering real-time market data"""
         return Task(
             config=self.tasks_config['market_data_task'], # type: ignore[index]
-            agent=self.financial_data_agent,
-            context=[self.chart_analysis_task]  # Depends on chart analysis results
+            agent=self.financial_data_agent(),
+            # Depends on chart analysis results, unless the pair is supplied up front
+            context=[] if self.parallel else [self.chart_analysis_task()]
+        )
+
+    @task
+    def news_sentiment_task(self) -> Task:
+        """Task for gathering news sentiment (parallel mode only)"""
+        return Task(
+            config=self.tasks_config['news_sentiment_task'], # type: ignore[index]
+            agent=self.news_analyst()
         )
 
     @task
     def strategy_formulation_task(self) -> Task:
         """Task for formulating comprehensive trading strategies"""
+        context = [self.chart_analysis_task(), self.market_data_task()]
+        if self.parallel:
+            context.append(self.news_sentiment_task())
         return Task(
             config=self.tasks_config['strategy_formulation_task'], # type: ignore[index]
-            agent=self.strategy_agent,
-            context=[self.chart_analysis_task, self.market_data_task],  # Depends on both previous tasks
+            agent=self.strategy_agent(),
+            context=context,  # Joins all previous tasks
             output_file='trading_strategy.md'
         )
 
+    @after_kickoff
+    def write_timing_report(self, output):
+        """Print the task timing report and save it next to the strategy output"""
+        print(self.timer.format_report())
+        os.makedirs('outputs', exist_ok=True)
+        with open(os.path.join('outputs', 'timing_report.json'), 'w') as f:
+            json.dump(self.timer.report(), f, indent=2)
+        return output
+
     @crew
     def crew(self) -> Crew:
         """Creates the Multimodal Trading Assistant crew"""
-       
+        tasks = self.tasks
+        if not self.parallel:
+            tasks = [t for t in tasks if t.name != 'news_sentiment_task']
+        agents = [a for a in self.agents if any(t.agent is a for t in tasks)]
+        for idle in self.agents:
+            # An agent's max_rpm timer re-arms every minute until it executes a task;
+            # stop those of agents left out, or they keep the process alive after the run
+            if not any(idle is a for a in agents) and idle._rpm_controller is not None:
+                idle._rpm_controller.stop_rpm_counter()
+        self.timer.watch(tasks)
+
         return Crew(
-            agents=self.agents, 
-            tasks=self.tasks, 
-            process=Process.sequential, 
+            agents=agents,
+            tasks=tasks,
+            process=Process.sequential,
             verbose=True,
         )
@@ -1,4 +1,5 @@
 #!/usr/bin/env python
+import os
 import sys
 import warnings
 
@@ -13,15 +14,27 @@ warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 # Replace with inputs you want to test with, it will automatically
 # interpolate any tasks and agents information
 
+def _inputs():
+    """Crew inputs, overridable through environment variables."""
+    return {
+        'video_path': os.getenv('FOREX_AI_VIDEO_PATH', 'videos/chart.mp4'),
+        'analysis_focus': os.getenv('FOREX_AI_ANALYSIS_FOCUS', 'comprehensive'),
+        'current_timestamp': datetime.now().isoformat(),
+        'trading_pair': os.getenv('FOREX_AI_TRADING_PAIR', 'EUR/USD'),
+        'data_sources': os.getenv('FOREX_AI_DATA_SOURCES', 'Alpha Vantage'),
+        'risk_level': os.getenv('FOREX_AI_RISK_LEVEL', 'moderate'),
+        'chart_analysis': 'See chart analysis task output',
+        'market_data': 'See market data task output',
+    }
+
+
 def run():
     """
-    Run the crew.
+    Run the crew. Set FOREX_AI_PARALLEL=1 to run chart analysis, market data
+    and news sentiment concurrently.
     """
-    inputs = {
-        'topic': 'AI LLMs',
-        'current_year': str(datetime.now().year)
-    }
-    
+    inputs = _inputs()
+
     try:
         ForexAiAgent().crew().kickoff(inputs=inputs)
     except Exception as e:
@@ -32,10 +45,7 @@ def train():
     """
     Train the crew for a given number of iterations.
     """
-    inputs = {
-        "topic": "AI LLMs",
-        'current_year': str(datetime.now().year)
-    }
+    inputs = _inputs()
     try:
         ForexAiAgent().crew().train(n_iterations=int(sys.argv[1]), filename=sys.argv[2], inputs=inputs)
 
@@ -56,11 +66,8 @@ def test():
     """
     Test the crew execution and returns the results.
     """
-    inputs = {
-        "topic": "AI LLMs",
-        "current_year": str(datetime.now().year)
-    }
-    
+    inputs = _inputs()
+
     try:
         ForexAiAgent().crew().test(n_iterations=int(sys.argv[1]), eval_llm=sys.argv[2], inputs=inputs)
 
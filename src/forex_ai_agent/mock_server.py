@@ -0,0 +1,447 @@
+"""
+Local stand-in for the Alpha Vantage and OpenAI APIs.
+
+Serves the Alpha Vantage query endpoint (``/query``) and OpenAI chat
+completions (``/v1/chat/completions``, streamed or not) from one stdlib
+HTTP server, so tools and crews can be tested and benchmarked offline with
+reproducible latency. Alpha Vantage responses come from recorded fixtures
+when present, else from deterministic generators in the real response
+formats. Latency, jitter, server errors and rate limiting (Alpha Vantage
+``Note`` responses, OpenAI HTTP 429) are injected at configurable rates,
+and ``/stats`` reports request counts by outcome.
+
+Point the tools at a running server with the variables from `MockServer.env`:
+ALPHA_VANTAGE_BASE_URL, OPENAI_BASE_URL and OPENROUTER_BASE_URL.
+
+    python -m forex_ai_agent.mock_server --port 8765 --latency 0.05 --rate-limit-rate 0.1
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+import urllib.parse
+import urllib.request
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+DEFAULT_PORT = 8765
+# Generated data ends here, so responses are identical from run to run
+ANCHOR = datetime(2024, 6, 28, 16, 0, tzinfo=timezone.utc)
+RATE_LIMIT_NOTE = (
+    "Thank you for using Alpha Vantage! Our standard API rate limit is 25 requests per day. "
+    "Please subscribe to any of the premium plans to instantly remove all daily rate limits."
+)
+# A ReAct-style final answer, so CrewAI agents finish on the first completion
+DEFAULT_REPLY = "Thought: I now know the final answer\nFinal Answer: Mock analysis: no actionable setup, stay flat."
+# Replies for prompts containing a marker; CrewAI task guardrails are validated by a "Guardrail Agent"
+DEFAULT_RULES = {
+    "Guardrail Agent": 'Thought: I now know the final answer\nFinal Answer: {"valid": true, "feedback": null}',
+}
+# Units per US dollar used to generate quotes
+USD_UNITS = {
+    "USD": 1.0, "EUR": 0.933, "GBP": 0.791, "JPY": 160.9, "CHF": 0.898, "CAD": 1.369, "AUD": 1.499,
+    "NZD": 1.642, "CNY": 7.267, "HKD": 7.808, "SGD": 1.356, "SEK": 10.59, "NOK": 10.65, "MXN": 18.33,
+    "BTC": 1 / 61500.0, "ETH": 1 / 3390.0, "SOL": 1 / 146.0, "XRP": 1 / 0.476, "LTC": 1 / 73.5,
+}
+CURRENCY_NAMES = {
+    "USD": "United States Dollar", "EUR": "Euro", "GBP": "British Pound Sterling", "JPY": "Japanese Yen",
+    "BTC": "Bitcoin", "ETH": "Ethereum",
+}
+# Parameters shown in fixture names; the name's digest covers every parameter but the API key
+_FIXTURE_KEYS = ("from_currency", "to_currency", "from_symbol", "to_symbol", "symbol", "market", "interval")
+_INTRADAY_MINUTES = {"1min": 1, "5min": 5, "15min": 15, "30min": 30, "60min": 60}
+
+
+@dataclass
+class MockSettings:
+    """
+    Behaviour of the mock server.
+
+    Rates are probabilities per request. `fixtures_dir` holds recorded
+    Alpha Vantage responses named ``<FUNCTION>[_<param>...]_<digest>.json``
+    (see `fixture_name`); with `record_url` set, missing fixtures are fetched
+    from that upstream endpoint and saved there. Chat completions answer
+    with the `rules` reply of the first marker found in the messages, else
+    with `reply`.
+    """
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    fixtures_dir: Optional[str] = None
+    record_url: Optional[str] = None
+    reply: str = DEFAULT_REPLY
+    rules: Dict[str, str] = field(default_factory=lambda: dict(DEFAULT_RULES))
+    seed: int = 0
+
+
+def fixture_name(function: str, params: Dict[str, str]) -> str:
+    """
+    File name of the recorded response for a request, e.g. FX_DAILY_EUR_USD_3f2a9c1b7e.json.
+
+    The currency and symbol parameters keep names readable; the digest of
+    every sorted parameter except the API key tells apart requests that
+    differ only in tickers, topics, limit, sort, time_from or outputsize.
+    """
+    query = urllib.parse.urlencode(sorted((key, str(value)) for key, value in params.items() if key != "apikey"))
+    parts = [function] + [params[key].upper() for key in _FIXTURE_KEYS if params.get(key)]
+    return "_".join(parts + [hashlib.sha1(query.encode("utf-8")).hexdigest()[:10]]) + ".json"
+
+
+def _seed(*parts: Any) -> int:
+    return int.from_bytes(hashlib.sha1("|".join(map(str, parts)).encode()).digest()[:4], "little")
+
+
+def _rate(base: str, quote: str) -> float:
+    return USD_UNITS.get(quote.upper(), 1.0) / USD_UNITS.get(base.upper(), 1.0)
+
+
+def _digits(price: float) -> int:
+    return 8 if price < 1e-2 else 5 if price < 50 else 3 if price < 1000 else 2
+
+
+def exchange_rate(params: Dict[str, str]) -> Dict[str, Any]:
+    base, quote = params.get("from_currency", "").upper(), params.get("to_currency", "").upper()
+    if base not in USD_UNITS or quote not in USD_UNITS:
+        return {"Error Message": "Invalid API call. Please retry or visit the documentation for CURRENCY_EXCHANGE_RATE."}
+    rate = _rate(base, quote)
+    digits = _digits(rate)
+    spread = rate * 0.00005
+    return {"Realtime Currency Exchange Rate": {
+        "1. From_Currency Code": base,
+        "2. From_Currency Name": CURRENCY_NAMES.get(base, base),
+        "3. To_Currency Code": quote,
+        "4. To_Currency Name": CURRENCY_NAMES.get(quote, quote),
+        "5. Exchange Rate": f"{rate:.{digits}f}",
+        "6. Last Refreshed": ANCHOR.strftime("%Y-%m-%d %H:%M:%S"),
+        "7. Time Zone": "UTC",
+        "8. Bid Price": f"{rate - spread:.{digits}f}",
+        "9. Ask Price": f"{rate + spread:.{digits}f}",
+    }}
+
+
+def time_series(function: str, params: Dict[str, str]) -> Dict[str, Any]:
+    """A seeded random walk in the FX_* or DIGITAL_CURRENCY_DAILY format."""
+    crypto = function == "DIGITAL_CURRENCY_DAILY"
+    base = params.get("symbol" if crypto else "from_symbol", "").upper()
+    quote = params.get("market" if crypto else "to_symbol", "").upper()
+    if base not in USD_UNITS or quote not in USD_UNITS:
+        return {"Error Message": f"Invalid API call. Please retry or visit the documentation for {function}."}
+    interval = params.get("interval", "")
+    if function == "FX_INTRADAY":
+        if interval not in _INTRADAY_MINUTES:
+            return {"Error Message": "Invalid API call. Please retry or visit the documentation for FX_INTRADAY."}
+        step, label, stamp = timedelta(minutes=_INTRADAY_MINUTES[interval]), f"FX ({interval})", "%Y-%m-%d %H:%M:%S"
+    else:
+        period = function.split("_")[-1].lower()
+        step = {"daily": timedelta(days=1), "weekly": timedelta(weeks=1), "monthly": timedelta(days=30)}.get(period)
+        if step is None:
+            return {"Error Message": f"Invalid API call. Please retry or visit the documentation for {function}."}
+        label = "(Digital Currency Daily)" if crypto else f"FX ({period.capitalize()})"
+        stamp = "%Y-%m-%d"
+    bars = 1000 if params.get("outputsize") == "full" else 100
+
+    rng = np.random.default_rng(_seed(function, base, quote, interval))
+    volatility = 0.03 if crypto else 0.004
+    walk = np.cumsum(rng.normal(0, volatility, bars))
+    close = _rate(base, quote) * np.exp(walk - walk[0])      # the newest close is the quoted rate
+    open_ = close * np.exp(rng.normal(0, volatility / 2, bars))
+    high = np.maximum(open_, close) * np.exp(np.abs(rng.normal(0, volatility / 2, bars)))
+    low = np.minimum(open_, close) * np.exp(-np.abs(rng.normal(0, volatility / 2, bars)))
+    digits = _digits(float(close[0]))
+    series = {}
+    for i in range(bars):      # newest first, as Alpha Vantage sends them
+        bar = {"1. open": f"{open_[i]:.{digits}f}", "2. high": f"{high[i]:.{digits}f}",
+               "3. low": f"{low[i]:.{digits}f}", "4. close": f"{close[i]:.{digits}f}"}
+        if crypto:
+            bar["5. volume"] = f"{rng.uniform(1e3, 5e4):.8f}"
+        series[(ANCHOR - i * step).strftime(stamp)] = bar
+    meta = {"1. Information": f"{function} time series", "2. From Symbol": base, "3. To Symbol": quote,
+            "4. Last Refreshed": ANCHOR.strftime(stamp), "5. Time Zone": "UTC"}
+    return {"Meta Data": meta, f"Time Series {label}": series}
+
+
+def news_sentiment(params: Dict[str, str]) -> Dict[str, Any]:
+    """Hourly articles back from the anchor, newest first, honouring limit, sort and time_from."""
+    limit = min(int(params.get("limit", 50)), 1000)
+    tickers = [t for t in params.get("tickers", "").split(",") if t] or ["FOREX:USD", "FOREX:EUR", "CRYPTO:BTC"]
+    topic = params.get("topics", "financial_markets").split(",")[0]
+    since = None
+    if params.get("time_from"):
+        since = datetime.strptime(params["time_from"], "%Y%m%dT%H%M").replace(tzinfo=timezone.utc)
+    rng = np.random.default_rng(_seed("NEWS", params.get("tickers", ""), topic))
+    scores = rng.uniform(-0.6, 0.6, limit)
+    feed = []
+    for i in range(limit):
+        published = ANCHOR - timedelta(hours=i)
+        if since is not None and published < since:
+            break
+        score = float(scores[i])
+        label = ("Bearish" if score <= -0.35 else "Somewhat-Bearish" if score <= -0.15 else "Neutral" if score < 0.15
+                 else "Somewhat-Bullish" if score < 0.35 else "Bullish")
+        feed.append({
+            "title": f"{tickers[i % len(tickers)].split(':')[-1]} markets update #{i}",
+            "url": f"https://news.example.com/{topic}/{published:%Y%m%d%H}-{i}",
+            "time_published": published.strftime("%Y%m%dT%H%M%S"),
+            "authors": ["Mock Wire"],
+            "summary": "Generated article for offline testing. " * 8,
+            "banner_image": None,
+            "source": "Mock Wire",
+            "category_within_source": "Markets",
+            "source_domain": "news.example.com",
+            "topics": [{"topic": topic, "relevance_score": "0.9"}],
+            "overall_sentiment_score": round(score, 6),
+            "overall_sentiment_label": label,
+            "ticker_sentiment": [
+                {"ticker": ticker, "relevance_score": f"{rng.uniform(0.1, 1):.6f}",
+                 "ticker_sentiment_score": f"{score + rng.normal(0, 0.05):.6f}", "ticker_sentiment_label": label}
+                for ticker in tickers
+            ],
+        })
+    if params.get("sort", "LATEST").upper() == "EARLIEST":
+        feed.reverse()
+    return {
+        "items": str(len(feed)),
+        "sentiment_score_definition": "x <= -0.35: Bearish; -0.35 < x <= -0.15: Somewhat-Bearish; "
+                                      "-0.15 < x < 0.15: Neutral; 0.15 <= x < 0.35: Somewhat_Bullish; x >= 0.35: Bullish",
+        "relevance_score_definition": "0 < x <= 1, with a higher score indicating higher relevance.",
+        "feed": feed,
+    }
+
+
+def alpha_vantage_response(params: Dict[str, str]) -> Dict[str, Any]:
+    """Generated response for an Alpha Vantage query."""
+    function = params.get("function", "").upper()
+    if not params.get("apikey"):
+        return {"Error Message": "the parameter apikey is invalid or missing. Please claim your free API key."}
+    if function == "CURRENCY_EXCHANGE_RATE":
+        return exchange_rate(params)
+    if function.startswith("FX_") or function == "DIGITAL_CURRENCY_DAILY":
+        return time_series(function, params)
+    if function == "NEWS_SENTIMENT":
+        return news_sentiment(params)
+    return {"Error Message": "This API function does not exist."}
+
+
+class MockServer:
+    """Threaded HTTP server answering Alpha Vantage and OpenAI requests; usable as a context manager."""
+
+    def __init__(self, settings: Optional[MockSettings] = None, host: str = "127.0.0.1", port: int = 0):
+        self.settings = settings or MockSettings()
+        self.stats: Dict[str, int] = {}
+        self._random = random.Random(self.settings.seed)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.mock = self
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self) -> Dict[str, str]:
+        """Environment variables pointing the tools and crew at this server, with placeholder keys and no quota."""
+        return {
+            "ALPHA_VANTAGE_BASE_URL": f"{self.url}/query",
+            "OPENAI_BASE_URL": f"{self.url}/v1",
+            "OPENROUTER_BASE_URL": f"{self.url}/v1",
+            "ALPHA_VANTAGE_API_KEY": "mock",
+            "OPENAI_API_KEY": "mock",
+            "OPENROUTER_API_KEY": "mock",
+            "ALPHA_VANTAGE_REQUESTS_PER_MINUTE": "1000000",
+            "ALPHA_VANTAGE_REQUESTS_PER_DAY": "1000000",
+        }
+
+    def start(self) -> "MockServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="mock-api-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "MockServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] = self.stats.get(name, 0) + 1
+
+    def draw(self) -> Tuple[float, float]:
+        """Random numbers for one request: its outcome and its latency jitter."""
+        with self._lock:
+            return self._random.random(), self._random.random()
+
+    def fixture(self, params: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        """Recorded response for a query, recording it from upstream when configured."""
+        if not self.settings.fixtures_dir:
+            return None
+        path = os.path.join(self.settings.fixtures_dir, fixture_name(params.get("function", "").upper(), params))
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        if not self.settings.record_url:
+            return None
+        query = urllib.parse.urlencode({**params, "apikey": os.getenv("ALPHA_VANTAGE_API_KEY", "")})
+        with urllib.request.urlopen(f"{self.settings.record_url}?{query}", timeout=30) as response:
+            data = json.load(response)
+        if not any(key in data for key in ("Error Message", "Note", "Information")):
+            os.makedirs(self.settings.fixtures_dir, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+        return data
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "ForexAIMock/1.0"
+
+    @property
+    def mock(self) -> MockServer:
+        return self.server.mock
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        url = urllib.parse.urlsplit(self.path)
+        if url.path == "/query":
+            self._alpha_vantage(dict(urllib.parse.parse_qsl(url.query)))
+        elif url.path == "/stats":
+            self._json(200, self.mock.stats)
+        else:
+            self._json(404, {"error": "Not found"})
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        path = urllib.parse.urlsplit(self.path).path
+        if path == "/query":
+            self._alpha_vantage(dict(urllib.parse.parse_qsl(body.decode())))
+        elif path.endswith("/chat/completions"):
+            self._chat(json.loads(body or b"{}"))
+        else:
+            self._json(404, {"error": "Not found"})
+
+    def _delay(self, jitter: float) -> None:
+        settings = self.mock.settings
+        delay = settings.latency + settings.jitter * jitter
+        if delay > 0:
+            time.sleep(delay)
+
+    def _json(self, status: int, payload: Any) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _alpha_vantage(self, params: Dict[str, str]) -> None:
+        outcome, jitter = self.mock.draw()
+        settings = self.mock.settings
+        self._delay(jitter)
+        if outcome < settings.error_rate:
+            self.mock.count("alpha_vantage.error")
+            self._json(503, {"error": "Service temporarily unavailable"})
+        elif outcome < settings.error_rate + settings.rate_limit_rate:
+            self.mock.count("alpha_vantage.rate_limited")
+            self._json(200, {"Note": RATE_LIMIT_NOTE})
+        else:
+            self.mock.count("alpha_vantage.ok")
+            self._json(200, self.mock.fixture(params) or alpha_vantage_response(params))
+
+    def _chat(self, request: Dict[str, Any]) -> None:
+        outcome, jitter = self.mock.draw()
+        settings = self.mock.settings
+        self._delay(jitter)
+        if outcome < settings.error_rate:
+            self.mock.count("openai.error")
+            self._json(500, {"error": {"message": "The server had an error", "type": "server_error"}})
+            return
+        if outcome < settings.error_rate + settings.rate_limit_rate:
+            self.mock.count("openai.rate_limited")
+            self._json(429, {"error": {"message": "Rate limit reached", "type": "rate_limit_error"}})
+            return
+        self.mock.count("openai.ok")
+        model = request.get("model", "mock-model")
+        prompt = "\n".join(str(message.get("content", "")) for message in request.get("messages", []))
+        reply = next((text for marker, text in settings.rules.items() if marker in prompt), settings.reply)
+        usage = {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(reply) // 4,
+                 "total_tokens": len(prompt) // 4 + len(reply) // 4}
+        base = {"id": f"chatcmpl-mock{time.monotonic_ns()}", "created": int(time.time()), "model": model}
+        if not request.get("stream"):
+            self._json(200, {**base, "object": "chat.completion", "usage": usage, "choices": [
+                {"index": 0, "message": {"role": "assistant", "content": reply}, "finish_reason": "stop"}
+            ]})
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        pieces: List[Dict[str, Any]] = [{"role": "assistant", "content": ""}]
+        pieces += [{"content": reply[i:i + 16]} for i in range(0, len(reply), 16)]
+        for delta in pieces + [{}]:
+            chunk = {**base, "object": "chat.completion.chunk",
+                     "choices": [{"index": 0, "delta": delta, "finish_reason": None if delta else "stop"}]}
+            if not delta:
+                chunk["usage"] = usage
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local mock of the Alpha Vantage and OpenAI APIs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Up to this many extra seconds, uniformly")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests failing with HTTP 5xx")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0,
+                        help="Fraction answered with an Alpha Vantage Note or OpenAI HTTP 429")
+    parser.add_argument("--fixtures", default=None, help="Directory of recorded Alpha Vantage responses")
+    parser.add_argument("--record", action="store_true",
+                        help="Fetch missing fixtures from the real Alpha Vantage API (needs ALPHA_VANTAGE_API_KEY)")
+    parser.add_argument("--reply", default=DEFAULT_REPLY, help="Content of every chat completion")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    settings = MockSettings(
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate,
+        fixtures_dir=args.fixtures, record_url="https://www.alphavantage.co/query" if args.record else None,
+        reply=args.reply, seed=args.seed,
+    )
+    server = MockServer(settings, args.host, args.port)
+    print(f"Mock Alpha Vantage and OpenAI server on {server.url}; point the tools at it with:")
+    for name, value in server.env().items():
+        print(f"export {name}={value}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Task timing for crew runs.
+
+Records when each task of a crew starts and finishes (via CrewAI task
+events) and reports per-task durations together with the critical path:
+the chain of tasks that actually determined end-to-end latency.
+"""
+
+import time
+import threading
+import weakref
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from crewai.events import crewai_event_bus
+from crewai.events.types.task_events import (
+    TaskCompletedEvent,
+    TaskFailedEvent,
+    TaskStartedEvent,
+)
+
+
+# Timers currently watching tasks; handlers are registered once per process
+_timers: "weakref.WeakSet[TaskTimer]" = weakref.WeakSet()
+
+
+class TaskTimer:
+    """Collects start/end times for a set of tasks and builds a timing report."""
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter):
+        self.clock = clock
+        self._names: Dict[int, str] = {}
+        self._starts: Dict[str, float] = {}
+        self._ends: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        _timers.add(self)
+
+    def watch(self, tasks: Iterable[Any]) -> None:
+        """Start watching `tasks`, clearing timings from any previous run."""
+        with self._lock:
+            self._names = {id(task): task.name or f"task_{i}" for i, task in enumerate(tasks)}
+            self._starts.clear()
+            self._ends.clear()
+
+    def _record(self, task: Any, times: Dict[str, float]) -> None:
+        name = self._names.get(id(task))
+        if name is not None:
+            with self._lock:
+                times[name] = self.clock()
+
+    def started(self, task: Any) -> None:
+        self._record(task, self._starts)
+
+    def finished(self, task: Any) -> None:
+        self._record(task, self._ends)
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Per-task timings (seconds, relative to the first task start) and the critical path.
+
+        The critical path is rebuilt from observed times: starting from the
+        task that finished last, each step goes back to the task that
+        finished most recently before the current one started, i.e. the task
+        it was waiting on.
+        """
+        with self._lock:
+            finished = {name: (self._starts[name], end) for name, end in self._ends.items() if name in self._starts}
+        if not finished:
+            return {"tasks": {}, "critical_path": [], "wall_time": 0.0}
+
+        origin = min(start for start, _ in finished.values())
+        tasks = {
+            name: {
+                "start": round(start - origin, 3),
+                "end": round(end - origin, 3),
+                "duration": round(end - start, 3),
+            }
+            for name, (start, end) in sorted(finished.items(), key=lambda item: item[1][0])
+        }
+
+        path: List[str] = []
+        current: Optional[str] = max(finished, key=lambda name: finished[name][1])
+        while current is not None:
+            path.append(current)
+            start = finished[current][0]
+            waited_on = [name for name, (_, end) in finished.items() if end <= start and name not in path]
+            current = max(waited_on, key=lambda name: finished[name][1]) if waited_on else None
+        path.reverse()
+
+        wall_time = max(end for _, end in finished.values()) - origin
+        total = sum(end - start for start, end in finished.values())
+        return {
+            "tasks": tasks,
+            "critical_path": path,
+            "critical_path_time": round(sum(tasks[name]["duration"] for name in path), 3),
+            "wall_time": round(wall_time, 3),
+            "sum_of_task_times": round(total, 3),
+            "parallel_speedup": round(total / wall_time, 2) if wall_time > 0 else 1.0,
+        }
+
+    def format_report(self) -> str:
+        """Human-readable timing table with the critical path marked."""
+        report = self.report()
+        lines = ["Task timing (seconds):"]
+        for name, timing in report["tasks"].items():
+            marker = "*" if name in report["critical_path"] else " "
+            lines.append(
+                f" {marker} {name:<30} start {timing['start']:>8.2f}  "
+                f"end {timing['end']:>8.2f}  duration {timing['duration']:>8.2f}"
+            )
+        lines.append(f"Critical path (*): {' -> '.join(report['critical_path'])}")
+        lines.append(
+            f"Wall time: {report['wall_time']:.2f}s, "
+            f"sum of task times: {report.get('sum_of_task_times', 0):.2f}s"
+        )
+        return "\n".join(lines)
+
+
+def _on_task_started(source: Any, event: TaskStartedEvent) -> None:
+    for timer in list(_timers):
+        timer.started(event.task)
+
+
+def _on_task_finished(source: Any, event: Any) -> None:
+    for timer in list(_timers):
+        timer.finished(event.task)
+
+
+crewai_event_bus.register_handler(TaskStartedEvent, _on_task_started)
+crewai_event_bus.register_handler(TaskCompletedEvent, _on_task_finished)
+crewai_event_bus.register_handler(TaskFailedEvent, _on_task_finished)
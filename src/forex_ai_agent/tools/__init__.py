@@ -4,13 +4,24 @@ Contains specialized tools for video analysis, market data, and strategy formula
 """
 
 from .video_analysis import video_analysis_tool
-from .market_data import crypto_api_connector, forex_data_fetcher
-from .strategy_tools import risk_calculator, strategy_validator
+from .crypto_data import crypto_api_connector
+from .forex_data import forex_data_fetcher
+from .news_data import news_sentiment_fetcher, ticker_sentiment_series
+from .batch_quotes import batch_quote_fetcher
+from .historical_data import historical_ohlc_fetcher
+from .strategy_tools import monte_carlo_risk_simulator, risk_calculator, strategy_validator
+from .indicators import technical_indicator_calculator
 
 __all__ = [
     'video_analysis_tool',
     'crypto_api_connector',
     'forex_data_fetcher',
+    'news_sentiment_fetcher',
+    'ticker_sentiment_series',
+    'batch_quote_fetcher',
+    'historical_ohlc_fetcher',
     'risk_calculator',
-    'strategy_validator'
+    'monte_carlo_risk_simulator',
+    'strategy_validator',
+    'technical_indicator_calculator'
 ]
\ No newline at end of file
@@ -0,0 +1,434 @@
+"""
+Shared Alpha Vantage API client.
+
+This module provides a single pooled HTTP client used by every market data
+tool, with a token-bucket rate limiter that enforces the Alpha Vantage
+per-minute and per-day quotas across all tools and a TTL response cache
+keyed on (function, params). The shared client also writes through to a
+persistent on-disk cache so fetched data survives restarts. An asyncio
+counterpart backed by a pooled aiohttp session shares the same quota and
+caches.
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional, Tuple, Union
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+
+from .persistent_cache import LazyCache, PersistentCache, lazy_persistent_cache
+
+
+# Overridable to point the tools at a local mock (see forex_ai_agent.mock_server)
+ALPHA_VANTAGE_BASE_URL = os.getenv("ALPHA_VANTAGE_BASE_URL", "https://www.alphavantage.co/query")
+
+# Free tier quotas (https://www.alphavantage.co/premium/)
+DEFAULT_REQUESTS_PER_MINUTE = 5
+DEFAULT_REQUESTS_PER_DAY = 25
+
+# Response cache lifetime per Alpha Vantage function, in seconds
+DEFAULT_CACHE_TTLS = {
+    "CURRENCY_EXCHANGE_RATE": 60,
+    "NEWS_SENTIMENT": 15 * 60,
+}
+DEFAULT_CACHE_TTL = 5 * 60
+
+# Chunk size for streamed response bodies
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Response keys Alpha Vantage uses for errors and quota notices
+ERROR_RESPONSE_KEYS = ("Error Message", "Note", "Information")
+
+CacheKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+# Transport failures raised by the sync (requests) and async (aiohttp) clients
+NETWORK_ERRORS = (requests.exceptions.RequestException, aiohttp.ClientError, asyncio.TimeoutError)
+
+
+class AlphaVantageRateLimitError(Exception):
+    """Raised when a request would exceed the configured Alpha Vantage quota."""
+
+
+class TokenBucket:
+    """Token bucket holding `capacity` tokens, refilled evenly over `period` seconds."""
+
+    def __init__(self, capacity: int, period: float, clock: Callable[[], float] = time.monotonic):
+        self.capacity = capacity
+        self.period = period
+        self.clock = clock
+        self.tokens = float(capacity)
+        self.updated_at = clock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        elapsed = now - self.updated_at
+        self.updated_at = now
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.capacity / self.period)
+
+    def wait_time(self) -> float:
+        """Seconds until one token is available (0 if available now)."""
+        self._refill()
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) * self.period / self.capacity
+
+    def consume(self) -> None:
+        self.tokens -= 1
+
+
+class RateLimiter:
+    """Thread-safe limiter combining the per-minute and per-day Alpha Vantage quotas."""
+
+    def __init__(
+        self,
+        requests_per_minute: int = DEFAULT_REQUESTS_PER_MINUTE,
+        requests_per_day: int = DEFAULT_REQUESTS_PER_DAY,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.minute_bucket = TokenBucket(requests_per_minute, 60, clock)
+        self.day_bucket = TokenBucket(requests_per_day, 24 * 60 * 60, clock)
+        self.sleep = sleep
+        self._lock = threading.Lock()
+
+    def _try_acquire(self, waited: float, max_wait: float) -> float:
+        """Take a slot if one is free (returning 0), else return the seconds to wait."""
+        with self._lock:
+            day_wait = self.day_bucket.wait_time()
+            minute_wait = self.minute_bucket.wait_time()
+            if day_wait == 0 and minute_wait == 0:
+                self.day_bucket.consume()
+                self.minute_bucket.consume()
+                return 0.0
+        wait = max(day_wait, minute_wait)
+        if waited + wait > max_wait:
+            quota = "daily" if day_wait > 0 else "per-minute"
+            raise AlphaVantageRateLimitError(
+                f"Alpha Vantage {quota} request quota exhausted (retry in {wait:.0f}s)"
+            )
+        return wait
+
+    def acquire(self, max_wait: float = 60.0) -> None:
+        """Take one request slot, waiting up to `max_wait` seconds for the minute quota."""
+        waited = 0.0
+        while True:
+            wait = self._try_acquire(waited, max_wait)
+            if wait == 0:
+                return
+            self.sleep(wait)
+            waited += wait
+
+    async def acquire_async(self, max_wait: float = 60.0) -> None:
+        """Like `acquire`, but yields to the event loop while waiting."""
+        waited = 0.0
+        while True:
+            wait = self._try_acquire(waited, max_wait)
+            if wait == 0:
+                return
+            await asyncio.sleep(wait)
+            waited += wait
+
+
+class TTLCache:
+    """Small thread-safe in-memory cache with per-entry expiry and a size bound."""
+
+    def __init__(self, max_entries: int = 256, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Any) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self.clock():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Any, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (self.clock() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class AlphaVantageClient:
+    """Pooled, rate-limited and cached client for the Alpha Vantage query endpoint."""
+
+    def __init__(
+        self,
+        base_url: str = ALPHA_VANTAGE_BASE_URL,
+        api_key: Optional[str] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        cache: Optional[TTLCache] = None,
+        persistent_cache: Union[PersistentCache, LazyCache, None] = None,
+        pool_size: int = 10,
+        max_wait: float = 60.0,
+    ):
+        self.base_url = base_url
+        self._api_key = api_key
+        self.rate_limiter = rate_limiter or RateLimiter(
+            requests_per_minute=int(os.getenv("ALPHA_VANTAGE_REQUESTS_PER_MINUTE", DEFAULT_REQUESTS_PER_MINUTE)),
+            requests_per_day=int(os.getenv("ALPHA_VANTAGE_REQUESTS_PER_DAY", DEFAULT_REQUESTS_PER_DAY)),
+        )
+        self.cache = cache or TTLCache()
+        self.persistent_cache = persistent_cache
+        self.max_wait = max_wait
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    @property
+    def api_key(self) -> Optional[str]:
+        """API key, read from the environment once it becomes available."""
+        if not self._api_key:
+            self._api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+        return self._api_key
+
+    @property
+    def persistent_cache(self) -> Optional[PersistentCache]:
+        """Disk cache, opened on first use when given as a LazyCache."""
+        cache = self._persistent_cache
+        return cache.open() if isinstance(cache, LazyCache) else cache
+
+    @persistent_cache.setter
+    def persistent_cache(self, cache: Union[PersistentCache, LazyCache, None]) -> None:
+        self._persistent_cache = cache
+
+    @staticmethod
+    def cache_key(function: str, params: Dict[str, Any]) -> CacheKey:
+        return function, tuple(sorted((k, str(v)) for k, v in params.items() if k != "apikey"))
+
+    def query(
+        self,
+        function: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: float = 10,
+        ttl: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Call an Alpha Vantage function and return the decoded JSON response.
+
+        Successful responses are cached in memory and on disk for `ttl`
+        seconds (defaulting to the per-function TTL); error and quota notices
+        are never cached.
+
+        Raises:
+            AlphaVantageRateLimitError: If the local quota is exhausted.
+            requests.exceptions.RequestException: On network or HTTP errors.
+        """
+        return self.query_with_cache_status(function, params, timeout, ttl)[0]
+
+    def query_with_cache_status(
+        self,
+        function: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: float = 10,
+        ttl: Optional[float] = None,
+    ) -> Tuple[Dict[str, Any], bool]:
+        """Like `query`, also returning whether the response came from a cache rather than the API."""
+        params = params or {}
+        key = self.cache_key(function, params)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached, True
+
+        self.rate_limiter.acquire(self.max_wait)
+        response = self.session.get(
+            self.base_url,
+            params={"function": function, **params, "apikey": self.api_key},
+            timeout=timeout,
+        )
+        response.raise_for_status()
+        data = response.json()
+        self._store(key, function, data, ttl)
+        return data, False
+
+    def stream(
+        self,
+        function: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: float = 10,
+        chunk_size: int = STREAM_CHUNK_SIZE,
+    ) -> Iterator[bytes]:
+        """
+        Call an Alpha Vantage function and yield the raw response body in chunks.
+
+        For large responses that are parsed incrementally (see json_stream).
+        Streamed responses are never decoded as a whole, so they bypass the
+        response caches. The connection is released when the generator is
+        exhausted or closed.
+
+        Raises:
+            AlphaVantageRateLimitError: If the local quota is exhausted.
+            requests.exceptions.RequestException: On network or HTTP errors.
+        """
+        self.rate_limiter.acquire(self.max_wait)
+        response = self.session.get(
+            self.base_url,
+            params={"function": function, **(params or {}), "apikey": self.api_key},
+            timeout=timeout,
+            stream=True,
+        )
+        try:
+            response.raise_for_status()
+            yield from response.iter_content(chunk_size)
+        finally:
+            response.close()
+
+    def _cached(self, key: CacheKey) -> Optional[Dict[str, Any]]:
+        """Look up a response in the memory cache, then the disk cache."""
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        if self.persistent_cache is not None:
+            disk_key = json.dumps(key)
+            cached = self.persistent_cache.get(disk_key)
+            if cached is not None:
+                self.cache.set(key, cached, self.persistent_cache.ttl(disk_key))
+        return cached
+
+    def _store(self, key: CacheKey, function: str, data: Dict[str, Any], ttl: Optional[float]) -> None:
+        """Cache a successful response in memory and on disk."""
+        if any(k in data for k in ERROR_RESPONSE_KEYS):
+            return
+        if ttl is None:
+            ttl = DEFAULT_CACHE_TTLS.get(function, DEFAULT_CACHE_TTL)
+        self.cache.set(key, data, ttl)
+        if self.persistent_cache is not None:
+            self.persistent_cache.set(json.dumps(key), data, ttl)
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for the memory cache and, if enabled, the disk cache."""
+        stats: Dict[str, Any] = {"memory": {"hits": self.cache.hits, "misses": self.cache.misses}}
+        if self.persistent_cache is not None:
+            stats["disk"] = self.persistent_cache.stats()
+        return stats
+
+
+class AsyncAlphaVantageClient:
+    """
+    asyncio client for the Alpha Vantage query endpoint.
+
+    Shares the rate limiter and caches of a synchronous client, so quota and
+    cached responses are common to sync and async callers. One pooled aiohttp
+    session is kept per event loop.
+    """
+
+    def __init__(self, client: AlphaVantageClient, pool_size: int = 10):
+        self.client = client
+        self.pool_size = pool_size
+        self._sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aiohttp.ClientSession]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    @property
+    def api_key(self) -> Optional[str]:
+        return self.client.api_key
+
+    def _session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self.pool_size))
+            self._sessions[loop] = session
+        return session
+
+    async def query(
+        self,
+        function: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: float = 10,
+        ttl: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Async equivalent of `AlphaVantageClient.query`.
+
+        Raises:
+            AlphaVantageRateLimitError: If the local quota is exhausted.
+            aiohttp.ClientError, asyncio.TimeoutError: On network or HTTP errors.
+        """
+        return (await self.query_with_cache_status(function, params, timeout, ttl))[0]
+
+    async def query_with_cache_status(
+        self,
+        function: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: float = 10,
+        ttl: Optional[float] = None,
+    ) -> Tuple[Dict[str, Any], bool]:
+        """Async equivalent of `AlphaVantageClient.query_with_cache_status`."""
+        params = params or {}
+        key = self.client.cache_key(function, params)
+        cached = self.client._cached(key)
+        if cached is not None:
+            return cached, True
+
+        await self.client.rate_limiter.acquire_async(self.client.max_wait)
+        request_params = {"function": function, **params, "apikey": self.api_key}
+        async with self._session().get(
+            self.client.base_url,
+            params={k: str(v) for k, v in request_params.items()},
+            timeout=aiohttp.ClientTimeout(total=timeout),
+        ) as response:
+            response.raise_for_status()
+            data = await response.json(content_type=None)
+        self.client._store(key, function, data, ttl)
+        return data, False
+
+    async def stream(
+        self,
+        function: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: float = 10,
+        chunk_size: int = STREAM_CHUNK_SIZE,
+    ) -> AsyncIterator[bytes]:
+        """
+        Async equivalent of `AlphaVantageClient.stream`.
+
+        Raises:
+            AlphaVantageRateLimitError: If the local quota is exhausted.
+            aiohttp.ClientError, asyncio.TimeoutError: On network or HTTP errors.
+        """
+        await self.client.rate_limiter.acquire_async(self.client.max_wait)
+        request_params = {"function": function, **(params or {}), "apikey": self.api_key}
+        async with self._session().get(
+            self.client.base_url,
+            params={k: str(v) for k, v in request_params.items()},
+            timeout=aiohttp.ClientTimeout(total=timeout),
+        ) as response:
+            response.raise_for_status()
+            async for chunk in response.content.iter_chunked(chunk_size):
+                yield chunk
+
+    async def close(self) -> None:
+        """Close the session bound to the running event loop."""
+        session = self._sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None:
+            await session.close()
+
+
+# Shared client instances used by all market data tools
+alpha_vantage_client = AlphaVantageClient(persistent_cache=lazy_persistent_cache("alpha_vantage"))
+async_alpha_vantage_client = AsyncAlphaVantageClient(alpha_vantage_client)
@@ -0,0 +1,171 @@
+"""
+Merging of chart analyses produced for separate chunks of a video.
+
+Each chunk analysis follows the video analysis JSON schema; `merge_analyses`
+reduces them to a single analysis in the same schema: categorical fields
+are decided by confidence-weighted votes, lists are unioned, and nearby
+support/resistance levels are clustered into one level.
+"""
+
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+# Levels within this fraction of each other are treated as the same level
+DEFAULT_LEVEL_TOLERANCE = 0.002
+MAX_OBSERVATIONS = 20
+
+_UNKNOWN = {"", "unknown", "error", "none", "n/a"}
+
+
+def _confidence(analysis: Dict[str, Any]) -> float:
+    try:
+        return max(0.0, float(analysis.get("confidence_score", 0.5)))
+    except (TypeError, ValueError):
+        return 0.5
+
+
+def _vote(analyses: List[Dict[str, Any]], field: str) -> Tuple[Optional[str], float]:
+    """Confidence-weighted winner of a categorical field and its share of the weight."""
+    weights: Dict[str, float] = defaultdict(float)
+    labels: Dict[str, str] = {}
+    for analysis in analyses:
+        value = analysis.get(field)
+        if not isinstance(value, str) or value.strip().lower() in _UNKNOWN:
+            continue
+        key = value.strip().lower()
+        labels.setdefault(key, value.strip())
+        # Every chunk gets a minimal say, even with a zero confidence score
+        weights[key] += max(_confidence(analysis), 1e-3)
+    if not weights:
+        return None, 0.0
+    winner = max(weights, key=weights.get)
+    return labels[winner], weights[winner] / sum(weights.values())
+
+
+def _union(lists: Iterable[Any]) -> List[Any]:
+    """Order-preserving union, case-insensitive for strings."""
+    seen = set()
+    merged = []
+    for items in lists:
+        for item in items or []:
+            key = item.strip().lower() if isinstance(item, str) else repr(item)
+            if key not in seen:
+                seen.add(key)
+                merged.append(item)
+    return merged
+
+
+def _as_float(value: Any) -> Optional[float]:
+    try:
+        return float(str(value).replace(",", ""))
+    except (TypeError, ValueError):
+        return None
+
+
+def _as_level(value: Any) -> Optional[float]:
+    """Price of a level given as a number, numeric string or {"price": ...} object."""
+    if isinstance(value, dict):
+        value = value.get("price", value.get("level"))
+    return _as_float(value)
+
+
+def cluster_levels(weighted_levels: List[Tuple[float, float]], tolerance: float = DEFAULT_LEVEL_TOLERANCE) -> List[float]:
+    """
+    Cluster (level, weight) pairs whose neighbours lie within `tolerance` (relative).
+
+    Each cluster is reported as its weighted mean, in ascending order.
+    """
+    clusters: List[List[Tuple[float, float]]] = []
+    for level, weight in sorted(weighted_levels):
+        if clusters and level - clusters[-1][-1][0] <= tolerance * abs(level):
+            clusters[-1].append((level, weight))
+        else:
+            clusters.append([(level, weight)])
+    merged = []
+    for cluster in clusters:
+        total = sum(weight for _, weight in cluster) or len(cluster)
+        merged.append(sum(level * (weight or 1) for level, weight in cluster) / total)
+    return merged
+
+
+def _merge_levels(analyses: List[Dict[str, Any]], field: str, tolerance: float) -> List[float]:
+    weighted = []
+    for analysis in analyses:
+        for value in analysis.get(field) or []:
+            level = _as_level(value)
+            if level is not None:
+                weighted.append((level, _confidence(analysis)))
+    return [round(level, 6) for level in cluster_levels(weighted, tolerance)]
+
+
+def _merge_patterns(analyses: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """One entry per pattern name, keeping the most confident sighting."""
+    best: Dict[str, Dict[str, Any]] = {}
+    for analysis in analyses:
+        for pattern in analysis.get("chart_patterns") or []:
+            if not isinstance(pattern, dict) or not pattern.get("pattern"):
+                continue
+            key = str(pattern["pattern"]).strip().lower()
+            confidence = _as_float(pattern.get("confidence")) or 0.0
+            if key not in best or confidence > (_as_float(best[key].get("confidence")) or 0.0):
+                best[key] = pattern
+    return list(best.values())
+
+
+def merge_analyses(analyses: List[Dict[str, Any]], tolerance: float = DEFAULT_LEVEL_TOLERANCE) -> Dict[str, Any]:
+    """
+    Reduce per-chunk analyses (in video order) to one analysis.
+
+    Failed chunks (with an "error" key) are skipped and listed under
+    "chunk_errors"; if every chunk failed the first failure is returned.
+    The confidence score is the mean chunk confidence scaled by how much
+    of the weight agreed on the trend direction.
+    """
+    succeeded = [analysis for analysis in analyses if "error" not in analysis]
+    errors = [analysis["error"] for analysis in analyses if "error" in analysis]
+    if not succeeded:
+        return dict(analyses[0]) if analyses else {"error": "No chunk analyses to merge"}
+
+    trading_pair, _ = _vote(succeeded, "trading_pair")
+    timeframe, _ = _vote(succeeded, "timeframe")
+    trend_direction, agreement = _vote(succeeded, "trend_direction")
+    trend_strength, _ = _vote(
+        [a for a in succeeded if str(a.get("trend_direction", "")).strip().lower() == str(trend_direction).lower()],
+        "trend_strength",
+    )
+
+    # Chunks are in video order, so the latest estimate is the current price
+    current_price = None
+    for analysis in reversed(succeeded):
+        current_price = _as_float(analysis.get("current_price_estimate"))
+        if current_price is not None:
+            break
+
+    mean_confidence = sum(_confidence(a) for a in succeeded) / len(succeeded)
+    confidence = mean_confidence * (agreement if trend_direction else 1.0)
+    frames_analyzed = sum(
+        int(_as_float((a.get("frame_analysis") or {}).get("total_frames_analyzed")) or 0) for a in succeeded
+    )
+
+    merged = {
+        "trading_pair": trading_pair or "Unknown",
+        "timeframe": timeframe or "Unknown",
+        "technical_indicators": _union(a.get("technical_indicators") for a in succeeded),
+        "chart_patterns": _merge_patterns(succeeded),
+        "support_levels": _merge_levels(succeeded, "support_levels", tolerance),
+        "resistance_levels": _merge_levels(succeeded, "resistance_levels", tolerance),
+        "trend_direction": trend_direction or "unknown",
+        "trend_strength": trend_strength or "unknown",
+        "current_price_estimate": current_price,
+        "key_observations": _union(a.get("key_observations") for a in succeeded)[:MAX_OBSERVATIONS],
+        "confidence_score": round(confidence, 3),
+        "frame_analysis": {
+            "total_frames_analyzed": frames_analyzed,
+            "consistency_across_frames": "high" if agreement >= 0.8 else "medium" if agreement >= 0.5 else "low",
+        },
+        "chunks": {"total": len(analyses), "failed": len(errors)},
+    }
+    if errors:
+        merged["chunk_errors"] = errors
+    return merged
@@ -0,0 +1,373 @@
+"""
+Vectorized backtesting of JSON trading strategies over OHLC arrays.
+
+A strategy is a set of entry/exit rules over price columns and indicators
+("ema_12 crosses_above ema_26", "rsi_14 < 70"), a stop-loss and take-profit
+specification and a position sizing rule. Indicators, rule signals, stop
+distances and the signal exit of every candidate entry are computed for the
+whole history at once with NumPy. Only the sequencing of trades (one open
+position at a time, sizing from the running balance) is path dependent; it
+runs once per trade, not per bar, and scans for stop/target hits only over
+the bars of that trade, in doubling windows so that a short trade never
+touches the rest of the history.
+
+Fills are conservative: signals are evaluated on a bar's close and filled at
+the next bar's open, stops and targets fill at their level or at a worse
+gapped open, and when one bar touches both the stop is assumed first.
+"""
+
+import bisect
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .indicators import DEFAULT_PERIODS, atr, bollinger, ema, macd, rsi, sma
+
+
+OPERATORS = (">", "<", ">=", "<=", "crosses_above", "crosses_below")
+PRICE_SERIES = ("open", "high", "low", "close")
+_INDICATOR_PATTERN = re.compile(r"^(sma|ema|rsi|atr)_(\d+)$")
+_COMPOUND_SERIES = {
+    "macd": 0, "macd_signal": 1, "macd_histogram": 2,
+    "bb_middle": 0, "bb_upper": 1, "bb_lower": 2,
+}
+TRADING_DAYS_PER_YEAR = 252
+# Bars in the first stop/target scan window of a trade; each further window doubles
+SCAN_WINDOW = 64
+
+
+def pip_size(pair: Optional[str]) -> float:
+    """0.01 for JPY-quoted pairs, 0.0001 otherwise."""
+    return 0.01 if pair and pair.strip().upper().endswith("JPY") else 0.0001
+
+
+@dataclass
+class Condition:
+    left: Any
+    op: str
+    right: Any
+
+    @classmethod
+    def parse(cls, rule: Any) -> "Condition":
+        """From {"left", "op", "right"} or a string such as "rsi_14 < 30"."""
+        if isinstance(rule, str):
+            parts = rule.split()
+            if len(parts) != 3:
+                raise ValueError(f"Rule must look like 'left operator right': {rule!r}")
+            left, op, right = parts
+        elif isinstance(rule, Mapping):
+            left, op, right = rule.get("left", rule.get("indicator")), rule.get("op"), rule.get("right", rule.get("value"))
+        else:
+            raise ValueError(f"Unsupported rule: {rule!r}")
+        op = str(op).strip().lower()
+        if op not in OPERATORS:
+            raise ValueError(f"Unknown operator {op!r}. Use one of {', '.join(OPERATORS)}")
+        return cls(_operand(left), op, _operand(right))
+
+
+def _operand(value: Any) -> Any:
+    """Numbers stay numbers; anything else is a series name."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(str(value))
+    except ValueError:
+        return str(value).strip().lower()
+
+
+@dataclass
+class StrategySpec:
+    direction: str = "long"
+    entry: List[Condition] = field(default_factory=list)
+    exit: List[Condition] = field(default_factory=list)
+    stop_loss: Dict[str, float] = field(default_factory=dict)
+    take_profit: Dict[str, float] = field(default_factory=dict)
+    risk_percent: float = 1.0
+    units: Optional[float] = None
+    initial_balance: float = 10_000.0
+    spread_pips: float = 0.0
+    pip: float = 0.0001
+
+    @classmethod
+    def parse(cls, strategy: Mapping[str, Any]) -> "StrategySpec":
+        direction = str(strategy.get("direction", "long")).strip().lower()
+        if direction not in ("long", "short"):
+            raise ValueError("direction must be 'long' or 'short'")
+        sizing = strategy.get("position_sizing") or {}
+        entry_price = strategy.get("entry_price", strategy.get("entry"))
+        return cls(
+            direction=direction,
+            entry=[Condition.parse(rule) for rule in _rules(strategy.get("entry_rules", strategy.get("entry")))],
+            exit=[Condition.parse(rule) for rule in _rules(strategy.get("exit_rules", strategy.get("exit")))],
+            stop_loss=_distance_spec(strategy.get("stop_loss"), entry_price),
+            take_profit=_distance_spec(strategy.get("take_profit"), entry_price),
+            risk_percent=float(sizing.get("risk_percent", strategy.get("risk_percent", 1.0))),
+            units=float(sizing["units"]) if "units" in sizing else None,
+            initial_balance=float(strategy.get("initial_balance", 10_000.0)),
+            spread_pips=float(strategy.get("spread_pips", 0.0)),
+            pip=pip_size(strategy.get("pair")),
+        )
+
+    def series_names(self) -> List[str]:
+        names = {operand for rule in self.entry + self.exit for operand in (rule.left, rule.right) if isinstance(operand, str)}
+        for spec in (self.stop_loss, self.take_profit):
+            if "atr" in spec:
+                names.add(f"atr_{int(spec.get('period', DEFAULT_PERIODS['atr']))}")
+        return sorted(names)
+
+
+def _rules(rules: Any) -> List[Any]:
+    """Rules given as one rule, a list, or {"all": [...]}; numbers (a fixed entry price) are not rules."""
+    if rules is None or isinstance(rules, (int, float)):
+        return []
+    if isinstance(rules, Mapping) and "all" in rules:
+        return list(rules["all"])
+    return list(rules) if isinstance(rules, (list, tuple)) else [rules]
+
+
+def _distance_spec(spec: Any, entry_price: Any) -> Dict[str, float]:
+    """
+    Normalize a stop/target to {"pips"|"percent"|"atr"|"rr"|"price_distance": value}.
+
+    A bare price together with a numeric entry price (as in a formulated
+    trade: entry 1.0850, stop 1.0800) becomes the distance between them.
+    """
+    if spec is None:
+        return {}
+    if isinstance(spec, Mapping):
+        spec = {k: float(v) for k, v in spec.items() if k in ("pips", "percent", "atr", "rr", "period", "price_distance")}
+        if not {"pips", "percent", "atr", "rr", "price_distance"} & set(spec):
+            raise ValueError("Stops and targets need one of: pips, percent, atr, rr")
+        return spec
+    if isinstance(entry_price, (int, float)) and isinstance(spec, (int, float)):
+        return {"price_distance": abs(float(entry_price) - float(spec))}
+    raise ValueError("Give stops and targets as {\"pips\": 30}, {\"percent\": 1}, {\"atr\": 2} or {\"rr\": 2}")
+
+
+def indicator_series(name: str, ohlc: Mapping[str, np.ndarray]) -> np.ndarray:
+    """Price column or indicator named like 'sma_50', 'rsi_14', 'macd_signal', 'bb_upper'."""
+    if name in PRICE_SERIES:
+        return np.asarray(ohlc[name], dtype=float)
+    close = np.asarray(ohlc["close"], dtype=float)
+    match = _INDICATOR_PATTERN.match(name)
+    if match:
+        kind, period = match.group(1), int(match.group(2))
+        if kind == "atr":
+            return atr(ohlc["high"], ohlc["low"], close, period)
+        return {"sma": sma, "ema": ema, "rsi": rsi}[kind](close, period)
+    if name in _COMPOUND_SERIES:
+        parts = macd(close) if name.startswith("macd") else bollinger(close)
+        return parts[_COMPOUND_SERIES[name]]
+    raise ValueError(f"Unknown series {name!r}: use open/high/low/close, sma_N, ema_N, rsi_N, atr_N, macd*, bb_*")
+
+
+def evaluate(conditions: Sequence[Condition], values: Mapping[str, np.ndarray], n: int) -> np.ndarray:
+    """Bars (by close) where all conditions hold; NaN comparisons are False."""
+    signal = np.ones(n, dtype=bool) if conditions else np.zeros(n, dtype=bool)
+    with np.errstate(invalid="ignore"):
+        for rule in conditions:
+            left = values[rule.left] if isinstance(rule.left, str) else np.full(n, rule.left)
+            right = values[rule.right] if isinstance(rule.right, str) else np.full(n, rule.right)
+            if rule.op in ("crosses_above", "crosses_below"):
+                above = left > right
+                below = left < right
+                crossed = np.zeros(n, dtype=bool)
+                if rule.op == "crosses_above":
+                    crossed[1:] = above[1:] & (left[:-1] <= right[:-1])
+                else:
+                    crossed[1:] = below[1:] & (left[:-1] >= right[:-1])
+                signal &= crossed
+            else:
+                signal &= {">": np.greater, "<": np.less, ">=": np.greater_equal, "<=": np.less_equal}[rule.op](left, right)
+    return signal
+
+
+def _distances(spec: Dict[str, float], values: Mapping[str, np.ndarray], close: np.ndarray, pip: float,
+               stop: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+    """Per-bar price distance for a stop/target spec, from the signal bar's values."""
+    if not spec:
+        return None
+    if "pips" in spec:
+        return np.full(len(close), spec["pips"] * pip)
+    if "percent" in spec:
+        return close * spec["percent"] / 100.0
+    if "atr" in spec:
+        return values[f"atr_{int(spec.get('period', DEFAULT_PERIODS['atr']))}"] * spec["atr"]
+    if "price_distance" in spec:
+        return np.full(len(close), spec["price_distance"])
+    if stop is None:
+        raise ValueError("A reward:risk take-profit needs a stop-loss")
+    return stop * spec["rr"]
+
+
+@dataclass
+class Trades:
+    entry_bar: np.ndarray
+    exit_bar: np.ndarray
+    entry_price: np.ndarray
+    exit_price: np.ndarray
+    units: np.ndarray
+    pnl: np.ndarray
+    r_multiple: np.ndarray
+    reason: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.entry_bar)
+
+
+def _first_hit(values: np.ndarray, start: int, end: int, level: float, above: bool) -> int:
+    """
+    Offset from `start` of the first bar in [start, end) at or beyond `level`, or -1.
+
+    Windows of SCAN_WINDOW, then twice as many bars, and so on are scanned
+    in turn, so the work follows the trade's length rather than `end`.
+    """
+    low, window = start, SCAN_WINDOW
+    while low < end:
+        high = min(end, low + window)
+        mask = values[low:high] >= level if above else values[low:high] <= level
+        index = int(mask.argmax())
+        if mask[index]:
+            return low - start + index
+        low, window = high, window * 2
+    return -1
+
+
+def run_backtest(
+    ohlc: Mapping[str, Sequence[float]], strategy: Mapping[str, Any], first_entry: int = 0
+) -> Tuple[Trades, Dict[str, Any]]:
+    """
+    Backtest `strategy` (see `StrategySpec.parse`) over OHLC columns.
+
+    Returns the trades and the performance metrics. Bars before `first_entry`
+    only warm up the indicators: no trade is entered before it.
+
+    Raises:
+        ValueError: For malformed strategies or unknown series.
+    """
+    spec = StrategySpec.parse(strategy)
+    if not spec.entry:
+        raise ValueError("Strategy has no entry rules to backtest")
+    o, h, l, c = (np.asarray(ohlc[column], dtype=float) for column in PRICE_SERIES)
+    n = len(c)
+    values = {name: indicator_series(name, ohlc) for name in spec.series_names()}
+
+    entry_signal = evaluate(spec.entry, values, n)
+    entry_signal[-1:] = False                       # no next bar to fill at
+    entry_signal[:max(0, first_entry - 1)] = False
+    exit_signal = evaluate(spec.exit, values, n)
+
+    stop = _distances(spec.stop_loss, values, c, spec.pip)
+    target = _distances(spec.take_profit, values, c, spec.pip, stop)
+    if stop is None and spec.units is None:
+        raise ValueError("Risk-based position sizing needs a stop_loss; give one or a fixed position_sizing.units")
+
+    # Entry bars and, vectorized for every candidate, the bar whose open the exit signal fills at
+    candidates = np.flatnonzero(entry_signal) + 1
+    # (n: no exit signal before the data ends)
+    exit_bars = np.append(np.flatnonzero(exit_signal[:-1]) + 1, n)
+    signal_exit = exit_bars[np.searchsorted(exit_bars, candidates, side="right")]
+
+    sign = 1.0 if spec.direction == "long" else -1.0
+    cost = spec.spread_pips * spec.pip
+    balance = spec.initial_balance
+    # Per-candidate values as Python numbers: the loop below runs once per trade
+    entries, exits = candidates.tolist(), signal_exit.tolist()
+    stops = stop[candidates - 1].tolist() if stop is not None else None
+    targets = target[candidates - 1].tolist() if target is not None else None
+    rows = []
+    i = 0
+    while i < len(entries):
+        bar = entries[i]
+        distance = stops[i] if stops is not None else np.nan
+        if stops is not None and not distance > 0:    # indicator warm-up (NaN) or zero distance
+            i += 1
+            continue
+        entry = o.item(bar)
+        last = exits[i] - 1                             # last bar held before a signal exit
+
+        exit_bar, price, reason = last, c.item(last), "end"
+        if exits[i] < n:
+            exit_bar, price, reason = exits[i], o.item(exits[i]), "signal"
+        hits = []
+        if stops is not None:
+            level = entry - sign * distance
+            hit = _first_hit(l, bar, last + 1, level, False) if sign > 0 else _first_hit(h, bar, last + 1, level, True)
+            if hit >= 0:
+                fill = min(o.item(bar + hit), level) if sign > 0 else max(o.item(bar + hit), level)
+                hits.append((hit, 0, fill, "stop_loss"))
+        if targets is not None and targets[i] > 0:
+            level = entry + sign * targets[i]
+            # Past the stop's bar the target can no longer fill first
+            end = bar + hits[0][0] + 1 if hits else last + 1
+            hit = _first_hit(h, bar, end, level, True) if sign > 0 else _first_hit(l, bar, end, level, False)
+            if hit >= 0:
+                fill = max(o.item(bar + hit), level) if sign > 0 else min(o.item(bar + hit), level)
+                hits.append((hit, 1, fill, "take_profit"))
+        if hits:
+            hit, _, price, reason = min(hits)           # same bar: the stop (0) sorts first
+            exit_bar = bar + hit
+
+        units = spec.units if spec.units is not None else balance * spec.risk_percent / 100.0 / distance
+        pnl = (sign * (price - entry) - cost) * units
+        risk = distance * units if stops is not None else np.nan
+        balance += pnl
+        rows.append((bar, exit_bar, entry, price, units, pnl, pnl / risk if risk else np.nan, reason))
+        # Next entry strictly after the exit bar
+        i = bisect.bisect_right(entries, exit_bar, i + 1)
+
+    columns = list(zip(*rows)) if rows else [[]] * 8
+    trades = Trades(*(np.asarray(column, dtype=dtype) for column, dtype in zip(
+        columns, (int, int, float, float, float, float, float, object)
+    )))
+    return trades, performance_metrics(trades, spec.initial_balance, n, ohlc.get("time"))
+
+
+def performance_metrics(
+    trades: Trades, initial_balance: float, bars: int, times: Optional[Sequence[int]] = None
+) -> Dict[str, Any]:
+    """
+    Win rate, expectancy, profit factor, drawdown and Sharpe of a trade list.
+
+    Drawdown and Sharpe use the realized balance per bar (it steps at each
+    exit). With bar times, Sharpe is annualized from daily balance returns;
+    otherwise it is the per-trade return Sharpe without annualization.
+    """
+    pnl = trades.pnl
+    wins, losses = pnl[pnl > 0], pnl[pnl <= 0]
+    realized = np.zeros(bars)
+    np.add.at(realized, trades.exit_bar, pnl)
+    balance = initial_balance + np.cumsum(realized)
+    peaks = np.maximum.accumulate(np.concatenate(([initial_balance], balance)))
+    drawdown = 1.0 - np.concatenate(([initial_balance], balance)) / peaks
+
+    if times is not None and len(times) == bars and bars:
+        days = np.asarray(times, dtype=np.int64) // 86400
+        day_close = np.append(np.flatnonzero(np.diff(days)), bars - 1)
+        daily = np.concatenate(([initial_balance], balance[day_close]))
+        returns = np.diff(daily) / daily[:-1]
+        scale = np.sqrt(TRADING_DAYS_PER_YEAR)
+    else:
+        balances = initial_balance + np.concatenate(([0.0], np.cumsum(pnl)))
+        returns = pnl / balances[:-1]
+        scale = 1.0
+    sharpe = float(returns.mean() / returns.std() * scale) if len(returns) > 1 and returns.std() > 0 else 0.0
+
+    reasons, counts = np.unique(trades.reason.astype(str), return_counts=True) if len(trades) else ([], [])
+    return {
+        "trade_count": len(trades),
+        "win_rate": round(len(wins) / len(pnl), 4) if len(pnl) else 0.0,
+        "expectancy": round(float(pnl.mean()), 4) if len(pnl) else 0.0,
+        "expectancy_r": round(float(np.nanmean(trades.r_multiple)), 4) if len(pnl) and not np.isnan(trades.r_multiple).all() else None,
+        "profit_factor": round(float(wins.sum() / -losses.sum()), 4) if len(losses) and losses.sum() < 0 else None,
+        "average_win": round(float(wins.mean()), 4) if len(wins) else 0.0,
+        "average_loss": round(float(losses.mean()), 4) if len(losses) else 0.0,
+        "total_return_pct": round(float(pnl.sum() / initial_balance * 100), 4),
+        "final_balance": round(float(initial_balance + pnl.sum()), 2),
+        "max_drawdown_pct": round(float(drawdown.max() * 100), 4),
+        "sharpe_ratio": round(sharpe, 4),
+        "average_bars_held": round(float((trades.exit_bar - trades.entry_bar).mean()), 2) if len(pnl) else 0.0,
+        "exit_reasons": {str(reason): int(count) for reason, count in zip(reasons, counts)},
+    }
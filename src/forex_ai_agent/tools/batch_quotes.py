@@ -0,0 +1,167 @@
+"""
+Batch multi-pair quote tools.
+
+This module provides a tool that quotes a whole basket of forex and crypto
+pairs in one call. Inverse pairs and crosses that can be triangulated from
+other requested pairs are derived locally instead of costing an API call,
+pairs already known to the shared cross-rate engine are answered without a
+request, and the remaining pairs are fetched concurrently through the
+shared, rate-limited Alpha Vantage client.
+"""
+
+from crewai.tools import BaseTool
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple, Type, Union
+from pydantic import BaseModel, Field
+import json
+from datetime import datetime
+
+from .cross_rates import Pair, Quote, cross, parse_pair
+from .forex_data import cross_rate_engine
+from .output import OutputProfile, render
+
+
+# Compact output drops per-quote fields implied by the pair; csv mode sends one row per pair
+OUTPUT_PROFILE = OutputProfile(
+    drop=("quotes.*.base", "quotes.*.quote", "quotes.*.timezone", "data_source", "timestamp"),
+    tables=("quotes",),
+)
+
+
+class BatchQuoteInput(BaseModel):
+    """Input schema for batch quote fetcher."""
+    pairs: str = Field(
+        ...,
+        description="Comma-separated currency pairs (e.g., 'EUR/USD,GBP/USD,EUR/GBP,USD/JPY,BTC/USD')"
+    )
+    max_workers: int = Field(default=4, description="Maximum number of concurrent API requests")
+
+
+def _legs_between(legs: List[Pair], a: str, b: str) -> List[Pair]:
+    return [leg for leg in legs if set(leg) == {a, b}]
+
+
+def plan_fetches(pairs: List[Pair]) -> Tuple[List[Pair], Dict[Pair, Tuple[Pair, Pair]]]:
+    """
+    Decide which pairs must be fetched to answer a basket of pairs.
+
+    Returns the pairs to fetch and, for each requested pair that can be
+    triangulated from two fetched pairs, the two legs to combine. Inverse
+    duplicates (EUR/USD and USD/EUR) are fetched once. USD legs are preferred
+    as fetched legs since most crosses route through USD.
+    """
+    legs: List[Pair] = []
+    for pair in pairs:
+        if pair not in legs and pair[::-1] not in legs:
+            legs.append(pair)
+
+    derived: Dict[Pair, Tuple[Pair, Pair]] = {}
+    pinned = set()
+    # Try to derive non-USD pairs first so USD legs stay fetched
+    for candidate in sorted(legs, key=lambda pair: "USD" in pair):
+        if candidate in pinned:
+            continue
+        active = [leg for leg in legs if leg not in derived and leg != candidate]
+        vias = {c for leg in active for c in leg} - set(candidate)
+        for via in sorted(vias, key=lambda c: c != "USD"):
+            first = _legs_between(active, candidate[0], via)
+            second = _legs_between(active, via, candidate[1])
+            if first and second:
+                derived[candidate] = (first[0], second[0])
+                pinned.update(derived[candidate])
+                break
+
+    return [leg for leg in legs if leg not in derived], derived
+
+
+class BatchQuoteFetcher(BaseTool):
+    name: str = "batch_quote_fetcher"
+    description: str = (
+        "Fetch real-time quotes for a list of forex and crypto pairs in a single call. "
+        "Inverse pairs and crosses derivable from other requested pairs are computed locally "
+        "to save API quota. Returns one compact JSON payload with rate, bid, ask and spread per pair."
+    )
+    args_schema: Type[BaseModel] = BatchQuoteInput
+    output_mode: Optional[str] = None
+
+    def _run(self, pairs: str, max_workers: int = 4) -> str:
+        """Fetch a basket of quotes from Alpha Vantage"""
+        try:
+            requested = [parse_pair(pair) for pair in pairs.split(",") if pair.strip()]
+        except ValueError as e:
+            return json.dumps({"error": str(e), "success": False})
+        if not requested:
+            return json.dumps({"error": "No currency pairs provided", "success": False})
+
+        known = {pair: cross_rate_engine.lookup(*pair) for pair in requested}
+        to_fetch, derived = plan_fetches([pair for pair in requested if known[pair] is None])
+        fetched, api_calls = self._fetch_all(to_fetch, max_workers)
+
+        quotes: Dict[str, Dict] = {}
+        errors: Dict[str, str] = {}
+        for base, quote in requested:
+            symbol = f"{base}/{quote}"
+            try:
+                resolved = known[(base, quote)] or self._resolve((base, quote), fetched, derived)
+                quotes[symbol] = resolved.to_dict()
+            except (KeyError, ValueError) as e:
+                errors[symbol] = str(e)
+
+        result = {
+            "success": bool(quotes),
+            "quotes": quotes,
+            "errors": errors,
+            "api_calls": api_calls,
+            "pairs_requested": len(requested),
+            "data_source": "Alpha Vantage",
+            "timestamp": datetime.now().isoformat()
+        }
+        return render(result, OUTPUT_PROFILE, self.output_mode)
+
+    def _fetch_all(self, pairs: List[Pair], max_workers: int) -> Tuple[Dict[Pair, Union[Quote, str]], int]:
+        """
+        Fetch pairs concurrently; failures are recorded as error strings.
+
+        Also returns the number of API calls made, counting only this call's
+        fetches and not responses served from the client's caches.
+        """
+        def fetch(pair: Pair) -> Tuple[Union[Quote, str], int]:
+            fetched: List[Quote] = []
+            try:
+                result: Union[Quote, str] = cross_rate_engine.get(*pair, fetched=fetched)
+            except Exception as e:
+                result = str(e)
+            return result, sum(not quote.cached for quote in fetched)
+
+        if not pairs:
+            return {}, 0
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pairs)))) as executor:
+            outcomes = list(executor.map(fetch, pairs))
+        return {pair: result for pair, (result, _) in zip(pairs, outcomes)}, sum(calls for _, calls in outcomes)
+
+    def _resolve(
+        self,
+        pair: Pair,
+        fetched: Dict[Pair, Union[Quote, str]],
+        derived: Dict[Pair, Tuple[Pair, Pair]],
+    ) -> Quote:
+        """Answer a requested pair from fetched legs, inverting or triangulating as needed."""
+        base, quote = pair
+        for leg in (pair, pair[::-1]):
+            if leg in fetched:
+                return self._leg(leg, fetched).oriented(base)
+            if leg in derived:
+                first, second = derived[leg]
+                return cross(self._leg(first, fetched), self._leg(second, fetched), base, quote)
+        raise KeyError(f"No quote planned for {base}/{quote}")
+
+    @staticmethod
+    def _leg(pair: Pair, fetched: Dict[Pair, Union[Quote, str]]) -> Quote:
+        result = fetched[pair]
+        if isinstance(result, str):
+            raise ValueError(f"{pair[0]}/{pair[1]}: {result}")
+        return result
+
+
+# Create tool instance
+batch_quote_fetcher = BatchQuoteFetcher()
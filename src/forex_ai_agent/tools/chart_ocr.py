@@ -0,0 +1,282 @@
+"""
+Local OCR pre-pass for chart frames.
+
+Much of what a chart shows is plain text: the symbol and timeframe in the
+header and the price labels on the right-hand axis. This module finds text
+regions with OpenCV morphology and reads them with an offline OCR engine
+(Tesseract via pytesseract), giving the trading pair, timeframe, the
+pixel-to-price scale of the axis and the highlighted current price label
+without a network call.
+"""
+
+import functools
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import cv2
+    import numpy as np
+    CV2_AVAILABLE = True
+except ImportError:
+    CV2_AVAILABLE = False
+    cv2 = None
+    np = None
+
+try:
+    import pytesseract
+    PYTESSERACT_AVAILABLE = True
+except ImportError:
+    PYTESSERACT_AVAILABLE = False
+    pytesseract = None
+
+from .frame_preprocess import detect_chart_area
+
+
+# (image, numeric) -> text; numeric readers are restricted to price characters
+OcrReader = Callable[["np.ndarray", bool], str]
+Box = Tuple[int, int, int, int]
+
+AXIS_FRACTION = 0.12
+HEADER_FRACTION = (0.12, 0.6)
+# Price labels with a saturated background mark the current price on TradingView-style axes
+CURRENT_PRICE_SATURATION = 80
+
+QUOTE_CURRENCIES = ("USDT", "USDC", "USD", "EUR", "JPY", "GBP", "CHF", "CAD", "AUD", "NZD", "BTC", "ETH")
+_TIMEFRAME_UNITS = {"s": "s", "m": "m", "min": "m", "h": "h", "d": "d", "w": "w", "M": "M"}
+
+
+@dataclass
+class ChartText:
+    """Text read from one chart frame."""
+    trading_pair: Optional[str] = None
+    timeframe: Optional[str] = None
+    price_ticks: List[Tuple[float, float]] = field(default_factory=list)
+    price_scale: Optional[Tuple[float, float]] = None
+    current_price: Optional[float] = None
+    # Candle series read from the plot with this scale (see chart_vision), when requested
+    candles: Any = None
+
+    def price_at(self, y: float) -> Optional[float]:
+        """Price at pixel row `y` of the frame, from the fitted axis scale."""
+        if self.price_scale is None:
+            return None
+        slope, intercept = self.price_scale
+        return slope * y + intercept
+
+
+@functools.lru_cache(maxsize=None)
+def ocr_available() -> bool:
+    """Whether Tesseract can be used; checked once, on first call, since it runs the tesseract binary."""
+    if not PYTESSERACT_AVAILABLE:
+        return False
+    try:
+        pytesseract.get_tesseract_version()
+        return True
+    except Exception:
+        # pytesseract installed without the tesseract binary
+        return False
+
+
+def tesseract_reader(image: "np.ndarray", numeric: bool = False) -> str:
+    """Read a single line of text with Tesseract."""
+    config = "--psm 7"
+    if numeric:
+        config += " -c tessedit_char_whitelist=0123456789.,-"
+    return pytesseract.image_to_string(image, config=config).strip()
+
+
+def detect_text_regions(
+    gray: "np.ndarray", min_height: int = 6, max_height: int = 60, min_contrast: int = 30
+) -> List[Box]:
+    """
+    Bounding boxes (x, y, w, h) of text-like regions, top to bottom.
+
+    Character strokes give strong local gradients; closing the thresholded
+    gradient with a wide, flat kernel joins the characters of a label into
+    one box, and boxes are kept when they have the height and shape of a line
+    of text. A fixed contrast threshold (rather than Otsu) keeps dim labels,
+    such as coloured price tags, when brighter text is present.
+    """
+    gradient = cv2.morphologyEx(gray, cv2.MORPH_GRADIENT, np.ones((3, 3), np.uint8))
+    _, binary = cv2.threshold(gradient, min_contrast, 255, cv2.THRESH_BINARY)
+    joined = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, cv2.getStructuringElement(cv2.MORPH_RECT, (9, 1)))
+    contours, _ = cv2.findContours(joined, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    boxes = []
+    for contour in contours:
+        x, y, w, h = cv2.boundingRect(contour)
+        if min_height <= h <= max_height and w >= h:
+            boxes.append((x, y, w, h))
+    return sorted(boxes, key=lambda box: (box[1], box[0]))
+
+
+def _prepare_for_ocr(image: "np.ndarray") -> "np.ndarray":
+    """Upscale and make text dark on light, which OCR engines read best."""
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    gray = cv2.resize(gray, None, fx=3, fy=3, interpolation=cv2.INTER_CUBIC)
+    if gray.mean() < 128:
+        gray = 255 - gray
+    return gray
+
+
+def parse_price(text: str) -> Optional[float]:
+    match = re.search(r"-?\d[\d,]*(?:\.\d+)?", text or "")
+    if not match:
+        return None
+    try:
+        return float(match.group().replace(",", ""))
+    except ValueError:
+        return None
+
+
+def parse_symbol(text: str) -> Optional[str]:
+    """'EUR/USD', 'FX:EURUSD' or 'BTCUSDT' -> 'EUR/USD' / 'BTC/USDT'."""
+    text = (text or "").upper()
+    match = re.search(r"\b([A-Z]{3,5})\s*/\s*([A-Z]{3,5})\b", text)
+    if match:
+        return f"{match.group(1)}/{match.group(2)}"
+    for token in re.findall(r"\b[A-Z]{6,9}\b", text):
+        for quote in QUOTE_CURRENCIES:
+            if token.endswith(quote) and 3 <= len(token) - len(quote) <= 5:
+                return f"{token[:-len(quote)]}/{quote}"
+    return None
+
+
+def parse_timeframe(text: str) -> Optional[str]:
+    """'1h', '15 min', '4H', 'D' or TradingView's '· 240 ·' (minutes) -> canonical '4h' style."""
+    text = text or ""
+    match = re.search(r"\b(\d{1,3})\s*(min|s|m|h|H|d|D|w|W|M)\b", text)
+    if match:
+        number, unit = match.groups()
+        unit = _TIMEFRAME_UNITS.get(unit, _TIMEFRAME_UNITS.get(unit.lower(), unit.lower()))
+        return f"{int(number)}{unit}"
+    match = re.search(r"[·•,|]\s*(\d{1,4}|[DWM])\s*(?=[·•,|]|$)", text)
+    if match:
+        value = match.group(1)
+        if value in ("D", "W", "M"):
+            return f"1{_TIMEFRAME_UNITS[value if value == 'M' else value.lower()]}"
+        minutes = int(value)
+        if minutes % 1440 == 0:
+            return f"{minutes // 1440}d"
+        if minutes % 60 == 0:
+            return f"{minutes // 60}h"
+        return f"{minutes}m"
+    return None
+
+
+def fit_price_scale(ticks: Sequence[Tuple[float, float]]) -> Optional[Tuple[float, float]]:
+    """
+    Fit price = slope * y + intercept to (y, price) axis ticks, ignoring misreads.
+
+    Every pair of ticks proposes a line (vectorized); the line agreeing with
+    the most ticks wins and is refit by least squares on its inliers. Prices
+    must fall as y grows (screen rows run downwards), and at least two ticks
+    must agree.
+    """
+    if len(ticks) < 2:
+        return None
+    points = np.asarray(ticks, dtype=float)
+    y, price = points[:, 0], points[:, 1]
+
+    i, j = np.triu_indices(len(points), k=1)
+    dy = y[j] - y[i]
+    valid = dy != 0
+    i, j, dy = i[valid], j[valid], dy[valid]
+    if not len(i):
+        return None
+    slopes = (price[j] - price[i]) / dy
+    intercepts = price[i] - slopes * y[i]
+
+    # Tolerance: a fraction of the typical (median, so misreads do not inflate it) label gap
+    gaps = np.abs(np.diff(price[np.argsort(y)]))
+    tolerance = 0.25 * (float(np.median(gaps[gaps > 0])) if np.any(gaps > 0) else abs(price[0]) or 1.0)
+    residuals = np.abs(slopes[:, None] * y[None, :] + intercepts[:, None] - price[None, :])
+    inlier_counts = (residuals <= tolerance).sum(axis=1)
+    inlier_counts[slopes >= 0] = 0
+    best = int(np.argmax(inlier_counts))
+    if inlier_counts[best] < 2:
+        return None
+
+    inliers = residuals[best] <= tolerance
+    slope, intercept = np.polyfit(y[inliers], price[inliers], 1)
+    return float(slope), float(intercept)
+
+
+def _saturation(image: "np.ndarray") -> float:
+    if image.ndim != 3 or not image.size:
+        return 0.0
+    return float(cv2.cvtColor(image, cv2.COLOR_BGR2HSV)[:, :, 1].mean())
+
+
+def extract_chart_text(frame: "np.ndarray", reader: Optional[OcrReader] = None) -> ChartText:
+    """
+    Read the symbol, timeframe, axis scale and current price from a chart frame.
+
+    Coordinates in the result (tick rows, price scale) refer to the full frame.
+    """
+    reader = reader or tesseract_reader
+    x0, y0, x1, y1 = detect_chart_area(frame)
+    chart = frame[y0:y1, x0:x1]
+    height, width = chart.shape[:2]
+    gray = cv2.cvtColor(chart, cv2.COLOR_BGR2GRAY) if chart.ndim == 3 else chart
+    result = ChartText()
+
+    # Header: symbol and timeframe sit in the top-left corner
+    header_h, header_w = int(height * HEADER_FRACTION[0]), int(width * HEADER_FRACTION[1])
+    header_text = " ".join(
+        reader(_prepare_for_ocr(chart[y:y + h, x:x + w]), False)
+        for x, y, w, h in detect_text_regions(gray[:header_h, :header_w])
+    )
+    result.trading_pair = parse_symbol(header_text)
+    result.timeframe = parse_timeframe(header_text)
+
+    # Price axis: labels in the rightmost strip
+    axis_x = width - int(width * AXIS_FRACTION)
+    current = []
+    for x, y, w, h in detect_text_regions(gray[:, axis_x:]):
+        label = chart[y:y + h, axis_x + x:axis_x + x + w]
+        price = parse_price(reader(_prepare_for_ocr(label), True))
+        if price is None:
+            continue
+        tick = (y0 + y + h / 2.0, price)
+        if _saturation(label) >= CURRENT_PRICE_SATURATION:
+            current.append(tick)
+        else:
+            result.price_ticks.append(tick)
+
+    result.price_scale = fit_price_scale(result.price_ticks)
+    if current:
+        result.current_price = current[0][1]
+    return result
+
+
+def summarize_chart_text(texts: Sequence[ChartText]) -> Dict[str, Any]:
+    """Combine per-frame readings (in video order): majority pair/timeframe, latest price and scale."""
+    pairs = Counter(text.trading_pair for text in texts if text.trading_pair)
+    timeframes = Counter(text.timeframe for text in texts if text.timeframe)
+    latest = next((text for text in reversed(texts) if text.current_price is not None), None)
+    scaled = next((text for text in reversed(texts) if text.price_scale is not None), None)
+    return {
+        "trading_pair": pairs.most_common(1)[0][0] if pairs else None,
+        "timeframe": timeframes.most_common(1)[0][0] if timeframes else None,
+        "current_price": latest.current_price if latest else None,
+        "price_scale": list(scaled.price_scale) if scaled else None,
+        "frames_read": sum(1 for text in texts if text.trading_pair or text.price_ticks),
+        "pair_agreement": round(pairs.most_common(1)[0][1] / len(texts), 3) if pairs and texts else 0.0,
+    }
+
+
+def format_hints(summary: Dict[str, Any]) -> Optional[str]:
+    """Prompt hints from an OCR summary, or None when nothing was read."""
+    hints = []
+    if summary.get("trading_pair"):
+        hints.append(f"trading pair {summary['trading_pair']}")
+    if summary.get("timeframe"):
+        hints.append(f"timeframe {summary['timeframe']}")
+    if summary.get("current_price") is not None:
+        hints.append(f"current price label {summary['current_price']}")
+    if not hints:
+        return None
+    return "Local OCR of the chart text read: " + ", ".join(hints) + ". Verify these against the images."
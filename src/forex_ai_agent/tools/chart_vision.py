@@ -0,0 +1,247 @@
+"""
+Deterministic candle extraction from chart frames.
+
+Candle bodies and wicks are segmented by colour (bullish green/teal,
+bearish red) inside the plot area, grouped into candles by runs of
+occupied columns, and measured with NumPy reductions over the whole mask
+at once. With the price-axis scale from the OCR pre-pass, pixel rows become
+prices and the frame becomes an OHLC series from which support/resistance
+and trend are computed locally in milliseconds.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import cv2
+    import numpy as np
+    CV2_AVAILABLE = True
+except ImportError:
+    CV2_AVAILABLE = False
+    cv2 = None
+    np = None
+
+from .analysis_merge import cluster_levels
+from .chart_ocr import AXIS_FRACTION
+from .frame_preprocess import detect_chart_area
+from .indicators import compute_indicators
+
+
+# HSV thresholds (OpenCV hue is 0-179): candle colours are saturated and reasonably bright
+MIN_SATURATION = 80
+MIN_VALUE = 60
+BULLISH_HUES = (35, 100)     # green to teal (TradingView's #26a69a is ~87)
+BEARISH_HUES = (10, 160)     # red wraps around: hue <= 10 or >= 160
+
+MIN_CANDLE_WIDTH = 2
+MAX_CANDLE_WIDTH = 40        # wider coloured runs are moving-average lines or labels
+BODY_FILL = 0.6              # a body row covers at least this share of the candle width
+
+MIN_LOCAL_CANDLES = 10
+
+
+@dataclass
+class CandleSeries:
+    """OHLC series read from a chart frame, oldest candle first."""
+    x: "np.ndarray"
+    open: "np.ndarray"
+    high: "np.ndarray"
+    low: "np.ndarray"
+    close: "np.ndarray"
+    bullish: "np.ndarray"
+    scaled: bool = True
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+    def to_dict(self, precision: int = 6) -> Dict[str, Any]:
+        return {
+            "candles": len(self),
+            "scaled": self.scaled,
+            "open": np.round(self.open, precision).tolist(),
+            "high": np.round(self.high, precision).tolist(),
+            "low": np.round(self.low, precision).tolist(),
+            "close": np.round(self.close, precision).tolist(),
+        }
+
+
+def candle_masks(image: "np.ndarray") -> Tuple["np.ndarray", "np.ndarray"]:
+    """Boolean masks of bullish and bearish candle pixels."""
+    hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
+    hue, saturation, value = hsv[:, :, 0], hsv[:, :, 1], hsv[:, :, 2]
+    coloured = (saturation >= MIN_SATURATION) & (value >= MIN_VALUE)
+    bullish = coloured & (hue >= BULLISH_HUES[0]) & (hue <= BULLISH_HUES[1])
+    bearish = coloured & ((hue <= BEARISH_HUES[0]) | (hue >= BEARISH_HUES[1]))
+    return bullish, bearish
+
+
+def _first_true(mask: "np.ndarray", default: "np.ndarray") -> "np.ndarray":
+    """Row index of the first True per column, `default` where a column has none."""
+    return np.where(mask.any(axis=0), mask.argmax(axis=0), default)
+
+
+def _last_true(mask: "np.ndarray", default: "np.ndarray") -> "np.ndarray":
+    return np.where(mask.any(axis=0), mask.shape[0] - 1 - mask[::-1].argmax(axis=0), default)
+
+
+def measure_candles(mask: "np.ndarray") -> Dict[str, "np.ndarray"]:
+    """
+    Locate candles in one colour mask and measure them in pixel rows.
+
+    Candles are runs of occupied columns. Per-candle row profiles come from
+    a single `np.add.reduceat` over the column runs; a row belongs to the body
+    when it spans most of the candle's width, and to the wick otherwise.
+    Returns x centres and top/bottom rows of wick (high/low) and body.
+    """
+    columns = mask.any(axis=0)
+    edges = np.diff(columns.astype(np.int8), prepend=0, append=0)
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    widths = ends - starts
+    keep = (widths >= MIN_CANDLE_WIDTH) & (widths <= MAX_CANDLE_WIDTH)
+    if not starts.size or not keep.any():
+        empty = np.array([], dtype=float)
+        return {key: empty for key in ("x", "high", "low", "body_top", "body_bottom")}
+
+    # Rows x candles: number of coloured pixels per row within each run
+    counts = np.add.reduceat(mask.astype(np.int32), starts, axis=1)[:, keep]
+    starts, widths = starts[keep], widths[keep]
+
+    occupied = counts > 0
+    body = counts >= np.maximum(2, np.ceil(BODY_FILL * widths))
+    high = _first_true(occupied, 0)
+    low = _last_true(occupied, 0)
+    middle = (high + low) / 2.0
+    return {
+        "x": starts + widths / 2.0,
+        "high": high.astype(float),
+        "low": low.astype(float),
+        # Doji candles have no full-width rows: open == close at the wick's middle
+        "body_top": _first_true(body, middle).astype(float),
+        "body_bottom": _last_true(body, middle).astype(float),
+    }
+
+
+def default_plot_box(frame: "np.ndarray") -> Tuple[int, int, int, int]:
+    """Chart area without the price axis strip on the right."""
+    x0, y0, x1, y1 = detect_chart_area(frame)
+    return x0, y0, x1 - int((x1 - x0) * AXIS_FRACTION), y1
+
+
+def extract_candles(
+    frame: "np.ndarray",
+    price_scale: Optional[Tuple[float, float]] = None,
+    plot_box: Optional[Tuple[int, int, int, int]] = None,
+) -> CandleSeries:
+    """
+    Reconstruct an OHLC series from a chart frame.
+
+    Args:
+        frame: BGR chart frame
+        price_scale: (slope, intercept) with price = slope * row + intercept in
+            frame coordinates, e.g. `ChartText.price_scale`. Without it prices
+            are negated pixel rows (higher is higher) and `scaled` is False.
+        plot_box: (x0, y0, x1, y1) plot area; defaults to the detected chart
+            area minus the price axis
+    """
+    x0, y0, x1, y1 = plot_box or default_plot_box(frame)
+    bullish_mask, bearish_mask = candle_masks(frame[y0:y1, x0:x1])
+
+    parts = []
+    for mask, is_bullish in ((bullish_mask, True), (bearish_mask, False)):
+        measured = measure_candles(mask)
+        # Bullish candles open at the bottom of the body, bearish ones at the top
+        open_row = measured["body_bottom"] if is_bullish else measured["body_top"]
+        close_row = measured["body_top"] if is_bullish else measured["body_bottom"]
+        parts.append(np.stack([
+            measured["x"] + x0,
+            open_row + y0,
+            measured["high"] + y0,
+            measured["low"] + y0,
+            close_row + y0,
+            np.full(len(measured["x"]), is_bullish, dtype=float),
+        ]))
+
+    table = np.concatenate(parts, axis=1)
+    table = table[:, np.argsort(table[0], kind="stable")]
+    rows = table[1:5]
+    if price_scale is not None:
+        slope, intercept = price_scale
+        prices = slope * rows + intercept
+    else:
+        prices = -rows
+    return CandleSeries(
+        x=table[0],
+        open=prices[0],
+        high=prices[1],
+        low=prices[2],
+        close=prices[3],
+        bullish=table[5].astype(bool),
+        scaled=price_scale is not None,
+    )
+
+
+def swing_points(values: "np.ndarray", window: int = 3, highs: bool = True) -> "np.ndarray":
+    """
+    Indices where `values` is the extreme of the surrounding 2*window+1 candles.
+
+    Only confirmed swings count: the first and last `window` candles lack a
+    full neighbourhood and are never swing points.
+    """
+    if len(values) < 2 * window + 1:
+        return np.array([], dtype=int)
+    windows = np.lib.stride_tricks.sliding_window_view(values, 2 * window + 1)
+    extreme = windows.max(axis=1) if highs else windows.min(axis=1)
+    return np.flatnonzero(values[window:len(values) - window] == extreme) + window
+
+
+def local_analysis(series: CandleSeries, window: int = 3, tolerance: float = 0.001) -> Dict[str, Any]:
+    """
+    Support/resistance, trend and indicators from a candle series.
+
+    Levels are clustered swing lows below and swing highs above the last
+    close. The trend is the least-squares slope of closes: its total move
+    over the series relative to price decides the direction, and R^2 the
+    strength.
+    """
+    close = series.close
+    last = float(close[-1])
+    highs = series.high[swing_points(series.high, window, highs=True)]
+    lows = series.low[swing_points(series.low, window, highs=False)]
+    resistance = cluster_levels([(float(level), 1.0) for level in highs if level > last], tolerance)
+    support = cluster_levels([(float(level), 1.0) for level in lows if level < last], tolerance)
+
+    index = np.arange(len(close), dtype=float)
+    slope, intercept = np.polyfit(index, close, 1)
+    fitted = slope * index + intercept
+    total = float(((close - close.mean()) ** 2).sum())
+    r_squared = 1 - float(((close - fitted) ** 2).sum()) / total if total > 0 else 0.0
+    move = slope * (len(close) - 1) / abs(float(close.mean()) or 1.0)
+    direction = "bullish" if move > 0.002 else "bearish" if move < -0.002 else "sideways"
+    strength = "strong" if r_squared >= 0.7 else "moderate" if r_squared >= 0.4 else "weak"
+
+    indicators = {"last_close": round(last, 6)}
+    for name, values in compute_indicators(close, series.high, series.low, ("sma", "ema", "rsi", "atr")).items():
+        if not np.isnan(values[-1]):
+            indicators[name] = round(float(values[-1]), 6)
+    return {
+        "support_levels": [round(level, 6) for level in sorted(support, reverse=True)],
+        "resistance_levels": [round(level, 6) for level in resistance],
+        "trend_direction": direction,
+        "trend_strength": strength,
+        "current_price_estimate": round(last, 6),
+        "indicators": indicators,
+        "trend_r_squared": round(r_squared, 3),
+    }
+
+
+def format_candle_hints(series: Optional[CandleSeries]) -> Optional[str]:
+    """Prompt hints from a scaled candle series, or None when there is none."""
+    if series is None or not series.scaled or len(series) < MIN_LOCAL_CANDLES:
+        return None
+    local = local_analysis(series)
+    hints = [f"{len(series)} candles, last close {local['current_price_estimate']}", f"{local['trend_direction']} trend"]
+    if local["support_levels"]:
+        hints.append("swing-low support " + ", ".join(str(level) for level in local["support_levels"][:3]))
+    if local["resistance_levels"]:
+        hints.append("swing-high resistance " + ", ".join(str(level) for level in local["resistance_levels"][:3]))
+    return "Candles read from the chart pixels show: " + "; ".join(hints) + "."
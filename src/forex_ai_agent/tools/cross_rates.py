@@ -0,0 +1,267 @@
+"""
+Exchange rate arithmetic and cross-rate engine.
+
+This module provides the quote representation shared by the market data
+tools, inversion and triangulation of quotes with bid/ask propagation, and
+a cross-rate engine that keeps a graph of recently fetched rates so crosses
+can be derived from fresh legs instead of calling Alpha Vantage.
+"""
+
+import threading
+import time
+from dataclasses import dataclass, asdict
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+
+Pair = Tuple[str, str]
+
+
+def parse_pair(pair: str) -> Pair:
+    """Parse 'EUR/USD', 'EURUSD' or 'eur-usd' into ('EUR', 'USD')."""
+    cleaned = pair.strip().upper()
+    for separator in ("/", "-", "_", ":"):
+        if separator in cleaned:
+            base, quote = cleaned.split(separator, 1)
+            return base.strip(), quote.strip()
+    if len(cleaned) == 6:
+        return cleaned[:3], cleaned[3:]
+    raise ValueError(f"Invalid currency pair: {pair}")
+
+
+@dataclass
+class Quote:
+    """Exchange rate for base/quote with bid/ask and the time it was observed."""
+    base: str
+    quote: str
+    rate: float
+    bid: float
+    ask: float
+    timestamp: str = ""
+    timezone: str = "UTC"
+    source: str = "direct"
+    base_name: str = ""
+    quote_name: str = ""
+    cached: bool = False  # served from the client's response cache rather than an API call
+
+    @property
+    def pair(self) -> Pair:
+        return self.base, self.quote
+
+    @property
+    def spread(self) -> float:
+        return self.ask - self.bid
+
+    @classmethod
+    def from_alpha_vantage(cls, rate_data: Dict[str, str]) -> "Quote":
+        """Build a quote from a 'Realtime Currency Exchange Rate' payload."""
+        rate = float(rate_data["5. Exchange Rate"])
+        # Alpha Vantage reports "-" for bid/ask on some crypto pairs
+        bid = _as_float(rate_data.get("8. Bid Price"), rate)
+        ask = _as_float(rate_data.get("9. Ask Price"), rate)
+        return cls(
+            base=rate_data["1. From_Currency Code"],
+            quote=rate_data["3. To_Currency Code"],
+            rate=rate,
+            bid=bid,
+            ask=ask,
+            timestamp=rate_data.get("6. Last Refreshed", ""),
+            timezone=rate_data.get("7. Time Zone", "UTC"),
+            base_name=rate_data.get("2. From_Currency Name", ""),
+            quote_name=rate_data.get("4. To_Currency Name", ""),
+        )
+
+    def inverse(self) -> "Quote":
+        """Quote/base rate; the inverse bid is the reciprocal of the ask and vice versa."""
+        return Quote(
+            base=self.quote,
+            quote=self.base,
+            rate=1 / self.rate,
+            bid=1 / self.ask,
+            ask=1 / self.bid,
+            timestamp=self.timestamp,
+            timezone=self.timezone,
+            source="inverse" if self.source == "direct" else self.source,
+            base_name=self.quote_name,
+            quote_name=self.base_name,
+        )
+
+    def oriented(self, base: str) -> "Quote":
+        """Return this quote expressed with `base` as the base currency."""
+        return self if self.base == base else self.inverse()
+
+    def to_dict(self, precision: int = 6) -> Dict[str, Any]:
+        data = asdict(self)
+        del data["base_name"], data["quote_name"], data["cached"]
+        for key in ("rate", "bid", "ask"):
+            data[key] = round(data[key], precision)
+        data["spread"] = round(self.spread, precision)
+        return data
+
+
+def _as_float(value: Any, default: float) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def cross(first: Quote, second: Quote, base: str, quote: str) -> Quote:
+    """
+    Triangulate base/quote from two legs sharing one currency.
+
+    Legs may be stored in either direction. Selling base for quote means
+    selling base for the shared currency and then the shared currency for
+    quote, so bids multiply with bids and asks with asks, which widens the
+    spread the way a real cross trade would.
+    """
+    shared = (set(first.pair) & set(second.pair)) - {base, quote}
+    if len(shared) != 1 or (set(first.pair) ^ set(second.pair)) != {base, quote}:
+        raise ValueError(f"Legs {first.pair} and {second.pair} do not triangulate {base}/{quote}")
+    via = shared.pop()
+    if base in first.pair:
+        leg_in, leg_out = first.oriented(base), second.oriented(via)
+    else:
+        leg_in, leg_out = second.oriented(base), first.oriented(via)
+    return Quote(
+        base=base,
+        quote=quote,
+        rate=leg_in.rate * leg_out.rate,
+        bid=leg_in.bid * leg_out.bid,
+        ask=leg_in.ask * leg_out.ask,
+        timestamp=min(leg_in.timestamp, leg_out.timestamp),
+        timezone=leg_in.timezone,
+        source=f"cross:{via}",
+        base_name=leg_in.base_name,
+        quote_name=leg_out.quote_name,
+    )
+
+
+class CrossRateEngine:
+    """
+    Graph of recently fetched rates that answers pairs from fresh legs.
+
+    Each fetched quote is an edge between its two currencies, stamped with
+    the time it was observed. A pair is answered from a fresh direct or
+    inverse edge, or triangulated through a shared currency when both legs
+    are fresher than `max_age` seconds. Only missing legs are fetched.
+
+    `fetches` counts API calls made by all callers; pass a `fetched` list to
+    `get` to collect the quotes fetched for one call.
+    """
+
+    def __init__(
+        self,
+        fetcher: Callable[[str, str], Quote],
+        async_fetcher: Optional[Callable[[str, str], Awaitable[Quote]]] = None,
+        max_age: float = 60.0,
+        hubs: Iterable[str] = ("USD",),
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.fetcher = fetcher
+        self.async_fetcher = async_fetcher
+        self.max_age = max_age
+        self.hubs = tuple(hubs)
+        self.clock = clock
+        self._edges: Dict[Pair, Tuple[Quote, float]] = {}
+        self._neighbours: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        self.fetches = 0
+
+    def record(self, quote: Quote) -> None:
+        """Add or refresh an edge with a newly observed quote."""
+        with self._lock:
+            self._edges.pop(quote.pair[::-1], None)
+            self._edges[quote.pair] = (quote, self.clock())
+            self._neighbours.setdefault(quote.base, set()).add(quote.quote)
+            self._neighbours.setdefault(quote.quote, set()).add(quote.base)
+
+    def _fresh_edge(self, base: str, quote: str) -> Optional[Quote]:
+        for pair in ((base, quote), (quote, base)):
+            entry = self._edges.get(pair)
+            if entry is not None and self.clock() - entry[1] <= self.max_age:
+                return entry[0].oriented(base)
+        return None
+
+    def _vias(self, base: str, quote: str) -> Tuple[str, ...]:
+        """Candidate intermediate currencies, hubs first."""
+        known = (self._neighbours.get(base, set()) | self._neighbours.get(quote, set())) - {base, quote}
+        hubs = tuple(h for h in self.hubs if h not in (base, quote))
+        return hubs + tuple(sorted(known - set(hubs)))
+
+    def lookup(self, base: str, quote: str) -> Optional[Quote]:
+        """Answer base/quote from fresh edges only, without fetching."""
+        base, quote = base.upper(), quote.upper()
+        with self._lock:
+            direct = self._fresh_edge(base, quote)
+            if direct is not None:
+                return direct
+            for via in self._vias(base, quote):
+                first, second = self._fresh_edge(base, via), self._fresh_edge(via, quote)
+                if first is not None and second is not None:
+                    return cross(first, second, base, quote)
+        return None
+
+    def fetch(self, base: str, quote: str, fetched: Optional[List[Quote]] = None) -> Quote:
+        """Fetch base/quote directly and record it."""
+        result = self.fetcher(base, quote)
+        self._recorded_fetch(result, fetched)
+        return result
+
+    async def afetch(self, base: str, quote: str, fetched: Optional[List[Quote]] = None) -> Quote:
+        """Async equivalent of `fetch`, using the async fetcher."""
+        result = await self.async_fetcher(base, quote)
+        self._recorded_fetch(result, fetched)
+        return result
+
+    def _recorded_fetch(self, result: Quote, fetched: Optional[List[Quote]]) -> None:
+        self.record(result)
+        if fetched is not None:
+            fetched.append(result)
+        if not result.cached:
+            with self._lock:
+                self.fetches += 1
+
+    def _missing_leg(self, base: str, quote: str) -> Optional[Pair]:
+        """
+        Choose the hub leg to fetch for a cross with one fresh hub leg.
+
+        Only crosses (neither currency is a hub) are answered this way; the
+        fetched hub leg also serves later crosses. Otherwise None is returned
+        and the pair itself should be fetched, since one direct call is never
+        more expensive than fetching legs.
+        """
+        if base in self.hubs or quote in self.hubs:
+            return None
+        with self._lock:
+            for via in self.hubs:
+                if self._fresh_edge(base, via) is not None:
+                    return quote, via
+                if self._fresh_edge(via, quote) is not None:
+                    return base, via
+        return None
+
+    def get(self, base: str, quote: str, fetched: Optional[List[Quote]] = None) -> Quote:
+        """Answer base/quote, fetching as little as possible; fetched quotes are appended to `fetched`."""
+        base, quote = base.upper(), quote.upper()
+        known = self.lookup(base, quote)
+        if known is not None:
+            return known
+
+        missing_leg = self._missing_leg(base, quote)
+        if missing_leg is None:
+            return self.fetch(base, quote, fetched)
+        self.fetch(*missing_leg, fetched)
+        return self.lookup(base, quote) or self.fetch(base, quote, fetched)
+
+    async def aget(self, base: str, quote: str, fetched: Optional[List[Quote]] = None) -> Quote:
+        """Async equivalent of `get`."""
+        base, quote = base.upper(), quote.upper()
+        known = self.lookup(base, quote)
+        if known is not None:
+            return known
+
+        missing_leg = self._missing_leg(base, quote)
+        if missing_leg is None:
+            return await self.afetch(base, quote, fetched)
+        await self.afetch(*missing_leg, fetched)
+        return self.lookup(base, quote) or await self.afetch(base, quote, fetched)
@@ -6,13 +6,23 @@ market data using Alpha Vantage API.
 """
 
 from crewai.tools import BaseTool
-from typing import Type
+from typing import Optional, Type
 from pydantic import BaseModel, Field
-import requests
 import json
-import os
 from datetime import datetime
 
+from .alpha_vantage import (
+    NETWORK_ERRORS,
+    AlphaVantageRateLimitError,
+    alpha_vantage_client,
+    async_alpha_vantage_client,
+)
+from .output import OutputProfile, render
+
+
+# Compact output drops currency names and constant fields
+OUTPUT_PROFILE = OutputProfile(drop=("pair_info", "data_source", "market_status"))
+
 
 class CryptoAPIInput(BaseModel):
     """Input schema for crypto API connector."""
@@ -27,94 +37,115 @@ class CryptoAPIConnector(BaseTool):
         "Provides current price, market cap, volume, and price changes for major cryptocurrencies."
     )
     args_schema: Type[BaseModel] = CryptoAPIInput
+    output_mode: Optional[str] = None
 
     def _run(self, symbol: str, vs_currency: str = "USD") -> str:
         """Fetch cryptocurrency data from Alpha Vantage"""
+        if not alpha_vantage_client.api_key:
+            return self._missing_api_key()
         try:
-            api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
-            if not api_key:
-                return json.dumps({
-                    "error": "ALPHA_VANTAGE_API_KEY not found in environment variables",
-                    "success": False,
-                    "message": "Please add your Alpha Vantage API key to .env file"
-                })
-
-            # Alpha Vantage Digital Currency endpoint
-            base_url = "https://www.alphavantage.co/query"
-            params = {
-                "function": "CURRENCY_EXCHANGE_RATE",
-                "from_currency": symbol,
-                "to_currency": vs_currency,
-                "apikey": api_key
-            }
+            data = alpha_vantage_client.query("CURRENCY_EXCHANGE_RATE", self._params(symbol, vs_currency), timeout=10)
+            return self._format_response(data, symbol, vs_currency)
+        except Exception as e:
+            return self._format_error(e)
 
-            response = requests.get(base_url, params=params, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
+    async def _arun(self, symbol: str, vs_currency: str = "USD") -> str:
+        """Async equivalent of `_run` using the shared aiohttp client"""
+        if not alpha_vantage_client.api_key:
+            return self._missing_api_key()
+        try:
+            data = await async_alpha_vantage_client.query(
+                "CURRENCY_EXCHANGE_RATE", self._params(symbol, vs_currency), timeout=10
+            )
+            return self._format_response(data, symbol, vs_currency)
+        except Exception as e:
+            return self._format_error(e)
+
+    def _missing_api_key(self) -> str:
+        return json.dumps({
+            "error": "ALPHA_VANTAGE_API_KEY not found in environment variables",
+            "success": False,
+            "message": "Please add your Alpha Vantage API key to .env file"
+        })
+
+    def _params(self, symbol: str, vs_currency: str) -> dict:
+        # Alpha Vantage Digital Currency endpoint
+        return {
+            "from_currency": symbol,
+            "to_currency": vs_currency
+        }
+
+    def _format_response(self, data: dict, symbol: str, vs_currency: str) -> str:
+        """Build the tool output from an Alpha Vantage response"""
+        # Check for API errors
+        if "Error Message" in data:
+            return json.dumps({
+                "error": data["Error Message"],
+                "success": False
+            })
+        
+        if "Note" in data:
+            return json.dumps({
+                "error": "API rate limit exceeded",
+                "success": False,
+                "message": "Alpha Vantage free tier: 25 requests/day limit reached"
+            })
+
+        # Parse the response
+        if "Realtime Currency Exchange Rate" in data:
+            rate_data = data["Realtime Currency Exchange Rate"]
             
-            # Check for API errors
-            if "Error Message" in data:
-                return json.dumps({
-                    "error": data["Error Message"],
-                    "success": False
-                })
+            # Calculate spread for crypto trading
+            bid_price = float(rate_data["8. Bid Price"])
+            ask_price = float(rate_data["9. Ask Price"])
+            spread = ask_price - bid_price
+            spread_percentage = (spread / bid_price) * 100 if bid_price > 0 else 0
             
-            if "Note" in data:
-                return json.dumps({
-                    "error": "API rate limit exceeded",
-                    "success": False,
-                    "message": "Alpha Vantage free tier: 25 requests/day limit reached"
-                })
-
-            # Parse the response
-            if "Realtime Currency Exchange Rate" in data:
-                rate_data = data["Realtime Currency Exchange Rate"]
-                
-                # Calculate spread for crypto trading
-                bid_price = float(rate_data["8. Bid Price"])
-                ask_price = float(rate_data["9. Ask Price"])
-                spread = ask_price - bid_price
-                spread_percentage = (spread / bid_price) * 100 if bid_price > 0 else 0
-                
-                result = {
-                    "success": True,
-                    "symbol": f"{symbol}/{vs_currency}",
-                    "current_price": float(rate_data["5. Exchange Rate"]),
-                    "bid_price": bid_price,
-                    "ask_price": ask_price,
-                    "spread": round(spread, 8),  # More precision for crypto
-                    "spread_percentage": round(spread_percentage, 4),
-                    "timestamp": rate_data["6. Last Refreshed"],
-                    "timezone": rate_data["7. Time Zone"],
-                    "data_source": "Alpha Vantage",
-                    "market_status": "open",  # Crypto markets are always open (24/7)
-                    "pair_info": {
-                        "from_currency": rate_data["1. From_Currency Code"],
-                        "from_currency_name": rate_data["2. From_Currency Name"],
-                        "to_currency": rate_data["3. To_Currency Code"],
-                        "to_currency_name": rate_data["4. To_Currency Name"]
-                    }
+            result = {
+                "success": True,
+                "symbol": f"{symbol}/{vs_currency}",
+                "current_price": float(rate_data["5. Exchange Rate"]),
+                "bid_price": bid_price,
+                "ask_price": ask_price,
+                "spread": round(spread, 8),  # More precision for crypto
+                "spread_percentage": round(spread_percentage, 4),
+                "timestamp": rate_data["6. Last Refreshed"],
+                "timezone": rate_data["7. Time Zone"],
+                "data_source": "Alpha Vantage",
+                "market_status": "open",  # Crypto markets are always open (24/7)
+                "pair_info": {
+                    "from_currency": rate_data["1. From_Currency Code"],
+                    "from_currency_name": rate_data["2. From_Currency Name"],
+                    "to_currency": rate_data["3. To_Currency Code"],
+                    "to_currency_name": rate_data["4. To_Currency Name"]
                 }
-                
-                return json.dumps(result, indent=2)
-            else:
-                return json.dumps({
-                    "error": "Unexpected API response format",
-                    "success": False,
-                    "raw_response": data
-                })
-
-        except requests.exceptions.RequestException as e:
+            }
+            
+            return render(result, OUTPUT_PROFILE, self.output_mode, indent=2)
+        else:
             return json.dumps({
-                "error": f"Network error: {str(e)}",
-                "success": False
+                "error": "Unexpected API response format",
+                "success": False,
+                "raw_response": data
             })
-        except Exception as e:
+
+    def _format_error(self, error: Exception) -> str:
+        """Map fetch errors to the tool's error payloads"""
+        if isinstance(error, AlphaVantageRateLimitError):
+            return json.dumps({
+                "error": "API rate limit exceeded",
+                "success": False,
+                "message": str(error)
+            })
+        if isinstance(error, NETWORK_ERRORS):
             return json.dumps({
-                "error": f"Crypto API error: {str(e)}",
+                "error": f"Network error: {str(error)}",
                 "success": False
             })
+        return json.dumps({
+            "error": f"Crypto API error: {str(error)}",
+            "success": False
+        })
 
 
 # Create tool instance
@@ -6,13 +6,69 @@ market data using Alpha Vantage API.
 """
 
 from crewai.tools import BaseTool
-from typing import Type
+from typing import Optional, Type
 from pydantic import BaseModel, Field
-import requests
 import json
 import os
 from datetime import datetime
 
+from .alpha_vantage import (
+    NETWORK_ERRORS,
+    AlphaVantageRateLimitError,
+    alpha_vantage_client,
+    async_alpha_vantage_client,
+)
+from .cross_rates import CrossRateEngine, Quote
+from .output import OutputProfile, render
+
+
+# Compact output drops currency names and constant fields
+OUTPUT_PROFILE = OutputProfile(drop=("pair_info", "data_source"))
+
+
+def _quote_params(from_currency: str, to_currency: str) -> dict:
+    return {
+        "from_currency": from_currency.upper(),
+        "to_currency": to_currency.upper()
+    }
+
+
+def _parse_quote(data: dict, params: dict, cached: bool = False) -> Quote:
+    """Turn a CURRENCY_EXCHANGE_RATE response into a Quote, raising on API errors."""
+    if "Note" in data or "Information" in data:
+        raise AlphaVantageRateLimitError(
+            data.get("Note") or "Alpha Vantage free tier: 25 requests/day. Upgrade for more requests."
+        )
+    if "Realtime Currency Exchange Rate" not in data:
+        raise ValueError(data.get("Error Message", "Unexpected API response format"))
+    quote = Quote.from_alpha_vantage(data["Realtime Currency Exchange Rate"])
+    quote.base, quote.quote = params["from_currency"], params["to_currency"]
+    quote.cached = cached
+    return quote
+
+
+def fetch_quote(from_currency: str, to_currency: str, timeout: float = 10) -> Quote:
+    """
+    Fetch a single exchange rate through the shared Alpha Vantage client.
+
+    Raises:
+        ValueError: If Alpha Vantage rejects the pair or returns an unexpected payload.
+        AlphaVantageRateLimitError: If the local or server-side quota is exhausted.
+        requests.exceptions.RequestException: On network errors.
+    """
+    params = _quote_params(from_currency, to_currency)
+    data, cached = alpha_vantage_client.query_with_cache_status("CURRENCY_EXCHANGE_RATE", params, timeout=timeout)
+    return _parse_quote(data, params, cached)
+
+
+async def afetch_quote(from_currency: str, to_currency: str, timeout: float = 10) -> Quote:
+    """Async equivalent of `fetch_quote` using the shared aiohttp client."""
+    params = _quote_params(from_currency, to_currency)
+    data, cached = await async_alpha_vantage_client.query_with_cache_status(
+        "CURRENCY_EXCHANGE_RATE", params, timeout=timeout
+    )
+    return _parse_quote(data, params, cached)
+
 
 class ForexDataInput(BaseModel):
     """Input schema for forex data fetcher."""
@@ -27,100 +83,90 @@ class ForexDataFetcher(BaseTool):
         "Provides exchange rates, bid/ask prices, and market timing for major currency pairs."
     )
     args_schema: Type[BaseModel] = ForexDataInput
+    output_mode: Optional[str] = None
 
     def _run(self, from_currency: str, to_currency: str) -> str:
-        """Fetch forex data from Alpha Vantage"""
+        """Fetch forex data from Alpha Vantage, deriving crosses from fresh legs when possible"""
+        if not alpha_vantage_client.api_key:
+            return self._missing_api_key()
+        try:
+            quote = cross_rate_engine.get(from_currency, to_currency)
+            return self._format_quote(quote, from_currency, to_currency)
+        except Exception as e:
+            return self._format_error(e, from_currency, to_currency)
+
+    async def _arun(self, from_currency: str, to_currency: str) -> str:
+        """Async equivalent of `_run` using the shared aiohttp client"""
+        if not alpha_vantage_client.api_key:
+            return self._missing_api_key()
         try:
-            api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
-            if not api_key:
-                return json.dumps({
-                    "error": "ALPHA_VANTAGE_API_KEY not found in environment variables",
-                    "success": False,
-                    "message": "Get your free API key from: https://www.alphavantage.co/support/#api-key"
-                })
-
-            # Alpha Vantage FX endpoint
-            base_url = "https://www.alphavantage.co/query"
-            params = {
-                "function": "CURRENCY_EXCHANGE_RATE",
-                "from_currency": from_currency.upper(),
-                "to_currency": to_currency.upper(),
-                "apikey": api_key
+            quote = await cross_rate_engine.aget(from_currency, to_currency)
+            return self._format_quote(quote, from_currency, to_currency)
+        except Exception as e:
+            return self._format_error(e, from_currency, to_currency)
+
+    def _missing_api_key(self) -> str:
+        return json.dumps({
+            "error": "ALPHA_VANTAGE_API_KEY not found in environment variables",
+            "success": False,
+            "message": "Get your free API key from: https://www.alphavantage.co/support/#api-key"
+        })
+
+    def _format_quote(self, quote: Quote, from_currency: str, to_currency: str) -> str:
+        """Build the tool output for a quote"""
+        spread_percentage = (quote.spread / quote.bid) * 100 if quote.bid > 0 else 0
+
+        # Determine market session
+        current_time = datetime.now()
+        market_status = self._get_forex_market_status(current_time)
+
+        result = {
+            "success": True,
+            "symbol": f"{from_currency}/{to_currency}",
+            "current_price": quote.rate,
+            "bid_price": quote.bid,
+            "ask_price": quote.ask,
+            "spread": round(quote.spread, 6),
+            "spread_percentage": round(spread_percentage, 4),
+            "timestamp": quote.timestamp,
+            "timezone": quote.timezone,
+            "market_status": market_status,
+            "data_source": "Alpha Vantage",
+            "rate_source": quote.source,
+            "pair_info": {
+                "from_currency": quote.base,
+                "from_currency_name": quote.base_name,
+                "to_currency": quote.quote,
+                "to_currency_name": quote.quote_name
             }
+        }
 
-            response = requests.get(base_url, params=params, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            # Check for API errors
-            if "Error Message" in data:
-                return json.dumps({
-                    "error": data["Error Message"],
-                    "success": False,
-                    "message": f"Invalid currency pair: {from_currency}/{to_currency}"
-                })
-            
-            if "Note" in data:
-                return json.dumps({
-                    "error": "API rate limit exceeded",
-                    "success": False,
-                    "message": "Alpha Vantage free tier: 25 requests/day. Upgrade for more requests."
-                })
-
-            # Parse the forex response
-            if "Realtime Currency Exchange Rate" in data:
-                rate_data = data["Realtime Currency Exchange Rate"]
-                
-                # Calculate spread and spread percentage
-                bid_price = float(rate_data["8. Bid Price"])
-                ask_price = float(rate_data["9. Ask Price"])
-                spread = ask_price - bid_price
-                spread_percentage = (spread / bid_price) * 100 if bid_price > 0 else 0
-                
-                # Determine market session
-                current_time = datetime.now()
-                market_status = self._get_forex_market_status(current_time)
-                
-                result = {
-                    "success": True,
-                    "symbol": f"{from_currency}/{to_currency}",
-                    "current_price": float(rate_data["5. Exchange Rate"]),
-                    "bid_price": bid_price,
-                    "ask_price": ask_price,
-                    "spread": round(spread, 6),
-                    "spread_percentage": round(spread_percentage, 4),
-                    "timestamp": rate_data["6. Last Refreshed"],
-                    "timezone": rate_data["7. Time Zone"],
-                    "market_status": market_status,
-                    "data_source": "Alpha Vantage",
-                    "pair_info": {
-                        "from_currency": rate_data["1. From_Currency Code"],
-                        "from_currency_name": rate_data["2. From_Currency Name"],
-                        "to_currency": rate_data["3. To_Currency Code"],
-                        "to_currency_name": rate_data["4. To_Currency Name"]
-                    }
-                }
-                
-                return json.dumps(result, indent=2)
-            else:
-                return json.dumps({
-                    "error": "Unexpected API response format",
-                    "success": False,
-                    "raw_response": data
-                })
-
-        except requests.exceptions.RequestException as e:
+        return render(result, OUTPUT_PROFILE, self.output_mode, indent=2)
+
+    def _format_error(self, error: Exception, from_currency: str, to_currency: str) -> str:
+        """Map fetch errors to the tool's error payloads"""
+        if isinstance(error, AlphaVantageRateLimitError):
             return json.dumps({
-                "error": f"Network error: {str(e)}",
+                "error": "API rate limit exceeded",
                 "success": False,
-                "message": "Check your internet connection"
+                "message": str(error)
             })
-        except Exception as e:
+        if isinstance(error, ValueError):
             return json.dumps({
-                "error": f"Forex API error: {str(e)}",
-                "success": False
+                "error": str(error),
+                "success": False,
+                "message": f"Invalid currency pair: {from_currency}/{to_currency}"
             })
+        if isinstance(error, NETWORK_ERRORS):
+            return json.dumps({
+                "error": f"Network error: {str(error)}",
+                "success": False,
+                "message": "Check your internet connection"
+            })
+        return json.dumps({
+            "error": f"Forex API error: {str(error)}",
+            "success": False
+        })
 
     def _get_forex_market_status(self, current_time: datetime) -> str:
         """Determine forex market status based on current time (UTC)"""
@@ -140,5 +186,12 @@ class ForexDataFetcher(BaseTool):
             return "open"
 
 
+# Shared graph of recently fetched rates, used by the forex and batch quote tools
+cross_rate_engine = CrossRateEngine(
+    fetch_quote,
+    async_fetcher=afetch_quote,
+    max_age=float(os.getenv("FOREX_AI_CROSS_RATE_MAX_AGE", 60))
+)
+
 # Create tool instance
 forex_data_fetcher = ForexDataFetcher()
\ No newline at end of file
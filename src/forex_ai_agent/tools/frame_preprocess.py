@@ -0,0 +1,242 @@
+"""
+Frame preprocessing before upload to a vision model.
+
+Frames are cropped to the chart area, resized to fit the model's image
+tile grid, JPEG-encoded within a byte budget and given a per-frame
+`detail` level, so each request uploads fewer bytes and costs fewer vision
+tokens. Token estimates follow OpenAI's published image accounting:
+a low-detail image costs a flat 85 tokens; a high-detail image is scaled to
+fit 2048x2048, then to 768px on its shortest side, and costs 85 tokens plus
+170 per 512px tile.
+"""
+
+import base64
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import cv2
+    import numpy as np
+    CV2_AVAILABLE = True
+except ImportError:
+    CV2_AVAILABLE = False
+    cv2 = None
+    np = None
+
+
+TILE_SIZE = 512
+BASE_IMAGE_TOKENS = 85
+TOKENS_PER_TILE = 170
+DETAIL_LEVELS = ("auto", "low", "high")
+
+DEFAULT_MAX_TILES = 4
+DEFAULT_JPEG_QUALITY = 80
+MIN_JPEG_QUALITY = 40
+DEFAULT_MAX_FRAME_BYTES = 200_000
+
+# Frames with fewer strong edges than this are mostly blank and sent at low detail
+LOW_DETAIL_EDGE_DENSITY = 0.01
+
+
+@dataclass
+class PreparedFrame:
+    """A frame ready for upload: base64 JPEG plus what it will cost."""
+    data: str
+    detail: str
+    width: int
+    height: int
+    bytes: int
+    tokens: int
+    crop: Tuple[int, int, int, int] = (0, 0, 0, 0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "size": [self.width, self.height],
+            "detail": self.detail,
+            "bytes": self.bytes,
+            "tokens": self.tokens,
+        }
+
+
+def _scaled_for_high_detail(width: int, height: int) -> Tuple[float, float]:
+    """Dimensions the API scales a high-detail image to before tiling."""
+    w, h = float(width), float(height)
+    if max(w, h) > 2048:
+        scale = 2048 / max(w, h)
+        w, h = w * scale, h * scale
+    if min(w, h) > 768:
+        scale = 768 / min(w, h)
+        w, h = w * scale, h * scale
+    return w, h
+
+
+def tile_count(width: int, height: int) -> int:
+    w, h = _scaled_for_high_detail(width, height)
+    return math.ceil(w / TILE_SIZE) * math.ceil(h / TILE_SIZE)
+
+
+def estimate_image_tokens(width: int, height: int, detail: str = "high") -> int:
+    """Vision tokens for one image of the given size and detail level."""
+    if detail == "low":
+        return BASE_IMAGE_TOKENS
+    return BASE_IMAGE_TOKENS + TOKENS_PER_TILE * tile_count(width, height)
+
+
+def fit_to_tiles(width: int, height: int, max_tiles: int = DEFAULT_MAX_TILES) -> Tuple[int, int]:
+    """
+    Largest size (keeping aspect ratio, never upscaling) that costs at most `max_tiles` tiles.
+
+    The image is first reduced the way the API would reduce it anyway, so
+    no bytes are uploaded only to be discarded; then, if it still spans too
+    many tiles, it is shrunk until a side lands on a tile boundary.
+    """
+    w, h = _scaled_for_high_detail(width, height)
+    if math.ceil(w / TILE_SIZE) * math.ceil(h / TILE_SIZE) > max_tiles:
+        # Candidate scales put one side exactly on a tile boundary
+        candidates = sorted(
+            {TILE_SIZE * k / side for side in (w, h) for k in range(1, max_tiles + 1)},
+            reverse=True,
+        )
+        for scale in candidates:
+            if scale < 1 and math.ceil(w * scale / TILE_SIZE - 1e-9) * math.ceil(h * scale / TILE_SIZE - 1e-9) <= max_tiles:
+                w, h = w * scale, h * scale
+                break
+    return max(1, int(round(w))), max(1, int(round(h)))
+
+
+def _separator_lines(gray: "np.ndarray", tolerance: int = 6, contrast: int = 12) -> Tuple["np.ndarray", "np.ndarray"]:
+    """Indices and colours of full-width single-colour lines that stand out from both neighbours."""
+    medians = np.median(gray, axis=1)
+    uniform = (np.abs(gray.astype(np.int16) - medians[:, None]) <= tolerance).mean(axis=1) >= 0.97
+    above = np.abs(np.diff(medians, prepend=medians[0]))
+    below = np.abs(np.diff(medians, append=medians[-1]))
+    lines = np.flatnonzero(uniform & (above >= contrast) & (below >= contrast))
+    return lines, medians[lines]
+
+
+def _chrome_edges(gray: "np.ndarray", edge_fraction: float) -> Tuple[int, int]:
+    """
+    Row range inside toolbar separators along the first axis.
+
+    Toolbars and browser bars are separated from the chart by a full-width
+    line in the outer `edge_fraction` of the frame. Chart grid lines look
+    the same, so lines whose colour also appears among lines in the middle
+    of the frame are ignored.
+    """
+    size = gray.shape[0]
+    lines, colours = _separator_lines(gray)
+    band = int(size * edge_fraction)
+    interior = colours[(lines > band) & (lines < size - band)]
+    start, end = 0, size
+    for line, colour in zip(lines, colours):
+        if interior.size and np.min(np.abs(interior - colour)) <= 6:
+            continue
+        if line < band:
+            start = max(start, line + 1)
+        elif line >= size - band:
+            end = min(end, line)
+    return start, end
+
+
+def _trim_uniform(gray: "np.ndarray", min_std: float = 4.0) -> Tuple[int, int]:
+    """Row range left after dropping blank (near-constant) rows at both edges."""
+    busy = np.flatnonzero(gray.std(axis=1) >= min_std)
+    if busy.size == 0:
+        return 0, gray.shape[0]
+    return int(busy[0]), int(busy[-1]) + 1
+
+
+def detect_chart_area(frame: "np.ndarray", edge_fraction: float = 0.15, min_area: float = 0.5) -> Tuple[int, int, int, int]:
+    """
+    Bounding box (x0, y0, x1, y1) of the chart inside application chrome.
+
+    Drops toolbar/browser bands behind separator lines near the frame edges
+    and blank margins. Falls back to the whole frame when the detected area
+    would be smaller than `min_area` of it.
+    """
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    height, width = gray.shape
+    y0, y1 = _chrome_edges(gray, edge_fraction)
+    x0, x1 = _chrome_edges(gray.T, edge_fraction)
+
+    inner = gray[y0:y1, x0:x1]
+    if inner.size:
+        ty0, ty1 = _trim_uniform(inner)
+        tx0, tx1 = _trim_uniform(inner.T)
+        y0, y1, x0, x1 = y0 + ty0, y0 + ty1, x0 + tx0, x0 + tx1
+
+    if (x1 - x0) * (y1 - y0) < min_area * width * height:
+        return 0, 0, width, height
+    return x0, y0, x1, y1
+
+
+def choose_detail(frame: "np.ndarray", width: int, height: int, detail: str = "auto") -> str:
+    """'low' for small or mostly blank frames, 'high' otherwise (unless forced)."""
+    if detail not in DETAIL_LEVELS:
+        raise ValueError(f"Unknown detail level: {detail}. Use one of {', '.join(DETAIL_LEVELS)}")
+    if detail != "auto":
+        return detail
+    if width <= TILE_SIZE and height <= TILE_SIZE:
+        return "low"
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    edge_density = np.count_nonzero(cv2.Canny(gray, 100, 200)) / gray.size
+    return "low" if edge_density < LOW_DETAIL_EDGE_DENSITY else "high"
+
+
+def encode_jpeg(frame: "np.ndarray", quality: int = DEFAULT_JPEG_QUALITY, max_bytes: Optional[int] = DEFAULT_MAX_FRAME_BYTES) -> bytes:
+    """JPEG-encode, lowering quality in steps of 10 until the image fits `max_bytes`."""
+    while True:
+        ok, buffer = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        if not ok:
+            raise ValueError("JPEG encoding failed")
+        if max_bytes is None or len(buffer) <= max_bytes or quality <= MIN_JPEG_QUALITY:
+            return buffer.tobytes()
+        quality = max(MIN_JPEG_QUALITY, quality - 10)
+
+
+def preprocess_frame(
+    frame: "np.ndarray",
+    autocrop: bool = True,
+    max_tiles: int = DEFAULT_MAX_TILES,
+    jpeg_quality: int = DEFAULT_JPEG_QUALITY,
+    max_bytes: Optional[int] = DEFAULT_MAX_FRAME_BYTES,
+    detail: str = "auto",
+) -> PreparedFrame:
+    """Crop, resize, pick a detail level and encode a frame for upload."""
+    crop = (0, 0, frame.shape[1], frame.shape[0])
+    if autocrop:
+        crop = detect_chart_area(frame)
+        x0, y0, x1, y1 = crop
+        frame = frame[y0:y1, x0:x1]
+
+    height, width = frame.shape[:2]
+    width, height = fit_to_tiles(width, height, max_tiles)
+    if (width, height) != (frame.shape[1], frame.shape[0]):
+        frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+
+    detail = choose_detail(frame, width, height, detail)
+    data = base64.b64encode(encode_jpeg(frame, jpeg_quality, max_bytes)).decode("utf-8")
+    return PreparedFrame(
+        data=data,
+        detail=detail,
+        width=width,
+        height=height,
+        bytes=len(data),
+        tokens=estimate_image_tokens(width, height, detail),
+        crop=crop,
+    )
+
+
+def upload_report(frames: List[PreparedFrame], prompt_chars: int = 0) -> Dict[str, Any]:
+    """Bytes and estimated input tokens for one request (text at ~4 characters per token)."""
+    image_tokens = sum(frame.tokens for frame in frames)
+    text_tokens = prompt_chars // 4
+    return {
+        "frames": len(frames),
+        "bytes": sum(frame.bytes for frame in frames),
+        "image_tokens": image_tokens,
+        "text_tokens": text_tokens,
+        "estimated_input_tokens": image_tokens + text_tokens,
+        "per_frame": [frame.to_dict() for frame in frames],
+    }
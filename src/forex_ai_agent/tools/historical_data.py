@@ -0,0 +1,188 @@
+"""
+Historical OHLC ingestion from Alpha Vantage.
+
+This module downloads FX_INTRADAY, FX_DAILY/WEEKLY/MONTHLY and
+DIGITAL_CURRENCY_DAILY bars through the shared rate-limited client and
+appends them to the columnar `OHLCStore`. Once a series is stored, later
+runs request only the compact (latest 100 bars) output and append the bars
+newer than the stored watermark; full history is downloaded only for a new
+series or when the compact window no longer reaches the stored data.
+"""
+
+from crewai.tools import BaseTool
+from typing import Any, Dict, Optional, Tuple, Type
+from pydantic import BaseModel, Field
+import json
+
+import numpy as np
+
+from .alpha_vantage import NETWORK_ERRORS, AlphaVantageRateLimitError, alpha_vantage_client
+from .cross_rates import parse_pair
+from .ohlc_store import COLUMNS, OHLCStore, default_ohlc_store
+from .output import OutputProfile, render
+
+
+INTRADAY_INTERVALS = ("1min", "5min", "15min", "30min", "60min")
+TIMEFRAMES = INTRADAY_INTERVALS + ("daily", "weekly", "monthly")
+# Currencies Alpha Vantage quotes through the FX_* functions; other bases are crypto
+FIAT_CURRENCIES = {
+    "USD", "EUR", "GBP", "JPY", "CHF", "CAD", "AUD", "NZD", "CNY", "HKD", "SGD", "SEK", "NOK",
+    "DKK", "PLN", "CZK", "HUF", "TRY", "ZAR", "MXN", "BRL", "INR", "KRW", "RUB", "ILS", "THB",
+}
+# Compact output keeps the latest bars; csv mode sends them as one table
+OUTPUT_PROFILE = OutputProfile(limits={"bars.*": -30}, tables=("bars",))
+_PRICE_FIELDS = {"1": "open", "2": "high", "3": "low", "4": "close", "5": "volume"}
+
+
+def is_crypto_pair(pair: Tuple[str, str]) -> bool:
+    return pair[0] not in FIAT_CURRENCIES
+
+
+def request_for(pair: Tuple[str, str], timeframe: str, outputsize: str) -> Tuple[str, Dict[str, str]]:
+    """Alpha Vantage function and parameters for a pair and timeframe."""
+    base, quote = pair
+    if timeframe not in TIMEFRAMES:
+        raise ValueError(f"Unknown timeframe: {timeframe}. Use one of {', '.join(TIMEFRAMES)}")
+    if is_crypto_pair(pair):
+        if timeframe != "daily":
+            raise ValueError("Crypto history is available at the daily timeframe only")
+        return "DIGITAL_CURRENCY_DAILY", {"symbol": base, "market": quote}
+    params = {"from_symbol": base, "to_symbol": quote}
+    if timeframe in INTRADAY_INTERVALS:
+        return "FX_INTRADAY", {**params, "interval": timeframe, "outputsize": outputsize}
+    if timeframe == "daily":
+        return "FX_DAILY", {**params, "outputsize": outputsize}
+    return f"FX_{timeframe.upper()}", params
+
+
+def parse_time_series(data: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """
+    Columns from an Alpha Vantage time series response, oldest bar first.
+
+    The series is the response key starting with "Time Series"; bar fields
+    are matched by their number prefix ("1. open", "1a. open (USD)"), so the
+    forex and digital currency formats parse alike. Times are UTC epoch seconds.
+    """
+    if "Note" in data or "Information" in data:
+        raise AlphaVantageRateLimitError(
+            data.get("Note") or data.get("Information") or "Alpha Vantage quota exhausted"
+        )
+    series = next((value for key, value in data.items() if key.startswith("Time Series")), None)
+    if series is None:
+        raise ValueError(data.get("Error Message", "Unexpected API response format"))
+
+    stamps = sorted(series)
+    columns = {"time": np.array(stamps, dtype="datetime64[s]").astype(np.int64)}
+    for prefix, column in _PRICE_FIELDS.items():
+        # First field with this number prefix, e.g. "1a. open (USD)" before "1b. open (USD)"
+        fields = [next((k for k in series[stamp] if k.split(".")[0].rstrip("ab") == prefix), None) for stamp in stamps]
+        columns[column] = np.array(
+            [float(series[stamp][field]) if field else 0.0 for stamp, field in zip(stamps, fields)], dtype=float
+        )
+    return columns
+
+
+class OHLCIngestor:
+    """Incrementally downloads bars into an `OHLCStore`."""
+
+    def __init__(self, store: OHLCStore, client: Any = alpha_vantage_client):
+        self.store = store
+        self.client = client
+
+    @staticmethod
+    def symbol(pair: Tuple[str, str]) -> str:
+        return f"{pair[0]}/{pair[1]}"
+
+    def ingest(self, pair: Tuple[str, str], timeframe: str, timeout: float = 30) -> Dict[str, Any]:
+        """
+        Bring a stored series up to date; returns counts and the request(s) made.
+
+        Raises:
+            ValueError: For unknown timeframes or unexpected API payloads.
+            AlphaVantageRateLimitError: If the local or server-side quota is exhausted.
+            requests.exceptions.RequestException: On network errors.
+        """
+        symbol = self.symbol(pair)
+        watermark = self.store.last_time(symbol, timeframe)
+        outputsize = "compact" if watermark is not None else "full"
+        function, params = request_for(pair, timeframe, outputsize)
+        bars = parse_time_series(self.client.query(function, params, timeout=timeout))
+
+        # The compact window starts after our last bar: there is a gap, fetch everything
+        if watermark is not None and "outputsize" in params and len(bars["time"]) and bars["time"][0] > watermark:
+            outputsize = "full"
+            function, params = request_for(pair, timeframe, outputsize)
+            bars = parse_time_series(self.client.query(function, params, timeout=timeout))
+
+        added = self.store.append(symbol, timeframe, bars)
+        return {
+            "symbol": symbol,
+            "timeframe": timeframe,
+            "function": function,
+            "outputsize": params.get("outputsize", "full"),
+            "received": int(len(bars["time"])),
+            "added": added,
+            "stored": self.store.count(symbol, timeframe),
+        }
+
+
+class HistoricalDataInput(BaseModel):
+    """Input schema for historical OHLC fetcher."""
+    pair: str = Field(..., description="Currency or crypto pair (e.g., 'EUR/USD', 'BTC/USD')")
+    timeframe: str = Field(default="daily", description="Bar timeframe: 1min, 5min, 15min, 30min, 60min, daily, weekly, monthly")
+    bars: int = Field(default=50, description="Number of most recent bars to return")
+    refresh: bool = Field(default=True, description="Download new bars before reading; False reads the local store only")
+
+
+class HistoricalDataFetcher(BaseTool):
+    name: str = "historical_ohlc_fetcher"
+    description: str = (
+        "Fetch historical OHLC bars for a forex or crypto pair. Bars are stored locally and only "
+        "new bars are downloaded on later calls. Returns the most recent bars as compact columns."
+    )
+    args_schema: Type[BaseModel] = HistoricalDataInput
+    output_mode: Optional[str] = None
+    store: Any = None
+    client: Any = None
+
+    def __init__(self, store: Optional[OHLCStore] = None, client: Any = None):
+        super().__init__()
+        self.store = store or default_ohlc_store()
+        self.client = client or alpha_vantage_client
+
+    def _run(self, pair: str, timeframe: str = "daily", bars: int = 50, refresh: bool = True) -> str:
+        """Update the local store from Alpha Vantage and return the latest bars"""
+        try:
+            parsed = parse_pair(pair)
+            timeframe = timeframe.strip().lower()
+            request_for(parsed, timeframe, "compact")
+        except ValueError as e:
+            return json.dumps({"error": str(e), "success": False})
+
+        ingestor = OHLCIngestor(self.store, self.client)
+        result: Dict[str, Any] = {"pair": ingestor.symbol(parsed), "timeframe": timeframe}
+        if refresh:
+            if not self.client.api_key:
+                result["warning"] = "ALPHA_VANTAGE_API_KEY not set; returning stored bars only"
+            else:
+                try:
+                    result["ingest"] = ingestor.ingest(parsed, timeframe)
+                except (AlphaVantageRateLimitError, ValueError, *NETWORK_ERRORS) as e:
+                    # Stored history is still useful when the refresh fails
+                    result["warning"] = f"Could not refresh from Alpha Vantage: {str(e)}"
+
+        data = self.store.read(ingestor.symbol(parsed), timeframe, last=max(1, int(bars)))
+        if not len(data["time"]):
+            return json.dumps({**result, "error": result.get("warning", "No stored bars"), "success": False})
+
+        result["bars"] = {
+            "time": np.array(data["time"], dtype="datetime64[s]").astype(str).tolist(),
+            **{column: np.round(data[column], 6).tolist() for column in COLUMNS[1:]},
+        }
+        result["count"] = len(data["time"])
+        result["success"] = True
+        return render(result, OUTPUT_PROFILE, self.output_mode)
+
+
+# Create tool instance
+historical_ohlc_fetcher = HistoricalDataFetcher()
@@ -0,0 +1,389 @@
+"""
+Technical indicators over OHLC arrays.
+
+Moving averages, RSI, MACD, Bollinger Bands and ATR are computed over whole
+NumPy arrays: simple averages from cumulative sums and rolling windows, and
+exponential/Wilder smoothing with a blockwise closed form instead of a
+per-bar Python loop. `IndicatorState` carries the smoothing state forward so
+a new bar updates every indicator in O(1), and `TechnicalIndicatorCalculator`
+exposes the library to the agents as a tool.
+
+Conventions follow TA-Lib: values are NaN until enough bars exist,
+exponential averages are seeded with the simple average of their first
+window, and RSI/ATR use Wilder's smoothing (alpha = 1 / period).
+"""
+
+from collections import deque
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
+import json
+import math
+
+import numpy as np
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+
+from .cross_rates import parse_pair
+from .ohlc_store import default_ohlc_store
+from .output import OutputProfile, render
+
+
+INDICATORS = ("sma", "ema", "rsi", "macd", "bollinger", "atr")
+DEFAULT_PERIODS = {
+    "sma": 20, "ema": 20, "rsi": 14, "bollinger": 20, "atr": 14,
+    "macd_fast": 12, "macd_slow": 26, "macd_signal": 9, "bollinger_k": 2.0,
+}
+# Largest growth factor allowed inside one block of the closed-form EMA
+_MAX_BLOCK_GROWTH = 1e100
+# Compact output keeps the latest values; csv mode sends the history as one table
+OUTPUT_PROFILE = OutputProfile(limits={"history.*": -20}, tables=("history",))
+
+
+def _nan(n: int) -> np.ndarray:
+    return np.full(n, np.nan)
+
+
+def smooth(values: np.ndarray, alpha: float, seed: float) -> np.ndarray:
+    """
+    y[t] = (1 - alpha) * y[t-1] + alpha * values[t], starting from y[-1] = seed.
+
+    Within a block, y[s+j] = d^(j+1) * y[s-1] + alpha * d^j * cumsum(x[s+k] * d^-k),
+    with d = 1 - alpha. Blocks are sized so d^-k stays within float range, which
+    keeps the result exact to rounding while only looping once per block.
+    """
+    values = np.asarray(values, dtype=float)
+    decay = 1.0 - alpha
+    if decay <= 0.0:
+        return values.copy()
+    block = max(1, int(math.log(_MAX_BLOCK_GROWTH) / -math.log(decay))) if decay < 1.0 else len(values)
+    out = np.empty_like(values)
+    previous = seed
+    for start in range(0, len(values), block):
+        chunk = values[start:start + block]
+        powers = decay ** np.arange(len(chunk))
+        out[start:start + len(chunk)] = decay * powers * previous + alpha * powers * np.cumsum(chunk / powers)
+        previous = out[start + len(chunk) - 1]
+    return out
+
+
+def sma(values: Sequence[float], period: int) -> np.ndarray:
+    """Simple moving average; NaN for the first `period - 1` bars."""
+    values = np.asarray(values, dtype=float)
+    out = _nan(len(values))
+    if period <= len(values):
+        sums = np.cumsum(np.concatenate(([0.0], values)))
+        out[period - 1:] = (sums[period:] - sums[:-period]) / period
+    return out
+
+
+def _seeded(values: np.ndarray, period: int, alpha: float) -> np.ndarray:
+    """Exponential smoothing seeded with the mean of the first `period` values."""
+    out = _nan(len(values))
+    if period <= len(values):
+        seed = values[:period].mean()
+        out[period - 1] = seed
+        out[period:] = smooth(values[period:], alpha, seed)
+    return out
+
+
+def ema(values: Sequence[float], period: int) -> np.ndarray:
+    """Exponential moving average (alpha = 2 / (period + 1)), seeded with the SMA."""
+    return _seeded(np.asarray(values, dtype=float), period, 2.0 / (period + 1))
+
+
+def wilder(values: Sequence[float], period: int) -> np.ndarray:
+    """Wilder's smoothing (alpha = 1 / period), seeded with the SMA."""
+    return _seeded(np.asarray(values, dtype=float), period, 1.0 / period)
+
+
+def rsi(close: Sequence[float], period: int = 14) -> np.ndarray:
+    """Relative Strength Index; the first value is at bar `period`."""
+    close = np.asarray(close, dtype=float)
+    out = _nan(len(close))
+    if len(close) <= period:
+        return out
+    delta = np.diff(close)
+    gains = wilder(np.clip(delta, 0, None), period)
+    losses = wilder(np.clip(-delta, 0, None), period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[1:] = np.where(losses == 0, 100.0, 100.0 - 100.0 / (1.0 + gains / losses))
+    out[1:][np.isnan(gains)] = np.nan
+    return out
+
+
+def macd(
+    close: Sequence[float], fast: int = 12, slow: int = 26, signal: int = 9
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """MACD line, signal line and histogram."""
+    close = np.asarray(close, dtype=float)
+    line = ema(close, fast) - ema(close, slow)
+    signal_line = _nan(len(close))
+    valid = np.flatnonzero(~np.isnan(line))
+    if len(valid):
+        signal_line[valid[0]:] = ema(line[valid[0]:], signal)
+    return line, signal_line, line - signal_line
+
+
+def bollinger(
+    close: Sequence[float], period: int = 20, k: float = 2.0
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Middle (SMA), upper and lower bands at `k` population standard deviations."""
+    close = np.asarray(close, dtype=float)
+    middle = sma(close, period)
+    deviation = _nan(len(close))
+    if period <= len(close):
+        deviation[period - 1:] = np.lib.stride_tricks.sliding_window_view(close, period).std(axis=1)
+    return middle, middle + k * deviation, middle - k * deviation
+
+
+def true_range(high: Sequence[float], low: Sequence[float], close: Sequence[float]) -> np.ndarray:
+    """True range; the first bar has no previous close and uses high - low."""
+    high, low, close = (np.asarray(a, dtype=float) for a in (high, low, close))
+    previous = np.concatenate(([close[0]], close[:-1])) if len(close) else close
+    return np.maximum(high - low, np.maximum(np.abs(high - previous), np.abs(low - previous)))
+
+
+def atr(high: Sequence[float], low: Sequence[float], close: Sequence[float], period: int = 14) -> np.ndarray:
+    """Average true range with Wilder's smoothing."""
+    return wilder(true_range(high, low, close), period)
+
+
+def compute_indicators(
+    close: Sequence[float],
+    high: Optional[Sequence[float]] = None,
+    low: Optional[Sequence[float]] = None,
+    indicators: Sequence[str] = INDICATORS,
+    periods: Optional[Dict[str, float]] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Named indicator series for one OHLC series, e.g. {"rsi_14": ..., "macd": ...}.
+
+    ATR needs `high` and `low`; it is skipped without them.
+    """
+    p = {**DEFAULT_PERIODS, **(periods or {})}
+    close = np.asarray(close, dtype=float)
+    series: Dict[str, np.ndarray] = {}
+    for name in indicators:
+        if name == "sma":
+            series[f"sma_{int(p['sma'])}"] = sma(close, int(p["sma"]))
+        elif name == "ema":
+            series[f"ema_{int(p['ema'])}"] = ema(close, int(p["ema"]))
+        elif name == "rsi":
+            series[f"rsi_{int(p['rsi'])}"] = rsi(close, int(p["rsi"]))
+        elif name == "macd":
+            series["macd"], series["macd_signal"], series["macd_histogram"] = macd(
+                close, int(p["macd_fast"]), int(p["macd_slow"]), int(p["macd_signal"])
+            )
+        elif name == "bollinger":
+            series["bb_middle"], series["bb_upper"], series["bb_lower"] = bollinger(
+                close, int(p["bollinger"]), float(p["bollinger_k"])
+            )
+        elif name == "atr":
+            if high is not None and low is not None:
+                series[f"atr_{int(p['atr'])}"] = atr(high, low, close, int(p["atr"]))
+        else:
+            raise ValueError(f"Unknown indicator: {name}. Use one of {', '.join(INDICATORS)}")
+    return series
+
+
+def _last(values: np.ndarray) -> Optional[float]:
+    return None if not len(values) or np.isnan(values[-1]) else float(values[-1])
+
+
+def _round(value: Optional[float], digits: int = 6) -> Optional[float]:
+    return None if value is None else round(value, digits)
+
+
+class _Smoother:
+    """Running seeded exponential average: SMA of the first `period` inputs, then smoothing."""
+
+    def __init__(self, period: int, alpha: float):
+        self.period, self.alpha = period, alpha
+        self.count, self.total, self.value = 0, 0.0, None
+
+    def update(self, x: float) -> Optional[float]:
+        self.count += 1
+        if self.value is not None:
+            self.value += self.alpha * (x - self.value)
+        else:
+            self.total += x
+            if self.count == self.period:
+                self.value = self.total / self.period
+        return self.value
+
+
+class IndicatorState:
+    """
+    Incremental indicators: `update()` with one bar costs O(1) (O(period) for
+    the rolling windows) and returns the same latest values as recomputing
+    `compute_indicators` over the whole history.
+    """
+
+    def __init__(self, periods: Optional[Dict[str, float]] = None):
+        p = self.periods = {**DEFAULT_PERIODS, **(periods or {})}
+        self._sma_window = deque(maxlen=int(p["sma"]))
+        self._bb_window = deque(maxlen=int(p["bollinger"]))
+        self._ema = _Smoother(int(p["ema"]), 2.0 / (p["ema"] + 1))
+        self._fast = _Smoother(int(p["macd_fast"]), 2.0 / (p["macd_fast"] + 1))
+        self._slow = _Smoother(int(p["macd_slow"]), 2.0 / (p["macd_slow"] + 1))
+        self._signal = _Smoother(int(p["macd_signal"]), 2.0 / (p["macd_signal"] + 1))
+        self._gain = _Smoother(int(p["rsi"]), 1.0 / p["rsi"])
+        self._loss = _Smoother(int(p["rsi"]), 1.0 / p["rsi"])
+        self._atr = _Smoother(int(p["atr"]), 1.0 / p["atr"])
+        self._previous_close: Optional[float] = None
+        self.latest: Dict[str, Optional[float]] = {}
+
+    @classmethod
+    def from_arrays(
+        cls,
+        close: Sequence[float],
+        high: Optional[Sequence[float]] = None,
+        low: Optional[Sequence[float]] = None,
+        periods: Optional[Dict[str, float]] = None,
+    ) -> "IndicatorState":
+        """State after `close` (and optionally high/low) history, ready for `update()`."""
+        state = cls(periods)
+        high = close if high is None else high
+        low = close if low is None else low
+        for bar in zip(high, low, close):
+            state.update(*bar)
+        return state
+
+    def update(self, high: float, low: float, close: float) -> Dict[str, Optional[float]]:
+        p = self.periods
+        self._sma_window.append(close)
+        self._bb_window.append(close)
+        latest = self.latest = {}
+
+        sma_period = int(p["sma"])
+        latest[f"sma_{sma_period}"] = sum(self._sma_window) / sma_period if len(self._sma_window) == sma_period else None
+        latest[f"ema_{int(p['ema'])}"] = self._ema.update(close)
+
+        fast, slow = self._fast.update(close), self._slow.update(close)
+        line = fast - slow if fast is not None and slow is not None else None
+        signal = self._signal.update(line) if line is not None else None
+        latest["macd"] = line
+        latest["macd_signal"] = signal
+        latest["macd_histogram"] = line - signal if signal is not None else None
+
+        bb_period = int(p["bollinger"])
+        if len(self._bb_window) == bb_period:
+            window = np.fromiter(self._bb_window, dtype=float)
+            middle, deviation = window.mean(), window.std()
+            latest["bb_middle"] = float(middle)
+            latest["bb_upper"] = float(middle + p["bollinger_k"] * deviation)
+            latest["bb_lower"] = float(middle - p["bollinger_k"] * deviation)
+        else:
+            latest["bb_middle"] = latest["bb_upper"] = latest["bb_lower"] = None
+
+        rsi_key = f"rsi_{int(p['rsi'])}"
+        latest[rsi_key] = None
+        previous = self._previous_close
+        if previous is not None:
+            gain = self._gain.update(max(close - previous, 0.0))
+            loss = self._loss.update(max(previous - close, 0.0))
+            if gain is not None:
+                latest[rsi_key] = 100.0 if loss == 0 else 100.0 - 100.0 / (1.0 + gain / loss)
+
+        reference = close if previous is None else previous
+        tr = max(high - low, abs(high - reference), abs(low - reference))
+        latest[f"atr_{int(p['atr'])}"] = self._atr.update(tr)
+
+        self._previous_close = close
+        return latest
+
+
+class TechnicalIndicatorInput(BaseModel):
+    """Input schema for technical indicator calculator."""
+    ohlc_data: str = Field(
+        default="",
+        description=(
+            "JSON OHLC data, oldest bar first: either {\"close\": [...], \"high\": [...], \"low\": [...]} "
+            "or a list of bars [{\"high\": ..., \"low\": ..., \"close\": ...}, ...]. "
+            "Leave empty to use stored history for `pair`"
+        )
+    )
+    pair: str = Field(default="", description="Pair whose stored history to use (see historical_ohlc_fetcher), e.g. 'EUR/USD'")
+    timeframe: str = Field(default="daily", description="Timeframe of the stored history")
+    lookback: int = Field(default=500, description="Number of most recent stored bars to compute over")
+    indicators: str = Field(
+        default=",".join(INDICATORS),
+        description="Comma-separated indicators: sma, ema, rsi, macd, bollinger, atr"
+    )
+    periods: str = Field(
+        default="{}",
+        description="Optional JSON of period overrides, e.g. {\"rsi\": 7, \"sma\": 50, \"macd_fast\": 8}"
+    )
+    tail: int = Field(default=1, description="Number of most recent values to return per indicator")
+
+
+def parse_ohlc(ohlc_data: Any) -> Dict[str, List[float]]:
+    """Column dict from a JSON column object or list of bar objects."""
+    data = json.loads(ohlc_data) if isinstance(ohlc_data, str) else ohlc_data
+    if isinstance(data, list):
+        data = {
+            column: [float(bar[column]) for bar in data]
+            for column in ("open", "high", "low", "close")
+            if data and all(column in bar for bar in data)
+        }
+    if not isinstance(data, dict) or not data.get("close"):
+        raise ValueError("OHLC data needs a non-empty 'close' series")
+    return {column: [float(v) for v in values] for column, values in data.items() if column in ("open", "high", "low", "close")}
+
+
+class TechnicalIndicatorCalculator(BaseTool):
+    name: str = "technical_indicator_calculator"
+    description: str = (
+        "Compute technical indicators (SMA, EMA, RSI, MACD, Bollinger Bands, ATR) locally "
+        "from OHLC price data. Returns the latest values, plus recent history when requested."
+    )
+    args_schema: Type[BaseModel] = TechnicalIndicatorInput
+    output_mode: Optional[str] = None
+    store: Any = None
+
+    def _run(
+        self,
+        ohlc_data: str = "",
+        indicators: str = ",".join(INDICATORS),
+        periods: str = "{}",
+        tail: int = 1,
+        pair: str = "",
+        timeframe: str = "daily",
+        lookback: int = 500,
+    ) -> str:
+        """Compute indicators over the given OHLC data or stored history"""
+        try:
+            columns = parse_ohlc(ohlc_data) if ohlc_data else self._stored(pair, timeframe, lookback)
+            names = [name.strip().lower() for name in indicators.split(",") if name.strip()]
+            overrides = json.loads(periods) if periods else {}
+            series = compute_indicators(columns["close"], columns.get("high"), columns.get("low"), names, overrides)
+        except (ValueError, TypeError, KeyError) as e:
+            return json.dumps({"error": f"Invalid indicator request: {str(e)}", "success": False})
+
+        tail = max(1, int(tail))
+        result = {
+            "bars": len(columns["close"]),
+            "latest": {name: _round(_last(values)) for name, values in series.items()},
+            "success": True,
+        }
+        if tail > 1:
+            result["history"] = {
+                name: [_round(None if np.isnan(v) else float(v)) for v in values[-tail:]]
+                for name, values in series.items()
+            }
+        if "atr" in names and not any(name.startswith("atr_") for name in series):
+            result["skipped"] = ["atr (needs high and low)"]
+        return render(result, OUTPUT_PROFILE, self.output_mode)
+
+    def _stored(self, pair: str, timeframe: str, lookback: int) -> Dict[str, np.ndarray]:
+        if not pair:
+            raise ValueError("Provide ohlc_data or a pair with stored history")
+        base, quote = parse_pair(pair)
+        self.store = self.store or default_ohlc_store()
+        data = self.store.read(f"{base}/{quote}", timeframe.strip().lower(), columns=("high", "low", "close"), last=max(1, int(lookback)))
+        if not len(data["close"]):
+            raise ValueError(f"No stored {timeframe} history for {base}/{quote}; fetch it with historical_ohlc_fetcher first")
+        return data
+
+
+# Create tool instance
+technical_indicator_calculator = TechnicalIndicatorCalculator()
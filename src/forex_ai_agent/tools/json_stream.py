@@ -0,0 +1,126 @@
+"""
+Incremental parsing of large JSON API responses.
+
+Alpha Vantage returns news as one JSON object whose "feed" array can hold
+a thousand articles. `StreamingObjectParser` is fed the response body in
+chunks and hands back each element of that array as soon as it is
+complete, so a caller can project, aggregate and drop articles one at a
+time. Peak memory is one chunk plus one article instead of the whole body
+and its decoded tree. Other top-level members (item counts, quota notices,
+error messages) are decoded normally and kept in `header`.
+"""
+
+import codecs
+import json
+import re
+from typing import Any, Dict, Iterable, Iterator, List
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+class StreamingObjectParser:
+    """Push parser for a top-level JSON object that streams the items of one array member."""
+
+    def __init__(self, array_key: str = "feed"):
+        self.array_key = array_key
+        self.header: Dict[str, Any] = {}
+        self.found = False        # whether the array member was present
+        self.done = False         # whether the closing brace was read
+        self._decoder = json.JSONDecoder()
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._state = "start"
+        self._key = None
+
+    def feed(self, data: bytes) -> List[Any]:
+        """Consume a chunk of the body; returns the array items it completed."""
+        self._buffer += self._text.decode(data)
+        return self._parse(final=False)
+
+    def close(self) -> List[Any]:
+        """
+        Finish the body; returns any remaining items.
+
+        Raises:
+            ValueError: If the body is not a complete JSON object.
+        """
+        self._buffer += self._text.decode(b"", final=True)
+        items = self._parse(final=True)
+        if not self.done:
+            raise ValueError("Truncated JSON response")
+        return items
+
+    def parse(self, chunks: Iterable[bytes]) -> Iterator[Any]:
+        """Yield the array items of a body given as an iterable of chunks."""
+        for chunk in chunks:
+            yield from self.feed(chunk)
+        yield from self.close()
+
+    def _decode(self, text: str, pos: int, final: bool):
+        """Decode the value at `pos`, or return None when more input is needed."""
+        try:
+            value, end = self._decoder.raw_decode(text, pos)
+        except json.JSONDecodeError:
+            if final:
+                raise ValueError(f"Invalid JSON response at character {pos}") from None
+            return None
+        # A number running to the end of the buffer may continue in the next chunk
+        if end == len(text) and not final:
+            return None
+        return value, end
+
+    def _parse(self, final: bool) -> List[Any]:
+        items: List[Any] = []
+        text, pos = self._buffer, 0
+        while True:
+            pos = _WHITESPACE.match(text, pos).end()
+            if pos >= len(text):
+                break
+            char = text[pos]
+            if self._state == "start":
+                if char != "{":
+                    raise ValueError("Expected a JSON object")
+                pos, self._state = pos + 1, "key"
+            elif self._state == "key":
+                if char == ",":
+                    pos += 1
+                elif char == "}":
+                    pos, self._state, self.done = pos + 1, "end", True
+                else:
+                    decoded = self._decode(text, pos, final)
+                    if decoded is None:
+                        break
+                    key, end = decoded
+                    colon = _WHITESPACE.match(text, end).end()
+                    if colon >= len(text):
+                        break
+                    if text[colon] != ":":
+                        raise ValueError(f"Expected ':' at character {colon}")
+                    self._key, pos, self._state = key, colon + 1, "value"
+            elif self._state == "value":
+                if self._key == self.array_key and char == "[":
+                    self.found = True
+                    pos, self._state = pos + 1, "items"
+                else:
+                    decoded = self._decode(text, pos, final)
+                    if decoded is None:
+                        break
+                    self.header[self._key], pos = decoded
+                    self._state = "key"
+            elif self._state == "items":
+                if char == ",":
+                    pos += 1
+                elif char == "]":
+                    pos, self._state = pos + 1, "key"
+                else:
+                    decoded = self._decode(text, pos, final)
+                    if decoded is None:
+                        break
+                    item, pos = decoded
+                    items.append(item)
+            else:
+                raise ValueError("Extra data after JSON object")
+        self._buffer = text[pos:]
+        if final and self._buffer.strip():
+            raise ValueError("Truncated JSON response")
+        return items
@@ -6,13 +6,46 @@ data using Alpha Vantage News & Sentiment API for forex and crypto pairs.
 """
 
 from crewai.tools import BaseTool
-from typing import Type, Optional
+from typing import Any, Dict, List, Optional, Type
 from pydantic import BaseModel, Field
-import requests
 import json
 import os
+import time
 from datetime import datetime
 
+from .alpha_vantage import (
+    NETWORK_ERRORS,
+    AlphaVantageRateLimitError,
+    alpha_vantage_client,
+    async_alpha_vantage_client,
+)
+from .json_stream import StreamingObjectParser
+from .news_store import default_news_store, format_time_from, parse_published, published_span, query_key
+from .output import OutputProfile, render
+from .sentiment_index import SentimentIndex
+
+# Compact output keeps the top articles' headline, time, source and sentiment
+OUTPUT_PROFILE = OutputProfile(
+    drop=(
+        "articles.*.authors",
+        "articles.*.summary",
+        "articles.*.url",
+        "articles.*.category_within_source",
+        "articles.*.ticker_sentiment",
+        "data_source",
+        "timestamp",
+    ),
+    limits={"articles": 10},
+    tables=("articles",),
+)
+# Most articles the API returns for one request
+MAX_LIMIT = 1000
+# Feeds of at least this many articles are parsed as a stream (FOREX_AI_NEWS_STREAMING=auto)
+STREAM_THRESHOLD = 200
+# csv mode sends one row per ticker
+SENTIMENT_PROFILE = OutputProfile(tables=("tickers",))
+MAX_SENTIMENT_BUCKETS = 48
+
 
 class NewsDataInput(BaseModel):
     """Input schema for news and sentiment data fetcher."""
@@ -36,6 +69,11 @@ class NewsAndSentimentFetcher(BaseTool):
         "Can filter by topics like blockchain, financial_markets, economy_monetary for comprehensive market analysis."
     )
     args_schema: Type[BaseModel] = NewsDataInput
+    output_mode: Optional[str] = None
+    # Incremental article store (see news_store), opened on first use; full feeds are fetched when disabled
+    store: Any = None
+    # Parse the feed as a stream (see json_stream); None follows FOREX_AI_NEWS_STREAMING
+    streaming: Optional[bool] = None
 
     def _run(
         self, 
@@ -45,122 +83,281 @@ class NewsAndSentimentFetcher(BaseTool):
         sort: str = "LATEST"
     ) -> str:
         """Fetch news and sentiment data from Alpha Vantage"""
+        if not alpha_vantage_client.api_key:
+            return self._missing_api_key()
         try:
-            api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
-            if not api_key:
-                return json.dumps({
-                    "error": "ALPHA_VANTAGE_API_KEY not found in environment variables",
-                    "success": False,
-                    "message": "Please add your Alpha Vantage API key to .env file"
-                })
-
-            # Alpha Vantage News & Sentiment endpoint
-            base_url = "https://www.alphavantage.co/query"
-            params = {
-                "function": "NEWS_SENTIMENT",
-                "apikey": api_key,
-                "limit": min(limit, 1000),  # Cap at 1000 as per API limit
-                "sort": sort.upper()
-            }
+            params = self._params(tickers, topics, limit, sort)
+            key = self._incremental_key(params, tickers, topics)
+            if self._use_streaming(params["limit"]):
+                parser, feed = StreamingObjectParser("feed"), _StreamedFeed(self.store, key, params["limit"])
+                chunks = alpha_vantage_client.stream("NEWS_SENTIMENT", params, timeout=15)
+                try:
+                    for chunk in chunks:
+                        feed.add(parser.feed(chunk))
+                        if feed.full:
+                            break
+                    else:
+                        feed.add(parser.close())
+                finally:
+                    chunks.close()
+                return self._format_stream(parser, feed, tickers, topics, limit, sort, params.get("time_from"))
+            data = alpha_vantage_client.query("NEWS_SENTIMENT", params, timeout=15)
+            if key is not None:
+                return self._format_incremental(data, key, tickers, topics, limit, sort, params.get("time_from"))
+            return self._format_response(data, tickers, topics, limit, sort)
+        except Exception as e:
+            return self._format_error(e)
 
-            # Add optional parameters if provided
-            if tickers:
-                params["tickers"] = tickers
-            if topics:
-                params["topics"] = topics
-
-            response = requests.get(base_url, params=params, timeout=15)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            # Check for API errors
-            if "Error Message" in data:
-                return json.dumps({
-                    "error": data["Error Message"],
-                    "success": False
-                })
-            
-            if "Note" in data:
-                return json.dumps({
-                    "error": "API rate limit exceeded",
-                    "success": False,
-                    "message": "Alpha Vantage free tier: 25 requests/day limit reached"
-                })
-
-            # Parse the news response
-            if "feed" in data:
-                articles = data["feed"]
-                
-                # Process and structure the news data
-                processed_articles = []
-                for article in articles[:limit]:  # Respect the limit parameter
-                    processed_article = {
-                        "title": article.get("title", ""),
-                        "url": article.get("url", ""),
-                        "time_published": article.get("time_published", ""),
-                        "authors": article.get("authors", []),
-                        "summary": article.get("summary", ""),
-                        "source": article.get("source", ""),
-                        "category_within_source": article.get("category_within_source", ""),
-                        "overall_sentiment_score": article.get("overall_sentiment_score", 0),
-                        "overall_sentiment_label": article.get("overall_sentiment_label", "Neutral"),
-                        "ticker_sentiment": article.get("ticker_sentiment", [])
-                    }
-                    processed_articles.append(processed_article)
-                
-                # Calculate summary statistics
-                sentiment_scores = [
-                    float(article.get("overall_sentiment_score", 0)) 
-                    for article in articles[:limit]
-                ]
-                
-                avg_sentiment = sum(sentiment_scores) / len(sentiment_scores) if sentiment_scores else 0
-                
-                # Count sentiment labels
-                sentiment_counts = {}
-                for article in articles[:limit]:
-                    label = article.get("overall_sentiment_label", "Neutral")
-                    sentiment_counts[label] = sentiment_counts.get(label, 0) + 1
-                
-                result = {
-                    "success": True,
-                    "query_info": {
-                        "tickers": tickers,
-                        "topics": topics,
-                        "sort": sort,
-                        "limit": limit,
-                        "articles_returned": len(processed_articles)
-                    },
-                    "sentiment_summary": {
-                        "average_sentiment_score": round(avg_sentiment, 4),
-                        "sentiment_distribution": sentiment_counts,
-                        "market_mood": self._interpret_sentiment(avg_sentiment)
-                    },
-                    "articles": processed_articles,
-                    "data_source": "Alpha Vantage News & Sentiment",
-                    "timestamp": datetime.now().isoformat()
-                }
-                
-                return json.dumps(result, indent=2)
-            else:
-                return json.dumps({
-                    "error": "Unexpected API response format",
-                    "success": False,
-                    "raw_response": data
-                })
-
-        except requests.exceptions.RequestException as e:
+    async def _arun(
+        self,
+        tickers: Optional[str] = None,
+        topics: Optional[str] = None,
+        limit: int = 50,
+        sort: str = "LATEST"
+    ) -> str:
+        """Async equivalent of `_run` using the shared aiohttp client"""
+        if not alpha_vantage_client.api_key:
+            return self._missing_api_key()
+        try:
+            params = self._params(tickers, topics, limit, sort)
+            key = self._incremental_key(params, tickers, topics)
+            if self._use_streaming(params["limit"]):
+                parser, feed = StreamingObjectParser("feed"), _StreamedFeed(self.store, key, params["limit"])
+                chunks = async_alpha_vantage_client.stream("NEWS_SENTIMENT", params, timeout=15)
+                try:
+                    async for chunk in chunks:
+                        feed.add(parser.feed(chunk))
+                        if feed.full:
+                            break
+                    else:
+                        feed.add(parser.close())
+                finally:
+                    await chunks.aclose()
+                return self._format_stream(parser, feed, tickers, topics, limit, sort, params.get("time_from"))
+            data = await async_alpha_vantage_client.query("NEWS_SENTIMENT", params, timeout=15)
+            if key is not None:
+                return self._format_incremental(data, key, tickers, topics, limit, sort, params.get("time_from"))
+            return self._format_response(data, tickers, topics, limit, sort)
+        except Exception as e:
+            return self._format_error(e)
+
+    def _missing_api_key(self) -> str:
+        return json.dumps({
+            "error": "ALPHA_VANTAGE_API_KEY not found in environment variables",
+            "success": False,
+            "message": "Please add your Alpha Vantage API key to .env file"
+        })
+
+    def _params(self, tickers: Optional[str], topics: Optional[str], limit: int, sort: str) -> dict:
+        # Alpha Vantage News & Sentiment endpoint
+        params = {
+            "limit": min(limit, MAX_LIMIT),  # Cap at 1000 as per API limit
+            "sort": sort.upper()
+        }
+
+        # Add optional parameters if provided
+        if tickers:
+            params["tickers"] = tickers
+        if topics:
+            params["topics"] = topics
+        return params
+
+    def _use_streaming(self, limit: int) -> bool:
+        """Whether to stream the feed: per instance, else FOREX_AI_NEWS_STREAMING (1, 0 or auto by size)"""
+        if self.streaming is not None:
+            return self.streaming
+        mode = os.getenv("FOREX_AI_NEWS_STREAMING", "auto").strip().lower()
+        if mode in ("1", "0"):
+            return mode == "1"
+        return limit >= STREAM_THRESHOLD
+
+    def _incremental_key(self, params: dict, tickers: Optional[str], topics: Optional[str]) -> Optional[str]:
+        """
+        Store key of a LATEST query, adding `time_from` once the store covers the limit.
+
+        Only articles published since the newest fetched one are requested
+        when the query's gap-free span already holds `limit` articles; a
+        larger limit, or a span cut short by a gap, is fetched in full.
+        Other sort orders are always fetched in full.
+        """
+        if params["sort"] != "LATEST":
+            return None
+        self.store = self.store or default_news_store()
+        if self.store is None:
+            return None
+        key = query_key(tickers, topics)
+        newest, covered = self.store.coverage(key)
+        if newest is not None and covered >= params["limit"]:
+            params["time_from"] = format_time_from(newest)
+        return key
+
+    def _format_response(
+        self,
+        data: dict,
+        tickers: Optional[str],
+        topics: Optional[str],
+        limit: int,
+        sort: str
+    ) -> str:
+        """Build the tool output from an Alpha Vantage response"""
+        # Check for API errors
+        if "Error Message" in data:
             return json.dumps({
-                "error": f"Network error: {str(e)}",
+                "error": data["Error Message"],
+                "success": False
+            })
+        
+        if "Note" in data:
+            return json.dumps({
+                "error": "API rate limit exceeded",
                 "success": False,
-                "message": "Check your internet connection"
+                "message": "Alpha Vantage free tier: 25 requests/day limit reached"
             })
-        except Exception as e:
+
+        # Parse the news response
+        if "feed" in data:
+            articles = [self._project(article) for article in data["feed"][:limit]]  # Respect the limit parameter
+            return self._result(articles, tickers, topics, limit, sort)
+        else:
             return json.dumps({
-                "error": f"News API error: {str(e)}",
-                "success": False
+                "error": "Unexpected API response format",
+                "success": False,
+                "raw_response": data
+            })
+
+    def _format_incremental(
+        self,
+        data: dict,
+        key: str,
+        tickers: Optional[str],
+        topics: Optional[str],
+        limit: int,
+        sort: str,
+        since: Optional[str] = None
+    ) -> str:
+        """Add new feed articles to the store and answer from it"""
+        if "feed" not in data:
+            return self._format_response(data, tickers, topics, limit, sort)
+        new_articles = self.store.add(key, data["feed"])
+        self.store.record_fetch(key, parse_published(since) if since else None,
+                                len(data["feed"]) < min(limit, MAX_LIMIT), *published_span(data["feed"]))
+        return self._from_store(new_articles, key, tickers, topics, limit, sort, since)
+
+    def _from_store(
+        self,
+        new_articles: int,
+        key: str,
+        tickers: Optional[str],
+        topics: Optional[str],
+        limit: int,
+        sort: str,
+        since: Optional[str] = None,
+        extra: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Answer with the query's newest stored articles and its aggregates"""
+        articles = self.store.latest(key, limit)
+        requested = [t.strip().upper() for t in (tickers or "").split(",") if t.strip()]
+        result = self._result(articles, tickers, topics, limit, sort, render_output=False)
+        result["query_info"]["new_articles"] = new_articles
+        result["query_info"]["time_from"] = since
+        result["query_info"].update(extra or {})
+        result["ticker_sentiment_summary"] = self.store.aggregates(requested or self.store.top_tickers())
+        result["sentiment_summary"]["decayed"] = self.store.aggregates([f"query:{key}"]).get(f"query:{key}")
+        return render(result, OUTPUT_PROFILE, self.output_mode, indent=2)
+
+    def _format_stream(
+        self,
+        parser: StreamingObjectParser,
+        feed: "_StreamedFeed",
+        tickers: Optional[str],
+        topics: Optional[str],
+        limit: int,
+        sort: str,
+        since: Optional[str] = None
+    ) -> str:
+        """Build the tool output from a streamed feed"""
+        if not parser.found:
+            return self._format_response(parser.header, tickers, topics, limit, sort)
+        streamed = {"streamed": True, "articles_streamed": feed.streamed}
+        if feed.key is not None:
+            self.store.record_fetch(feed.key, parse_published(since) if since else None, not feed.full,
+                                    feed.oldest, feed.newest)
+            return self._from_store(feed.new_articles, feed.key, tickers, topics, limit, sort, since, extra=streamed)
+        result = self._result(feed.articles, tickers, topics, limit, sort, render_output=False, tally=feed.tally)
+        result["query_info"].update(streamed)
+        return render(result, OUTPUT_PROFILE, self.output_mode, indent=2)
+
+    @staticmethod
+    def _project(article: dict) -> dict:
+        """The article fields passed on to the agent"""
+        return {
+            "title": article.get("title", ""),
+            "url": article.get("url", ""),
+            "time_published": article.get("time_published", ""),
+            "authors": article.get("authors", []),
+            "summary": article.get("summary", ""),
+            "source": article.get("source", ""),
+            "category_within_source": article.get("category_within_source", ""),
+            "overall_sentiment_score": article.get("overall_sentiment_score", 0),
+            "overall_sentiment_label": article.get("overall_sentiment_label", "Neutral"),
+            "ticker_sentiment": article.get("ticker_sentiment", [])
+        }
+
+    def _result(
+        self,
+        articles: List[dict],
+        tickers: Optional[str],
+        topics: Optional[str],
+        limit: int,
+        sort: str,
+        render_output: bool = True,
+        tally: Optional["_SentimentTally"] = None
+    ) -> Any:
+        """Build the tool output, computing the sentiment summary in one pass over the articles unless tallied already"""
+        if tally is None:
+            tally = _SentimentTally()
+            for article in articles:
+                tally.add(article)
+        avg_sentiment = tally.average()
+
+        result = {
+            "success": True,
+            "query_info": {
+                "tickers": tickers,
+                "topics": topics,
+                "sort": sort,
+                "limit": limit,
+                "articles_returned": len(articles)
+            },
+            "sentiment_summary": {
+                "average_sentiment_score": round(avg_sentiment, 4),
+                "sentiment_distribution": tally.labels,
+                "market_mood": self._interpret_sentiment(avg_sentiment)
+            },
+            "articles": articles,
+            "data_source": "Alpha Vantage News & Sentiment",
+            "timestamp": datetime.now().isoformat()
+        }
+        return render(result, OUTPUT_PROFILE, self.output_mode, indent=2) if render_output else result
+
+    def _format_error(self, error: Exception) -> str:
+        """Map fetch errors to the tool's error payloads"""
+        if isinstance(error, AlphaVantageRateLimitError):
+            return json.dumps({
+                "error": "API rate limit exceeded",
+                "success": False,
+                "message": str(error)
+            })
+        if isinstance(error, NETWORK_ERRORS):
+            return json.dumps({
+                "error": f"Network error: {str(error)}",
+                "success": False,
+                "message": "Check your internet connection"
             })
+        return json.dumps({
+            "error": f"News API error: {str(error)}",
+            "success": False
+        })
 
     def _interpret_sentiment(self, avg_score: float) -> str:
         """Interpret average sentiment score into market mood"""
@@ -176,5 +373,149 @@ class NewsAndSentimentFetcher(BaseTool):
             return "Neutral"
 
 
-# Create tool instance
-news_sentiment_fetcher = NewsAndSentimentFetcher()
\ No newline at end of file
+class _SentimentTally:
+    """Running average of article sentiment scores and counts of their labels"""
+
+    def __init__(self):
+        self.total, self.count, self.labels = 0.0, 0, {}
+
+    def add(self, article: dict) -> None:
+        self.total += float(article.get("overall_sentiment_score", 0) or 0)
+        self.count += 1
+        label = article.get("overall_sentiment_label", "Neutral")
+        self.labels[label] = self.labels.get(label, 0) + 1
+
+    def average(self) -> float:
+        return self.total / self.count if self.count else 0
+
+
+class _StreamedFeed:
+    """
+    Articles of a streamed feed, consumed batch by batch as they are parsed.
+
+    Each article is stored (for incremental queries, with the span of
+    their publication times), or tallied and projected for the output;
+    the rest of the article is dropped as soon as it is parsed.
+    """
+
+    def __init__(self, store: Any, key: Optional[str], limit: int):
+        self.store = store if key is not None else None
+        self.key = key
+        self.remaining = limit
+        self.tally = _SentimentTally()
+        self.articles: List[dict] = []
+        self.streamed = 0
+        self.new_articles = 0
+        self.oldest: Optional[int] = None
+        self.newest: Optional[int] = None
+
+    @property
+    def full(self) -> bool:
+        return self.remaining <= 0
+
+    def add(self, batch: List[dict]) -> None:
+        batch = batch[:max(0, self.remaining)]
+        self.remaining -= len(batch)
+        self.streamed += len(batch)
+        if self.store is not None:
+            # The output is answered from the store
+            self.new_articles += self.store.add(self.key, batch)
+            oldest, newest = published_span(batch)
+            if oldest is not None:
+                self.oldest = oldest if self.oldest is None else min(self.oldest, oldest)
+                self.newest = newest if self.newest is None else max(self.newest, newest)
+            return
+        for article in batch:
+            self.tally.add(article)
+            self.articles.append(NewsAndSentimentFetcher._project(article))
+
+
+class TickerSentimentInput(BaseModel):
+    """Input schema for the ticker sentiment time series query."""
+    tickers: str = Field(
+        default="",
+        description="Comma-separated tickers (e.g., 'FOREX:EUR,FOREX:USD'); empty for the most mentioned tickers"
+    )
+    window_hours: float = Field(default=6.0, description="Length of the window ending at `end`, in hours")
+    end: Optional[str] = Field(
+        default=None,
+        description="Window end as YYYYMMDDTHHMM (UTC); defaults to now"
+    )
+    min_relevance: float = Field(default=0.0, description="Ignore mentions with a lower relevance score (0-1)")
+    buckets: int = Field(default=0, description="Also split the window into this many buckets for a sentiment trend (max 48)")
+
+
+class TickerSentimentSeries(BaseTool):
+    name: str = "ticker_sentiment_series"
+    description: str = (
+        "Summarize indexed news sentiment per ticker over a time window, e.g. FOREX:EUR over the last 6 hours. "
+        "Returns mention counts and relevance-weighted sentiment scores (-1 bearish to 1 bullish), optionally "
+        "as a bucketed trend. Uses articles already gathered by news_sentiment_fetcher, so no API call is made."
+    )
+    args_schema: Type[BaseModel] = TickerSentimentInput
+    output_mode: Optional[str] = None
+    # Sentiment index over the news store's mentions (see sentiment_index), built on first use
+    index: Any = None
+
+    def _run(
+        self,
+        tickers: str = "",
+        window_hours: float = 6.0,
+        end: Optional[str] = None,
+        min_relevance: float = 0.0,
+        buckets: int = 0
+    ) -> str:
+        """Query the per-ticker sentiment index"""
+        try:
+            if window_hours <= 0:
+                raise ValueError("window_hours must be positive")
+            if not 0 <= buckets <= MAX_SENTIMENT_BUCKETS:
+                raise ValueError(f"buckets must be between 0 and {MAX_SENTIMENT_BUCKETS}")
+            if self.index is None:
+                store = default_news_store()
+                if store is None:
+                    return json.dumps({
+                        "error": "News store is disabled",
+                        "success": False,
+                        "message": "Ticker sentiment is indexed from the news store; unset FOREX_AI_NEWS_STORE=0"
+                    })
+                self.index = SentimentIndex(store)
+            self.index.refresh()
+
+            end_time = parse_published(end) if end else int(time.time())
+            start_time = end_time - int(window_hours * 3600)
+            names = [t.strip().upper() for t in tickers.split(",") if t.strip()] or self.index.tickers()[:10]
+            summary = {}
+            for name in names:
+                series = self.index.series.get(name)
+                if series is None:
+                    summary[name] = {"mentions": 0, "weighted_sentiment": None}
+                    continue
+                summary[name] = series.window(start_time, end_time, min_relevance)
+                if buckets:
+                    summary[name]["trend"] = series.buckets(start_time, end_time, buckets)
+            latest = self.index.latest()
+            result = {
+                "success": True,
+                "window": {
+                    "start": format_time_from(start_time),
+                    "end": format_time_from(end_time),
+                    "hours": window_hours,
+                    "min_relevance": min_relevance,
+                },
+                "tickers": summary,
+                "latest_indexed": format_time_from(latest) if latest is not None else None,
+            }
+            if not any(entry["mentions"] for entry in summary.values()):
+                result["message"] = "No indexed mentions in this window; fetch news with news_sentiment_fetcher first"
+            return render(result, SENTIMENT_PROFILE, self.output_mode, indent=2)
+        except Exception as e:
+            return json.dumps({
+                "error": f"Sentiment query error: {str(e)}",
+                "success": False
+            })
+
+
+# Create tool instances
+news_sentiment_fetcher = NewsAndSentimentFetcher()
+ticker_sentiment_series = TickerSentimentSeries()
\ No newline at end of file
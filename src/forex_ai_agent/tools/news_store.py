@@ -0,0 +1,335 @@
+"""
+Incremental news and sentiment store.
+
+Articles from the Alpha Vantage NEWS_SENTIMENT feed are kept in SQLite,
+deduplicated by URL and by title, and linked to the queries (tickers and
+topics) that returned them. Each query records the span it has fetched
+without gaps; once that span holds as many articles as a repeat query asks
+for, only articles newer than it are requested.
+
+Running sentiment aggregates are kept per ticker (from each article's
+`ticker_sentiment`, weighted by relevance) and per query (from the overall
+article sentiment). Averages are exponentially time-decayed, and each new
+article updates them in O(1), so repeat runs never rescan stored history.
+Ticker mentions are also kept row by row for time series queries.
+"""
+
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .persistent_cache import DEFAULT_CACHE_DIR
+
+
+DEFAULT_HALF_LIFE_HOURS = 24.0
+TIME_FORMATS = ("%Y%m%dT%H%M%S", "%Y%m%dT%H%M")
+# Fields of an article kept for the tool output
+ARTICLE_FIELDS = (
+    "title", "url", "time_published", "authors", "summary", "source",
+    "category_within_source", "overall_sentiment_score", "overall_sentiment_label", "ticker_sentiment",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id TEXT PRIMARY KEY,
+    title_hash TEXT NOT NULL UNIQUE,
+    published INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS query_articles (
+    query TEXT NOT NULL,
+    article_id TEXT NOT NULL,
+    published INTEGER NOT NULL,
+    PRIMARY KEY (query, article_id)
+);
+CREATE INDEX IF NOT EXISTS query_articles_published ON query_articles (query, published);
+CREATE TABLE IF NOT EXISTS coverage (
+    query TEXT PRIMARY KEY,
+    oldest INTEGER NOT NULL,
+    newest INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS mentions (
+    ticker TEXT NOT NULL,
+    published INTEGER NOT NULL,
+    relevance REAL NOT NULL,
+    score REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS mentions_ticker ON mentions (ticker, published);
+CREATE TABLE IF NOT EXISTS aggregates (
+    name TEXT PRIMARY KEY,
+    ref_time INTEGER NOT NULL,
+    weighted_sum REAL NOT NULL,
+    weight REAL NOT NULL,
+    count INTEGER NOT NULL,
+    labels TEXT NOT NULL,
+    last_published INTEGER NOT NULL
+);
+"""
+
+
+def parse_published(value: str) -> int:
+    """Epoch seconds of an Alpha Vantage `time_published` stamp such as 20240101T120000 (UTC)."""
+    for fmt in TIME_FORMATS:
+        try:
+            return int(datetime.strptime(value, fmt).replace(tzinfo=timezone.utc).timestamp())
+        except (TypeError, ValueError):
+            continue
+    raise ValueError(f"Unrecognized time_published: {value!r}")
+
+
+def format_time_from(epoch: int) -> str:
+    """The YYYYMMDDTHHMM `time_from` parameter for an epoch time."""
+    return datetime.fromtimestamp(epoch, timezone.utc).strftime("%Y%m%dT%H%M")
+
+
+def query_key(tickers: Optional[str], topics: Optional[str]) -> str:
+    """Order-insensitive identity of a news query."""
+    split = lambda text: sorted({part.strip() for part in (text or "").split(",") if part.strip()})
+    return "tickers=" + ",".join(t.upper() for t in split(tickers)) + "|topics=" + ",".join(t.lower() for t in split(topics))
+
+
+def published_span(articles: Iterable[Dict[str, Any]]) -> Tuple[Optional[int], Optional[int]]:
+    """Oldest and newest `time_published` (epoch seconds) of feed articles, or (None, None)."""
+    times = [parse_published(article.get("time_published", "")) for article in articles]
+    return (min(times), max(times)) if times else (None, None)
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class _Aggregate:
+    """Time-decayed weighted average with label counts, anchored at its newest observation."""
+
+    def __init__(self, ref_time: int = 0, weighted_sum: float = 0.0, weight: float = 0.0,
+                 count: int = 0, labels: Optional[Dict[str, int]] = None, last_published: int = 0):
+        self.ref_time, self.weighted_sum, self.weight = ref_time, weighted_sum, weight
+        self.count, self.labels, self.last_published = count, labels or {}, last_published
+
+    def add(self, published: int, score: float, weight: float, label: str, tau: float) -> None:
+        if self.count and published > self.ref_time:
+            decay = math.exp(-(published - self.ref_time) / tau)
+            self.weighted_sum *= decay
+            self.weight *= decay
+            self.ref_time = published
+        elif not self.count:
+            self.ref_time = published
+        factor = weight * math.exp(-(self.ref_time - published) / tau)
+        self.weighted_sum += factor * score
+        self.weight += factor
+        self.count += 1
+        self.labels[label] = self.labels.get(label, 0) + 1
+        self.last_published = max(self.last_published, published)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "decayed_average": round(self.weighted_sum / self.weight, 4) if self.weight > 0 else 0.0,
+            "count": self.count,
+            "labels": self.labels,
+            "last_published": datetime.fromtimestamp(self.last_published, timezone.utc).strftime("%Y%m%dT%H%M%S"),
+        }
+
+
+class NewsStore:
+    """SQLite store of deduplicated articles with incremental sentiment aggregates."""
+
+    def __init__(self, path: str, half_life_hours: float = DEFAULT_HALF_LIFE_HOURS):
+        self.path = path
+        self.tau = half_life_hours * 3600 / math.log(2)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def watermark(self, query: str) -> Optional[int]:
+        """Newest `time_published` (epoch seconds) stored for a query, or None."""
+        row = self._connect().execute("SELECT MAX(published) FROM query_articles WHERE query = ?", (query,)).fetchone()
+        return row[0]
+
+    def coverage(self, query: str) -> Tuple[Optional[int], int]:
+        """
+        Newest fetched time of a query and how many stored articles its gap-free span holds.
+
+        Returns (None, 0) for a query never fetched (or stored before spans
+        were recorded), which calls for a full fetch.
+        """
+        conn = self._connect()
+        row = conn.execute("SELECT oldest, newest FROM coverage WHERE query = ?", (query,)).fetchone()
+        if row is None:
+            return None, 0
+        count = conn.execute(
+            "SELECT COUNT(*) FROM query_articles WHERE query = ? AND published BETWEEN ? AND ?", (query, *row)
+        ).fetchone()[0]
+        return row[1], count
+
+    def record_fetch(self, query: str, since: Optional[int], exhausted: bool,
+                     oldest: Optional[int], newest: Optional[int]) -> None:
+        """
+        Extend a query's gap-free span by a fetch of the articles published since `since` (or ever).
+
+        A fetch that came back short of its limit (`exhausted`) reached back to
+        `since`; a full one only to its oldest article, so when that is newer
+        than the span, the articles in between may be missing and the span
+        restarts at the fetch.
+        """
+        reach = (since or 0) if exhausted else oldest
+        if reach is None:
+            return
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT oldest, newest FROM coverage WHERE query = ?", (query,)).fetchone()
+            if row is not None and reach <= row[1]:
+                span = (min(row[0], reach), max(row[1], newest if newest is not None else reach))
+            else:
+                span = (reach, newest if newest is not None else reach)
+            conn.execute("INSERT OR REPLACE INTO coverage (query, oldest, newest) VALUES (?, ?, ?)", (query, *span))
+
+    def add(self, query: str, feed: Iterable[Dict[str, Any]]) -> int:
+        """
+        Store feed articles for a query and update aggregates; returns how many were new to it.
+
+        An article already stored (same URL, or same title under another URL)
+        is only linked to the query, so ticker aggregates count it once.
+        """
+        added = 0
+        with self._lock, self._connect() as conn:
+            aggregates: Dict[str, _Aggregate] = {}
+            for article in feed:
+                title = str(article.get("title", "")).strip()
+                url = str(article.get("url", "")).strip()
+                if not title and not url:
+                    continue
+                published = parse_published(article.get("time_published", ""))
+                article_id, title_hash = _digest(url or title), _digest(title.lower() or url)
+                inserted = conn.execute(
+                    "INSERT OR IGNORE INTO articles (id, title_hash, published, data) VALUES (?, ?, ?, ?)",
+                    (article_id, title_hash, published,
+                     json.dumps({field: article.get(field) for field in ARTICLE_FIELDS if field in article}, separators=(",", ":"))),
+                ).rowcount
+                if not inserted:
+                    article_id = conn.execute(
+                        "SELECT id FROM articles WHERE id = ? OR title_hash = ?", (article_id, title_hash)
+                    ).fetchone()[0]
+                else:
+                    self._mention(conn, aggregates, article, published)
+                linked = conn.execute(
+                    "INSERT OR IGNORE INTO query_articles (query, article_id, published) VALUES (?, ?, ?)",
+                    (query, article_id, published),
+                ).rowcount
+                if linked:
+                    added += 1
+                    self._aggregate(conn, aggregates, f"query:{query}").add(
+                        published, _float(article.get("overall_sentiment_score")), 1.0,
+                        article.get("overall_sentiment_label", "Neutral"), self.tau,
+                    )
+            self._save(conn, aggregates)
+        return added
+
+    def _mention(self, conn: sqlite3.Connection, aggregates: Dict[str, _Aggregate], article: Dict[str, Any], published: int) -> None:
+        """Record a new article's ticker sentiment rows and fold them into the ticker aggregates."""
+        rows = []
+        for entry in article.get("ticker_sentiment") or []:
+            ticker = str(entry.get("ticker", "")).upper()
+            if not ticker:
+                continue
+            relevance, score = _float(entry.get("relevance_score")), _float(entry.get("ticker_sentiment_score"))
+            rows.append((ticker, published, relevance, score))
+            self._aggregate(conn, aggregates, ticker).add(
+                published, score, relevance, entry.get("ticker_sentiment_label", "Neutral"), self.tau
+            )
+        conn.executemany("INSERT INTO mentions (ticker, published, relevance, score) VALUES (?, ?, ?, ?)", rows)
+
+    @staticmethod
+    def _aggregate(conn: sqlite3.Connection, aggregates: Dict[str, _Aggregate], name: str) -> _Aggregate:
+        if name not in aggregates:
+            row = conn.execute(
+                "SELECT ref_time, weighted_sum, weight, count, labels, last_published FROM aggregates WHERE name = ?", (name,)
+            ).fetchone()
+            aggregates[name] = _Aggregate(*row[:4], json.loads(row[4]), row[5]) if row else _Aggregate()
+        return aggregates[name]
+
+    @staticmethod
+    def _save(conn: sqlite3.Connection, aggregates: Dict[str, _Aggregate]) -> None:
+        conn.executemany(
+            "INSERT OR REPLACE INTO aggregates (name, ref_time, weighted_sum, weight, count, labels, last_published) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(name, a.ref_time, a.weighted_sum, a.weight, a.count, json.dumps(a.labels), a.last_published)
+             for name, a in aggregates.items()],
+        )
+
+    def latest(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        """The query's newest stored articles, newest first."""
+        rows = self._connect().execute(
+            "SELECT a.data FROM query_articles q JOIN articles a ON a.id = q.article_id "
+            "WHERE q.query = ? ORDER BY q.published DESC LIMIT ?",
+            (query, max(0, int(limit))),
+        ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def mentions(self, after: int = 0) -> List[tuple]:
+        """Ticker mention rows `(rowid, ticker, published, relevance, score)` stored after `after`, in insert order."""
+        return self._connect().execute(
+            "SELECT rowid, ticker, published, relevance, score FROM mentions WHERE rowid > ? ORDER BY rowid", (after,)
+        ).fetchall()
+
+    def aggregates(self, names: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        """Summaries of the named aggregates (tickers, or "query:<key>") that exist."""
+        conn = self._connect()
+        found = {}
+        for name in names:
+            row = conn.execute(
+                "SELECT ref_time, weighted_sum, weight, count, labels, last_published FROM aggregates WHERE name = ?", (name,)
+            ).fetchone()
+            if row:
+                found[name] = _Aggregate(*row[:4], json.loads(row[4]), row[5]).summary()
+        return found
+
+    def top_tickers(self, limit: int = 10) -> List[str]:
+        """Most mentioned tickers."""
+        rows = self._connect().execute(
+            "SELECT name FROM aggregates WHERE name NOT LIKE 'query:%' ORDER BY count DESC LIMIT ?", (limit,)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+
+def default_news_store() -> Optional[NewsStore]:
+    """
+    The shared store in `news.sqlite3` under FOREX_AI_CACHE_DIR.
+
+    Returns None when disabled with FOREX_AI_NEWS_STORE=0 or when the cache
+    directory is not writable, so the news tool falls back to full fetches.
+    """
+    if os.getenv("FOREX_AI_NEWS_STORE", "1") == "0":
+        return None
+    cache_dir = os.getenv("FOREX_AI_CACHE_DIR", DEFAULT_CACHE_DIR)
+    try:
+        return NewsStore(
+            os.path.join(cache_dir, "news.sqlite3"),
+            half_life_hours=float(os.getenv("FOREX_AI_NEWS_HALF_LIFE_HOURS", DEFAULT_HALF_LIFE_HOURS)),
+        )
+    except (OSError, sqlite3.Error):
+        return None
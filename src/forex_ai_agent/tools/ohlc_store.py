@@ -0,0 +1,155 @@
+"""
+Columnar on-disk storage for OHLC bars.
+
+Each symbol/timeframe is a directory holding one raw little-endian file per
+column (time as int64 epoch seconds, prices and volume as float64). New
+bars are appended to the end of the files, and reads memory-map the columns
+so a range query binary-searches the time column and touches only the pages
+of the requested rows instead of loading whole files.
+
+The time column is written last and defines the row count, so a write
+interrupted half way leaves the other columns at most a few rows long,
+which the next append truncates away.
+"""
+
+import os
+import re
+import threading
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .persistent_cache import DEFAULT_CACHE_DIR
+
+
+COLUMNS = ("time", "open", "high", "low", "close", "volume")
+PRICE_COLUMNS = COLUMNS[1:]
+_DTYPES = {"time": np.dtype("<i8"), **{column: np.dtype("<f8") for column in PRICE_COLUMNS}}
+
+
+def _slug(value: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", value.strip()).strip("_").upper()
+
+
+class OHLCStore:
+    """Append-only columnar bar storage, one directory per symbol and timeframe."""
+
+    def __init__(self, root: str):
+        self.root = root
+        self._lock = threading.Lock()
+
+    def _dir(self, symbol: str, timeframe: str) -> str:
+        return os.path.join(self.root, _slug(symbol), timeframe.strip().lower())
+
+    def _path(self, symbol: str, timeframe: str, column: str) -> str:
+        return os.path.join(self._dir(symbol, timeframe), f"{column}.bin")
+
+    def _column(self, symbol: str, timeframe: str, column: str, rows: Optional[int] = None) -> np.ndarray:
+        """Memory-mapped column (read-only), limited to `rows` rows."""
+        path = self._path(symbol, timeframe, column)
+        dtype = _DTYPES[column]
+        size = os.path.getsize(path) // dtype.itemsize if os.path.exists(path) else 0
+        size = size if rows is None else min(size, rows)
+        if size == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode="r", shape=(size,))
+
+    def count(self, symbol: str, timeframe: str) -> int:
+        """Number of committed bars (the length of the time column)."""
+        return len(self._column(symbol, timeframe, "time"))
+
+    def last_time(self, symbol: str, timeframe: str) -> Optional[int]:
+        times = self._column(symbol, timeframe, "time")
+        return int(times[-1]) if len(times) else None
+
+    def series(self) -> List[Tuple[str, str]]:
+        """All stored (symbol, timeframe) pairs."""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(
+            (symbol, timeframe)
+            for symbol in os.listdir(self.root)
+            for timeframe in os.listdir(os.path.join(self.root, symbol))
+            if os.path.exists(os.path.join(self.root, symbol, timeframe, "time.bin"))
+        )
+
+    def append(self, symbol: str, timeframe: str, bars: Mapping[str, Sequence[float]]) -> int:
+        """
+        Store the bars newer than the last stored bar; returns how many were added.
+
+        `bars` maps column names to equal-length sequences and needs at least
+        time, open, high, low and close (volume defaults to 0). Bars may come
+        in any order. A bar with the same time as the last stored bar replaces
+        it, since the latest bar of a live series is revised until it closes.
+        """
+        times = np.asarray(bars["time"], dtype=np.int64)
+        order = np.argsort(times, kind="stable")
+        data = {"time": times[order]}
+        for column in PRICE_COLUMNS:
+            values = bars.get(column)
+            data[column] = np.zeros(len(times)) if values is None else np.asarray(values, dtype=float)[order]
+
+        # Drop duplicate timestamps within the batch, keeping the last occurrence
+        keep = np.append(data["time"][1:] != data["time"][:-1], True) if len(times) else np.array([], dtype=bool)
+        data = {column: values[keep] for column, values in data.items()}
+
+        with self._lock:
+            os.makedirs(self._dir(symbol, timeframe), exist_ok=True)
+            rows = self.count(symbol, timeframe)
+            last = self.last_time(symbol, timeframe)
+            if last is not None:
+                self._revise_last(symbol, timeframe, rows, data, last)
+                newer = data["time"] > last
+                data = {column: values[newer] for column, values in data.items()}
+            if not len(data["time"]):
+                return 0
+            # Prices first, time last: the time column commits the rows
+            for column in PRICE_COLUMNS + ("time",):
+                with open(self._path(symbol, timeframe, column), "r+b" if rows else "wb") as handle:
+                    handle.truncate(rows * _DTYPES[column].itemsize)
+                    handle.seek(0, os.SEEK_END)
+                    handle.write(data[column].astype(_DTYPES[column]).tobytes())
+            return len(data["time"])
+
+    def _revise_last(self, symbol: str, timeframe: str, rows: int, data: Dict[str, np.ndarray], last: int) -> None:
+        """Overwrite the stored last bar in place if the batch has a newer version of it."""
+        match = np.flatnonzero(data["time"] == last)
+        if not len(match):
+            return
+        for column in PRICE_COLUMNS:
+            stored = np.memmap(self._path(symbol, timeframe, column), dtype=_DTYPES[column], mode="r+", shape=(rows,))
+            stored[-1] = data[column][match[-1]]
+            stored.flush()
+            del stored
+
+    def read(
+        self,
+        symbol: str,
+        timeframe: str,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        columns: Sequence[str] = COLUMNS,
+        last: Optional[int] = None,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Bars with start <= time < end (epoch seconds), optionally only the `last` N.
+
+        Returned arrays are read-only memory-mapped views; copy them to keep
+        them beyond the store's lifetime or to modify them.
+        """
+        times = self._column(symbol, timeframe, "time")
+        lo = 0 if start is None else int(np.searchsorted(times, start, side="left"))
+        hi = len(times) if end is None else int(np.searchsorted(times, end, side="left"))
+        if last is not None:
+            lo = max(lo, hi - last)
+        result = {}
+        for column in columns:
+            values = times if column == "time" else self._column(symbol, timeframe, column, len(times))
+            result[column] = values[lo:hi]
+        return result
+
+
+def default_ohlc_store() -> OHLCStore:
+    """The shared store under FOREX_AI_OHLC_DIR (default: `ohlc` in the cache directory)."""
+    root = os.getenv("FOREX_AI_OHLC_DIR") or os.path.join(os.getenv("FOREX_AI_CACHE_DIR", DEFAULT_CACHE_DIR), "ohlc")
+    return OHLCStore(root)
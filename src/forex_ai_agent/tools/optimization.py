@@ -0,0 +1,353 @@
+"""
+Parameter sweeps and walk-forward optimization of backtested strategies.
+
+A strategy template holds placeholders such as "ema_{fast} crosses_above
+ema_{slow}" or {"atr": "{stop_atr}"}; a parameter space expands into a grid
+or a random sample of concrete strategies. Candidates are backtested across
+CPU cores with a `ProcessPoolExecutor`. The OHLC columns are copied once
+into a shared memory block that every worker attaches to at start-up, so a
+task carries only its parameters and bar range instead of pickled arrays.
+
+Walk-forward mode splits the history into consecutive folds, picks the
+best parameters on each fold's training window and reports how they did on
+the following, unseen test window.
+"""
+
+import itertools
+import math
+import operator
+import os
+import random
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .backtest import run_backtest
+from .ohlc_store import COLUMNS
+
+
+OBJECTIVES = ("sharpe_ratio", "expectancy", "expectancy_r", "total_return_pct", "profit_factor", "win_rate", "max_drawdown_pct")
+LOWER_IS_BETTER = {"max_drawdown_pct"}
+DEFAULT_MIN_TRADES = 10
+DEFAULT_WARMUP_BARS = 200
+MAX_GRID_SIZE = 10_000
+_PLACEHOLDER = re.compile(r"\{(\w+)\}")
+_CONSTRAINT_OPERATORS = {
+    "<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge, "==": operator.eq, "!=": operator.ne,
+}
+
+Task = Tuple[Dict[str, Any], int, int, int]     # strategy, start bar, end bar, first entry (relative)
+
+
+def _values(spec: Any) -> List[Any]:
+    """Candidate values: a list, a single value, or {"min", "max", "step"}."""
+    if isinstance(spec, Mapping):
+        lo, hi, step = float(spec["min"]), float(spec["max"]), float(spec.get("step", 1))
+        count = int(math.floor((hi - lo) / step + 1e-9)) + 1
+        values = [round(lo + i * step, 10) for i in range(count)]
+        return [int(v) if float(v).is_integer() and all(isinstance(spec[k], int) for k in ("min", "max")) else v for v in values]
+    return list(spec) if isinstance(spec, (list, tuple)) else [spec]
+
+
+def _parse_constraints(constraints: Sequence[str]) -> List[Tuple[str, Any, str]]:
+    """Split constraints like "fast < slow" into (left, operator, right), rejecting unknown operators."""
+    parsed = []
+    for constraint in constraints:
+        parts = str(constraint).split()
+        if len(parts) != 3:
+            raise ValueError(f"Constraints look like 'fast < slow', got: {constraint!r}")
+        left, op, right = parts
+        if op not in _CONSTRAINT_OPERATORS:
+            raise ValueError(f"Unknown constraint operator: {op}")
+        parsed.append((left, _CONSTRAINT_OPERATORS[op], right))
+    return parsed
+
+
+def _satisfies(params: Mapping[str, Any], constraints: Sequence[Tuple[str, Any, str]]) -> bool:
+    """Parsed constraints between parameters (or a parameter and a number)."""
+    for left, compare, right in constraints:
+        resolve = lambda token: params[token] if token in params else float(token)
+        if not compare(resolve(left), resolve(right)):
+            return False
+    return True
+
+
+def parameter_sets(
+    space: Mapping[str, Any], samples: Optional[int] = None, constraints: Sequence[str] = (), seed: int = 0
+) -> List[Dict[str, Any]]:
+    """The full grid of a parameter space, or `samples` random draws from it, honouring constraints."""
+    constraints = _parse_constraints(constraints)
+    names = list(space)
+    choices = [_values(space[name]) for name in names]
+    if samples is None:
+        size = math.prod(len(values) for values in choices)
+        if size > MAX_GRID_SIZE:
+            raise ValueError(f"Grid of {size} combinations exceeds {MAX_GRID_SIZE}; use random samples")
+        candidates = (dict(zip(names, combo)) for combo in itertools.product(*choices))
+        return [params for params in candidates if _satisfies(params, constraints)]
+
+    rng = random.Random(seed)
+    found, seen = [], set()
+    for _ in range(samples * 20):
+        params = {name: rng.choice(values) for name, values in zip(names, choices)}
+        key = tuple(params.values())
+        if key not in seen and _satisfies(params, constraints):
+            seen.add(key)
+            found.append(params)
+            if len(found) == samples:
+                break
+    return found
+
+
+def apply_parameters(template: Any, params: Mapping[str, Any]) -> Any:
+    """Substitute {name} placeholders; a value that is exactly "{name}" takes the parameter's type."""
+    if isinstance(template, str):
+        whole = _PLACEHOLDER.fullmatch(template)
+        if whole and whole.group(1) in params:
+            return params[whole.group(1)]
+        return _PLACEHOLDER.sub(lambda m: str(params.get(m.group(1), m.group(0))), template)
+    if isinstance(template, Mapping):
+        return {key: apply_parameters(value, params) for key, value in template.items()}
+    if isinstance(template, list):
+        return [apply_parameters(value, params) for value in template]
+    return template
+
+
+def walk_forward_splits(
+    bars: int, folds: int, train_fraction: float = 0.7, anchored: bool = False
+) -> List[Tuple[int, int, int, int]]:
+    """
+    (train_start, train_end, test_start, test_end) bar ranges of consecutive folds.
+
+    The history is cut into `folds` equal windows, each split into a training
+    and a test part. Anchored folds train from the first bar instead of the
+    window start.
+    """
+    if folds < 1 or not 0 < train_fraction < 1:
+        raise ValueError("Walk-forward needs folds >= 1 and 0 < train_fraction < 1")
+    window = bars // folds
+    splits = []
+    for fold in range(folds):
+        start = fold * window
+        end = bars if fold == folds - 1 else start + window
+        test_start = start + int((end - start) * train_fraction)
+        splits.append((0 if anchored else start, test_start, test_start, end))
+    return splits
+
+
+class SharedOHLC:
+    """OHLC columns in one shared memory block; workers map them without copying."""
+
+    def __init__(self, ohlc: Mapping[str, Sequence[float]]):
+        columns = tuple(column for column in COLUMNS if ohlc.get(column) is not None)
+        bars = len(ohlc["close"])
+        self.shm = SharedMemory(create=True, size=max(8, 8 * bars * len(columns)))
+        self.layout = (self.shm.name, bars, columns)
+        self.arrays = self._views(self.shm, bars, columns)
+        for column in columns:
+            self.arrays[column][:] = ohlc[column]
+
+    @staticmethod
+    def _views(shm: SharedMemory, bars: int, columns: Sequence[str]) -> Dict[str, np.ndarray]:
+        return {
+            column: np.ndarray((bars,), dtype=np.int64 if column == "time" else np.float64,
+                               buffer=shm.buf, offset=8 * bars * index)
+            for index, column in enumerate(columns)
+        }
+
+    @classmethod
+    def attach(cls, layout: Tuple[str, int, Tuple[str, ...]]) -> Tuple[SharedMemory, Dict[str, np.ndarray]]:
+        name, bars, columns = layout
+        shm = SharedMemory(name=name)
+        return shm, cls._views(shm, bars, columns)
+
+    def close(self) -> None:
+        self.arrays = {}
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self) -> "SharedOHLC":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+# Worker process state: the attached block and its column views
+_worker_shm: Optional[SharedMemory] = None
+_worker_arrays: Dict[str, np.ndarray] = {}
+
+
+def _attach_worker(layout: Tuple[str, int, Tuple[str, ...]]) -> None:
+    global _worker_shm, _worker_arrays
+    _worker_shm, _worker_arrays = SharedOHLC.attach(layout)
+
+
+def _backtest_range(arrays: Mapping[str, np.ndarray], task: Task) -> Dict[str, Any]:
+    strategy, start, end, first_entry = task
+    try:
+        _, metrics = run_backtest({column: values[start:end] for column, values in arrays.items()}, strategy, first_entry)
+        return metrics
+    except (ValueError, KeyError) as e:
+        return {"error": str(e)}
+
+
+def _worker_backtest(task: Task) -> Dict[str, Any]:
+    return _backtest_range(_worker_arrays, task)
+
+
+def _score(metrics: Mapping[str, Any], objective: str, min_trades: int) -> float:
+    """Objective value, oriented so higher is better; too few trades or errors score -inf."""
+    if "error" in metrics or metrics.get("trade_count", 0) < min_trades or metrics.get(objective) is None:
+        return -math.inf
+    value = float(metrics[objective])
+    return -value if objective in LOWER_IS_BETTER else value
+
+
+class StrategyOptimizer:
+    """Runs backtest tasks over one OHLC history, in parallel when worthwhile."""
+
+    def __init__(self, ohlc: Mapping[str, Sequence[float]], max_workers: Optional[int] = None):
+        self.ohlc = {column: np.asarray(values) for column, values in ohlc.items() if column in COLUMNS}
+        self.bars = len(self.ohlc["close"])
+        self.max_workers = max(1, max_workers or os.cpu_count() or 1)
+
+    def run(self, tasks: List[Task]) -> List[Dict[str, Any]]:
+        """Metrics per task, in task order."""
+        workers = min(self.max_workers, len(tasks))
+        if workers <= 1:
+            return [_backtest_range(self.ohlc, task) for task in tasks]
+        with SharedOHLC(self.ohlc) as shared:
+            with ProcessPoolExecutor(workers, initializer=_attach_worker, initargs=(shared.layout,)) as pool:
+                chunksize = max(1, len(tasks) // (workers * 4))
+                return list(pool.map(_worker_backtest, tasks, chunksize=chunksize))
+
+    def sweep(
+        self,
+        template: Mapping[str, Any],
+        candidates: List[Dict[str, Any]],
+        objective: str = "sharpe_ratio",
+        min_trades: int = DEFAULT_MIN_TRADES,
+        start: int = 0,
+        end: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Backtest every parameter set over bars [start, end); results sorted best first."""
+        if objective not in OBJECTIVES:
+            raise ValueError(f"Unknown objective: {objective}. Use one of {', '.join(OBJECTIVES)}")
+        end = self.bars if end is None else end
+        tasks = [(apply_parameters(template, params), start, end, 0) for params in candidates]
+        results = [
+            {"params": params, "score": _score(metrics, objective, min_trades), "metrics": metrics}
+            for params, metrics in zip(candidates, self.run(tasks))
+        ]
+        return sorted(results, key=lambda result: result["score"], reverse=True)
+
+    def walk_forward(
+        self,
+        template: Mapping[str, Any],
+        candidates: List[Dict[str, Any]],
+        folds: int = 4,
+        train_fraction: float = 0.7,
+        anchored: bool = False,
+        objective: str = "sharpe_ratio",
+        min_trades: int = DEFAULT_MIN_TRADES,
+        warmup: int = DEFAULT_WARMUP_BARS,
+    ) -> Dict[str, Any]:
+        """
+        Optimize on each fold's training window and test the winner out of sample.
+
+        Test windows are backtested with up to `warmup` preceding bars so
+        indicators are primed, but trades are only entered inside the window.
+        All folds' training sweeps run as one batch of tasks.
+        """
+        if objective not in OBJECTIVES:
+            raise ValueError(f"Unknown objective: {objective}. Use one of {', '.join(OBJECTIVES)}")
+        splits = walk_forward_splits(self.bars, folds, train_fraction, anchored)
+        tasks = [
+            (apply_parameters(template, params), train_start, train_end, 0)
+            for train_start, train_end, _, _ in splits for params in candidates
+        ]
+        train_metrics = self.run(tasks)
+
+        winners, test_tasks = [], []
+        for fold, (_, _, test_start, test_end) in enumerate(splits):
+            fold_metrics = train_metrics[fold * len(candidates):(fold + 1) * len(candidates)]
+            scores = [_score(metrics, objective, min_trades) for metrics in fold_metrics]
+            best = int(np.argmax(scores))
+            winners.append((candidates[best], scores[best]))
+            primed = max(0, test_start - warmup)
+            test_tasks.append((apply_parameters(template, candidates[best]), primed, test_end, test_start - primed))
+        test_metrics = self.run(test_tasks)
+
+        report = []
+        for (train_start, train_end, test_start, test_end), (params, score), metrics in zip(splits, winners, test_metrics):
+            report.append({
+                "train_bars": [train_start, train_end],
+                "test_bars": [test_start, test_end],
+                "best_params": params,
+                "train_score": None if math.isinf(score) else round(score, 4),
+                "test_metrics": metrics,
+            })
+        scored = [fold["test_metrics"] for fold in report if "error" not in fold["test_metrics"]]
+        return {
+            "folds": report,
+            "out_of_sample": {
+                "trade_count": sum(m["trade_count"] for m in scored),
+                "total_return_pct": round(sum(m["total_return_pct"] for m in scored), 4),
+                f"mean_{objective}": round(float(np.mean([m[objective] or 0.0 for m in scored])), 4) if scored else None,
+                "profitable_folds": sum(1 for m in scored if m["total_return_pct"] > 0),
+            },
+        }
+
+
+def optimize(
+    ohlc: Mapping[str, Sequence[float]],
+    template: Mapping[str, Any],
+    sweep: Mapping[str, Any],
+    candidates: Optional[List[Dict[str, Any]]] = None,
+) -> Dict[str, Any]:
+    """
+    Run a sweep request: {"parameters": {...}, "samples": N, "constraints": [...],
+    "objective": ..., "min_trades": ..., "top": 5, "max_workers": ..., "walk_forward": {...}}.
+
+    `candidates` are the request's parameter sets when the caller has
+    already expanded them (see `parameter_sets`).
+    """
+    began = time.perf_counter()
+    if candidates is None:
+        candidates = parameter_sets(
+            sweep.get("parameters") or {}, sweep.get("samples"), sweep.get("constraints") or (), int(sweep.get("seed", 0))
+        )
+    if not candidates:
+        raise ValueError("The parameter space (after constraints) is empty")
+    optimizer = StrategyOptimizer(ohlc, sweep.get("max_workers"))
+    objective = sweep.get("objective", "sharpe_ratio")
+    min_trades = int(sweep.get("min_trades", DEFAULT_MIN_TRADES))
+
+    result: Dict[str, Any] = {"objective": objective, "candidates": len(candidates)}
+    if sweep.get("walk_forward"):
+        options = sweep["walk_forward"] if isinstance(sweep["walk_forward"], Mapping) else {}
+        result["mode"] = "walk_forward"
+        result["walk_forward"] = optimizer.walk_forward(
+            template, candidates,
+            folds=int(options.get("folds", 4)),
+            train_fraction=float(options.get("train_fraction", 0.7)),
+            anchored=bool(options.get("anchored", False)),
+            objective=objective,
+            min_trades=min_trades,
+        )
+    else:
+        ranked = optimizer.sweep(template, candidates, objective, min_trades)
+        result["mode"] = "sweep"
+        result["top"] = [
+            {"params": entry["params"], "score": None if math.isinf(entry["score"]) else round(entry["score"], 4),
+             "metrics": entry["metrics"]}
+            for entry in ranked[:int(sweep.get("top", 5))]
+        ]
+    result["workers"] = min(optimizer.max_workers, len(candidates))
+    result["elapsed_seconds"] = round(time.perf_counter() - began, 3)
+    return result
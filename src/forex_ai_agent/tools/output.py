@@ -0,0 +1,208 @@
+"""
+Token-efficient serialization of tool results.
+
+Tool results become LLM prompt tokens, so their size drives per-run
+latency and cost. Every tool serializes through `render`, which supports
+three modes:
+
+- ``full``: the tool's original JSON, unchanged.
+- ``compact``: minified JSON. Verbose fields are dropped per tool, long
+  lists are capped to the top (or latest) N items, floats are rounded to
+  significant digits, empty values are removed, and the whole payload is
+  held under a character budget.
+- ``csv``: compact, with multi-row data (lists of records, or dicts of
+  equal-length columns) rendered as CSV tables.
+
+Non-full payloads carry a ``_meta`` entry with the mode and an approximate
+token count. The mode is set per tool instance (`output_mode`) or for the
+whole process with FOREX_AI_OUTPUT_MODE; FOREX_AI_OUTPUT_MAX_CHARS sets
+the budget.
+"""
+
+import csv
+import io
+import json
+import math
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+
+OUTPUT_MODES = ("full", "compact", "csv")
+DEFAULT_MAX_CHARS = 6000
+DEFAULT_PRECISION = 6
+CHARS_PER_TOKEN = 4
+_EMPTY = (None, "", [], {})
+
+
+@dataclass(frozen=True)
+class OutputProfile:
+    """
+    How a tool's result is reduced outside full mode.
+
+    Paths are dotted keys where "*" matches any key or list index, e.g.
+    "articles.*.authors". `limits` caps lists at a path to their first N
+    items, or their last N for negative limits (time series keep the latest
+    bars). `tables` are the paths rendered as CSV in csv mode.
+    """
+    drop: Tuple[str, ...] = ()
+    limits: Dict[str, int] = field(default_factory=dict)
+    tables: Tuple[str, ...] = ()
+    precision: int = DEFAULT_PRECISION
+
+
+def output_mode(mode: Optional[str] = None) -> str:
+    """The explicit mode, else FOREX_AI_OUTPUT_MODE, else full."""
+    mode = (mode or os.getenv("FOREX_AI_OUTPUT_MODE") or "full").strip().lower()
+    if mode not in OUTPUT_MODES:
+        raise ValueError(f"Unknown output mode: {mode}. Use one of {', '.join(OUTPUT_MODES)}")
+    return mode
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count of text sent to the LLM (about four characters per token)."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _matches(path: Tuple[str, ...], pattern: str) -> bool:
+    parts = pattern.split(".")
+    return len(parts) == len(path) and all(p == "*" or p == key for p, key in zip(parts, path))
+
+
+def _reduce(value: Any, path: Tuple[str, ...], profile: OutputProfile, cut: Dict[str, int]) -> Any:
+    """Drop, cap, round and prune one value of the result tree."""
+    if isinstance(value, dict):
+        reduced = {}
+        for key, item in value.items():
+            child = path + (str(key),)
+            if any(_matches(child, pattern) for pattern in profile.drop):
+                continue
+            item = _reduce(item, child, profile, cut)
+            if item not in _EMPTY:
+                reduced[key] = item
+        return reduced
+    if isinstance(value, (list, tuple)):
+        items = list(value)
+        pattern, limit = next(((p, n) for p, n in profile.limits.items() if _matches(path, p)), (None, None))
+        if limit is not None and len(items) > abs(limit):
+            # Columns ("bars.*") are reported once, under their table
+            cut[".".join(path[:-1] if pattern.endswith(".*") else path)] = len(items) - abs(limit)
+            items = items[limit:] if limit < 0 else items[:limit]
+        return [_reduce(item, path + (str(i),), profile, cut) for i, item in enumerate(items)]
+    if isinstance(value, float):
+        return float(f"{value:.{profile.precision}g}") if math.isfinite(value) else None
+    return value
+
+
+def _lists(value: Any, path: Tuple[str, ...] = ()) -> List[Tuple[Tuple[str, ...], list]]:
+    """Every list in the tree with its path."""
+    found = []
+    if isinstance(value, dict):
+        for key, item in value.items():
+            found.extend(_lists(item, path + (str(key),)))
+    elif isinstance(value, list):
+        found.append((path, value))
+        for i, item in enumerate(value):
+            found.extend(_lists(item, path + (str(i),)))
+    return found
+
+
+def _fit(result: Dict[str, Any], max_chars: int, tail: Tuple[str, ...], cut: Dict[str, int]) -> None:
+    """
+    Halve the largest list until the minified result fits in `max_chars`.
+
+    Lists that are columns of one table (equal-length siblings in a dict)
+    are halved together, so their rows stay aligned.
+    """
+    while len(json.dumps(result, separators=(",", ":"))) > max_chars:
+        candidates = [(path, items) for path, items in _lists(result) if len(items) > 1]
+        if not candidates:
+            return
+        path, items = max(candidates, key=lambda entry: len(json.dumps(entry[1], separators=(",", ":"))))
+        parent: Any = result
+        for key in path[:-1]:
+            parent = parent[int(key)] if isinstance(parent, list) else parent[key]
+        columns = [items]
+        if isinstance(parent, dict) and all(isinstance(v, list) and len(v) == len(items) for v in parent.values()):
+            columns = list(parent.values())
+        keep = len(items) // 2
+        name = ".".join(path[:-1] if len(columns) > 1 else path)
+        cut[name] = cut.get(name, 0) + len(items) - keep
+        latest = any(_matches(path, pattern) for pattern in tail)
+        for column in columns:
+            column[:] = column[len(column) - keep:] if latest else column[:keep]
+
+
+def _flat(record: Dict[str, Any], prefix: str = "") -> Dict[str, Any]:
+    flat = {}
+    for key, value in record.items():
+        if isinstance(value, dict):
+            flat.update(_flat(value, f"{prefix}{key}."))
+        else:
+            flat[f"{prefix}{key}"] = json.dumps(value, separators=(",", ":")) if isinstance(value, list) else value
+    return flat
+
+
+def to_csv(value: Any) -> Optional[str]:
+    """CSV text for records (a list, or a dict keyed by name) or a dict of equal-length columns; None otherwise."""
+    if isinstance(value, dict) and value and all(isinstance(v, dict) for v in value.values()):
+        value = [{"key": key, **record} for key, record in value.items()]
+    if isinstance(value, dict) and value and all(isinstance(v, list) for v in value.values()):
+        lengths = {len(v) for v in value.values()}
+        if len(lengths) != 1:
+            return None
+        rows = [dict(zip(value, row)) for row in zip(*value.values())]
+    elif isinstance(value, list) and value and all(isinstance(v, dict) for v in value):
+        rows = [_flat(v) for v in value]
+    else:
+        return None
+    columns = list(dict.fromkeys(key for row in rows for key in row))
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, lineterminator="\n")
+    writer.writeheader()
+    writer.writerows(rows)
+    return buffer.getvalue()
+
+
+def _tabulate(value: Any, path: Tuple[str, ...], tables: Tuple[str, ...]) -> Any:
+    if any(_matches(path, pattern) for pattern in tables):
+        table = to_csv(value)
+        if table is not None:
+            return table
+    if isinstance(value, dict):
+        return {key: _tabulate(item, path + (str(key),), tables) for key, item in value.items()}
+    return value
+
+
+def render(
+    result: Dict[str, Any],
+    profile: OutputProfile = OutputProfile(),
+    mode: Optional[str] = None,
+    indent: Optional[int] = None,
+    max_chars: Optional[int] = None,
+) -> str:
+    """
+    Serialize a tool result in the selected output mode.
+
+    Full mode reproduces the tool's original `json.dumps` (indented when
+    `indent` is given, minified otherwise).
+    """
+    mode = output_mode(mode)
+    if mode == "full":
+        return json.dumps(result, indent=indent) if indent else json.dumps(result, separators=(",", ":"))
+
+    cut: Dict[str, int] = {}
+    reduced = _reduce(result, (), profile, cut)
+    budget = max_chars or int(os.getenv("FOREX_AI_OUTPUT_MAX_CHARS", DEFAULT_MAX_CHARS))
+    tail = tuple(pattern for pattern, limit in profile.limits.items() if limit < 0)
+    _fit(reduced, budget, tail, cut)
+    if mode == "csv":
+        reduced = _tabulate(reduced, (), profile.tables)
+
+    meta: Dict[str, Any] = {"mode": mode}
+    if cut:
+        meta["omitted"] = cut
+    reduced["_meta"] = meta
+    text = json.dumps(reduced, separators=(",", ":"))
+    meta["approx_tokens"] = estimate_tokens(text) + 5           # the count itself adds a few characters
+    return json.dumps(reduced, separators=(",", ":"))
@@ -0,0 +1,193 @@
+"""
+Persistent on-disk cache for market data.
+
+This module provides a SQLite-backed key/value cache with per-entry TTLs,
+size-bounded LRU eviction and hit/miss counters. The database is opened in
+WAL mode so several worker processes on one host can share fetched data.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "forex_ai_agent")
+DEFAULT_MAX_ENTRIES = 10_000
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    expires_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+class PersistentCache:
+    """SQLite-backed JSON cache with TTL expiry and LRU eviction."""
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self._local = threading.local()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, conn: sqlite3.Connection, name: str) -> None:
+        conn.execute(
+            "INSERT INTO counters (name, value) VALUES (?, 1) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + 1",
+            (name,),
+        )
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for `key`, or None if missing or expired."""
+        now = self.clock()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value, expires_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] <= now:
+                if row is not None:
+                    conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._count(conn, "misses")
+                return None
+            conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (now, key))
+            self._count(conn, "hits")
+        return json.loads(row[0])
+
+    def ttl(self, key: str) -> float:
+        """Seconds until `key` expires (0 if missing or expired)."""
+        row = self._connect().execute(
+            "SELECT expires_at FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        return max(0.0, row[0] - self.clock()) if row else 0.0
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        """Store a JSON-serializable value for `ttl` seconds, evicting LRU entries if full."""
+        payload = json.dumps(value, separators=(",", ":"))
+        now = self.clock()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, payload, len(payload), now + ttl, now),
+            )
+            self._evict(conn, now)
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        conn.execute("DELETE FROM entries WHERE expires_at <= ?", (now,))
+        count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+
+        # Walk entries from least to most recently used until both bounds hold
+        evict_keys = []
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY last_access"):
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            evict_keys.append((key,))
+            count -= 1
+            total -= size
+        conn.executemany("DELETE FROM entries WHERE key = ?", evict_keys)
+        conn.execute(
+            "INSERT INTO counters (name, value) VALUES ('evictions', ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (len(evict_keys),),
+        )
+
+    def clear(self) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM entries")
+            conn.execute("DELETE FROM counters")
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss/eviction counters (shared by all processes) and current size."""
+        conn = self._connect()
+        stats = {"hits": 0, "misses": 0, "evictions": 0}
+        stats.update(dict(conn.execute("SELECT name, value FROM counters").fetchall()))
+        stats["entries"], stats["bytes"] = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()
+        return stats
+
+
+def default_persistent_cache(name: str) -> Optional[PersistentCache]:
+    """
+    Open the shared on-disk cache `name` under FOREX_AI_CACHE_DIR.
+
+    Returns None when disabled with FOREX_AI_DISK_CACHE=0 or when the cache
+    directory is not writable, so callers fall back to memory-only caching.
+    """
+    if os.getenv("FOREX_AI_DISK_CACHE", "1") == "0":
+        return None
+    cache_dir = os.getenv("FOREX_AI_CACHE_DIR", DEFAULT_CACHE_DIR)
+    try:
+        return PersistentCache(
+            os.path.join(cache_dir, f"{name}.sqlite3"),
+            max_entries=int(os.getenv("FOREX_AI_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)),
+            max_bytes=int(os.getenv("FOREX_AI_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)),
+        )
+    except (OSError, sqlite3.Error):
+        return None
+
+
+class LazyCache:
+    """
+    Opens a cache with `opener` on first use.
+
+    Shared clients are created at import time; deferring the open keeps
+    importing a tool from creating cache files.
+    """
+
+    def __init__(self, opener: Callable[[], Any]):
+        self._opener = opener
+        self._lock = threading.Lock()
+        self._opened = False
+        self._cache: Any = None
+
+    def open(self) -> Any:
+        if not self._opened:
+            with self._lock:
+                if not self._opened:
+                    self._cache = self._opener()
+                    self._opened = True
+        return self._cache
+
+
+def lazy_persistent_cache(name: str) -> LazyCache:
+    """`default_persistent_cache(name)`, opened on first use."""
+    return LazyCache(lambda: default_persistent_cache(name))
@@ -0,0 +1,400 @@
+"""
+Position sizing and portfolio risk allocation.
+
+Sizes trades from the account balance, risk percentage and stop distance,
+converting the loss per unit from the pair's quote currency into the
+account currency. Conversion rates come from rates given by the caller,
+the trades' own prices, fresh quotes in the cross-rate engine or, as a last
+resort, a live quote. A batch of candidate trades is allocated in priority
+order under portfolio-level caps on total risk, risk per currency and risk
+across correlated positions.
+"""
+
+import math
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .backtest import pip_size
+from .cross_rates import Pair, parse_pair
+from .historical_data import is_crypto_pair
+
+
+DEFAULT_LEVERAGE = 30.0
+MICRO_LOT = 1000
+STANDARD_LOT = 100_000
+# Portfolio caps, in percent of the account balance
+MAX_PORTFOLIO_RISK_PERCENT = 6.0
+MAX_CURRENCY_RISK_PERCENT = 4.0
+MAX_CORRELATED_RISK_PERCENT = 4.0
+CORRELATION_THRESHOLD = 0.5
+CORRELATION_BARS = 120
+# Assumed return correlation of pairs sharing a currency when no history is stored
+OVERLAP_CORRELATION = 0.5
+# Monte Carlo quantiles are taken over at most this many paths, sampled uniformly
+QUANTILE_SAMPLE_SIZE = 100_000
+
+
+@dataclass
+class TradeRequest:
+    """One candidate trade; direction follows from the stop's side of the entry."""
+    pair: Pair
+    entry: float
+    stop: float
+    target: Optional[float] = None
+    risk_percent: Optional[float] = None
+
+    @classmethod
+    def parse(cls, data: Mapping[str, Any], default_pair: str = "") -> "TradeRequest":
+        entry, stop = float(data.get("entry_price", data.get("entry", 0))), float(data.get("stop_loss", data.get("stop", 0)))
+        if entry <= 0 or stop <= 0 or entry == stop:
+            raise ValueError("Each trade needs positive entry_price and stop_loss that differ")
+        target = data.get("take_profit", data.get("target"))
+        risk = data.get("risk_percentage", data.get("risk_percent"))
+        pair = data.get("pair") or default_pair
+        if not pair:
+            raise ValueError("Each trade needs a pair (e.g. 'EUR/USD')")
+        return cls(parse_pair(pair), entry, stop, float(target) if target else None, float(risk) if risk is not None else None)
+
+    @property
+    def symbol(self) -> str:
+        return f"{self.pair[0]}/{self.pair[1]}"
+
+    @property
+    def direction(self) -> int:
+        return 1 if self.stop < self.entry else -1
+
+
+@dataclass
+class RateBook:
+    """Resolves the rate converting one currency into another."""
+    rates: Dict[Pair, float] = field(default_factory=dict)
+    lookup: Optional[Callable[[str, str], Any]] = None      # cached quotes only, returns None when unknown
+    fetch: Optional[Callable[[str, str], Any]] = None       # live quote
+
+    def add(self, pair: Pair, rate: float) -> None:
+        if rate > 0 and pair not in self.rates and pair[::-1] not in self.rates:
+            self.rates[pair] = rate
+
+    def _known(self, base: str, quote: str) -> Optional[float]:
+        if (base, quote) in self.rates:
+            return self.rates[(base, quote)]
+        if (quote, base) in self.rates:
+            return 1.0 / self.rates[(quote, base)]
+        return None
+
+    def convert(self, currency: str, account: str) -> Tuple[float, str]:
+        """Units of `account` currency per unit of `currency`, and where the rate came from."""
+        if currency == account:
+            return 1.0, "identity"
+        known = self._known(currency, account)
+        if known is not None:
+            return known, "given"
+        vias = {c for pair in self.rates for c in pair} - {currency, account}
+        for via in sorted(vias):
+            first, second = self._known(currency, via), self._known(via, account)
+            if first is not None and second is not None:
+                return first * second, f"cross:{via}"
+        for source, resolve in (("cached", self.lookup), ("live", self.fetch)):
+            quote = resolve(currency, account) if resolve else None
+            if quote is not None:
+                self.add((currency, account), quote.rate)
+                return quote.rate, source
+        raise ValueError(f"No {currency}/{account} rate to convert into the account currency; pass it in rates")
+
+
+def position_size(
+    trade: TradeRequest,
+    risk_amount: float,
+    account: str,
+    book: RateBook,
+    leverage: float = DEFAULT_LEVERAGE,
+) -> Dict[str, Any]:
+    """
+    Units, pip value, reward:risk and margin of one trade risking `risk_amount`.
+
+    Forex positions are rounded down to micro lots, so the actual risk never
+    exceeds the budget; crypto positions keep fractional units.
+    """
+    conversion, source = book.convert(trade.pair[1], account)
+    distance = abs(trade.entry - trade.stop)
+    loss_per_unit = distance * conversion
+    units = risk_amount / loss_per_unit if loss_per_unit > 0 else 0.0
+    crypto = is_crypto_pair(trade.pair)
+    units = round(units, 8) if crypto else math.floor(units / MICRO_LOT + 1e-9) * MICRO_LOT
+    pip = pip_size(trade.symbol)
+
+    result: Dict[str, Any] = {
+        "pair": trade.symbol,
+        "direction": "long" if trade.direction > 0 else "short",
+        "entry_price": trade.entry,
+        "stop_loss": trade.stop,
+        "units": units,
+        "risk_amount": round(units * loss_per_unit, 2),
+        "stop_distance_pips": round(distance / pip, 1),
+        "conversion": {"rate": round(conversion, 8), "source": source},
+    }
+    if not crypto:
+        result["lots"] = round(units / STANDARD_LOT, 2)
+        result["pip_value"] = round(pip * units * conversion, 4)
+        result["pip_value_per_standard_lot"] = round(pip * STANDARD_LOT * conversion, 4)
+    notional = units * trade.entry * conversion
+    result["notional"] = round(notional, 2)
+    result["margin_required"] = round(notional / leverage, 2) if leverage > 0 else round(notional, 2)
+    if trade.target is not None:
+        reward = (trade.target - trade.entry) * trade.direction
+        result["take_profit"] = trade.target
+        result["risk_reward"] = round(reward / distance, 2)
+        result["potential_profit"] = round(reward * units * conversion, 2)
+    return result
+
+
+def _default_correlation(first: Pair, second: Pair) -> float:
+    """Assumed correlation of two pairs' returns from the currencies they share."""
+    if first == second:
+        return 1.0
+    if first == second[::-1]:
+        return -1.0
+    if first[0] == second[0] or first[1] == second[1]:
+        return OVERLAP_CORRELATION
+    if first[0] == second[1] or first[1] == second[0]:
+        return -OVERLAP_CORRELATION
+    return 0.0
+
+
+def pair_correlations(pairs: Sequence[Pair], store: Any = None, timeframe: str = "daily") -> Tuple[np.ndarray, str]:
+    """
+    Correlation matrix of the pairs' returns.
+
+    Uses the last `CORRELATION_BARS` stored closes, aligned on time, when
+    every pair has stored history; otherwise pairs are related through the
+    currencies they share.
+    """
+    n = len(pairs)
+    fallback = np.array([[_default_correlation(a, b) for b in pairs] for a in pairs]).reshape(n, n)
+    if store is None or n < 2:
+        return fallback, "currency_overlap"
+    closes = [store.read(f"{p[0]}/{p[1]}", timeframe, columns=("time", "close"), last=CORRELATION_BARS + 1) for p in pairs]
+    if any(len(c["time"]) < 3 for c in closes):
+        return fallback, "currency_overlap"
+    common = closes[0]["time"]
+    for c in closes[1:]:
+        common = np.intersect1d(common, c["time"])
+    if len(common) < 3:
+        return fallback, "currency_overlap"
+    returns = np.diff(np.log([np.asarray(c["close"])[np.searchsorted(c["time"], common)] for c in closes]), axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        matrix = np.nan_to_num(np.corrcoef(returns))
+    np.fill_diagonal(matrix, 1.0)
+    return matrix, f"returns:{len(common) - 1}"
+
+
+def allocate(
+    trades: Sequence[TradeRequest],
+    balance: float,
+    account: str,
+    book: RateBook,
+    risk_percent: float = 1.0,
+    leverage: float = DEFAULT_LEVERAGE,
+    max_portfolio_risk: float = MAX_PORTFOLIO_RISK_PERCENT,
+    max_currency_risk: float = MAX_CURRENCY_RISK_PERCENT,
+    max_correlated_risk: float = MAX_CORRELATED_RISK_PERCENT,
+    correlation_threshold: float = CORRELATION_THRESHOLD,
+    correlations: Optional[np.ndarray] = None,
+) -> Dict[str, Any]:
+    """
+    Size trades in priority order within the portfolio caps.
+
+    Each trade asks for its own risk percentage (or `risk_percent`) and gets
+    the most that fits: the remaining portfolio budget, the headroom on each
+    currency it adds exposure to (long base / short quote), and the headroom
+    among accepted positions whose returns move with it (correlation times
+    both directions at or above the threshold). Trades left with no budget
+    are rejected.
+    """
+    if correlations is None:
+        correlations, _ = pair_correlations([t.pair for t in trades])
+    percent = lambda amount: round(100.0 * amount / balance, 4)
+    budget = balance * max_portfolio_risk / 100.0
+    exposure: Dict[str, float] = {}
+    accepted_risk = np.zeros(len(trades))
+    directions = np.array([t.direction for t in trades], dtype=float)
+    positions, used_margin = [], 0.0
+
+    for i, trade in enumerate(trades):
+        wanted = balance * (trade.risk_percent if trade.risk_percent is not None else risk_percent) / 100.0
+        limits = {"portfolio_risk": budget - accepted_risk.sum()}
+        for currency, sign in ((trade.pair[0], trade.direction), (trade.pair[1], -trade.direction)):
+            current = exposure.get(currency, 0.0) * sign
+            limits[f"{currency}_exposure"] = balance * max_currency_risk / 100.0 - max(current, 0.0)
+        moving_together = correlations[i, :i] * directions[:i] * directions[i] >= correlation_threshold
+        limits["correlated_risk"] = balance * max_correlated_risk / 100.0 - accepted_risk[:i][moving_together].sum()
+
+        allowed = max(0.0, min(wanted, *limits.values()))
+        position = position_size(trade, allowed, account, book, leverage) if allowed > 0 else {
+            "pair": trade.symbol, "direction": "long" if trade.direction > 0 else "short", "units": 0, "risk_amount": 0.0,
+        }
+        position["requested_risk_percent"] = percent(wanted)
+        position["risk_percent"] = percent(position["risk_amount"])
+        if position["risk_amount"] <= 0:
+            position["status"] = "rejected"
+            if allowed > 0:
+                position["note"] = "Risk budget is below one micro lot"
+        else:
+            position["status"] = "accepted" if allowed >= wanted - 1e-9 else "reduced"
+        binding = [name for name, limit in limits.items() if limit < wanted - 1e-9]
+        if binding:
+            position["limited_by"] = binding
+
+        accepted_risk[i] = position["risk_amount"]
+        exposure[trade.pair[0]] = exposure.get(trade.pair[0], 0.0) + trade.direction * accepted_risk[i]
+        exposure[trade.pair[1]] = exposure.get(trade.pair[1], 0.0) - trade.direction * accepted_risk[i]
+        used_margin += position.get("margin_required", 0.0)
+        positions.append(position)
+
+    warnings = []
+    if used_margin > balance:
+        warnings.append(f"Margin required {used_margin:.2f} exceeds the balance at {leverage:g}:1 leverage")
+    return {
+        "positions": positions,
+        "portfolio": {
+            "total_risk": round(float(accepted_risk.sum()), 2),
+            "total_risk_percent": percent(float(accepted_risk.sum())),
+            "margin_required": round(used_margin, 2),
+            "margin_percent": percent(used_margin),
+            "currency_exposure_percent": {c: percent(v) for c, v in sorted(exposure.items()) if abs(v) > 1e-9},
+            "accepted": sum(p["status"] != "rejected" for p in positions),
+            "rejected": sum(p["status"] == "rejected" for p in positions),
+        },
+        "warnings": warnings,
+    }
+
+
+def _outcomes(
+    rng: np.random.Generator,
+    shape: Tuple[int, int],
+    win_rate: float,
+    win: float,
+    loss: float,
+    samples: Optional[np.ndarray],
+) -> np.ndarray:
+    """Per-trade results: resampled from `samples`, or `win` with probability `win_rate`, else `loss`."""
+    if samples is not None:
+        return samples[rng.integers(0, len(samples), size=shape)]
+    outcomes = (rng.random(shape, dtype=np.float32) < win_rate).astype(np.float32)
+    outcomes *= np.float32(win - loss)
+    outcomes += np.float32(loss)
+    return outcomes
+
+
+def simulate_paths(
+    win_rate: float = 0.5,
+    avg_win: float = 1.0,
+    avg_loss: float = 1.0,
+    risk_percent: float = 1.0,
+    trades: int = 200,
+    paths: int = 10_000,
+    ruin_percent: float = 50.0,
+    compounding: bool = True,
+    r_multiples: Optional[Sequence[float]] = None,
+    chunk_paths: int = 100_000,
+    block_elements: int = 1_000_000,
+    seed: Optional[int] = None,
+):
+    """
+    Equity paths in chunks; yields (max_drawdown, final_equity, ruined) arrays per chunk.
+
+    Equity starts at 1 and each trade adds `risk_percent` of the current
+    (compounding) or starting balance times its R result. A path is ruined
+    once equity falls to `1 - ruin_percent / 100`.
+
+    A chunk of `chunk_paths` paths advances one trade at a time over
+    vectors of running equity, peak, deepest drawdown and lowest equity,
+    with trade results drawn in float32 blocks of about `block_elements`.
+    Memory stays bounded for any number of paths or trades, and each step
+    works on cache-sized rows. Compounding paths accumulate log equity, so
+    their drawdowns need no division.
+    """
+    if not 0 <= win_rate <= 1 or trades < 1 or paths < 1:
+        raise ValueError("Need 0 <= win_rate <= 1, trades >= 1 and paths >= 1")
+    if r_multiples is not None and not len(r_multiples):
+        raise ValueError("r_multiples is empty")
+    rng = np.random.default_rng(seed)
+    risk, floor = risk_percent / 100.0, 1.0 - ruin_percent / 100.0
+    # Per-trade equity steps: log growth factors when compounding, else fractions of the start
+    step = (lambda r: np.log(np.maximum(1.0 + risk * r, 1e-12))) if compounding else (lambda r: risk * r)
+    samples = None if r_multiples is None else step(np.asarray(r_multiples, dtype=float)).astype(np.float32)
+    win, loss = step(avg_win), step(-avg_loss)
+
+    for start in range(0, paths, chunk_paths):
+        size = min(chunk_paths, paths - start)
+        equity, peak, deepest, lowest, gap = (np.zeros(size, dtype=np.float32) for _ in range(5))
+        rows = max(1, block_elements // size)
+        for first in range(0, trades, rows):
+            for result in _outcomes(rng, (min(rows, trades - first), size), win_rate, win, loss, samples):
+                equity += result
+                np.maximum(peak, equity, out=peak)          # peak starts at 0: drawdowns count from the start
+                np.subtract(peak, equity, out=gap)
+                if not compounding:
+                    gap /= 1.0 + peak
+                np.maximum(deepest, gap, out=deepest)
+                np.minimum(lowest, equity, out=lowest)
+        if compounding:
+            yield -np.expm1(-deepest.astype(float)), np.exp(equity.astype(float)), lowest <= np.log(max(floor, 1e-12))
+        else:
+            yield np.minimum(deepest.astype(float), 1.0), 1.0 + equity.astype(float), lowest <= floor - 1.0
+
+
+class _Reservoir:
+    """Uniform random sample of at most `size` of the rows added so far (reservoir sampling, one chunk at a time)."""
+
+    def __init__(self, size: int, columns: int, rng: np.random.Generator):
+        self.size, self.seen, self.rng = size, 0, rng
+        self.rows = np.empty((0, columns))
+
+    def add(self, rows: np.ndarray) -> None:
+        take = min(max(self.size - len(self.rows), 0), len(rows))
+        if take:
+            self.rows = np.concatenate([self.rows, rows[:take]])
+        rest = rows[take:]
+        if len(rest):
+            # The row seen t-th (from 0) replaces a random slot with probability size / (t + 1)
+            seen = self.seen + take + np.arange(len(rest))
+            slots = (self.rng.random(len(rest)) * (seen + 1)).astype(np.int64)
+            kept = slots < self.size
+            self.rows[slots[kept]] = rest[kept]
+        self.seen += len(rows)
+
+
+def monte_carlo(sample_size: int = QUANTILE_SAMPLE_SIZE, **options: Any) -> Dict[str, Any]:
+    """
+    Risk of ruin and drawdown/return quantiles over `simulate_paths` chunks.
+
+    Each chunk is reduced as it arrives: ruined and profitable paths are
+    counted, and quantiles come from a uniform sample of at most
+    `sample_size` paths (all of them in smaller runs, so results are exact).
+    """
+    # The sample draws from its own stream, so it never correlates with the simulated trades
+    sample = _Reservoir(sample_size, 2, np.random.default_rng(np.random.SeedSequence(options.get("seed")).spawn(1)[0]))
+    paths = ruined = profitable = 0
+    for drawdown, final, ruin in simulate_paths(**options):
+        final = (final - 1.0) * 100.0
+        paths += len(final)
+        ruined += int(np.count_nonzero(ruin))
+        profitable += int(np.count_nonzero(final > 1e-4))
+        sample.add(np.column_stack((drawdown * 100.0, final)))
+    drawdown, final = sample.rows.T
+    quantiles = (50, 75, 90, 95, 99)
+    return {
+        "paths": paths,
+        "risk_of_ruin": round(ruined / paths, 6),
+        "max_drawdown_pct": {f"p{q}": round(float(v), 2) for q, v in zip(quantiles, np.percentile(drawdown, quantiles))},
+        "final_return_pct": {f"p{q}": round(float(v), 2) for q, v in zip((5, 25, 50, 75, 95), np.percentile(final, (5, 25, 50, 75, 95)))},
+        "probability_of_profit": round(profitable / paths, 4),
+    }
+
+
+def kelly_fraction(win_rate: float, avg_win: float, avg_loss: float) -> float:
+    """Kelly-optimal fraction of the balance to risk for fixed win/loss payoffs."""
+    return win_rate - (1.0 - win_rate) * avg_loss / avg_win if avg_win > 0 else 0.0
@@ -0,0 +1,146 @@
+"""
+Per-ticker sentiment time series.
+
+Each ticker's `ticker_sentiment` mentions from the news feed are held as
+parallel NumPy arrays of publish time, relevance and sentiment score,
+sorted by time, with running sums of relevance and relevance * score.
+A window query is two binary searches and a difference of sums, so
+"FOREX:EUR over the last 6h, relevance-weighted" costs O(log n) however
+much history is indexed, and bucketed series are one vectorized lookup.
+
+The index is loaded from the news store's mention rows and refreshed
+incrementally: only rows inserted since the last refresh are read.
+"""
+
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .news_store import NewsStore, parse_published
+
+# Alpha Vantage ticker sentiment label thresholds
+BULLISH_THRESHOLD = 0.15
+BEARISH_THRESHOLD = -0.15
+
+
+class TickerSeries:
+    """Time-sorted mentions of one ticker with prefix sums for window queries."""
+
+    def __init__(self):
+        self.times = np.empty(0, dtype=np.int64)
+        self.relevance = np.empty(0, dtype=np.float32)
+        self.score = np.empty(0, dtype=np.float32)
+        self._relevance_sum = np.zeros(1)
+        self._weighted_sum = np.zeros(1)
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def extend(self, times: np.ndarray, relevance: np.ndarray, score: np.ndarray) -> None:
+        """Append mentions, re-sorting only when they are older than the newest indexed one."""
+        if not len(times):
+            return
+        times = np.concatenate([self.times, np.asarray(times, dtype=np.int64)])
+        relevance = np.concatenate([self.relevance, np.asarray(relevance, dtype=np.float32)])
+        score = np.concatenate([self.score, np.asarray(score, dtype=np.float32)])
+        if np.any(np.diff(times) < 0):
+            order = np.argsort(times, kind="stable")
+            times, relevance, score = times[order], relevance[order], score[order]
+        self.times, self.relevance, self.score = times, relevance, score
+        weights = relevance.astype(np.float64)
+        self._relevance_sum = np.concatenate([[0.0], np.cumsum(weights)])
+        self._weighted_sum = np.concatenate([[0.0], np.cumsum(weights * score)])
+
+    def bounds(self, start: int, end: int) -> Tuple[int, int]:
+        """Index range of mentions published in [start, end]."""
+        return (int(np.searchsorted(self.times, start, side="left")),
+                int(np.searchsorted(self.times, end, side="right")))
+
+    def window(self, start: int, end: int, min_relevance: float = 0.0) -> Dict[str, Any]:
+        """Relevance-weighted and plain sentiment of the mentions in [start, end]."""
+        lo, hi = self.bounds(start, end)
+        relevance, score = self.relevance[lo:hi], self.score[lo:hi]
+        if min_relevance > 0:
+            keep = relevance >= min_relevance
+            relevance, score = relevance[keep], score[keep]
+            weight = float(relevance.sum(dtype=np.float64))
+            weighted = float(np.dot(relevance.astype(np.float64), score))
+        else:
+            weight = self._relevance_sum[hi] - self._relevance_sum[lo]
+            weighted = self._weighted_sum[hi] - self._weighted_sum[lo]
+        count = len(score)
+        return {
+            "mentions": count,
+            "weighted_sentiment": round(weighted / weight, 4) if weight > 0 else None,
+            "average_sentiment": round(float(score.mean(dtype=np.float64)), 4) if count else None,
+            "average_relevance": round(float(relevance.mean(dtype=np.float64)), 4) if count else None,
+            "bullish": int(np.count_nonzero(score >= BULLISH_THRESHOLD)),
+            "bearish": int(np.count_nonzero(score <= BEARISH_THRESHOLD)),
+        }
+
+    def buckets(self, start: int, end: int, count: int) -> Dict[str, List[Any]]:
+        """Relevance-weighted sentiment in `count` equal buckets spanning [start, end]."""
+        edges = np.linspace(start, end, count + 1)
+        index = np.searchsorted(self.times, edges, side="left")
+        index[-1] = np.searchsorted(self.times, end, side="right")
+        weight = np.diff(self._relevance_sum[index])
+        weighted = np.diff(self._weighted_sum[index])
+        with np.errstate(invalid="ignore", divide="ignore"):
+            sentiment = np.where(weight > 0, weighted / weight, np.nan)
+        return {
+            "start": [int(edge) for edge in edges[:-1]],
+            "mentions": np.diff(index).tolist(),
+            "weighted_sentiment": [None if np.isnan(value) else round(float(value), 4) for value in sentiment],
+        }
+
+
+class SentimentIndex:
+    """Ticker -> `TickerSeries`, fed from a news store or directly from feed articles."""
+
+    def __init__(self, store: Optional[NewsStore] = None):
+        self.store = store
+        self.series: Dict[str, TickerSeries] = {}
+        self._cursor = 0
+        self._lock = threading.Lock()
+
+    def refresh(self) -> int:
+        """Index the store's mention rows added since the last refresh; returns how many."""
+        if self.store is None:
+            return 0
+        with self._lock:
+            rows = self.store.mentions(self._cursor)
+            if rows:
+                self._cursor = rows[-1][0]
+                self._extend((ticker, published, relevance, score) for _, ticker, published, relevance, score in rows)
+            return len(rows)
+
+    def add_feed(self, feed: Iterable[Dict[str, Any]]) -> None:
+        """Index the `ticker_sentiment` entries of feed articles (without a store)."""
+        rows = []
+        for article in feed:
+            published = parse_published(article.get("time_published", ""))
+            for entry in article.get("ticker_sentiment") or []:
+                ticker = str(entry.get("ticker", "")).upper()
+                if ticker:
+                    rows.append((ticker, published, float(entry.get("relevance_score") or 0),
+                                 float(entry.get("ticker_sentiment_score") or 0)))
+        with self._lock:
+            self._extend(rows)
+
+    def _extend(self, rows: Iterable[Tuple[str, int, float, float]]) -> None:
+        grouped: Dict[str, List[Tuple[int, float, float]]] = {}
+        for ticker, published, relevance, score in rows:
+            grouped.setdefault(ticker, []).append((published, relevance, score))
+        for ticker, values in grouped.items():
+            times, relevance, score = zip(*values)
+            self.series.setdefault(ticker, TickerSeries()).extend(np.array(times), np.array(relevance), np.array(score))
+
+    def tickers(self) -> List[str]:
+        """Indexed tickers, most mentioned first."""
+        return sorted(self.series, key=lambda ticker: -len(self.series[ticker]))
+
+    def latest(self) -> Optional[int]:
+        """Newest indexed publish time."""
+        times = [int(series.times[-1]) for series in self.series.values() if len(series)]
+        return max(times) if times else None
@@ -1,47 +1,400 @@
 from crewai.tools import BaseTool
-from typing import Type
+from typing import Any, Dict, List, Mapping, Optional, Type
 from pydantic import BaseModel, Field
+import json
+import time
+
+import numpy as np
+
+from .alpha_vantage import NETWORK_ERRORS, AlphaVantageRateLimitError, alpha_vantage_client
+from .backtest import StrategySpec, run_backtest
+from .cross_rates import parse_pair
+from .forex_data import cross_rate_engine
+from .ohlc_store import default_ohlc_store
+from .optimization import apply_parameters, optimize, parameter_sets
+from .output import OutputProfile, render
+from .risk import (
+    DEFAULT_LEVERAGE,
+    MAX_CORRELATED_RISK_PERCENT,
+    MAX_CURRENCY_RISK_PERCENT,
+    MAX_PORTFOLIO_RISK_PERCENT,
+    RateBook,
+    TradeRequest,
+    allocate,
+    kelly_fraction,
+    monte_carlo,
+    pair_correlations,
+    position_size,
+)
+
+
+# Compact output drops conversion details; csv mode sends one row per position
+RISK_PROFILE = OutputProfile(
+    drop=("conversion", "pip_value_per_standard_lot", "positions.*.conversion", "positions.*.pip_value_per_standard_lot"),
+    tables=("positions",),
+)
+# Compact output drops per-trade sweep metrics detail; csv mode tabulates trades and rankings
+VALIDATOR_PROFILE = OutputProfile(
+    drop=("sweep.top.*.metrics.exit_reasons", "sweep.walk_forward.folds.*.test_metrics.exit_reasons"),
+    tables=("recent_trades", "sweep.top", "sweep.walk_forward.folds"),
+)
+# Risk per trade above this percentage of the balance is flagged by the calculator and the validator
+MAX_RISK_PERCENT = 2.0
 
 
 class RiskCalculatorInput(BaseModel):
     """Input schema for risk calculator."""
-    entry_price: float = Field(..., description="Entry price for the trade")
-    stop_loss: float = Field(..., description="Stop loss price")
+    entry_price: float = Field(default=0.0, description="Entry price for the trade")
+    stop_loss: float = Field(default=0.0, description="Stop loss price")
     account_balance: float = Field(..., description="Account balance")
     risk_percentage: float = Field(default=2.0, description="Risk percentage per trade")
+    pair: str = Field(default="EUR/USD", description="Currency or crypto pair of the trade (e.g., 'EUR/USD', 'USD/JPY')")
+    take_profit: float = Field(default=0.0, description="Optional take profit price for the risk-reward ratio")
+    account_currency: str = Field(default="USD", description="Currency of the account balance")
+    leverage: float = Field(default=30.0, description="Account leverage used for margin requirements (e.g., 30 for 30:1)")
+    trades: str = Field(
+        default="",
+        description=(
+            "Optional JSON list of candidate trades sized together in priority order, e.g. "
+            "[{\"pair\": \"EUR/USD\", \"entry_price\": 1.085, \"stop_loss\": 1.08, \"take_profit\": 1.095}]; "
+            "replaces the single-trade fields"
+        )
+    )
+    rates: str = Field(default="", description="Optional JSON conversion rates, e.g. {\"USD/JPY\": 150.2}")
+    max_portfolio_risk: float = Field(default=6.0, description="Batch mode: cap on total risk, percent of balance")
+    max_currency_risk: float = Field(default=4.0, description="Batch mode: cap on risk added to one currency, percent of balance")
+    max_correlated_risk: float = Field(default=4.0, description="Batch mode: cap on risk across correlated positions, percent of balance")
 
 
 class RiskCalculator(BaseTool):
     name: str = "risk_calculator"
     description: str = (
         "Calculate position sizing, risk-reward ratios, and risk management "
-        "parameters for trading strategies."
+        "parameters for trading strategies. Converts pip values and risk into the account "
+        "currency, reports margin requirements, and sizes a batch of trades against one "
+        "account with portfolio risk, currency exposure and correlation caps."
     )
     args_schema: Type[BaseModel] = RiskCalculatorInput
+    output_mode: Optional[str] = None
+    store: Any = None
+
+    def _run(
+        self,
+        entry_price: float = 0.0,
+        stop_loss: float = 0.0,
+        account_balance: float = 0.0,
+        risk_percentage: float = 2.0,
+        pair: str = "EUR/USD",
+        take_profit: float = 0.0,
+        account_currency: str = "USD",
+        leverage: float = DEFAULT_LEVERAGE,
+        trades: str = "",
+        rates: str = "",
+        max_portfolio_risk: float = MAX_PORTFOLIO_RISK_PERCENT,
+        max_currency_risk: float = MAX_CURRENCY_RISK_PERCENT,
+        max_correlated_risk: float = MAX_CORRELATED_RISK_PERCENT,
+    ) -> str:
+        """Size one trade, or a batch of trades under portfolio caps, in the account currency"""
+        try:
+            if account_balance <= 0:
+                raise ValueError("account_balance must be positive")
+            if trades:
+                batch = json.loads(trades) if isinstance(trades, str) else list(trades)
+                if not isinstance(batch, list) or not batch:
+                    raise ValueError("trades must be a non-empty JSON list")
+                requests = [TradeRequest.parse(trade) for trade in batch]
+            else:
+                requests = [TradeRequest.parse(
+                    {"entry_price": entry_price, "stop_loss": stop_loss, "take_profit": take_profit or None}, pair
+                )]
+            account = account_currency.strip().upper()
+            book = self._rate_book(rates, requests)
+        except (ValueError, TypeError, AttributeError) as e:
+            return json.dumps({"error": f"Invalid input: {str(e)}", "success": False})
+
+        try:
+            if not trades:
+                trade = requests[0]
+                result = position_size(trade, account_balance * risk_percentage / 100.0, account, book, leverage)
+                result["risk_percent"] = round(100.0 * result["risk_amount"] / account_balance, 4)
+                result["warnings"] = self._warnings(result, risk_percentage, account_balance)
+            else:
+                self.store = self.store or default_ohlc_store()
+                correlations, source = pair_correlations([t.pair for t in requests], self.store)
+                result = allocate(
+                    requests, account_balance, account, book,
+                    risk_percent=risk_percentage,
+                    leverage=leverage,
+                    max_portfolio_risk=max_portfolio_risk,
+                    max_currency_risk=max_currency_risk,
+                    max_correlated_risk=max_correlated_risk,
+                    correlations=correlations,
+                )
+                result["correlation_source"] = source
+        except (ValueError, AlphaVantageRateLimitError, *NETWORK_ERRORS) as e:
+            return json.dumps({"error": f"Risk calculation failed: {str(e)}", "success": False})
+        except Exception as e:
+            return json.dumps({"error": f"Risk calculation error: {str(e)}", "success": False})
+
+        result.update({"account_balance": account_balance, "account_currency": account, "leverage": leverage, "success": True})
+        return render(result, RISK_PROFILE, self.output_mode)
+
+    @staticmethod
+    def _rate_book(rates: str, requests: List[TradeRequest]) -> RateBook:
+        """Given rates first, then the trades' own prices, then cached and (with an API key) live quotes."""
+        given = json.loads(rates) if isinstance(rates, str) and rates else dict(rates or {})
+        book = RateBook(
+            lookup=cross_rate_engine.lookup,
+            fetch=cross_rate_engine.get if alpha_vantage_client.api_key else None,
+        )
+        for symbol, rate in given.items():
+            book.add(parse_pair(symbol), float(rate))
+        for trade in requests:
+            book.add(trade.pair, trade.entry)
+        return book
 
-    def _run(self, entry_price: float, stop_loss: float, account_balance: float, risk_percentage: float = 2.0) -> str:
-        """Placeholder for risk calculator - to be implemented in task 2.3"""
-        return f"Risk calculator for entry: {entry_price}, SL: {stop_loss} - Implementation pending in task 2.3"
+    @staticmethod
+    def _warnings(position: Dict[str, Any], risk_percentage: float, balance: float) -> List[str]:
+        warnings = []
+        if risk_percentage > MAX_RISK_PERCENT:
+            warnings.append(f"Risk per trade of {risk_percentage}% exceeds {MAX_RISK_PERCENT}%")
+        if position.get("risk_reward") is not None and position["risk_reward"] < 1:
+            warnings.append(f"Reward:risk of {position['risk_reward']} is below 1")
+        if position["units"] == 0:
+            warnings.append("Risk budget is below one micro lot")
+        if position["margin_required"] > balance:
+            warnings.append("Margin required exceeds the account balance")
+        return warnings
+
+
+class MonteCarloInput(BaseModel):
+    """Input schema for Monte Carlo risk simulator."""
+    win_rate: float = Field(default=0.5, description="Probability of a winning trade (0-1)")
+    avg_win: float = Field(default=1.0, description="Average win in R (multiples of the amount risked)")
+    avg_loss: float = Field(default=1.0, description="Average loss in R")
+    risk_percentage: float = Field(default=1.0, description="Risk percentage per trade")
+    trades: int = Field(default=200, description="Trades per simulated equity path")
+    paths: int = Field(default=10000, description="Number of simulated equity paths (up to 1,000,000)")
+    ruin_percent: float = Field(default=50.0, description="Loss of the starting balance, in percent, that counts as ruin")
+    compounding: bool = Field(default=True, description="Risk a percentage of current equity (True) or of the starting balance (False)")
+    r_multiples: str = Field(
+        default="",
+        description="Optional JSON list of trade results in R (e.g. from a backtest) to resample instead of win_rate/avg_win/avg_loss"
+    )
+    seed: Optional[int] = Field(default=None, description="Random seed for reproducible results")
+
+
+MAX_PATHS = 1_000_000
+
+
+class MonteCarloRiskSimulator(BaseTool):
+    name: str = "monte_carlo_risk_simulator"
+    description: str = (
+        "Simulate thousands of equity paths from a strategy's win rate, payoffs and risk per "
+        "trade to estimate the risk of ruin, drawdown quantiles and the spread of final returns."
+    )
+    args_schema: Type[BaseModel] = MonteCarloInput
+    output_mode: Optional[str] = None
+
+    def _run(
+        self,
+        win_rate: float = 0.5,
+        avg_win: float = 1.0,
+        avg_loss: float = 1.0,
+        risk_percentage: float = 1.0,
+        trades: int = 200,
+        paths: int = 10000,
+        ruin_percent: float = 50.0,
+        compounding: bool = True,
+        r_multiples: str = "",
+        seed: Optional[int] = None,
+    ) -> str:
+        """Run a vectorized Monte Carlo simulation of the strategy's equity paths"""
+        try:
+            samples = None
+            if r_multiples:
+                samples = json.loads(r_multiples) if isinstance(r_multiples, str) else list(r_multiples)
+                samples = [float(r) for r in samples]
+            if avg_win <= 0 or avg_loss <= 0 or not 0 < ruin_percent <= 100 or risk_percentage <= 0:
+                raise ValueError("avg_win, avg_loss and risk_percentage must be positive and 0 < ruin_percent <= 100")
+            began = time.perf_counter()
+            result = monte_carlo(
+                win_rate=win_rate, avg_win=avg_win, avg_loss=avg_loss, risk_percent=risk_percentage,
+                trades=int(trades), paths=min(int(paths), MAX_PATHS), ruin_percent=ruin_percent,
+                compounding=compounding, r_multiples=samples, seed=seed,
+            )
+        except (ValueError, TypeError) as e:
+            return json.dumps({"error": f"Invalid simulation input: {str(e)}", "success": False})
+
+        if samples is None:
+            result["expectancy_r"] = round(win_rate * avg_win - (1 - win_rate) * avg_loss, 4)
+            result["kelly_percent"] = round(100.0 * kelly_fraction(win_rate, avg_win, avg_loss), 2)
+        else:
+            result["expectancy_r"] = round(float(np.mean(samples)), 4)
+            result["resampled_trades"] = len(samples)
+        result["trades_per_path"] = int(trades)
+        result["elapsed_seconds"] = round(time.perf_counter() - began, 3)
+        result["success"] = True
+        return render(result, OutputProfile(), self.output_mode)
 
 
 class StrategyValidatorInput(BaseModel):
     """Input schema for strategy validator."""
-    strategy_data: str = Field(..., description="JSON string containing strategy details")
+    strategy_data: str = Field(
+        ...,
+        description=(
+            "JSON strategy: pair, timeframe, direction ('long'/'short'), entry_rules and exit_rules "
+            "(e.g. [\"ema_12 crosses_above ema_26\", \"rsi_14 < 70\"]), stop_loss and take_profit "
+            "({\"pips\": 30}, {\"percent\": 1}, {\"atr\": 2} or {\"rr\": 2}), risk_percent; "
+            "optional start/end dates (YYYY-MM-DD) and inline ohlc columns"
+        )
+    )
+    sweep: str = Field(
+        default="",
+        description=(
+            "Optional JSON parameter sweep over {placeholders} in the strategy "
+            "(e.g. \"ema_{fast} crosses_above ema_{slow}\"): parameters ({\"fast\": [5, 10], "
+            "\"slow\": {\"min\": 20, \"max\": 60, \"step\": 10}}), constraints ([\"fast < slow\"]), "
+            "samples, objective, min_trades, top, max_workers and walk_forward "
+            "({\"folds\": 4, \"train_fraction\": 0.7, \"anchored\": false})"
+        )
+    )
+
+
+# Backtest thresholds for the overall assessment
+MIN_TRADES = 30
+MAX_DRAWDOWN_PCT = 25.0
+
+
+def _epoch(value: Optional[str]) -> Optional[int]:
+    return None if not value else int(np.datetime64(str(value), "s").astype(np.int64))
+
+
+def strategy_checks(spec: StrategySpec) -> List[str]:
+    """Risk-management warnings that do not need a backtest."""
+    warnings = []
+    if not spec.stop_loss:
+        warnings.append("No stop-loss defined")
+    if spec.units is None and spec.risk_percent > MAX_RISK_PERCENT:
+        warnings.append(f"Risk per trade of {spec.risk_percent}% exceeds {MAX_RISK_PERCENT}%")
+    stop, target = spec.stop_loss, spec.take_profit
+    for kind in ("price_distance", "pips", "percent", "atr"):
+        if kind in stop and kind in target and stop[kind] > 0 and target[kind] / stop[kind] < 1:
+            warnings.append(f"Reward:risk of {target[kind] / stop[kind]:.2f} is below 1")
+    if "rr" in target and target["rr"] < 1:
+        warnings.append(f"Reward:risk of {target['rr']} is below 1")
+    return warnings
+
+
+def assess(metrics: Dict[str, Any]) -> Dict[str, Any]:
+    """Overall verdict and the reasons behind it from backtest metrics."""
+    reasons = []
+    if metrics["trade_count"] < MIN_TRADES:
+        reasons.append(f"Only {metrics['trade_count']} trades; at least {MIN_TRADES} are needed for meaningful statistics")
+    if metrics["expectancy"] <= 0:
+        reasons.append("Non-positive expectancy")
+    if metrics["max_drawdown_pct"] > MAX_DRAWDOWN_PCT:
+        reasons.append(f"Max drawdown {metrics['max_drawdown_pct']}% exceeds {MAX_DRAWDOWN_PCT}%")
+    if metrics["expectancy"] <= 0 and metrics["trade_count"] >= MIN_TRADES:
+        verdict = "unprofitable"
+    else:
+        verdict = "viable" if not reasons else "needs_review"
+    return {"verdict": verdict, "reasons": reasons}
 
 
 class StrategyValidator(BaseTool):
     name: str = "strategy_validator"
     description: str = (
         "Validate trading strategies against market conditions, "
-        "risk parameters, and technical analysis principles."
+        "risk parameters, and technical analysis principles. Backtests entry/exit rules, "
+        "stop-loss, take-profit and position sizing over stored OHLC history and reports "
+        "win rate, expectancy, max drawdown, Sharpe ratio and trade count. With a sweep, "
+        "optimizes strategy parameters in parallel, optionally with walk-forward validation."
     )
     args_schema: Type[BaseModel] = StrategyValidatorInput
+    output_mode: Optional[str] = None
+    store: Any = None
+
+    def _run(self, strategy_data: str, sweep: str = "") -> str:
+        """Check risk parameters and backtest (or optimize) the strategy over stored or inline history"""
+        try:
+            strategy = json.loads(strategy_data) if isinstance(strategy_data, str) else dict(strategy_data)
+            if not isinstance(strategy, dict):
+                raise ValueError("Strategy must be a JSON object")
+            if sweep:
+                return self._sweep(strategy, json.loads(sweep) if isinstance(sweep, str) else dict(sweep))
+            spec = StrategySpec.parse(strategy)
+        except (ValueError, TypeError) as e:
+            return json.dumps({"error": f"Invalid strategy: {str(e)}", "success": False})
+
+        result: Dict[str, Any] = {"checks": strategy_checks(spec), "success": True}
+        if not spec.entry:
+            result["backtest"] = None
+            result["note"] = "No entry_rules given; only risk parameters were checked"
+            return render(result, VALIDATOR_PROFILE, self.output_mode)
+
+        try:
+            ohlc = self._history(strategy)
+            if len(ohlc["close"]) < 2:
+                raise ValueError("Not enough OHLC history to backtest")
+            trades, metrics = run_backtest(ohlc, strategy)
+        except (ValueError, KeyError) as e:
+            return json.dumps({**result, "error": f"Backtest failed: {str(e)}", "success": False})
+
+        result["data"] = {"bars": len(ohlc["close"])}
+        if ohlc.get("time") is not None and len(ohlc["time"]):
+            result["data"]["from"], result["data"]["to"] = (
+                str(np.datetime64(int(ohlc["time"][index]), "s")) for index in (0, -1)
+            )
+        result["backtest"] = metrics
+        result["assessment"] = assess(metrics)
+        result["recent_trades"] = [
+            {"entry_bar": int(trades.entry_bar[i]), "exit_bar": int(trades.exit_bar[i]),
+             "entry": round(float(trades.entry_price[i]), 6), "exit": round(float(trades.exit_price[i]), 6),
+             "pnl": round(float(trades.pnl[i]), 2), "reason": trades.reason[i]}
+            for i in range(max(0, len(trades) - 5), len(trades))
+        ]
+        return render(result, VALIDATOR_PROFILE, self.output_mode)
+
+    def _sweep(self, template: Dict[str, Any], sweep: Dict[str, Any]) -> str:
+        """Optimize the {placeholder} parameters of a strategy template"""
+        candidates = parameter_sets(
+            sweep.get("parameters") or {}, sweep.get("samples"), sweep.get("constraints") or (), int(sweep.get("seed", 0))
+        )
+        if not candidates:
+            raise ValueError("The sweep has no parameter sets; give parameters (and satisfiable constraints)")
+        # Risk checks see the template with its first parameter set filled in
+        result: Dict[str, Any] = {
+            "checks": strategy_checks(StrategySpec.parse(apply_parameters(template, candidates[0]))),
+            "success": True,
+        }
+        try:
+            ohlc = self._history(template)
+            if len(ohlc["close"]) < 2:
+                raise ValueError("Not enough OHLC history to backtest")
+            result["data"] = {"bars": len(ohlc["close"])}
+            result["sweep"] = optimize(ohlc, template, sweep, candidates)
+        except (ValueError, KeyError) as e:
+            return json.dumps({**result, "error": f"Sweep failed: {str(e)}", "success": False})
+        return render(result, VALIDATOR_PROFILE, self.output_mode)
 
-    def _run(self, strategy_data: str) -> str:
-        """Placeholder for strategy validator - to be implemented in task 2.3"""
-        return f"Strategy validator - Implementation pending in task 2.3"
+    def _history(self, strategy: Mapping[str, Any]) -> Dict[str, np.ndarray]:
+        """Inline `ohlc` columns, or the stored bars for pair/timeframe between start and end."""
+        if strategy.get("ohlc"):
+            return {column: np.asarray(values, dtype=float if column != "time" else np.int64)
+                    for column, values in strategy["ohlc"].items()}
+        if not strategy.get("pair"):
+            raise ValueError("Give a pair with stored history (see historical_ohlc_fetcher) or inline ohlc data")
+        base, quote = parse_pair(strategy["pair"])
+        timeframe = str(strategy.get("timeframe", "daily")).strip().lower()
+        self.store = self.store or default_ohlc_store()
+        data = self.store.read(f"{base}/{quote}", timeframe, _epoch(strategy.get("start")), _epoch(strategy.get("end")))
+        if not len(data["time"]):
+            raise ValueError(f"No stored {timeframe} history for {base}/{quote}; fetch it with historical_ohlc_fetcher first")
+        return data
 
 
 # Create tool instances
 risk_calculator = RiskCalculator()
+monte_carlo_risk_simulator = MonteCarloRiskSimulator()
 strategy_validator = StrategyValidator()
\ No newline at end of file
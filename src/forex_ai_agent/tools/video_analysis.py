@@ -1,17 +1,20 @@
 from crewai.tools import BaseTool
-from typing import Type, Any, Dict, List
+from typing import Type, Any, Dict, Iterable, List, Optional, Tuple
 from pydantic import BaseModel, Field
+import asyncio
 import base64
+from concurrent.futures import ThreadPoolExecutor
 import json
 import os
 import tempfile
 
 try:
-    from openai import OpenAI
+    from openai import AsyncOpenAI, OpenAI
     OPENAI_AVAILABLE = True
 except ImportError:
     OPENAI_AVAILABLE = False
     OpenAI = None
+    AsyncOpenAI = None
 
 try:
     import cv2
@@ -22,12 +25,44 @@ except ImportError:
     cv2 = None
     np = None
 
+from .video_frames import (
+    DEFAULT_MAX_SCAN_POINTS,
+    DEFAULT_MIN_CHANGE,
+    DEFAULT_SCAN_INTERVAL,
+    DEFAULT_SEEK_GAP_THRESHOLD,
+    FRAME_SELECTIONS,
+    frame_hash,
+    iter_frames,
+    iter_keyframes,
+)
+from .video_cache import video_analysis_cache
+from .analysis_merge import merge_analyses
+from .output import OutputProfile, render
+from .chart_ocr import ChartText, extract_chart_text, format_hints, ocr_available, summarize_chart_text, tesseract_reader
+from .chart_vision import MIN_LOCAL_CANDLES, CandleSeries, extract_candles, format_candle_hints, local_analysis
+from .frame_preprocess import (
+    DEFAULT_JPEG_QUALITY,
+    DEFAULT_MAX_FRAME_BYTES,
+    DEFAULT_MAX_TILES,
+    PreparedFrame,
+    preprocess_frame,
+    upload_report,
+)
+
+
+# Focuses answered locally when an OCR engine is available: the price from chart text,
+# levels from candles read off the pixels with the OCR axis scale
+OCR_ONLY_FOCUSES = ("price",)
+PIXEL_FOCUSES = ("levels",)
+# Compact output drops run bookkeeping the strategy agent does not need
+OUTPUT_PROFILE = OutputProfile(drop=("upload", "video_path", "analysis_timestamp", "cache_hit"))
+
 
 class VideoAnalysisInput(BaseModel):
     """Input schema for video analysis tool."""
     video_path: str = Field(..., description="Path to the video file to analyze")
     max_frames: int = Field(default=10, description="Maximum number of frames to extract and analyze")
-    analysis_focus: str = Field(default="comprehensive", description="Focus of analysis: 'comprehensive', 'patterns', 'indicators', 'levels'")
+    analysis_focus: str = Field(default="comprehensive", description="Focus of analysis: 'comprehensive', 'patterns', 'indicators', 'levels', or 'price' (current price read locally from the chart text, without the LLM)")
 
 
 class VideoAnalysisTool(BaseTool):
@@ -38,37 +73,155 @@ class VideoAnalysisTool(BaseTool):
         "chart patterns, support/resistance levels, and trend analysis."
     )
     args_schema: Type[BaseModel] = VideoAnalysisInput
+    client: Any = None
+    async_client: Any = None
+    model: str = "gpt-4o"  # Use GPT-4 with vision capabilities
+    cache: Any = None
+    # Upload preprocessing: crop to the chart, fit the tile grid, bound JPEG size, pick detail per frame
+    autocrop: bool = Field(default_factory=lambda: os.getenv("FOREX_AI_FRAME_AUTOCROP", "1") != "0")
+    max_tiles: int = DEFAULT_MAX_TILES
+    jpeg_quality: int = DEFAULT_JPEG_QUALITY
+    max_frame_bytes: int = DEFAULT_MAX_FRAME_BYTES
+    frame_detail: str = Field(default_factory=lambda: os.getenv("FOREX_AI_FRAME_DETAIL", "auto"))
+    # Map-reduce mode: analyze chunks of `chunk_size` frames concurrently and merge (0 = one request)
+    chunk_size: int = Field(default_factory=lambda: int(os.getenv("FOREX_AI_VIDEO_CHUNK_SIZE", 0)))
+    max_concurrent_chunks: int = 4
+    # Local OCR pre-pass (header symbol/timeframe, price axis); None when no OCR engine is installed
+    ocr_reader: Any = None
+    # 'auto' seeks for sparse samples and decodes sequentially for dense ones
+    extraction_mode: str = Field(default_factory=lambda: os.getenv("FOREX_AI_FRAME_EXTRACTION", "auto"))
+    seek_gap_threshold: int = DEFAULT_SEEK_GAP_THRESHOLD
+    output_mode: Optional[str] = None
+    # 'scene' keeps only frames where the chart changes; 'uniform' samples evenly
+    frame_selection: str = Field(default_factory=lambda: os.getenv("FOREX_AI_FRAME_SELECTION", "scene"))
+    scene_scan_interval: float = DEFAULT_SCAN_INTERVAL
+    scene_min_change: float = DEFAULT_MIN_CHANGE
+    scene_max_scan_points: int = DEFAULT_MAX_SCAN_POINTS
 
     def __init__(self):
         super().__init__()
+        self.cache = video_analysis_cache
+        if os.getenv("FOREX_AI_OCR", "1") != "0":
+            # Resolved by _ocr_reader on first use; checking for Tesseract runs its binary
+            self.ocr_reader = "auto"
         if OPENAI_AVAILABLE and os.getenv("OPENAI_API_KEY"):
             self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+            # Shared async client; its pooled HTTP connections serve concurrent _arun calls
+            self.async_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
         else:
             self.client = None
+            self.async_client = None
 
-    def _extract_frames(self, video_path: str, max_frames: int = 10):
-        """Extract frames from video file."""
+    def _iter_frames(self, video_path: str, max_frames: int = 10):
+        """Stream sampled frames (scene-change keyframes or evenly spaced) from video file."""
         try:
-            cap = cv2.VideoCapture(video_path)
-            if not cap.isOpened():
-                raise ValueError(f"Could not open video file: {video_path}")
-            
-            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-            frame_indices = np.linspace(0, total_frames - 1, max_frames, dtype=int)
-            
-            frames = []
-            for frame_idx in frame_indices:
-                cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
-                ret, frame = cap.read()
-                if ret:
-                    frames.append(frame)
-            
-            cap.release()
-            return frames
-            
+            if self.frame_selection not in FRAME_SELECTIONS:
+                raise ValueError(f"Unknown frame selection: {self.frame_selection}. Use one of {', '.join(FRAME_SELECTIONS)}")
+            if self.frame_selection == "scene":
+                frames = iter_keyframes(video_path, max_frames, self.scene_scan_interval, self.scene_min_change,
+                                        self.extraction_mode, self.seek_gap_threshold, self.scene_max_scan_points)
+            else:
+                frames = iter_frames(video_path, max_frames, self.extraction_mode, self.seek_gap_threshold)
+            for _, frame in frames:
+                yield frame
         except Exception as e:
             raise Exception(f"Error extracting frames from video: {str(e)}")
 
+    def _extract_frames(self, video_path: str, max_frames: int = 10):
+        """Extract frames from video file."""
+        return list(self._iter_frames(video_path, max_frames))
+
+    def _encode_frames(self, frames: Iterable[Any]) -> List[str]:
+        """Encode frames as they are produced so full-resolution frames are not kept around."""
+        return [self._encode_frame_to_base64(frame) for frame in frames]
+
+    def _prepare_frames(self, video_path: str, max_frames: int) -> Tuple[List[PreparedFrame], List[str], List[ChartText]]:
+        """Stream frames from video, keeping only the preprocessed JPEGs, perceptual hashes and OCR readings."""
+        prepared, hashes, texts = [], [], []
+        for frame in self._iter_frames(video_path, max_frames):
+            if self._ocr_reader() is not None:
+                texts.append(self._read_chart_text(frame))
+            prepared.append(preprocess_frame(
+                frame,
+                autocrop=self.autocrop,
+                max_tiles=self.max_tiles,
+                jpeg_quality=self.jpeg_quality,
+                max_bytes=self.max_frame_bytes,
+                detail=self.frame_detail,
+            ))
+            hashes.append(frame_hash(frame))
+        return prepared, hashes, texts
+
+    def _ocr_reader(self) -> Any:
+        """The OCR reader, or None; "auto" selects Tesseract if it is installed."""
+        if isinstance(self.ocr_reader, str) and self.ocr_reader == "auto":
+            self.ocr_reader = tesseract_reader if ocr_available() else None
+        return self.ocr_reader
+
+    def _read_chart_text(self, frame: np.ndarray) -> ChartText:
+        try:
+            text = extract_chart_text(frame, self._ocr_reader())
+            if text.price_scale is not None:
+                text.candles = extract_candles(frame, text.price_scale)
+            return text
+        except Exception:
+            # OCR only provides hints; never fail the analysis because of it
+            return ChartText()
+
+    def _ocr_only(self, analysis_focus: str) -> bool:
+        """Whether this focus can be answered locally (OCR and pixels), without the LLM."""
+        focus = analysis_focus.strip().lower()
+        return self._ocr_reader() is not None and (focus in OCR_ONLY_FOCUSES or focus in PIXEL_FOCUSES)
+
+    @staticmethod
+    def _candle_series(chart_texts: List[ChartText]) -> Optional[CandleSeries]:
+        """Candles of the latest frame with enough of them for local levels."""
+        for text in reversed(chart_texts):
+            if text.candles is not None and len(text.candles) >= MIN_LOCAL_CANDLES:
+                return text.candles
+        return None
+
+    def _ocr_analysis(
+        self, summary: Dict[str, Any], frame_count: int, series: Optional[CandleSeries] = None
+    ) -> Dict[str, Any]:
+        """Analysis in the usual schema built from OCR readings and, when given, pixel candles."""
+        analysis = {
+            "trading_pair": summary["trading_pair"] or "Unknown",
+            "timeframe": summary["timeframe"] or "Unknown",
+            "technical_indicators": [],
+            "chart_patterns": [],
+            "support_levels": [],
+            "resistance_levels": [],
+            "trend_direction": "unknown",
+            "trend_strength": "unknown",
+            "current_price_estimate": summary["current_price"],
+            "key_observations": ["Read from chart text by local OCR; no LLM analysis was made"],
+            "confidence_score": summary["pair_agreement"],
+            "frame_analysis": {
+                "total_frames_analyzed": frame_count,
+                "consistency_across_frames": "high" if summary["pair_agreement"] >= 0.8 else "low",
+            },
+            "analysis_source": "ocr",
+            "ocr": summary,
+        }
+        if series is not None:
+            local = local_analysis(series)
+            analysis.update({
+                "technical_indicators": [f"{name}: {value}" for name, value in local["indicators"].items()],
+                "support_levels": local["support_levels"],
+                "resistance_levels": local["resistance_levels"],
+                "trend_direction": local["trend_direction"],
+                "trend_strength": local["trend_strength"],
+                "key_observations": [
+                    f"Levels and trend computed from {len(series)} candles read off the chart pixels; no LLM analysis was made"
+                ],
+                "analysis_source": "pixels",
+                "candles": series.to_dict(),
+            })
+            if analysis["current_price_estimate"] is None:
+                analysis["current_price_estimate"] = local["current_price_estimate"]
+        return analysis
+
     def _encode_frame_to_base64(self, frame) -> str:
         """Convert frame to base64 string for API."""
         try:
@@ -78,113 +231,124 @@ class VideoAnalysisTool(BaseTool):
         except Exception as e:
             raise Exception(f"Error encoding frame to base64: {str(e)}")
 
-    def _analyze_frames_with_llm(self, frames: List[np.ndarray], analysis_focus: str) -> Dict[str, Any]:
-        """Analyze frames using OpenAI's multimodal capabilities."""
+    def _analyze_frames_with_llm(
+        self, frames: List[PreparedFrame], analysis_focus: str, hints: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Analyze preprocessed frames using OpenAI's multimodal capabilities."""
         try:
-            # Convert frames to base64
-            frame_images = []
-            for i, frame in enumerate(frames):
-                frame_base64 = self._encode_frame_to_base64(frame)
-                frame_images.append({
-                    "type": "image_url",
-                    "image_url": {
-                        "url": f"data:image/jpeg;base64,{frame_base64}",
-                        "detail": "high"
-                    }
-                })
-
-            # Create comprehensive prompt for trading chart analysis
-            system_prompt = """You are an expert technical analyst specializing in trading chart analysis. 
-            Analyze the provided trading chart frames and extract detailed technical information.
-            
-            Focus on identifying:
-            1. Trading pair (e.g., BTC/USD, EUR/USD, etc.)
-            2. Timeframe (1m, 5m, 15m, 1h, 4h, 1d, etc.)
-            3. Technical indicators visible (RSI, MACD, Moving Averages, Bollinger Bands, etc.)
-            4. Chart patterns (triangles, head and shoulders, flags, pennants, wedges, etc.)
-            5. Support and resistance levels
-            6. Trend direction and strength
-            7. Key price levels and significant zones
-            8. Volume information if visible
-            
-            Provide your analysis in a structured JSON format with high accuracy and confidence scores."""
-
-            user_prompt = f"""Analyze these trading chart frames with focus on: {analysis_focus}
-            
-            Please provide a comprehensive technical analysis in the following JSON structure:
-            {{
-                "trading_pair": "string (e.g., BTC/USD)",
-                "timeframe": "string (e.g., 1h)",
-                "technical_indicators": ["array of visible indicators"],
-                "chart_patterns": [
-                    {{
-                        "pattern": "pattern name",
-                        "confidence": 0.0-1.0,
-                        "description": "brief description"
-                    }}
-                ],
-                "support_levels": [array of price levels],
-                "resistance_levels": [array of price levels],
-                "trend_direction": "bullish/bearish/sideways",
-                "trend_strength": "strong/moderate/weak",
-                "current_price_estimate": float,
-                "key_observations": ["array of important notes"],
-                "confidence_score": 0.0-1.0,
-                "frame_analysis": {{
-                    "total_frames_analyzed": int,
-                    "consistency_across_frames": "high/medium/low"
-                }}
-            }}
-            
-            Be precise and only include information you can clearly observe in the charts."""
-
-            # Prepare messages for API call
-            messages = [
-                {"role": "system", "content": system_prompt},
-                {
-                    "role": "user", 
-                    "content": [
-                        {"type": "text", "text": user_prompt}
-                    ] + frame_images
-                }
-            ]
-
             # Call OpenAI API with vision model
             response = self.client.chat.completions.create(
-                model="gpt-4o",  # Use GPT-4 with vision capabilities
-                messages=messages,
+                model=self.model,
+                messages=self._build_messages(frames, analysis_focus, hints),
                 max_tokens=2000,
                 temperature=0.1  # Low temperature for consistent analysis
             )
+            return self._parse_analysis(response.choices[0].message.content)
 
-            # Parse the response
-            analysis_text = response.choices[0].message.content
-            
-            # Try to extract JSON from the response
-            try:
-                # Find JSON in the response
-                start_idx = analysis_text.find('{')
-                end_idx = analysis_text.rfind('}') + 1
-                if start_idx != -1 and end_idx != 0:
-                    json_str = analysis_text[start_idx:end_idx]
-                    analysis_result = json.loads(json_str)
-                else:
-                    # Fallback: create structured response from text
-                    analysis_result = {
-                        "trading_pair": "Unknown",
-                        "timeframe": "Unknown",
-                        "technical_indicators": [],
-                        "chart_patterns": [],
-                        "support_levels": [],
-                        "resistance_levels": [],
-                        "trend_direction": "unknown",
-                        "trend_strength": "unknown",
-                        "key_observations": [analysis_text],
-                        "confidence_score": 0.5,
-                        "raw_analysis": analysis_text
-                    }
-            except json.JSONDecodeError:
-                # Fallback response if JSON parsing fails
+        except Exception as e:
+            return self._analysis_error(e)
+
+    async def _aanalyze_frames_with_llm(
+        self, frames: List[PreparedFrame], analysis_focus: str, hints: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Async equivalent of `_analyze_frames_with_llm`."""
+        try:
+            response = await self.async_client.chat.completions.create(
+                model=self.model,
+                messages=self._build_messages(frames, analysis_focus, hints),
+                max_tokens=2000,
+                temperature=0.1
+            )
+            return self._parse_analysis(response.choices[0].message.content)
+
+        except Exception as e:
+            return self._analysis_error(e)
+
+    def _build_messages(
+        self, frames: List[PreparedFrame], analysis_focus: str, hints: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Build the chat messages (prompt plus base64 frames) for a chart analysis request."""
+        frame_images = []
+        for frame in frames:
+            frame_images.append({
+                "type": "image_url",
+                "image_url": {
+                    "url": f"data:image/jpeg;base64,{frame.data}",
+                    "detail": frame.detail
+                }
+            })
+
+        # Create comprehensive prompt for trading chart analysis
+        system_prompt = """You are an expert technical analyst specializing in trading chart analysis. 
+        Analyze the provided trading chart frames and extract detailed technical information.
+        
+        Focus on identifying:
+        1. Trading pair (e.g., BTC/USD, EUR/USD, etc.)
+        2. Timeframe (1m, 5m, 15m, 1h, 4h, 1d, etc.)
+        3. Technical indicators visible (RSI, MACD, Moving Averages, Bollinger Bands, etc.)
+        4. Chart patterns (triangles, head and shoulders, flags, pennants, wedges, etc.)
+        5. Support and resistance levels
+        6. Trend direction and strength
+        7. Key price levels and significant zones
+        8. Volume information if visible
+        
+        Provide your analysis in a structured JSON format with high accuracy and confidence scores."""
+
+        user_prompt = f"""Analyze these trading chart frames with focus on: {analysis_focus}
+        
+        Please provide a comprehensive technical analysis in the following JSON structure:
+        {{
+            "trading_pair": "string (e.g., BTC/USD)",
+            "timeframe": "string (e.g., 1h)",
+            "technical_indicators": ["array of visible indicators"],
+            "chart_patterns": [
+                {{
+                    "pattern": "pattern name",
+                    "confidence": 0.0-1.0,
+                    "description": "brief description"
+                }}
+            ],
+            "support_levels": [array of price levels],
+            "resistance_levels": [array of price levels],
+            "trend_direction": "bullish/bearish/sideways",
+            "trend_strength": "strong/moderate/weak",
+            "current_price_estimate": float,
+            "key_observations": ["array of important notes"],
+            "confidence_score": 0.0-1.0,
+            "frame_analysis": {{
+                "total_frames_analyzed": int,
+                "consistency_across_frames": "high/medium/low"
+            }}
+        }}
+        
+        Be precise and only include information you can clearly observe in the charts."""
+        if hints:
+            user_prompt += f"\n\n{hints}"
+
+        # Prepare messages for API call
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {
+                "role": "user", 
+                "content": [
+                    {"type": "text", "text": user_prompt}
+                ] + frame_images
+            }
+        ]
+        return messages
+
+    def _parse_analysis(self, analysis_text: str) -> Dict[str, Any]:
+        """Extract the JSON analysis from the model response, with structured fallbacks."""
+        # Try to extract JSON from the response
+        try:
+            # Find JSON in the response
+            start_idx = analysis_text.find('{')
+            end_idx = analysis_text.rfind('}') + 1
+            if start_idx != -1 and end_idx != 0:
+                json_str = analysis_text[start_idx:end_idx]
+                analysis_result = json.loads(json_str)
+            else:
+                # Fallback: create structured response from text
                 analysis_result = {
                     "trading_pair": "Unknown",
                     "timeframe": "Unknown",
@@ -194,87 +358,351 @@ class VideoAnalysisTool(BaseTool):
                     "resistance_levels": [],
                     "trend_direction": "unknown",
                     "trend_strength": "unknown",
-                    "key_observations": ["Analysis completed but JSON parsing failed"],
-                    "confidence_score": 0.3,
-                    "raw_analysis": analysis_text,
-                    "error": "JSON parsing failed"
+                    "key_observations": [analysis_text],
+                    "confidence_score": 0.5,
+                    "raw_analysis": analysis_text
                 }
-
-            return analysis_result
-
-        except Exception as e:
-            return {
-                "error": f"LLM analysis failed: {str(e)}",
-                "trading_pair": "Error",
-                "timeframe": "Error",
+        except json.JSONDecodeError:
+            # Fallback response if JSON parsing fails
+            analysis_result = {
+                "trading_pair": "Unknown",
+                "timeframe": "Unknown",
                 "technical_indicators": [],
                 "chart_patterns": [],
                 "support_levels": [],
                 "resistance_levels": [],
-                "trend_direction": "error",
-                "trend_strength": "error",
-                "key_observations": [f"Analysis failed: {str(e)}"],
-                "confidence_score": 0.0
+                "trend_direction": "unknown",
+                "trend_strength": "unknown",
+                "key_observations": ["Analysis completed but JSON parsing failed"],
+                "confidence_score": 0.3,
+                "raw_analysis": analysis_text,
+                "error": "JSON parsing failed"
             }
 
+        return analysis_result
+
+    def _analysis_error(self, e: Exception) -> Dict[str, Any]:
+        return {
+            "error": f"LLM analysis failed: {str(e)}",
+            "trading_pair": "Error",
+            "timeframe": "Error",
+            "technical_indicators": [],
+            "chart_patterns": [],
+            "support_levels": [],
+            "resistance_levels": [],
+            "trend_direction": "error",
+            "trend_strength": "error",
+            "key_observations": [f"Analysis failed: {str(e)}"],
+            "confidence_score": 0.0
+        }
+
     def _run(self, video_path: str, max_frames: int = 10, analysis_focus: str = "comprehensive") -> str:
         """Execute the video analysis tool."""
         try:
-            # Check dependencies
-            if not CV2_AVAILABLE:
-                return json.dumps({
-                    "error": "OpenCV (cv2) is not installed. Please install with: pip install opencv-python",
-                    "success": False
-                })
-            
-            if not OPENAI_AVAILABLE:
-                return json.dumps({
-                    "error": "OpenAI library is not installed. Please install with: pip install openai",
-                    "success": False
-                })
+            error = self._validate_request(video_path, require_client=not self._ocr_only(analysis_focus))
+            if error:
+                return error
+
+            # Same recording and settings as an earlier run: no extraction or LLM call
+            video_key = self._video_key(self.cache.video_digest(video_path), max_frames, analysis_focus)
+            cached = self.cache.get(video_key)
+            if cached is not None:
+                return self._finalize(cached, cached.get("frames_processed", 0), video_path, "video")
+
+            # Stream frames from video, keeping only the encoded JPEGs
+            frames, frame_hashes, chart_texts = self._prepare_frames(video_path, max_frames)
             
-            if not self.client:
+            if not frames:
                 return json.dumps({
-                    "error": "OpenAI API key not configured. Please set OPENAI_API_KEY environment variable",
+                    "error": "No frames could be extracted from video",
                     "success": False
                 })
 
-            # Validate video file exists
-            if not os.path.exists(video_path):
-                return json.dumps({
-                    "error": f"Video file not found: {video_path}",
-                    "success": False
-                })
+            ocr = summarize_chart_text(chart_texts) if chart_texts else None
+            series = self._candle_series(chart_texts)
+            analysis_result, error = self._without_llm(ocr, series, analysis_focus, len(frames))
+            if error:
+                return error
+
+            # Same or near-identical frames as an earlier recording: reuse its analysis
+            cache_hit = None
+            if analysis_result is None:
+                analysis_result, cache_hit = self._cached_frames(frame_hashes, analysis_focus)
+            upload = None
+            if analysis_result is None:
+                hints = self._hints(ocr, series)
+                # Analyze frames with multimodal LLM
+                if self._is_chunked(frames):
+                    analysis_result, upload = self._analyze_chunks(frames, frame_hashes, analysis_focus, hints)
+                else:
+                    analysis_result = self._analyze_frames_with_llm(frames, analysis_focus, hints)
+                    upload = self._upload_report([frames], analysis_focus)
+
+            self._store(analysis_result, len(frames), video_key, frame_hashes, analysis_focus)
+            return self._finalize(analysis_result, len(frames), video_path, cache_hit, upload)
+
+        except Exception as e:
+            return self._run_error(e, video_path)
+
+    async def _arun(self, video_path: str, max_frames: int = 10, analysis_focus: str = "comprehensive") -> str:
+        """Async equivalent of `_run`; hashing and frame extraction run in a worker thread."""
+        try:
+            error = self._validate_request(video_path, require_client=not self._ocr_only(analysis_focus))
+            if error:
+                return error
+
+            digest = await asyncio.to_thread(self.cache.video_digest, video_path)
+            video_key = self._video_key(digest, max_frames, analysis_focus)
+            cached = self.cache.get(video_key)
+            if cached is not None:
+                return self._finalize(cached, cached.get("frames_processed", 0), video_path, "video")
+
+            frames, frame_hashes, chart_texts = await asyncio.to_thread(self._prepare_frames, video_path, max_frames)
 
-            # Extract frames from video
-            frames = self._extract_frames(video_path, max_frames)
-            
             if not frames:
                 return json.dumps({
                     "error": "No frames could be extracted from video",
                     "success": False
                 })
 
-            # Analyze frames with multimodal LLM
-            analysis_result = self._analyze_frames_with_llm(frames, analysis_focus)
-            
-            # Add metadata
-            analysis_result.update({
-                "success": True,
-                "frames_processed": len(frames),
-                "video_path": video_path,
-                "analysis_timestamp": "2024-01-01T00:00:00Z"  # You might want to use actual timestamp
-            })
+            ocr = summarize_chart_text(chart_texts) if chart_texts else None
+            series = self._candle_series(chart_texts)
+            analysis_result, error = self._without_llm(ocr, series, analysis_focus, len(frames))
+            if error:
+                return error
 
-            return json.dumps(analysis_result, indent=2)
+            cache_hit = None
+            if analysis_result is None:
+                analysis_result, cache_hit = self._cached_frames(frame_hashes, analysis_focus)
+            upload = None
+            if analysis_result is None:
+                hints = self._hints(ocr, series)
+                if self._is_chunked(frames):
+                    analysis_result, upload = await self._aanalyze_chunks(frames, frame_hashes, analysis_focus, hints)
+                else:
+                    analysis_result = await self._aanalyze_frames_with_llm(frames, analysis_focus, hints)
+                    upload = self._upload_report([frames], analysis_focus)
+
+            self._store(analysis_result, len(frames), video_key, frame_hashes, analysis_focus)
+            return self._finalize(analysis_result, len(frames), video_path, cache_hit, upload)
 
         except Exception as e:
-            error_result = {
-                "error": f"Video analysis failed: {str(e)}",
-                "success": False,
-                "video_path": video_path
-            }
-            return json.dumps(error_result, indent=2)
+            return self._run_error(e, video_path)
+
+    def _without_llm(
+        self,
+        ocr: Optional[Dict[str, Any]],
+        series: Optional[CandleSeries],
+        analysis_focus: str,
+        frame_count: int,
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        Answer OCR and pixel focuses locally. Returns (analysis, None) when the
+        local readings suffice, (None, error payload) when the LLM is needed but
+        no client is configured, and (None, None) to go on with the LLM.
+        """
+        focus = analysis_focus.strip().lower()
+        if self._ocr_reader() is not None and ocr:
+            if focus in OCR_ONLY_FOCUSES and ocr["current_price"] is not None:
+                return self._ocr_analysis(ocr, frame_count), None
+            if focus in PIXEL_FOCUSES and series is not None:
+                return self._ocr_analysis(ocr, frame_count, series), None
+        if not self.client:
+            return None, self._missing_client_error()
+        return None, None
+
+    @staticmethod
+    def _hints(ocr: Optional[Dict[str, Any]], series: Optional[CandleSeries]) -> Optional[str]:
+        hints = [hint for hint in (format_hints(ocr) if ocr else None, format_candle_hints(series)) if hint]
+        return " ".join(hints) or None
+
+    def _request_settings(self) -> Dict[str, Any]:
+        """Settings that change the request sent to the LLM for a given set of frames."""
+        return {
+            "autocrop": self.autocrop,
+            "max_tiles": self.max_tiles,
+            "jpeg_quality": self.jpeg_quality,
+            "max_frame_bytes": self.max_frame_bytes,
+            "frame_detail": self.frame_detail,
+            "ocr_hints": self._ocr_reader() is not None,
+        }
+
+    def _video_key(self, digest: str, max_frames: int, analysis_focus: str) -> str:
+        # Selection settings decide which frames are sent; chunking changes how they are analyzed
+        settings = {
+            **self._request_settings(),
+            "frame_selection": self.frame_selection,
+            "scene_scan_interval": self.scene_scan_interval,
+            "scene_min_change": self.scene_min_change,
+            "scene_max_scan_points": self.scene_max_scan_points,
+            "chunk_size": self.chunk_size,
+        }
+        return self.cache.video_key(digest, max_frames, analysis_focus, self.model, self.cache.settings_digest(settings))
+
+    def _cached_frames(
+        self, frame_hashes: List[str], analysis_focus: str
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        settings = self.cache.settings_digest(self._request_settings())
+        return self.cache.get_frames(frame_hashes, analysis_focus, self.model, settings)
+
+    def _store_frames(self, frame_hashes: List[str], analysis_focus: str, analysis_result: Dict[str, Any]) -> None:
+        settings = self.cache.settings_digest(self._request_settings())
+        self.cache.set_frames(frame_hashes, analysis_focus, self.model, settings, analysis_result)
+
+    def _is_chunked(self, frames: List[PreparedFrame]) -> bool:
+        return 0 < self.chunk_size < len(frames)
+
+    def _chunks(
+        self, frames: List[PreparedFrame], frame_hashes: List[str]
+    ) -> List[Tuple[List[PreparedFrame], List[str]]]:
+        """Split frames (with their hashes) into chunks of `chunk_size`."""
+        return [
+            (frames[i:i + self.chunk_size], frame_hashes[i:i + self.chunk_size])
+            for i in range(0, len(frames), self.chunk_size)
+        ]
+
+    def _chunk_result(
+        self, chunk: List[PreparedFrame], result: Dict[str, Any], chunk_hashes: List[str], analysis_focus: str
+    ) -> Dict[str, Any]:
+        if "error" not in result:
+            result.setdefault("frame_analysis", {})["total_frames_analyzed"] = len(chunk)
+            self._store_frames(chunk_hashes, analysis_focus, result)
+        return result
+
+    def _analyze_chunks(
+        self, frames: List[PreparedFrame], frame_hashes: List[str], analysis_focus: str, hints: Optional[str] = None
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Map-reduce analysis: chunks are analyzed concurrently through a bounded
+        pool and merged. Each chunk is cached by its frame hashes, so chunks
+        shared with an earlier recording are not re-analyzed and a failed
+        chunk only costs a retry of that chunk.
+        """
+        uploaded: List[List[PreparedFrame]] = []
+
+        def analyze(chunk: Tuple[List[PreparedFrame], List[str]]) -> Dict[str, Any]:
+            chunk_frames, chunk_hashes = chunk
+            cached, _ = self._cached_frames(chunk_hashes, analysis_focus)
+            if cached is not None:
+                return cached
+            uploaded.append(chunk_frames)
+            result = self._analyze_frames_with_llm(chunk_frames, analysis_focus, hints)
+            return self._chunk_result(chunk_frames, result, chunk_hashes, analysis_focus)
+
+        chunks = self._chunks(frames, frame_hashes)
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_concurrent_chunks, len(chunks)))) as executor:
+            results = list(executor.map(analyze, chunks))
+        return merge_analyses(results), self._upload_report(uploaded, analysis_focus)
+
+    async def _aanalyze_chunks(
+        self, frames: List[PreparedFrame], frame_hashes: List[str], analysis_focus: str, hints: Optional[str] = None
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Async equivalent of `_analyze_chunks`, bounded by a semaphore."""
+        uploaded: List[List[PreparedFrame]] = []
+        semaphore = asyncio.Semaphore(max(1, self.max_concurrent_chunks))
+
+        async def analyze(chunk: Tuple[List[PreparedFrame], List[str]]) -> Dict[str, Any]:
+            chunk_frames, chunk_hashes = chunk
+            cached, _ = self._cached_frames(chunk_hashes, analysis_focus)
+            if cached is not None:
+                return cached
+            uploaded.append(chunk_frames)
+            async with semaphore:
+                result = await self._aanalyze_frames_with_llm(chunk_frames, analysis_focus, hints)
+            return self._chunk_result(chunk_frames, result, chunk_hashes, analysis_focus)
+
+        results = await asyncio.gather(*(analyze(chunk) for chunk in self._chunks(frames, frame_hashes)))
+        return merge_analyses(list(results)), self._upload_report(uploaded, analysis_focus)
+
+    def _upload_report(self, requests: List[List[PreparedFrame]], analysis_focus: str) -> Dict[str, Any]:
+        """Bytes and estimated tokens of the analysis requests, one frame list per request."""
+        prompt_chars = 0
+        for message in self._build_messages([], analysis_focus):
+            content = message["content"]
+            if isinstance(content, str):
+                prompt_chars += len(content)
+            else:
+                prompt_chars += sum(len(part.get("text", "")) for part in content)
+        report = upload_report([frame for frames in requests for frame in frames], prompt_chars * len(requests))
+        report["requests"] = len(requests)
+        return report
+
+    def _store(
+        self,
+        analysis_result: Dict[str, Any],
+        frame_count: int,
+        video_key: str,
+        frame_hashes: List[str],
+        analysis_focus: str,
+    ) -> None:
+        """Cache an analysis under both the video and the frames key."""
+        analysis_result["frames_processed"] = frame_count
+        if "chunk_errors" in analysis_result:
+            # Successful chunks are cached individually; retry only the failed ones next time
+            return
+        self._store_frames(frame_hashes, analysis_focus, analysis_result)
+        self.cache.set(video_key, analysis_result)
+
+    def _validate_request(self, video_path: str, require_client: bool = True) -> Optional[str]:
+        """Return an error payload if dependencies, credentials or the video are missing."""
+        # Check dependencies
+        if not CV2_AVAILABLE:
+            return json.dumps({
+                "error": "OpenCV (cv2) is not installed. Please install with: pip install opencv-python",
+                "success": False
+            })
+        
+        if not OPENAI_AVAILABLE:
+            return json.dumps({
+                "error": "OpenAI library is not installed. Please install with: pip install openai",
+                "success": False
+            })
+        
+        if require_client and not self.client:
+            return self._missing_client_error()
+
+        # Validate video file exists
+        if not os.path.exists(video_path):
+            return json.dumps({
+                "error": f"Video file not found: {video_path}",
+                "success": False
+            })
+        return None
+
+    def _missing_client_error(self) -> str:
+        return json.dumps({
+            "error": "OpenAI API key not configured. Please set OPENAI_API_KEY environment variable",
+            "success": False
+        })
+
+    def _finalize(
+        self,
+        analysis_result: Dict[str, Any],
+        frame_count: int,
+        video_path: str,
+        cache_hit: Optional[str] = None,
+        upload: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """Add run metadata to an analysis result and serialize it."""
+        if upload is not None:
+            analysis_result["upload"] = upload
+        analysis_result.update({
+            "success": True,
+            "frames_processed": frame_count,
+            "cache_hit": cache_hit,
+            "video_path": video_path,
+            "analysis_timestamp": "2024-01-01T00:00:00Z"  # You might want to use actual timestamp
+        })
+
+        return render(analysis_result, OUTPUT_PROFILE, self.output_mode, indent=2)
+
+    def _run_error(self, e: Exception, video_path: str) -> str:
+        error_result = {
+            "error": f"Video analysis failed: {str(e)}",
+            "success": False,
+            "video_path": video_path
+        }
+        return json.dumps(error_result, indent=2)
 
 
 # Create tool instance for import
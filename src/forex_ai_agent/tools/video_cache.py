@@ -0,0 +1,177 @@
+"""
+Content-addressed cache for video analysis results.
+
+The LLM analysis of a chart video is the most expensive call in the crew,
+so parsed analyses are stored in the shared on-disk cache under two kinds
+of keys:
+
+- a video key: SHA-256 of the file contents plus the analysis settings, so
+  re-running on the same recording (under any path) skips frame extraction
+  and the LLM call entirely;
+- a frames key: the perceptual hashes of the frames sent to the LLM, so a
+  re-encoded, renamed or trimmed recording that yields the same frames
+  reuses the earlier analysis.
+
+Frame hashes of recent analyses are also indexed per focus, model and
+settings. When no key matches exactly, an earlier analysis is reused if
+each frame is within a few bits (Hamming distance) of one of its frames
+and the last frames match, i.e. a recording that overlaps an analyzed one
+and shows the same latest chart state.
+
+Both keys include a digest of the settings that change the request (frame
+selection, preprocessing, OCR hints), so changing one of them never
+returns an analysis made under the old settings.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from .persistent_cache import LazyCache, PersistentCache, lazy_persistent_cache
+
+
+# Analyses of a given recording do not go stale; entries age out through LRU eviction
+DEFAULT_ANALYSIS_TTL = 30 * 24 * 3600
+# Bits of a 256-bit frame dHash that may differ for two frames to count as the same chart
+DEFAULT_HASH_TOLERANCE = 12
+# Recent analyses whose frame hashes are kept for near-duplicate lookups, per focus, model and settings
+DEFAULT_INDEX_SIZE = 256
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def hamming_distance(first: str, second: str) -> int:
+    """Number of differing bits between two hex hashes."""
+    return (int(first, 16) ^ int(second, 16)).bit_count()
+
+
+def covers(stored: Sequence[str], frame_hashes: Sequence[str], tolerance: int = DEFAULT_HASH_TOLERANCE) -> bool:
+    """
+    Whether frames analyzed earlier (`stored`) stand in for `frame_hashes`.
+
+    Every frame must be within `tolerance` bits of a stored frame, and the
+    last frames must match too, so the latest chart state is the one the
+    earlier analysis saw.
+    """
+    if not stored or not frame_hashes or hamming_distance(stored[-1], frame_hashes[-1]) > tolerance:
+        return False
+    return all(any(hamming_distance(h, s) <= tolerance for s in stored) for h in frame_hashes)
+
+
+class VideoAnalysisCache:
+    """Stores parsed video analyses keyed by video content or frame hashes."""
+
+    def __init__(
+        self,
+        store: Union[PersistentCache, LazyCache, None],
+        ttl: float = DEFAULT_ANALYSIS_TTL,
+        hash_tolerance: int = DEFAULT_HASH_TOLERANCE,
+        index_size: int = DEFAULT_INDEX_SIZE,
+    ):
+        self._store = store
+        self.ttl = ttl
+        self.hash_tolerance = hash_tolerance
+        self.index_size = index_size
+        # (path, size, mtime) -> digest, so unchanged files are hashed once per process
+        self._digests: Dict[Tuple[str, int, int], str] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def store(self) -> Optional[PersistentCache]:
+        """Disk cache, opened on first use when given as a LazyCache."""
+        store = self._store
+        return store.open() if isinstance(store, LazyCache) else store
+
+    def video_digest(self, video_path: str) -> str:
+        """SHA-256 of the video file contents."""
+        stat = os.stat(video_path)
+        memo_key = (os.path.realpath(video_path), stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            digest = self._digests.get(memo_key)
+        if digest is None:
+            sha = hashlib.sha256()
+            with open(video_path, "rb") as f:
+                for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+                    sha.update(chunk)
+            digest = sha.hexdigest()
+            with self._lock:
+                self._digests[memo_key] = digest
+        return digest
+
+    @staticmethod
+    def settings_digest(settings: Dict[str, Any]) -> str:
+        """Short, order-independent hash of a settings dict."""
+        return hashlib.sha256(json.dumps(settings, sort_keys=True).encode()).hexdigest()[:16]
+
+    @staticmethod
+    def video_key(digest: str, max_frames: int, analysis_focus: str, model: str, settings: str) -> str:
+        return f"video:{digest}:{max_frames}:{analysis_focus}:{model}:{settings}"
+
+    @staticmethod
+    def frames_key(frame_hashes: Iterable[str], analysis_focus: str, model: str, settings: str) -> str:
+        frames_digest = hashlib.sha256(",".join(frame_hashes).encode()).hexdigest()
+        return f"frames:{frames_digest}:{analysis_focus}:{model}:{settings}"
+
+    @staticmethod
+    def index_key(analysis_focus: str, model: str, settings: str) -> str:
+        return f"frames-index:{analysis_focus}:{model}:{settings}"
+
+    def get_frames(
+        self, frame_hashes: List[str], analysis_focus: str, model: str, settings: str
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        Look up an analysis of these frames: returns (analysis, "frames") for
+        an exact match, (analysis, "similar_frames") for a near-duplicate
+        match (see `covers`), or (None, None).
+        """
+        analysis = self.get(self.frames_key(frame_hashes, analysis_focus, model, settings))
+        if analysis is not None:
+            return analysis, "frames"
+        store = self.store
+        if store is None:
+            return None, None
+        # Newest first: a recording is most likely to overlap the last ones analyzed
+        for entry in reversed(store.get(self.index_key(analysis_focus, model, settings)) or []):
+            if covers(entry["hashes"], frame_hashes, self.hash_tolerance):
+                analysis = self.get(entry["key"])
+                if analysis is not None:
+                    return analysis, "similar_frames"
+        return None, None
+
+    def set_frames(
+        self, frame_hashes: List[str], analysis_focus: str, model: str, settings: str, analysis: Dict[str, Any]
+    ) -> None:
+        """Store an analysis under its frames key and add its frame hashes to the index."""
+        store = self.store
+        if store is None or "error" in analysis:
+            return
+        key = self.frames_key(frame_hashes, analysis_focus, model, settings)
+        store.set(key, analysis, self.ttl)
+        index_key = self.index_key(analysis_focus, model, settings)
+        with self._lock:
+            # Concurrent writers from other processes may drop an entry; the index is only a lookup aid
+            index = [entry for entry in store.get(index_key) or [] if entry["key"] != key]
+            index.append({"key": key, "hashes": list(frame_hashes)})
+            store.set(index_key, index[-self.index_size:], self.ttl)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        store = self.store
+        if store is None:
+            return None
+        return store.get(key)
+
+    def set(self, key: str, analysis: Dict[str, Any]) -> None:
+        """Store a successful analysis; failed analyses are never cached."""
+        store = self.store
+        if store is None or "error" in analysis:
+            return
+        store.set(key, analysis, self.ttl)
+
+
+# Shared cache used by the video analysis tool
+video_analysis_cache = VideoAnalysisCache(
+    lazy_persistent_cache("video_analysis"),
+    ttl=float(os.getenv("FOREX_AI_VIDEO_CACHE_TTL", DEFAULT_ANALYSIS_TTL)),
+)
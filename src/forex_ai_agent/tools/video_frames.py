@@ -0,0 +1,224 @@
+"""
+Streaming frame extraction for chart videos.
+
+Frames are produced by a generator so only the frames being processed are
+held in memory. Sampled frames are read either by seeking to each target
+index or by a single sequential pass that grabs every frame and only
+decodes (retrieves) the targets. Seeking is cheap when samples are far
+apart; on long H.264 screen recordings with sparse keyframes each seek
+decodes from the previous keyframe, so dense sampling is faster in one
+sequential pass.
+
+Keyframes can also be chosen by content: the video is scanned at a fixed
+time interval (widened on long videos so the scan stays a bounded number
+of frames) and a frame is kept only when its downscaled grayscale
+signature differs materially from the last kept frame (a new candle, a
+symbol switch, a zoom), so a static chart yields one frame instead of many
+near-identical ones.
+"""
+
+import heapq
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import cv2
+    import numpy as np
+    CV2_AVAILABLE = True
+except ImportError:
+    CV2_AVAILABLE = False
+    cv2 = None
+    np = None
+
+
+EXTRACTION_MODES = ("auto", "seek", "sequential")
+
+# Average gap (in frames) between samples above which seeking beats a sequential pass.
+# Roughly the keyframe interval of typical screen recordings (10s at 25fps).
+DEFAULT_SEEK_GAP_THRESHOLD = 250
+
+FRAME_SELECTIONS = ("scene", "uniform")
+
+# Scene-change defaults: signatures are 160x90 grayscale thumbnails, a pixel counts as
+# changed when it moves by more than PIXEL_DELTA levels, and a frame is a keyframe when
+# at least MIN_CHANGE of the pixels changed (about 30 pixels, roughly one new candle).
+SIGNATURE_SIZE = (160, 90)
+DEFAULT_PIXEL_DELTA = 24
+DEFAULT_MIN_CHANGE = 0.002
+DEFAULT_SCAN_INTERVAL = 1.0
+# Long recordings are scanned at no more than this many points; past ~2 minutes the interval
+# widens, and past the seek gap threshold the scan seeks instead of decoding every frame
+DEFAULT_MAX_SCAN_POINTS = 120
+
+
+def sample_indices(total_frames: int, max_frames: int) -> List[int]:
+    """Evenly spaced, de-duplicated frame indices covering the whole video."""
+    if total_frames <= 0 or max_frames <= 0:
+        return []
+    return sorted(set(int(i) for i in np.linspace(0, total_frames - 1, max_frames, dtype=int)))
+
+
+def scan_indices(
+    total_frames: int,
+    fps: float,
+    interval: float = DEFAULT_SCAN_INTERVAL,
+    max_points: int = DEFAULT_MAX_SCAN_POINTS,
+) -> List[int]:
+    """
+    Frame indices every `interval` seconds, always including the last frame.
+
+    The interval is widened so that at most about `max_points` indices are
+    returned, whatever the length of the video.
+    """
+    if total_frames <= 0:
+        return []
+    step = max(1, int(round((fps or 25.0) * interval)), -(-total_frames // max(1, max_points)))
+    indices = list(range(0, total_frames, step))
+    if indices[-1] != total_frames - 1:
+        indices.append(total_frames - 1)
+    return indices
+
+
+def choose_mode(indices: Sequence[int], mode: str = "auto", seek_gap_threshold: int = DEFAULT_SEEK_GAP_THRESHOLD) -> str:
+    """Resolve 'auto' to 'seek' or 'sequential' from the sampling density."""
+    if mode not in EXTRACTION_MODES:
+        raise ValueError(f"Unknown extraction mode: {mode}. Use one of {', '.join(EXTRACTION_MODES)}")
+    if mode != "auto":
+        return mode
+    if len(indices) < 2:
+        return "seek"
+    average_gap = (indices[-1] - indices[0]) / (len(indices) - 1)
+    return "seek" if average_gap > seek_gap_threshold else "sequential"
+
+
+def _open(video_path: str):
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        cap.release()
+        raise ValueError(f"Could not open video file: {video_path}")
+    return cap
+
+
+def video_properties(video_path: str) -> Tuple[int, float]:
+    """Return (frame_count, fps) of a video."""
+    cap = _open(video_path)
+    try:
+        return int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), float(cap.get(cv2.CAP_PROP_FPS))
+    finally:
+        cap.release()
+
+
+def iter_frames(
+    video_path: str,
+    max_frames: int = 10,
+    mode: str = "auto",
+    seek_gap_threshold: int = DEFAULT_SEEK_GAP_THRESHOLD,
+    indices: Optional[Sequence[int]] = None,
+) -> Iterator[Tuple[int, "np.ndarray"]]:
+    """
+    Yield (frame_index, frame) for evenly sampled frames of a video.
+
+    Args:
+        video_path: Path to the video file
+        max_frames: Number of frames to sample when `indices` is not given
+        mode: 'seek', 'sequential' or 'auto' (pick by sampling density)
+        seek_gap_threshold: Average sample gap above which 'auto' seeks
+        indices: Explicit frame indices to read instead of even sampling
+    """
+    cap = _open(video_path)
+    try:
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        if indices is None:
+            indices = sample_indices(total_frames, max_frames)
+        else:
+            indices = sorted(set(indices))
+        if not indices:
+            return
+
+        if choose_mode(indices, mode, seek_gap_threshold) == "seek":
+            for frame_idx in indices:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
+                ret, frame = cap.read()
+                if ret:
+                    yield frame_idx, frame
+        else:
+            targets = iter(indices)
+            target = next(targets)
+            position = 0
+            while target is not None and cap.grab():
+                if position == target:
+                    ret, frame = cap.retrieve()
+                    if ret:
+                        yield position, frame
+                    target = next(targets, None)
+                position += 1
+    finally:
+        cap.release()
+
+
+def frame_signature(frame: "np.ndarray", size: Tuple[int, int] = SIGNATURE_SIZE) -> "np.ndarray":
+    """Downscaled grayscale thumbnail used to compare frames cheaply."""
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    return cv2.resize(gray, size, interpolation=cv2.INTER_AREA)
+
+
+def change_score(previous: "np.ndarray", current: "np.ndarray", pixel_delta: int = DEFAULT_PIXEL_DELTA) -> float:
+    """Fraction of signature pixels that changed by more than `pixel_delta` levels."""
+    return float(np.count_nonzero(cv2.absdiff(previous, current) > pixel_delta)) / previous.size
+
+
+def select_keyframes(
+    frames: Iterable[Tuple[int, "np.ndarray"]],
+    max_frames: int = 10,
+    min_change: float = DEFAULT_MIN_CHANGE,
+    pixel_delta: int = DEFAULT_PIXEL_DELTA,
+) -> List[Tuple[int, "np.ndarray"]]:
+    """
+    Keep frames where the chart materially changed, at most `max_frames`.
+
+    Each frame is compared with the last kept frame, so slow drifts add up
+    to a keyframe too. The first frame is always kept; when more than
+    `max_frames` frames qualify, the ones with the smallest change are
+    dropped. At most `max_frames` full frames are held at any time.
+    Returns (frame_index, frame) pairs in video order.
+    """
+    kept: List[Tuple[float, int, "np.ndarray"]] = []
+    last_signature = None
+    for frame_idx, frame in frames:
+        signature = frame_signature(frame)
+        score = float("inf") if last_signature is None else change_score(last_signature, signature, pixel_delta)
+        if score < min_change:
+            continue
+        last_signature = signature
+        heapq.heappush(kept, (score, frame_idx, frame))
+        if len(kept) > max_frames:
+            heapq.heappop(kept)
+    return [(frame_idx, frame) for _, frame_idx, frame in sorted(kept, key=lambda item: item[1])]
+
+
+def iter_keyframes(
+    video_path: str,
+    max_frames: int = 10,
+    scan_interval: float = DEFAULT_SCAN_INTERVAL,
+    min_change: float = DEFAULT_MIN_CHANGE,
+    mode: str = "auto",
+    seek_gap_threshold: int = DEFAULT_SEEK_GAP_THRESHOLD,
+    max_scan_points: int = DEFAULT_MAX_SCAN_POINTS,
+) -> Iterator[Tuple[int, "np.ndarray"]]:
+    """Yield scene-change keyframes found by scanning the video every `scan_interval` seconds (see `scan_indices`)."""
+    total_frames, fps = video_properties(video_path)
+    scanned = iter_frames(video_path, mode=mode, seek_gap_threshold=seek_gap_threshold,
+                          indices=scan_indices(total_frames, fps, scan_interval, max_scan_points))
+    yield from select_keyframes(scanned, max_frames, min_change)
+
+
+def frame_hash(frame: "np.ndarray", hash_size: int = 16) -> str:
+    """
+    Difference hash (dHash) of a frame as a hex string.
+
+    Each bit records whether a pixel of a (hash_size + 1) x hash_size
+    grayscale thumbnail is brighter than its left neighbour, so re-encoding
+    or rescaling a recording leaves the hash unchanged while a different
+    chart changes it.
+    """
+    thumbnail = frame_signature(frame, (hash_size + 1, hash_size)).astype(np.int16)
+    return np.packbits(thumbnail[:, 1:] > thumbnail[:, :-1]).tobytes().hex()
@@ -0,0 +1,15 @@
+"""
+Shared test setup: keep on-disk caches and stores out of the user's cache directory.
+"""
+
+import os
+import shutil
+import tempfile
+
+# Set before the tools are imported, so every shared cache opens under the temporary directory
+_cache_dir = tempfile.mkdtemp(prefix="forex-ai-tests-")
+os.environ["FOREX_AI_CACHE_DIR"] = _cache_dir
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(_cache_dir, ignore_errors=True)
@@ -0,0 +1,129 @@
+"""
+Test suite for the shared Alpha Vantage client.
+
+These tests exercise the rate limiter and response cache with a fake clock
+and a fake HTTP session, so they run without network access or an API key.
+"""
+
+import sys
+import os
+
+import pytest
+
+# Add the src directory to the path so we can import our tools
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from forex_ai_agent.tools.alpha_vantage import (
+    AlphaVantageClient,
+    AlphaVantageRateLimitError,
+    RateLimiter,
+    TTLCache,
+)
+
+
+class FakeClock:
+    """Manually advanced clock for deterministic limiter and cache tests"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.now += seconds
+
+
+class FakeResponse:
+    def __init__(self, payload: dict):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+
+class FakeSession:
+    """Records requests and returns a canned payload"""
+
+    def __init__(self, payload: dict):
+        self.payload = payload
+        self.calls = []
+
+    def get(self, url, params=None, timeout=None):
+        self.calls.append(params)
+        return FakeResponse(self.payload)
+
+
+QUOTE = {"Realtime Currency Exchange Rate": {"5. Exchange Rate": "1.0850"}}
+
+
+def make_client(payload: dict, clock: FakeClock, per_minute: int = 5, per_day: int = 25):
+    client = AlphaVantageClient(
+        api_key="test-key",
+        rate_limiter=RateLimiter(per_minute, per_day, clock=clock, sleep=clock.sleep),
+        cache=TTLCache(clock=clock),
+    )
+    client.session = FakeSession(payload)
+    return client
+
+
+def test_rate_limiter_waits_for_minute_quota():
+    """The sixth request within a minute waits for a token to refill"""
+    clock = FakeClock()
+    limiter = RateLimiter(5, 25, clock=clock, sleep=clock.sleep)
+    for _ in range(5):
+        limiter.acquire()
+    assert clock.now == 0
+    limiter.acquire()
+    assert clock.now == pytest.approx(12.0)
+
+
+def test_rate_limiter_raises_when_daily_quota_exhausted():
+    """The daily quota fails fast instead of blocking for hours"""
+    clock = FakeClock()
+    limiter = RateLimiter(100, 3, clock=clock, sleep=clock.sleep)
+    for _ in range(3):
+        limiter.acquire()
+    with pytest.raises(AlphaVantageRateLimitError):
+        limiter.acquire(max_wait=60)
+
+
+def test_identical_queries_are_served_from_cache():
+    """Repeated quotes for the same pair cost one network call"""
+    clock = FakeClock()
+    client = make_client(QUOTE, clock)
+    params = {"from_currency": "EUR", "to_currency": "USD"}
+
+    first = client.query("CURRENCY_EXCHANGE_RATE", params)
+    second = client.query("CURRENCY_EXCHANGE_RATE", dict(reversed(list(params.items()))))
+
+    assert first == second == QUOTE
+    assert len(client.session.calls) == 1
+    assert client.session.calls[0]["apikey"] == "test-key"
+    assert client.cache.hits == 1
+    assert client.query_with_cache_status("CURRENCY_EXCHANGE_RATE", params) == (QUOTE, True)
+
+
+def test_cache_entries_expire():
+    clock = FakeClock()
+    client = make_client(QUOTE, clock)
+    params = {"from_currency": "EUR", "to_currency": "USD"}
+
+    client.query("CURRENCY_EXCHANGE_RATE", params, ttl=30)
+    clock.now += 31
+    client.query("CURRENCY_EXCHANGE_RATE", params, ttl=30)
+
+    assert len(client.session.calls) == 2
+
+
+def test_error_responses_are_not_cached():
+    clock = FakeClock()
+    client = make_client({"Note": "Thank you for using Alpha Vantage!"}, clock)
+
+    client.query("CURRENCY_EXCHANGE_RATE", {"from_currency": "EUR", "to_currency": "USD"})
+    client.query("CURRENCY_EXCHANGE_RATE", {"from_currency": "EUR", "to_currency": "USD"})
+
+    assert len(client.session.calls) == 2
@@ -0,0 +1,79 @@
+"""
+Test suite for merging chunked video analyses.
+"""
+
+import sys
+import os
+
+import pytest
+
+# Add the src directory to the path so we can import our tools
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from forex_ai_agent.tools.analysis_merge import cluster_levels, merge_analyses
+
+
+def chunk(**fields):
+    analysis = {
+        "trading_pair": "EUR/USD",
+        "timeframe": "1h",
+        "technical_indicators": [],
+        "chart_patterns": [],
+        "support_levels": [],
+        "resistance_levels": [],
+        "trend_direction": "bullish",
+        "trend_strength": "moderate",
+        "key_observations": [],
+        "confidence_score": 0.8,
+        "frame_analysis": {"total_frames_analyzed": 2},
+    }
+    analysis.update(fields)
+    return analysis
+
+
+def test_cluster_levels_merges_nearby_levels():
+    levels = cluster_levels([(1.0850, 1.0), (1.0851, 1.0), (1.0900, 1.0)], tolerance=0.001)
+    assert levels == pytest.approx([1.08505, 1.0900])
+
+
+def test_merge_unions_lists_and_clusters_levels():
+    merged = merge_analyses([
+        chunk(technical_indicators=["RSI", "MACD"], support_levels=[1.0800, "1.0850"]),
+        chunk(technical_indicators=["rsi", "EMA 50"], support_levels=[1.0801], resistance_levels=[{"price": 1.095}]),
+    ])
+
+    assert merged["technical_indicators"] == ["RSI", "MACD", "EMA 50"]
+    assert merged["support_levels"] == pytest.approx([1.08005, 1.0850])
+    assert merged["resistance_levels"] == [1.095]
+    assert merged["frame_analysis"]["total_frames_analyzed"] == 4
+
+
+def test_trend_is_a_confidence_weighted_vote():
+    merged = merge_analyses([
+        chunk(trend_direction="bearish", trend_strength="strong", confidence_score=0.9),
+        chunk(trend_direction="bullish", confidence_score=0.3),
+        chunk(trend_direction="bullish", confidence_score=0.3),
+    ])
+
+    assert merged["trend_direction"] == "bearish"
+    assert merged["trend_strength"] == "strong"
+    assert merged["confidence_score"] == pytest.approx(0.5 * 0.6)
+    assert merged["frame_analysis"]["consistency_across_frames"] == "medium"
+
+
+def test_patterns_keep_most_confident_and_price_is_latest():
+    merged = merge_analyses([
+        chunk(chart_patterns=[{"pattern": "Flag", "confidence": 0.4}], current_price_estimate=1.08),
+        chunk(chart_patterns=[{"pattern": "flag", "confidence": 0.7}], current_price_estimate=1.09),
+    ])
+
+    assert merged["chart_patterns"] == [{"pattern": "flag", "confidence": 0.7}]
+    assert merged["current_price_estimate"] == 1.09
+
+
+def test_failed_chunks_are_reported():
+    merged = merge_analyses([chunk(), {"error": "LLM analysis failed: timeout"}])
+    assert merged["chunks"] == {"total": 2, "failed": 1}
+    assert merged["chunk_errors"] == ["LLM analysis failed: timeout"]
+
+    assert "error" in merge_analyses([{"error": "LLM analysis failed: timeout"}])
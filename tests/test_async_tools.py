@@ -0,0 +1,108 @@
+"""
+Test suite for the async execution path of the market data tools.
+
+A local aiohttp server stands in for Alpha Vantage, so no API key or
+network access is needed.
+"""
+
+import sys
+import os
+import asyncio
+import json
+
+from aiohttp import web
+
+# Add the src directory to the path so we can import our tools
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from forex_ai_agent.tools import forex_data
+from forex_ai_agent.tools.alpha_vantage import (
+    AlphaVantageClient,
+    AsyncAlphaVantageClient,
+    RateLimiter,
+)
+from forex_ai_agent.tools.cross_rates import CrossRateEngine, Quote
+from forex_ai_agent.tools.forex_data import forex_data_fetcher
+
+
+def exchange_rate_payload(base: str, quote: str) -> dict:
+    return {
+        "Realtime Currency Exchange Rate": {
+            "1. From_Currency Code": base,
+            "2. From_Currency Name": base,
+            "3. To_Currency Code": quote,
+            "4. To_Currency Name": quote,
+            "5. Exchange Rate": "1.08500000",
+            "6. Last Refreshed": "2024-01-01 12:00:00",
+            "7. Time Zone": "UTC",
+            "8. Bid Price": "1.08490000",
+            "9. Ask Price": "1.08510000"
+        }
+    }
+
+
+async def with_server(test):
+    """Run `test(base_url, requests_seen)` against a local fake Alpha Vantage server"""
+    seen = []
+
+    async def query(request):
+        seen.append(dict(request.query))
+        await asyncio.sleep(0.05)
+        return web.json_response(
+            exchange_rate_payload(request.query["from_currency"], request.query["to_currency"])
+        )
+
+    app = web.Application()
+    app.router.add_get("/query", query)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        await test(f"http://127.0.0.1:{port}/query", seen)
+    finally:
+        await runner.cleanup()
+
+
+def make_async_client(base_url: str) -> AsyncAlphaVantageClient:
+    sync_client = AlphaVantageClient(
+        base_url=base_url,
+        api_key="test-key",
+        rate_limiter=RateLimiter(requests_per_minute=100, requests_per_day=100),
+    )
+    return AsyncAlphaVantageClient(sync_client)
+
+
+def test_async_queries_run_concurrently_and_share_cache():
+    async def test(base_url, seen):
+        client = make_async_client(base_url)
+        pairs = [("EUR", "USD"), ("GBP", "USD"), ("USD", "JPY")]
+        results = await asyncio.gather(*[
+            client.query("CURRENCY_EXCHANGE_RATE", {"from_currency": b, "to_currency": q})
+            for b, q in pairs
+        ])
+        assert [r["Realtime Currency Exchange Rate"]["1. From_Currency Code"] for r in results] == ["EUR", "GBP", "USD"]
+
+        # Served from the cache shared with the sync client
+        cached = client.client.query("CURRENCY_EXCHANGE_RATE", {"from_currency": "EUR", "to_currency": "USD"})
+        assert cached == results[0]
+        assert len(seen) == 3
+        assert seen[0]["apikey"] == "test-key"
+        await client.close()
+
+    asyncio.run(with_server(test))
+
+
+def test_forex_tool_arun(monkeypatch):
+    async def fake_afetch(base, quote):
+        return Quote(base, quote, 1.085, 1.0849, 1.0851, "2024-01-01 12:00:00")
+
+    monkeypatch.setattr(forex_data.alpha_vantage_client, "_api_key", "test-key")
+    monkeypatch.setattr(forex_data, "cross_rate_engine", CrossRateEngine(None, async_fetcher=fake_afetch))
+
+    result = json.loads(asyncio.run(forex_data_fetcher._arun("EUR", "USD")))
+
+    assert result["success"] is True
+    assert result["current_price"] == 1.085
+    assert result["spread"] == 0.0002
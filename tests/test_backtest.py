@@ -0,0 +1,195 @@
+"""
+Test suite for the vectorized backtesting engine and the strategy validator.
+
+Small hand-built bar series make fills and exits checkable by hand.
+"""
+
+import sys
+import os
+import json
+import time
+
+import numpy as np
+import pytest
+
+# Add the src directory to the path so we can import our tools
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from forex_ai_agent.tools import backtest
+from forex_ai_agent.tools.backtest import Condition, StrategySpec, evaluate, run_backtest
+from forex_ai_agent.tools.ohlc_store import OHLCStore
+from forex_ai_agent.tools.strategy_tools import StrategyValidator
+
+
+def bars_from(opens, highs, lows, closes):
+    return {
+        "open": np.array(opens, dtype=float), "high": np.array(highs, dtype=float),
+        "low": np.array(lows, dtype=float), "close": np.array(closes, dtype=float),
+        "time": np.arange(len(closes)) * 86400,
+    }
+
+
+def random_walk(n=5000, seed=2):
+    rng = np.random.default_rng(seed)
+    close = 1.1 + np.cumsum(rng.normal(0, 0.002, n))
+    opens = np.concatenate(([close[0]], close[:-1]))
+    return {
+        "open": opens, "close": close,
+        "high": np.maximum(opens, close) + 0.001, "low": np.minimum(opens, close) - 0.001,
+        "time": np.arange(n) * 86400,
+    }
+
+
+def test_rule_parsing_and_crossovers():
+    assert Condition.parse("rsi_14 < 30") == Condition("rsi_14", "<", 30.0)
+    assert Condition.parse({"indicator": "close", "op": ">", "value": "sma_20"}).right == "sma_20"
+    with pytest.raises(ValueError):
+        Condition.parse("rsi_14 between 30")
+
+    values = {"fast": np.array([1.0, 2.0, 3.0, 1.0]), "slow": np.array([2.0, 2.0, 2.0, 2.0])}
+    assert list(evaluate([Condition("fast", "crosses_above", "slow")], values, 4)) == [False, False, True, False]
+    assert list(evaluate([Condition("fast", "crosses_below", "slow")], values, 4)) == [False, False, False, True]
+
+
+def test_entry_fills_next_open_and_exits_at_take_profit():
+    # Signal on bar 1's close, entry at bar 2's open (1.0010); target 20 pips away is hit on bar 3
+    data = bars_from(
+        opens=[1.0000, 1.0000, 1.0010, 1.0015, 1.0030],
+        highs=[1.0005, 1.0012, 1.0018, 1.0035, 1.0040],
+        lows=[0.9995, 0.9998, 1.0005, 1.0012, 1.0025],
+        closes=[1.0000, 1.0011, 1.0015, 1.0030, 1.0035],
+    )
+    strategy = {"pair": "EUR/USD", "entry_rules": ["close > 1.001"], "stop_loss": {"pips": 10},
+                "take_profit": {"rr": 2}, "risk_percent": 1, "initial_balance": 10000}
+    trades, metrics = run_backtest(data, strategy)
+
+    assert trades.entry_bar[0] == 2
+    assert trades.entry_price[0] == pytest.approx(1.0010)
+    assert trades.exit_price[0] == pytest.approx(1.0030)
+    assert trades.reason[0] == "take_profit"
+    # 1% of 10,000 risked over 10 pips: 100,000 units, +20 pips = +200
+    assert trades.pnl[0] == pytest.approx(200.0)
+    assert trades.r_multiple[0] == pytest.approx(2.0)
+    assert metrics["trade_count"] == len(trades)
+    assert metrics["win_rate"] > 0
+
+
+def test_stop_gaps_fill_at_open_and_stop_wins_ties():
+    data = bars_from(
+        opens=[1.0, 1.0, 1.0, 0.99, 1.0],
+        highs=[1.0, 1.0, 1.0, 0.995, 1.0],
+        lows=[1.0, 1.0, 1.0, 0.985, 1.0],
+        closes=[1.0, 1.0, 1.0, 0.99, 1.0],
+    )
+    strategy = {"entry_rules": ["close >= 1"], "stop_loss": {"percent": 0.5}, "position_sizing": {"units": 1000}}
+    trades, _ = run_backtest(data, strategy)
+    # Entered at bar 1; bar 3 gaps below the stop (0.995) and fills at its open
+    assert trades.reason[0] == "stop_loss"
+    assert trades.exit_price[0] == pytest.approx(0.99)
+    assert trades.pnl[0] == pytest.approx(-10.0)
+
+    # One bar spanning both the stop and the target: the stop is assumed first
+    data = bars_from([1.0, 1.0, 1.0], [1.0, 1.0, 1.02], [1.0, 1.0, 0.98], [1.0, 1.0, 1.0])
+    trades, _ = run_backtest(data, {"entry_rules": ["close >= 1"], "stop_loss": {"percent": 1},
+                                    "take_profit": {"percent": 1}, "position_sizing": {"units": 1}})
+    assert trades.reason[0] == "stop_loss"
+
+
+def test_positions_do_not_overlap_and_shorts_mirror_longs():
+    data = random_walk()
+    strategy = {"entry_rules": ["ema_10 crosses_above ema_30"], "exit_rules": ["ema_10 crosses_below ema_30"],
+                "stop_loss": {"atr": 2}, "take_profit": {"rr": 3}}
+    trades, metrics = run_backtest(data, strategy)
+    assert len(trades) > 20
+    assert np.all(trades.entry_bar[1:] > trades.exit_bar[:-1])
+    assert set(metrics["exit_reasons"]) <= {"signal", "stop_loss", "take_profit", "end"}
+    assert 0 <= metrics["max_drawdown_pct"] <= 100
+
+    short = {**strategy, "direction": "short", "entry_rules": ["ema_10 crosses_below ema_30"],
+             "exit_rules": ["ema_10 crosses_above ema_30"]}
+    trades, _ = run_backtest(data, short)
+    losing = trades.reason == "stop_loss"
+    assert np.all(trades.exit_price[losing] >= trades.entry_price[losing])
+
+
+def minute_walk(n, seed=3):
+    """One-minute bars moving about 2 pips each, so 5-pip stops close trades within a few bars."""
+    rng = np.random.default_rng(seed)
+    close = 1.1 + np.cumsum(rng.normal(0, 0.0002, n))
+    opens = np.concatenate(([close[0]], close[:-1]))
+    return {"open": opens, "close": close,
+            "high": np.maximum(opens, close) + 0.0001, "low": np.minimum(opens, close) - 0.0001}
+
+
+SCALPER = {"pair": "EUR/USD", "entry_rules": ["close > sma_20"], "stop_loss": {"pips": 5},
+           "take_profit": {"rr": 1}, "position_sizing": {"units": 1000}}
+
+
+def test_stop_and_target_scans_match_across_windows(monkeypatch):
+    data = minute_walk(20_000)
+    for strategy in (SCALPER, {**SCALPER, "take_profit": {"rr": 4}}, {**SCALPER, "direction": "short"}):
+        expected, _ = run_backtest(data, strategy)
+        # Tiny windows make long trades span many of them
+        monkeypatch.setattr(backtest, "SCAN_WINDOW", 1)
+        trades, _ = run_backtest(data, strategy)
+        monkeypatch.undo()
+        assert len(trades) == len(expected) > 100
+        assert np.array_equal(trades.exit_bar, expected.exit_bar)
+        assert np.array_equal(trades.reason, expected.reason)
+
+
+def test_many_short_trades_scale_linearly():
+    # Without exit rules every trade could run to the end of the data; only its own bars may be scanned
+    data = minute_walk(200_000)
+    quarter = {column: values[:50_000] for column, values in data.items()}
+
+    def seconds(bars):
+        best = float("inf")
+        for _ in range(3):
+            start = time.perf_counter()
+            run_backtest(bars, SCALPER)
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    trades, _ = run_backtest(data, SCALPER)
+    assert len(trades) > 10_000
+    # Four times the bars (and trades): about four times the time, not sixteen
+    assert seconds(data) < 8 * seconds(quarter)
+
+
+def test_formulated_trade_prices_become_distances():
+    spec = StrategySpec.parse({"entry": 1.0850, "stop_loss": 1.0800, "take_profit": 1.0950})
+    assert spec.entry == []
+    assert spec.stop_loss["price_distance"] == pytest.approx(0.005)
+    assert spec.take_profit["price_distance"] == pytest.approx(0.01)
+
+
+def test_validator_checks_without_rules():
+    result = json.loads(StrategyValidator()._run('{"entry": 1.0850, "stop_loss": 1.0800, "risk_percent": 5}'))
+    assert result["success"] is True
+    assert result["backtest"] is None
+    assert any("exceeds 2.0%" in check for check in result["checks"])
+
+
+def test_validator_backtests_stored_history(tmp_path):
+    store = OHLCStore(str(tmp_path))
+    data = random_walk()
+    store.append("EUR/USD", "daily", data)
+    validator = StrategyValidator()
+    validator.store = store
+
+    strategy = {"pair": "EUR/USD", "timeframe": "daily", "start": "1975-01-01",
+                "entry_rules": ["close crosses_above sma_50"], "exit_rules": ["close crosses_below sma_50"],
+                "stop_loss": {"atr": 2}, "take_profit": {"rr": 2}}
+    result = json.loads(validator._run(json.dumps(strategy)))
+    assert result["success"] is True
+    assert result["data"]["from"] == "1975-01-01T00:00:00"
+    assert result["data"]["bars"] == len(data["close"]) - 5 * 365 - 1
+    assert result["backtest"]["trade_count"] > 0
+    assert result["assessment"]["verdict"] in ("viable", "needs_review", "unprofitable")
+    assert len(result["recent_trades"]) <= 5
+
+    missing = json.loads(validator._run(json.dumps({**strategy, "pair": "GBP/JPY"})))
+    assert missing["success"] is False
+    assert "historical_ohlc_fetcher" in missing["error"]
+    assert json.loads(validator._run("not json"))["success"] is False
@@ -0,0 +1,176 @@
+"""
+Test suite for batch quotes and cross-rate arithmetic.
+
+Quotes are served by a fake fetcher so no API calls are made.
+"""
+
+import sys
+import os
+import json
+import threading
+
+import pytest
+
+# Add the src directory to the path so we can import our tools
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from forex_ai_agent.tools import batch_quotes
+from forex_ai_agent.tools.batch_quotes import batch_quote_fetcher, plan_fetches
+from forex_ai_agent.tools.cross_rates import CrossRateEngine, Quote, cross, parse_pair
+
+
+MARKET = {
+    ("EUR", "USD"): (1.0850, 1.0849, 1.0851),
+    ("GBP", "USD"): (1.2700, 1.2698, 1.2702),
+    ("USD", "JPY"): (150.00, 149.99, 150.01),
+}
+
+
+def fake_fetch_quote(from_currency: str, to_currency: str) -> Quote:
+    rate, bid, ask = MARKET[(from_currency, to_currency)]
+    return Quote(from_currency, to_currency, rate, bid, ask, "2024-01-01 12:00:00")
+
+
+def test_parse_pair_formats():
+    assert parse_pair("eur/usd") == ("EUR", "USD")
+    assert parse_pair("GBPJPY") == ("GBP", "JPY")
+    assert parse_pair("BTC-USD") == ("BTC", "USD")
+
+
+def test_inverse_swaps_and_reciprocates_bid_ask():
+    inverse = fake_fetch_quote("EUR", "USD").inverse()
+    assert inverse.pair == ("USD", "EUR")
+    assert inverse.bid == pytest.approx(1 / 1.0851)
+    assert inverse.ask == pytest.approx(1 / 1.0849)
+
+
+def test_cross_propagates_spread():
+    eur_usd = fake_fetch_quote("EUR", "USD")
+    usd_jpy = fake_fetch_quote("USD", "JPY")
+    eur_jpy = cross(eur_usd, usd_jpy, "EUR", "JPY")
+
+    assert eur_jpy.rate == pytest.approx(1.0850 * 150.00)
+    assert eur_jpy.bid == pytest.approx(1.0849 * 149.99)
+    assert eur_jpy.ask == pytest.approx(1.0851 * 150.01)
+    assert eur_jpy.source == "cross:USD"
+
+    eur_gbp = cross(eur_usd, fake_fetch_quote("GBP", "USD"), "EUR", "GBP")
+    assert eur_gbp.rate == pytest.approx(1.0850 / 1.2700)
+    assert eur_gbp.bid == pytest.approx(1.0849 / 1.2702)
+
+
+def test_plan_dedupes_inverses_and_derives_crosses():
+    pairs = [("EUR", "USD"), ("USD", "EUR"), ("GBP", "USD"), ("EUR", "GBP"), ("USD", "JPY"), ("GBP", "JPY")]
+    to_fetch, derived = plan_fetches(pairs)
+
+    assert sorted(to_fetch) == [("EUR", "USD"), ("GBP", "USD"), ("USD", "JPY")]
+    assert set(derived) == {("EUR", "GBP"), ("GBP", "JPY")}
+
+
+def test_batch_tool_fetches_only_needed_legs(monkeypatch):
+    calls = []
+
+    def fetch(from_currency, to_currency):
+        calls.append((from_currency, to_currency))
+        return fake_fetch_quote(from_currency, to_currency)
+
+    monkeypatch.setattr(batch_quotes, "cross_rate_engine", CrossRateEngine(fetch))
+    result = json.loads(batch_quote_fetcher._run("EUR/USD,USD/EUR,GBP/USD,EUR/GBP,USD/JPY,EUR/JPY"))
+
+    assert result["success"] is True
+    assert result["api_calls"] == 3
+    assert sorted(calls) == [("EUR", "USD"), ("GBP", "USD"), ("USD", "JPY")]
+    assert result["quotes"]["USD/EUR"]["source"] == "inverse"
+    assert result["quotes"]["EUR/JPY"]["rate"] == pytest.approx(1.0850 * 150.00, rel=1e-6)
+
+
+def test_batch_tool_reports_failed_legs(monkeypatch):
+    def fetch(from_currency, to_currency):
+        if to_currency == "JPY":
+            raise ValueError("Invalid API call")
+        return fake_fetch_quote(from_currency, to_currency)
+
+    monkeypatch.setattr(batch_quotes, "cross_rate_engine", CrossRateEngine(fetch))
+    result = json.loads(batch_quote_fetcher._run("EUR/USD,USD/JPY,EUR/JPY"))
+
+    assert "EUR/USD" in result["quotes"]
+    assert set(result["errors"]) == {"USD/JPY", "EUR/JPY"}
+
+
+def test_batch_tool_reuses_engine_rates_across_calls(monkeypatch):
+    engine = CrossRateEngine(fake_fetch_quote)
+    monkeypatch.setattr(batch_quotes, "cross_rate_engine", engine)
+
+    batch_quote_fetcher._run("EUR/USD,USD/JPY")
+    result = json.loads(batch_quote_fetcher._run("EUR/JPY,JPY/EUR"))
+
+    assert result["api_calls"] == 0
+    assert result["quotes"]["EUR/JPY"]["source"] == "cross:USD"
+
+
+def test_batch_tool_counts_only_its_own_api_calls(monkeypatch):
+    """Cached responses and fetches made by other callers meanwhile are not API calls of this call"""
+    engine = CrossRateEngine(lambda base, quote: None)
+
+    def fetch(from_currency, to_currency):
+        quote = fake_fetch_quote(from_currency, to_currency)
+        if (from_currency, to_currency) == ("EUR", "USD"):
+            quote.cached = True
+        elif (from_currency, to_currency) == ("GBP", "USD"):
+            # Another tool quoting at the same time
+            other = threading.Thread(target=engine.fetch, args=("USD", "JPY"))
+            other.start()
+            other.join()
+        return quote
+
+    engine.fetcher = fetch
+    monkeypatch.setattr(batch_quotes, "cross_rate_engine", engine)
+    result = json.loads(batch_quote_fetcher._run("EUR/USD,GBP/USD"))
+
+    assert result["api_calls"] == 1
+    assert "cached" not in result["quotes"]["EUR/USD"]
+    assert engine.fetches == 2
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_engine_triangulates_fresh_legs_without_fetching():
+    engine = CrossRateEngine(fake_fetch_quote)
+    engine.get("EUR", "USD")
+    engine.get("USD", "JPY")
+
+    eur_jpy = engine.get("EUR", "JPY")
+    assert engine.fetches == 2
+    assert eur_jpy.source == "cross:USD"
+    assert eur_jpy.ask == pytest.approx(1.0851 * 150.01)
+
+
+def test_engine_fetches_only_the_missing_leg():
+    calls = []
+
+    def fetch(from_currency, to_currency):
+        calls.append((from_currency, to_currency))
+        return fake_fetch_quote(from_currency, to_currency)
+
+    engine = CrossRateEngine(fetch)
+    engine.get("USD", "JPY")
+    engine.get("GBP", "JPY")
+
+    assert calls == [("USD", "JPY"), ("GBP", "USD")]
+
+
+def test_engine_ignores_stale_legs():
+    clock = FakeClock()
+    engine = CrossRateEngine(fake_fetch_quote, max_age=60, clock=clock)
+    engine.get("EUR", "USD")
+    clock.now += 61
+
+    assert engine.lookup("EUR", "USD") is None
+    engine.get("EUR", "USD")
+    assert engine.fetches == 2
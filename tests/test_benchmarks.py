@@ -0,0 +1,99 @@
+"""
+Test suite for the benchmark harness: timing, registration and comparison.
+"""
+
+import sys
+import os
+
+import pytest
+
+# Add the repository root to the path so we can import the benchmarks
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from benchmarks.harness import Benchmark, benchmark, compare, load, measure, run_all, save
+
+
+class FakeClock:
+    def __init__(self, step):
+        self.now, self.step = 0.0, step
+
+    def __call__(self):
+        self.now += self.step
+        return self.now
+
+
+def test_measure_runs_until_min_rounds_and_min_time():
+    calls = []
+    stats = measure(lambda: calls.append(1), min_rounds=3, min_time=1.0, clock=FakeClock(0.1))
+    # One warm-up call, then rounds until a second of fake time has passed
+    assert len(calls) == stats["rounds"] + 1
+    assert stats["rounds"] >= 3
+    assert stats["median"] == pytest.approx(0.1)
+    assert stats["ops_per_second"] == pytest.approx(10)
+
+    stats = measure(lambda: None, min_rounds=2, max_rounds=5, min_time=100.0, clock=FakeClock(0.1))
+    assert stats["rounds"] == 5
+
+
+def test_run_all_sets_up_and_tears_down_cases():
+    registry, events = [], []
+
+    def plain(size):
+        return lambda: sum(range(size))
+
+    def with_teardown():
+        events.append("setup")
+        try:
+            yield lambda: None
+        finally:
+            events.append("teardown")
+
+    def broken(_):
+        raise RuntimeError("no input")
+
+    registry.append(Benchmark("sum", plain, [10, 100], quick_params=[10]))
+    registry.append(Benchmark("noop", with_teardown, [None]))
+    registry.append(Benchmark("broken", broken, ["x"]))
+
+    document = run_all(registry, quick=True, report=lambda line: None, min_time=0.0)
+    assert set(document["benchmarks"]) == {"sum[10]", "noop", "broken[x]"}
+    assert document["benchmarks"]["sum[10]"]["group"] == "sum"
+    assert document["benchmarks"]["broken[x]"]["error"] == "RuntimeError: no input"
+    assert events == ["setup", "teardown"]
+    assert {"version", "commit", "dirty", "created", "machine", "quick"} <= set(document)
+
+    document = run_all(registry, select="sum[1", report=lambda line: None, min_time=0.0)
+    assert set(document["benchmarks"]) == {"sum[10]", "sum[100]"}
+
+
+def test_benchmark_decorator_names_cases():
+    from benchmarks import harness
+    before = len(harness.REGISTRY)
+
+    @benchmark("encode", params=[{"seconds": 10, "resolution": "720p"}, {"seconds": 60, "resolution": "1080p"}])
+    def encode(case):
+        return lambda: None
+
+    try:
+        assert [name for name, _ in harness.REGISTRY[-1].cases()] == ["encode[10-720p]", "encode[60-1080p]"]
+    finally:
+        del harness.REGISTRY[before:]
+
+
+def test_compare_flags_regressions_and_improvements(tmp_path):
+    baseline = {"commit": "a", "benchmarks": {
+        "slower": {"median": 1.0}, "faster": {"median": 1.0}, "same": {"median": 1.0},
+        "failed": {"error": "x"}, "removed": {"median": 1.0},
+    }}
+    current = {"commit": "b", "benchmarks": {
+        "slower": {"median": 1.5}, "faster": {"median": 0.5}, "same": {"median": 1.1},
+        "failed": {"median": 1.0}, "added": {"median": 1.0},
+    }}
+    path = str(tmp_path / "results" / "a.json")
+    save(baseline, path)
+    comparison = compare(load(path), current, threshold=0.2)
+    assert set(comparison["benchmarks"]) == {"slower", "faster", "same"}
+    assert comparison["benchmarks"]["slower"]["ratio"] == 1.5
+    assert comparison["regressions"] == ["slower"]
+    assert comparison["improvements"] == ["faster"]
+    assert (comparison["baseline_commit"], comparison["current_commit"]) == ("a", "b")
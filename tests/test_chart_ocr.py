@@ -0,0 +1,130 @@
+"""
+Test suite for the local chart OCR pre-pass.
+
+Text labels are drawn as blocks on a synthetic chart and read by a fake
+reader that answers in reading order, so no OCR engine is needed.
+"""
+
+import sys
+import os
+import json
+from types import SimpleNamespace
+
+import pytest
+
+# Add the src directory to the path so we can import our tools
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+pytest.importorskip("cv2")
+import numpy as np
+
+from forex_ai_agent.tools.chart_ocr import (
+    extract_chart_text,
+    fit_price_scale,
+    format_hints,
+    parse_price,
+    parse_symbol,
+    parse_timeframe,
+    summarize_chart_text,
+)
+from forex_ai_agent.tools import video_analysis
+from forex_ai_agent.tools.persistent_cache import PersistentCache
+from forex_ai_agent.tools.video_analysis import VideoAnalysisTool
+from forex_ai_agent.tools.video_cache import VideoAnalysisCache
+
+from test_video_frames import write_video
+
+
+HEADER = "FX:EURUSD · 60 · FX"
+# Axis labels top to bottom; the red label (current price) sits between 1.0850 and 1.0800,
+# and the last label is a misread with a dropped decimal point
+AXIS = ["1.0900", "1.0850", "1.0830", "1.0800", "10750"]
+AXIS_ROWS = [50, 110, 140, 170, 230]
+
+
+def chart_frame():
+    frame = np.full((300, 400, 3), 20, dtype=np.uint8)
+    frame[40:290, 20:330] = np.random.default_rng(0).integers(0, 255, (250, 310, 3), dtype=np.uint8)
+    frame[5:17, 10:70] = 200                      # header label
+    for row in AXIS_ROWS:
+        frame[row:row + 12, 362:396] = 200        # axis labels
+    frame[140:152, 362:396] = (0, 0, 255)         # highlighted current price
+    return frame
+
+
+class FakeReader:
+    """Returns the header text for header reads, then axis labels in order."""
+
+    def __init__(self):
+        self.axis = iter(())
+        self.calls = 0
+
+    def __call__(self, image, numeric=False):
+        self.calls += 1
+        if not numeric:
+            self.axis = iter(AXIS)
+            return HEADER
+        return next(self.axis, "")
+
+
+def test_parsers():
+    assert parse_symbol("FX:EURUSD · 60") == "EUR/USD"
+    assert parse_symbol("BTCUSDT 15") == "BTC/USDT"
+    assert parse_symbol("GBP / JPY, 4h") == "GBP/JPY"
+    assert parse_timeframe("EUR/USD · 240 · FX") == "4h"
+    assert parse_timeframe("BTC/USD 15m") == "15m"
+    assert parse_timeframe("EURUSD · D · FX") == "1d"
+    assert parse_price("1,234.50") == 1234.5
+    assert parse_price("--") is None
+
+
+def test_fit_price_scale_ignores_misreads():
+    ticks = [(50, 1.09), (110, 1.085), (170, 1.08), (230, 10750.0)]
+    slope, intercept = fit_price_scale(ticks)
+    assert slope * 140 + intercept == pytest.approx(1.0825)
+    assert fit_price_scale([(50, 1.09)]) is None
+
+
+def test_extract_chart_text_reads_header_axis_and_current_price():
+    text = extract_chart_text(chart_frame(), FakeReader())
+
+    assert text.trading_pair == "EUR/USD"
+    assert text.timeframe == "1h"
+    assert text.current_price == 1.083
+    assert len(text.price_ticks) == 4
+    assert text.price_at(116) == pytest.approx(1.085, abs=2e-4)
+
+
+def test_summary_and_hints():
+    summary = summarize_chart_text([extract_chart_text(chart_frame(), FakeReader())])
+    assert summary["trading_pair"] == "EUR/USD"
+    assert "current price label 1.083" in format_hints(summary)
+
+
+def test_price_focus_skips_the_llm(tmp_path):
+    path = write_video(tmp_path / "chart.avi", [chart_frame()] * 20)
+    tool = VideoAnalysisTool()
+    tool.client = None
+    tool.ocr_reader = FakeReader()
+    tool.cache = VideoAnalysisCache(PersistentCache(str(tmp_path / "video.sqlite3")))
+
+    result = json.loads(tool._run(path, analysis_focus="price"))
+    assert result["success"] is True
+    assert result["analysis_source"] == "ocr"
+    assert result["trading_pair"] == "EUR/USD"
+    assert result["current_price_estimate"] == 1.083
+
+    # Other focuses still need the LLM
+    assert "OpenAI API key" in json.loads(tool._run(path, analysis_focus="patterns"))["error"]
+
+
+def test_tesseract_is_looked_for_on_first_use(monkeypatch):
+    calls = []
+    monkeypatch.setattr(video_analysis, "ocr_available", lambda: calls.append(1) or False)
+    tool = VideoAnalysisTool()
+    assert tool.ocr_reader == "auto" and calls == []
+
+    # Without Tesseract the price focus needs the LLM
+    assert not tool._ocr_only("price")
+    assert tool.ocr_reader is None and calls == [1]
+    assert "'price'" in tool.args_schema.model_fields["analysis_focus"].description
@@ -0,0 +1,129 @@
+"""
+Test suite for pixel-to-price candle extraction.
+
+Candles with known pixel rows are drawn on a synthetic dark chart; the axis
+labels follow test_chart_ocr so the fake OCR reader yields the price scale.
+"""
+
+import sys
+import os
+import json
+
+import pytest
+
+# Add the src directory to the path so we can import our tools
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+pytest.importorskip("cv2")
+import numpy as np
+
+from forex_ai_agent.tools.chart_ocr import extract_chart_text
+from forex_ai_agent.tools.chart_vision import (
+    extract_candles,
+    format_candle_hints,
+    local_analysis,
+    swing_points,
+)
+from forex_ai_agent.tools.persistent_cache import PersistentCache
+from forex_ai_agent.tools.video_analysis import VideoAnalysisTool
+from forex_ai_agent.tools.video_cache import VideoAnalysisCache
+
+from test_chart_ocr import AXIS_ROWS, FakeReader
+from test_video_frames import write_video
+
+
+# price = SLOPE * row + INTERCEPT matches the axis labels of test_chart_ocr (1.0900 at row 56, 1.0850 at 116)
+SLOPE = -0.005 / 60
+INTERCEPT = 1.09 - SLOPE * 56
+TEAL = (154, 166, 38)
+RED = (80, 83, 239)
+
+
+def candle_rows(count=25, seed=3):
+    """(open, high, low, close) pixel rows of a random walk of candles."""
+    rng = np.random.default_rng(seed)
+    rows, close = [], 160
+    for _ in range(count):
+        open_ = close
+        close = int(np.clip(open_ + rng.integers(-12, 13), 80, 240))
+        high = min(open_, close) - int(rng.integers(0, 8))
+        low = max(open_, close) + int(rng.integers(0, 8))
+        rows.append((open_, high, low, close))
+    return rows
+
+
+def candle_frame(rows):
+    frame = np.full((300, 400, 3), 20, dtype=np.uint8)
+    frame[60:280:40, 20:340] = 45                 # grid lines
+    for i, (open_, high, low, close) in enumerate(rows):
+        x = 24 + 12 * i
+        color = TEAL if close <= open_ else RED    # rows grow downwards: lower row = higher price
+        frame[high:low + 1, x + 3] = color
+        frame[min(open_, close):max(open_, close) + 1, x:x + 7] = color
+    frame[5:17, 10:70] = 200                      # header label
+    for row in AXIS_ROWS:
+        frame[row:row + 12, 362:396] = 200        # axis labels
+    frame[140:152, 362:396] = RED                 # highlighted current price
+    return frame
+
+
+def price(row):
+    return SLOPE * row + INTERCEPT
+
+
+def test_extract_candles_recovers_ohlc():
+    rows = candle_rows()
+    series = extract_candles(candle_frame(rows), (SLOPE, INTERCEPT))
+
+    expected = np.array([[price(r) for r in candle] for candle in rows])
+    assert len(series) == len(rows)
+    assert series.scaled
+    np.testing.assert_allclose(series.open, expected[:, 0], atol=1e-6)
+    np.testing.assert_allclose(series.high, expected[:, 1], atol=1e-6)
+    np.testing.assert_allclose(series.low, expected[:, 2], atol=1e-6)
+    np.testing.assert_allclose(series.close, expected[:, 3], atol=1e-6)
+    assert list(series.bullish) == [close <= open_ for open_, _, _, close in rows]
+
+
+def test_unscaled_series_keeps_pixel_order():
+    rows = candle_rows()
+    series = extract_candles(candle_frame(rows))
+    assert not series.scaled
+    assert series.high[0] == -rows[0][1]
+
+
+def test_ocr_scale_feeds_candle_extraction():
+    frame = candle_frame(candle_rows())
+    text = extract_chart_text(frame, FakeReader())
+    series = extract_candles(frame, text.price_scale)
+    assert series.close[-1] == pytest.approx(price(candle_rows()[-1][3]), abs=2e-4)
+
+
+def test_swing_points_and_local_levels():
+    values = np.array([1.0, 2.0, 5.0, 2.0, 1.0, 0.5, 1.0, 3.0, 4.0, 3.0, 2.0])
+    assert list(swing_points(values, window=2, highs=True)) == [2, 8]
+    assert list(swing_points(values, window=2, highs=False)) == [5]
+
+    series = extract_candles(candle_frame(candle_rows()), (SLOPE, INTERCEPT))
+    local = local_analysis(series)
+    last = series.close[-1]
+    assert all(level < last for level in local["support_levels"])
+    assert all(level > last for level in local["resistance_levels"])
+    assert local["trend_direction"] in ("bullish", "bearish", "sideways")
+    assert "sma_20" in local["indicators"]
+    assert "Candles read from the chart pixels" in format_candle_hints(series)
+
+
+def test_levels_focus_is_answered_from_pixels(tmp_path):
+    path = write_video(tmp_path / "chart.avi", [candle_frame(candle_rows())] * 20)
+    tool = VideoAnalysisTool()
+    tool.client = None
+    tool.ocr_reader = FakeReader()
+    tool.cache = VideoAnalysisCache(PersistentCache(str(tmp_path / "video.sqlite3")))
+
+    result = json.loads(tool._run(path, analysis_focus="levels"))
+    assert result["success"] is True
+    assert result["analysis_source"] == "pixels"
+    assert result["trading_pair"] == "EUR/USD"
+    assert result["candles"]["candles"] == 25
+    assert result["support_levels"] or result["resistance_levels"]
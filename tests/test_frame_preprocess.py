@@ -0,0 +1,86 @@
+"""
+Test suite for frame preprocessing before vision uploads.
+
+Frames are synthetic images, so no videos or API calls are needed.
+"""
+
+import sys
+import os
+
+import pytest
+
+# Add the src directory to the path so we can import our tools
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+pytest.importorskip("cv2")
+import numpy as np
+
+from forex_ai_agent.tools.frame_preprocess import (
+    choose_detail,
+    detect_chart_area,
+    encode_jpeg,
+    estimate_image_tokens,
+    fit_to_tiles,
+    preprocess_frame,
+    upload_report,
+)
+
+
+def chart_with_chrome(width=400, height=300):
+    """Noisy 'chart' with a top and left toolbar behind 1px separator lines."""
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    frame[:30, :] = 60          # top toolbar
+    frame[:, :25] = 60          # left toolbar
+    frame[30, :] = 120          # separators
+    frame[:, 25] = 120
+    frame[40, 26:] = 45         # a grid line inside the chart, near the edge
+    return frame
+
+
+def test_token_estimates_follow_tile_accounting():
+    assert estimate_image_tokens(1920, 1080, "low") == 85
+    # 1920x1080 is scaled to 1365x768: 3x2 tiles
+    assert estimate_image_tokens(1920, 1080, "high") == 85 + 170 * 6
+    assert estimate_image_tokens(512, 512, "high") == 85 + 170
+
+
+def test_fit_to_tiles_shrinks_onto_tile_boundaries():
+    assert fit_to_tiles(1920, 1080, max_tiles=4) == (1024, 576)
+    assert estimate_image_tokens(1024, 576) == 85 + 170 * 4
+    # Never upscales small frames
+    assert fit_to_tiles(300, 200, max_tiles=4) == (300, 200)
+
+
+def test_detect_chart_area_drops_toolbars():
+    assert detect_chart_area(chart_with_chrome()) == (26, 31, 400, 300)
+
+
+def test_detect_chart_area_keeps_plain_frames_whole():
+    rng = np.random.default_rng(1)
+    frame = rng.integers(0, 255, (120, 160, 3), dtype=np.uint8)
+    assert detect_chart_area(frame) == (0, 0, 160, 120)
+
+
+def test_blank_frames_use_low_detail():
+    blank = np.full((1080, 1920, 3), 30, dtype=np.uint8)
+    assert choose_detail(blank, 1920, 1080) == "low"
+    assert choose_detail(blank, 1920, 1080, "high") == "high"
+    assert choose_detail(chart_with_chrome(1200, 800), 1200, 800) == "high"
+
+
+def test_jpeg_quality_is_lowered_to_fit_budget():
+    frame = np.random.default_rng(2).integers(0, 255, (300, 400, 3), dtype=np.uint8)
+    unbounded = encode_jpeg(frame, quality=90, max_bytes=None)
+    bounded = encode_jpeg(frame, quality=90, max_bytes=len(unbounded) // 2)
+    assert len(bounded) < len(unbounded)
+
+
+def test_preprocess_and_report():
+    prepared = preprocess_frame(chart_with_chrome(1600, 1200), max_tiles=4)
+    assert prepared.crop[:2] != (0, 0)
+    assert prepared.width <= 1024 and prepared.height <= 1024
+
+    report = upload_report([prepared, prepared], prompt_chars=400)
+    assert report["bytes"] == 2 * prepared.bytes
+    assert report["estimated_input_tokens"] == 2 * prepared.tokens + 100
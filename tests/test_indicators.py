@@ -0,0 +1,121 @@
+"""
+Test suite for the vectorized technical indicator library.
+
+Vectorized results are checked against straightforward per-bar loops, and
+the incremental state against recomputing over the whole history.
+"""
+
+import sys
+import os
+import json
+
+import numpy as np
+import pytest
+
+# Add the src directory to the path so we can import our tools
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from forex_ai_agent.tools.indicators import (
+    IndicatorState,
+    TechnicalIndicatorCalculator,
+    atr,
+    bollinger,
+    compute_indicators,
+    ema,
+    macd,
+    rsi,
+    sma,
+)
+
+
+def ohlc(n=600, seed=1):
+    rng = np.random.default_rng(seed)
+    close = 1.1 + np.cumsum(rng.normal(0, 0.001, n))
+    spread = np.abs(rng.normal(0, 0.0008, n))
+    return close + spread, close - spread, close
+
+
+def loop_ema(values, period, alpha=None):
+    alpha = alpha or 2.0 / (period + 1)
+    out = [np.nan] * len(values)
+    value = sum(values[:period]) / period
+    out[period - 1] = value
+    for i in range(period, len(values)):
+        value = value + alpha * (values[i] - value)
+        out[i] = value
+    return np.array(out)
+
+
+def test_moving_averages_match_loops():
+    _, _, close = ohlc()
+    np.testing.assert_allclose(sma(close, 20)[19:], [close[i - 19:i + 1].mean() for i in range(19, len(close))])
+    assert np.isnan(sma(close, 20)[:19]).all()
+    np.testing.assert_allclose(ema(close, 20), loop_ema(close, 20), rtol=1e-12)
+    # Short periods decay fast and need many closed-form blocks
+    long_close = np.tile(close, 10)
+    np.testing.assert_allclose(ema(long_close, 2), loop_ema(long_close, 2), rtol=1e-10)
+
+
+def test_rsi_matches_wilder_loop():
+    _, _, close = ohlc()
+    delta = np.diff(close)
+    gains = loop_ema(np.clip(delta, 0, None), 14, 1 / 14)
+    losses = loop_ema(np.clip(-delta, 0, None), 14, 1 / 14)
+    expected = 100 - 100 / (1 + gains / losses)
+
+    result = rsi(close, 14)
+    assert np.isnan(result[:14]).all()
+    np.testing.assert_allclose(result[14:], expected[13:], rtol=1e-10)
+    assert rsi(np.arange(30.0), 14)[-1] == 100.0
+
+
+def test_macd_bollinger_and_atr():
+    high, low, close = ohlc()
+    line, signal, histogram = macd(close)
+    expected_line = loop_ema(close, 12) - loop_ema(close, 26)
+    np.testing.assert_allclose(line, expected_line, atol=1e-12)
+    np.testing.assert_allclose(signal[25:], loop_ema(expected_line[25:], 9), atol=1e-12)
+    np.testing.assert_allclose(histogram, line - signal)
+
+    middle, upper, lower = bollinger(close, 20, 2.0)
+    assert upper[-1] - middle[-1] == pytest.approx(2 * close[-20:].std())
+    assert lower[-1] < middle[-1] < upper[-1]
+
+    values = atr(high, low, close, 14)
+    assert np.isnan(values[:13]).all()
+    assert (values[13:] > 0).all()
+
+
+def test_incremental_updates_match_batch():
+    high, low, close = ohlc()
+    state = IndicatorState.from_arrays(close[:500], high[:500], low[:500])
+    for bar in zip(high[500:], low[500:], close[500:]):
+        latest = state.update(*bar)
+
+    batch = compute_indicators(close, high, low)
+    assert latest.keys() == batch.keys()
+    for name, values in batch.items():
+        assert latest[name] == pytest.approx(values[-1], rel=1e-9), name
+
+
+def test_unknown_indicator_is_rejected():
+    with pytest.raises(ValueError):
+        compute_indicators([1.0, 2.0], indicators=["vwap"])
+
+
+def test_tool_accepts_bar_lists():
+    high, low, close = ohlc(60)
+    bars = [{"high": h, "low": l, "close": c} for h, l, c in zip(high, low, close)]
+    result = json.loads(TechnicalIndicatorCalculator()._run(json.dumps(bars), "rsi,atr,macd", '{"rsi": 7}', tail=3))
+
+    assert result["success"] is True
+    assert result["bars"] == 60
+    assert result["latest"]["rsi_7"] == pytest.approx(rsi(close, 7)[-1], abs=1e-6)
+    assert len(result["history"]["atr_14"]) == 3
+    assert result["latest"]["macd_signal"] is not None
+
+
+def test_tool_reports_invalid_input():
+    result = json.loads(TechnicalIndicatorCalculator()._run('{"open": [1, 2]}'))
+    assert result["success"] is False
+    assert "close" in result["error"]
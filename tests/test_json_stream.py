@@ -0,0 +1,144 @@
+"""
+Test suite for incremental JSON parsing and the news tool's streaming mode.
+
+Bodies are fed in small chunks so that tokens, numbers and multi-byte
+characters are split across chunk boundaries.
+"""
+
+import sys
+import os
+import json
+import asyncio
+import tracemalloc
+
+import pytest
+
+# Add the src directory to the path so we can import our tools
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from forex_ai_agent.tools import news_data
+from forex_ai_agent.tools.json_stream import StreamingObjectParser
+from forex_ai_agent.tools.news_data import NewsAndSentimentFetcher
+from forex_ai_agent.tools.news_store import NewsStore
+
+
+def chunked(body, size):
+    view = memoryview(body)
+    for start in range(0, len(body), size):
+        yield bytes(view[start:start + size])
+
+
+def feed_body(count):
+    feed = [{
+        "title": f"Euro réagit {i}", "url": f"https://example.com/{i}", "time_published": f"20240101T{i % 24:02d}0000",
+        "summary": "x" * 500, "overall_sentiment_score": 0.25 if i % 2 else -0.125,
+        "overall_sentiment_label": "Somewhat-Bullish" if i % 2 else "Neutral",
+        "ticker_sentiment": [{"ticker": "FOREX:EUR", "relevance_score": "0.5", "ticker_sentiment_score": "0.1"}],
+    } for i in range(count)]
+    return json.dumps({"items": str(count), "sentiment_score_definition": "x <= -0.35: Bearish",
+                       "feed": feed, "relevance_score": 12345}, indent=2).encode("utf-8"), feed
+
+
+@pytest.mark.parametrize("size", [1, 7, 4096])
+def test_parser_matches_json_loads(size):
+    body, feed = feed_body(20)
+    parser = StreamingObjectParser("feed")
+    assert list(parser.parse(chunked(body, size))) == feed
+    assert parser.found and parser.done
+    assert parser.header == {"items": "20", "sentiment_score_definition": "x <= -0.35: Bearish", "relevance_score": 12345}
+
+
+def test_parser_reports_notices_and_bad_bodies():
+    parser = StreamingObjectParser("feed")
+    assert list(parser.parse(chunked(b'{"Note": "Thank you for using Alpha Vantage!"}', 5))) == []
+    assert not parser.found and parser.header == {"Note": "Thank you for using Alpha Vantage!"}
+
+    with pytest.raises(ValueError):
+        list(StreamingObjectParser().parse(chunked(b'{"feed": [{"a": 1}, {"b"', 4)))
+    with pytest.raises(ValueError):
+        list(StreamingObjectParser().parse([b"[1, 2]"]))
+
+
+def test_parser_memory_does_not_grow_with_the_feed():
+    peaks = []
+    for count in (1000, 4000):
+        body, _ = feed_body(count)
+        parser = StreamingObjectParser("feed")
+        tracemalloc.start()
+        assert sum(1 for _ in parser.parse(chunked(body, 64 * 1024))) == count
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    # Peak memory follows the chunk size: about one chunk of text and the articles it completes
+    assert peaks[1] < 1.5 * peaks[0]
+    assert peaks[1] < len(body) / 8
+
+
+class StubClient:
+    api_key = "demo"
+
+    def __init__(self, body):
+        self.body = body
+        self.closed = False
+
+    def stream(self, function, params, timeout=10, chunk_size=None):
+        try:
+            yield from chunked(self.body, 1000)
+        finally:
+            self.closed = True
+
+    def query(self, *args, **kwargs):
+        raise AssertionError("streaming mode must not decode the whole response")
+
+
+def test_tool_streams_large_feeds(monkeypatch):
+    body, feed = feed_body(300)
+    client = StubClient(body)
+    monkeypatch.setattr(news_data, "alpha_vantage_client", client)
+    monkeypatch.delenv("FOREX_AI_NEWS_STREAMING", raising=False)
+
+    fetcher = NewsAndSentimentFetcher()
+    result = json.loads(fetcher._run(tickers="FOREX:EUR", limit=300, sort="RELEVANCE"))
+    assert result["query_info"]["streamed"] is True
+    assert result["query_info"]["articles_streamed"] == 300
+    # Every article up to the limit is returned, as when the response is decoded whole
+    assert result["articles"] == [fetcher._project(article) for article in feed]
+    # The summary covers every streamed article
+    assert result["sentiment_summary"]["average_sentiment_score"] == round((150 * 0.25 - 150 * 0.125) / 300, 4)
+    assert result["sentiment_summary"]["sentiment_distribution"] == {"Neutral": 150, "Somewhat-Bullish": 150}
+
+    # Stopping at the limit closes the response
+    client.closed = False
+    result = json.loads(fetcher._run(tickers="FOREX:EUR", limit=250, sort="RELEVANCE"))
+    assert result["query_info"]["articles_streamed"] == 250
+    assert client.closed
+
+    client.body = b'{"Note": "Thank you for using Alpha Vantage!"}'
+    assert json.loads(fetcher._run(limit=300, sort="RELEVANCE"))["error"] == "API rate limit exceeded"
+
+
+def test_tool_streams_into_store(tmp_path, monkeypatch):
+    body, _ = feed_body(300)
+    monkeypatch.setattr(news_data, "alpha_vantage_client", StubClient(body))
+    fetcher = NewsAndSentimentFetcher(streaming=True)
+    fetcher.store = NewsStore(str(tmp_path / "news.sqlite3"))
+    result = json.loads(fetcher._run(tickers="FOREX:EUR", limit=300))
+    assert result["query_info"]["new_articles"] == 300
+    assert result["query_info"]["articles_returned"] == len(result["articles"]) == 300
+    assert result["ticker_sentiment_summary"]["FOREX:EUR"]["count"] == 300
+
+
+def test_async_tool_streams(monkeypatch):
+    body, _ = feed_body(10)
+
+    class AsyncStub:
+        api_key = "demo"
+
+        async def stream(self, function, params, timeout=10, chunk_size=None):
+            for chunk in chunked(body, 100):
+                yield chunk
+
+    monkeypatch.setattr(news_data, "alpha_vantage_client", AsyncStub())
+    monkeypatch.setattr(news_data, "async_alpha_vantage_client", AsyncStub())
+    fetcher = NewsAndSentimentFetcher(streaming=True)
+    result = json.loads(asyncio.run(fetcher._arun(limit=10, sort="RELEVANCE")))
+    assert result["query_info"]["articles_streamed"] == 10
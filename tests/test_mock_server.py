@@ -0,0 +1,106 @@
+"""
+Test suite for the local Alpha Vantage and OpenAI mock server.
+
+The tools' shared Alpha Vantage client is pointed at the server for each test.
+"""
+
+import sys
+import os
+import json
+
+import pytest
+import requests
+
+# Add the src directory to the path so we can import our tools
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from forex_ai_agent.mock_server import MockServer, MockSettings, fixture_name
+from forex_ai_agent.tools.alpha_vantage import RateLimiter, TTLCache, alpha_vantage_client
+from forex_ai_agent.tools.forex_data import forex_data_fetcher
+from forex_ai_agent.tools.historical_data import parse_time_series
+from forex_ai_agent.tools.news_data import NewsAndSentimentFetcher
+
+
+@pytest.fixture
+def mock_api(monkeypatch):
+    """Start a server and point the shared client at it, without quota or caches."""
+    servers = []
+
+    def start(**settings):
+        server = MockServer(MockSettings(**settings)).start()
+        servers.append(server)
+        monkeypatch.setattr(alpha_vantage_client, "base_url", f"{server.url}/query")
+        monkeypatch.setattr(alpha_vantage_client, "_api_key", "mock")
+        monkeypatch.setattr(alpha_vantage_client, "rate_limiter", RateLimiter(10 ** 6, 10 ** 6))
+        monkeypatch.setattr(alpha_vantage_client, "cache", TTLCache())
+        monkeypatch.setattr(alpha_vantage_client, "persistent_cache", None)
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
+
+
+def test_tools_run_against_generated_responses(mock_api):
+    server = mock_api()
+    quote = json.loads(forex_data_fetcher._run(from_currency="EUR", to_currency="USD"))
+    assert quote["success"] is True
+    assert quote["current_price"] == pytest.approx(1 / 0.933, rel=1e-4)
+
+    bars = parse_time_series(alpha_vantage_client.query("FX_DAILY", {"from_symbol": "EUR", "to_symbol": "USD"}))
+    assert len(bars["close"]) == 100
+    assert (bars["high"] >= bars["low"]).all() and (bars["time"][1:] > bars["time"][:-1]).all()
+
+    news = NewsAndSentimentFetcher(streaming=False)
+    result = json.loads(news._run(tickers="FOREX:EUR", limit=20, sort="RELEVANCE"))
+    assert result["query_info"]["articles_returned"] == 20
+    assert alpha_vantage_client.query("NEWS_SENTIMENT", {"limit": 50, "time_from": "20240628T1400"})["items"] == "3"
+    assert server.stats == {"alpha_vantage.ok": 4}
+
+
+def test_rate_limit_notes_and_errors(mock_api):
+    mock_api(rate_limit_rate=1.0)
+    result = json.loads(forex_data_fetcher._run(from_currency="GBP", to_currency="USD"))
+    assert result["success"] is False and "limit" in result["error"].lower()
+
+    mock_api(error_rate=1.0)
+    result = json.loads(forex_data_fetcher._run(from_currency="GBP", to_currency="USD"))
+    assert result["success"] is False and result["error"].startswith("Network error")
+
+
+def test_recorded_fixtures_take_precedence(mock_api, tmp_path):
+    params = {"function": "CURRENCY_EXCHANGE_RATE", "from_currency": "EUR", "to_currency": "USD"}
+    name = fixture_name("CURRENCY_EXCHANGE_RATE", params)
+    assert name.startswith("CURRENCY_EXCHANGE_RATE_EUR_USD_") and name.endswith(".json")
+    # Every parameter but the API key tells requests apart
+    assert fixture_name("CURRENCY_EXCHANGE_RATE", {**params, "apikey": "secret"}) == name
+    news = {"function": "NEWS_SENTIMENT", "tickers": "FOREX:EUR", "limit": "50", "sort": "LATEST"}
+    names = {fixture_name("NEWS_SENTIMENT", {**news, **change})
+             for change in ({}, {"tickers": "FOREX:USD"}, {"topics": "economy_monetary"}, {"limit": "200"},
+                            {"sort": "RELEVANCE"}, {"time_from": "20240101T0000"})}
+    assert len(names) == 6
+    recorded = {"Realtime Currency Exchange Rate": {
+        "1. From_Currency Code": "EUR", "2. From_Currency Name": "Euro", "3. To_Currency Code": "USD",
+        "4. To_Currency Name": "United States Dollar", "5. Exchange Rate": "1.23450", "6. Last Refreshed": "2024-01-02 10:00:00",
+        "7. Time Zone": "UTC", "8. Bid Price": "1.23440", "9. Ask Price": "1.23460",
+    }}
+    (tmp_path / name).write_text(json.dumps(recorded))
+    mock_api(fixtures_dir=str(tmp_path))
+    data = alpha_vantage_client.query("CURRENCY_EXCHANGE_RATE", {"from_currency": "EUR", "to_currency": "USD"})
+    assert data == recorded
+
+
+def test_chat_completions(mock_api):
+    server = mock_api(reply="Final Answer: hold")
+    url = f"{server.url}/v1/chat/completions"
+    body = {"model": "mock", "messages": [{"role": "user", "content": "EUR/USD?"}]}
+    completion = requests.post(url, json=body, timeout=5).json()
+    assert completion["choices"][0]["message"]["content"] == "Final Answer: hold"
+
+    with requests.post(url, json={**body, "stream": True}, stream=True, timeout=5) as response:
+        events = [line[6:] for line in response.iter_lines(decode_unicode=True) if line.startswith("data: ")]
+    assert events[-1] == "[DONE]"
+    assert "".join(json.loads(e)["choices"][0]["delta"].get("content", "") for e in events[:-1]) == "Final Answer: hold"
+
+    server.settings.rate_limit_rate = 1.0
+    assert requests.post(url, json=body, timeout=5).status_code == 429
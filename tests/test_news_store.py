@@ -0,0 +1,144 @@
+"""
+Test suite for the incremental news store and the news tool's delta queries.
+
+The Alpha Vantage client is replaced by a stub serving a generated feed.
+"""
+
+import sys
+import os
+import json
+
+import pytest
+
+# Add the src directory to the path so we can import our tools
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from forex_ai_agent.tools import news_data
+from forex_ai_agent.tools.news_data import NewsAndSentimentFetcher
+from forex_ai_agent.tools.news_store import NewsStore, format_time_from, parse_published, query_key
+
+HOUR = 3600
+
+
+def article(i, hour, score=0.2, ticker="FOREX:USD", relevance=0.8, title=None, url=None):
+    stamp = format_time_from(hour * HOUR) + "00"
+    return {
+        "title": title or f"Headline {i}", "url": url or f"https://example.com/{i}", "time_published": stamp,
+        "summary": "...", "source": "Wire", "overall_sentiment_score": score,
+        "overall_sentiment_label": "Bullish" if score > 0.15 else "Neutral",
+        "ticker_sentiment": [{"ticker": ticker, "relevance_score": str(relevance),
+                              "ticker_sentiment_score": str(score), "ticker_sentiment_label": "Bullish"}],
+    }
+
+
+def test_time_stamps_and_query_keys():
+    assert parse_published("20240101T120000") == parse_published("20240101T1200") == 1704110400
+    assert format_time_from(1704110400) == "20240101T1200"
+    assert query_key("forex:usd, CRYPTO:BTC", None) == query_key("CRYPTO:BTC,FOREX:USD", "")
+    with pytest.raises(ValueError):
+        parse_published("yesterday")
+
+
+def test_dedup_and_watermark(tmp_path):
+    store = NewsStore(str(tmp_path / "news.sqlite3"))
+    key = query_key("FOREX:USD", None)
+    assert store.watermark(key) is None
+    assert store.add(key, [article(1, 10), article(2, 11)]) == 2
+    # Same URL again, and a syndicated copy with the same title under another URL
+    assert store.add(key, [article(2, 11), article(3, 12, title="Headline 1", url="https://mirror.com/1")]) == 0
+    assert store.watermark(key) == 11 * HOUR
+    assert [a["title"] for a in store.latest(key, 10)] == ["Headline 2", "Headline 1"]
+
+    # Another query linking a stored article: counted for the query, not again for the ticker
+    other = query_key("FOREX:EUR", None)
+    assert store.add(other, [article(1, 10)]) == 1
+    assert store.aggregates(["FOREX:USD"])["FOREX:USD"]["count"] == 2
+
+
+def test_decayed_aggregates_favour_recent_articles(tmp_path):
+    store = NewsStore(str(tmp_path / "news.sqlite3"), half_life_hours=1)
+    key = query_key("FOREX:USD", None)
+    store.add(key, [article(1, 0, score=-0.5), article(2, 1, score=0.5)])
+    summary = store.aggregates(["FOREX:USD", f"query:{key}"])
+    # One half-life apart: weights 1 and 0.5 -> (0.5 - 0.25) / 1.5
+    assert summary["FOREX:USD"]["decayed_average"] == pytest.approx(1 / 6, abs=1e-4)
+    assert summary[f"query:{key}"]["decayed_average"] == pytest.approx(1 / 6, abs=1e-4)
+    # Updates arriving out of order decay the same way
+    store.add(key, [article(3, 0, score=0.5)])
+    assert store.aggregates(["FOREX:USD"])["FOREX:USD"]["decayed_average"] == pytest.approx(0.5 / 2.0, abs=1e-4)
+    assert store.aggregates(["FOREX:USD"])["FOREX:USD"]["labels"] == {"Bullish": 3}
+    assert store.top_tickers() == ["FOREX:USD"]
+
+
+class StubClient:
+    def __init__(self, feed):
+        self.feed = feed
+        self.requests = []
+
+    def query(self, function, params, timeout=10, ttl=None):
+        self.requests.append(dict(params))
+        since = parse_published(params["time_from"]) if "time_from" in params else 0
+        return {"items": "0", "feed": [a for a in self.feed if parse_published(a["time_published"]) >= since]}
+
+
+def test_tool_requests_only_new_articles(tmp_path, monkeypatch):
+    feed = [article(i, 100 - i) for i in range(5)]
+    client = StubClient(feed)
+    client.api_key = "demo"
+    monkeypatch.setattr(news_data, "alpha_vantage_client", client)
+
+    fetcher = NewsAndSentimentFetcher()
+    fetcher.store = NewsStore(str(tmp_path / "news.sqlite3"))
+    first = json.loads(fetcher._run(tickers="FOREX:USD", limit=3))
+    assert first["query_info"]["new_articles"] == 5
+    assert len(first["articles"]) == 3
+    assert first["sentiment_summary"]["average_sentiment_score"] == 0.2
+    assert first["ticker_sentiment_summary"]["FOREX:USD"]["count"] == 5
+
+    feed.insert(0, article(9, 101))
+    second = json.loads(fetcher._run(tickers="FOREX:USD", limit=3))
+    assert client.requests[-1]["time_from"] == format_time_from(100 * HOUR)
+    assert second["query_info"]["new_articles"] == 1
+    assert second["articles"][0]["title"] == "Headline 9"
+
+    # Other sort orders are not incremental
+    assert json.loads(fetcher._run(tickers="FOREX:USD", sort="RELEVANCE"))["success"] is True
+    assert "time_from" not in client.requests[-1]
+
+
+class LimitedClient(StubClient):
+    """Serves at most `limit` articles, newest first, like the API."""
+
+    def query(self, function, params, timeout=10, ttl=None):
+        data = super().query(function, params, timeout, ttl)
+        data["feed"] = data["feed"][:int(params["limit"])]
+        return data
+
+
+def test_larger_limit_and_gaps_are_fetched_in_full(tmp_path, monkeypatch):
+    feed = [article(i, 100 - i) for i in range(20)]
+    client = LimitedClient(feed)
+    client.api_key = "demo"
+    monkeypatch.setattr(news_data, "alpha_vantage_client", client)
+    fetcher = NewsAndSentimentFetcher()
+    fetcher.store = NewsStore(str(tmp_path / "news.sqlite3"))
+
+    assert json.loads(fetcher._run(tickers="FOREX:USD", limit=5))["query_info"]["new_articles"] == 5
+    # Only 5 articles are covered, so a larger limit fetches older ones too
+    larger = json.loads(fetcher._run(tickers="FOREX:USD", limit=12))
+    assert "time_from" not in client.requests[-1]
+    assert larger["query_info"]["articles_returned"] == 12
+    assert larger["query_info"]["new_articles"] == 7
+    # Now covered: a repeat only asks for newer articles
+    json.loads(fetcher._run(tickers="FOREX:USD", limit=12))
+    assert client.requests[-1]["time_from"] == format_time_from(100 * HOUR)
+
+    # More new articles than the limit: those between them and the store may be missing
+    feed[:0] = [article(100 + i, 110 - i) for i in range(8)]
+    gapped = json.loads(fetcher._run(tickers="FOREX:USD", limit=5))
+    assert gapped["query_info"]["new_articles"] == 5
+    refilled = json.loads(fetcher._run(tickers="FOREX:USD", limit=10))
+    assert "time_from" not in client.requests[-1]
+    assert [a["title"] for a in refilled["articles"]] == [
+        f"Headline {i}" for i in list(range(100, 108)) + [0, 1]
+    ]
@@ -0,0 +1,153 @@
+"""
+Test suite for the columnar OHLC store and incremental Alpha Vantage ingestion.
+
+Alpha Vantage is replaced by a stub client serving generated time series.
+"""
+
+import sys
+import os
+import json
+
+import numpy as np
+import pytest
+
+# Add the src directory to the path so we can import our tools
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from forex_ai_agent.tools.historical_data import (
+    HistoricalDataFetcher,
+    OHLCIngestor,
+    parse_time_series,
+    request_for,
+)
+from forex_ai_agent.tools.indicators import TechnicalIndicatorCalculator
+from forex_ai_agent.tools.ohlc_store import OHLCStore
+
+DAY = 86400
+
+
+def bars(start, count):
+    times = np.arange(start, start + count) * DAY
+    close = 1.1 + np.arange(count) * 0.001
+    return {"time": times, "open": close - 0.0005, "high": close + 0.001, "low": close - 0.001, "close": close}
+
+
+def av_series(days, key="Time Series FX (Daily)"):
+    """Alpha Vantage style response for the given day numbers (newest first, as the API sends them)."""
+    series = {}
+    for day in sorted(days, reverse=True):
+        stamp = str(np.datetime64(int(day * DAY), "s").astype("datetime64[D]"))
+        price = 1.1 + day * 0.001
+        series[stamp] = {"1. open": str(price), "2. high": str(price + 0.001), "3. low": str(price - 0.001), "4. close": str(price)}
+    return {"Meta Data": {}, key: series}
+
+
+class StubClient:
+    api_key = "demo"
+
+    def __init__(self, latest_day):
+        self.latest_day = latest_day
+        self.requests = []
+
+    def query(self, function, params, timeout=10, ttl=None):
+        self.requests.append((function, dict(params)))
+        first = 0 if params.get("outputsize") != "compact" else self.latest_day - 99
+        return av_series(range(max(first, 0), self.latest_day + 1))
+
+
+def test_append_is_incremental_and_revises_last_bar(tmp_path):
+    store = OHLCStore(str(tmp_path))
+    assert store.append("EUR/USD", "daily", bars(0, 10)) == 10
+    # Overlapping batch: only bars after the stored watermark are added
+    update = bars(5, 10)
+    update["close"] = update["close"] + 1
+    assert store.append("EUR/USD", "daily", update) == 5
+
+    data = store.read("EUR/USD", "daily")
+    assert len(data["time"]) == 15
+    assert np.all(np.diff(data["time"]) > 0)
+    assert data["close"][8] == pytest.approx(1.108)      # untouched history
+    assert data["close"][9] == pytest.approx(2.104)      # last stored bar revised
+    assert data["volume"][0] == 0.0
+    assert store.series() == [("EUR_USD", "daily")]
+
+
+def test_range_queries(tmp_path):
+    store = OHLCStore(str(tmp_path))
+    store.append("EUR/USD", "daily", bars(0, 1000))
+
+    window = store.read("EUR/USD", "daily", start=100 * DAY, end=110 * DAY, columns=("time", "close"))
+    assert list(window["time"] // DAY) == list(range(100, 110))
+    assert set(window) == {"time", "close"}
+    assert isinstance(window["close"], np.memmap)
+    assert list(store.read("EUR/USD", "daily", last=3)["time"] // DAY) == [997, 998, 999]
+    assert len(store.read("GBP/USD", "daily")["time"]) == 0
+
+
+def test_interrupted_append_is_truncated(tmp_path):
+    store = OHLCStore(str(tmp_path))
+    store.append("EUR/USD", "daily", bars(0, 5))
+    # A crash after writing prices but before committing the time column
+    with open(os.path.join(store._dir("EUR/USD", "daily"), "close.bin"), "ab") as handle:
+        handle.write(np.zeros(3).tobytes())
+
+    store.append("EUR/USD", "daily", bars(5, 2))
+    data = store.read("EUR/USD", "daily")
+    assert len(data["close"]) == len(data["time"]) == 7
+    assert data["close"][5] == pytest.approx(1.1)
+
+
+def test_parse_time_series_formats():
+    parsed = parse_time_series(av_series([3, 1, 2]))
+    assert list(parsed["time"] // DAY) == [1, 2, 3]
+    assert parsed["close"][0] == pytest.approx(1.101)
+
+    crypto = {"Time Series (Digital Currency Daily)": {
+        "2024-01-02": {"1a. open (USD)": "1", "1b. open (USD)": "9", "2a. high (USD)": "2",
+                       "3a. low (USD)": "0.5", "4a. close (USD)": "1.5", "5. volume": "10"},
+    }}
+    parsed = parse_time_series(crypto)
+    assert parsed["open"][0] == 1.0 and parsed["volume"][0] == 10.0
+
+    with pytest.raises(ValueError):
+        parse_time_series({"Error Message": "Invalid API call"})
+    assert request_for(("BTC", "USD"), "daily", "full")[0] == "DIGITAL_CURRENCY_DAILY"
+    assert request_for(("EUR", "USD"), "5min", "compact")[1]["interval"] == "5min"
+
+
+def test_ingestion_downloads_full_history_once(tmp_path):
+    store = OHLCStore(str(tmp_path))
+    client = StubClient(latest_day=500)
+    ingestor = OHLCIngestor(store, client)
+
+    first = ingestor.ingest(("EUR", "USD"), "daily")
+    assert first["outputsize"] == "full" and first["added"] == 501
+
+    client.latest_day = 503
+    second = ingestor.ingest(("EUR", "USD"), "daily")
+    assert second["outputsize"] == "compact"
+    assert second["added"] == 3 and second["stored"] == 504
+
+    # Stored data older than the compact window: fall back to full history
+    client.latest_day = 800
+    third = ingestor.ingest(("EUR", "USD"), "daily")
+    assert third["outputsize"] == "full" and third["stored"] == 801
+    assert [params["outputsize"] for _, params in client.requests] == ["full", "compact", "compact", "full"]
+
+
+def test_tools_read_stored_history(tmp_path):
+    store = OHLCStore(str(tmp_path))
+    fetcher = HistoricalDataFetcher(store=store, client=StubClient(latest_day=120))
+    result = json.loads(fetcher._run("EUR/USD", "daily", bars=5))
+    assert result["success"] is True
+    assert result["count"] == 5
+    assert result["ingest"]["added"] == 121
+    assert result["bars"]["close"][-1] == pytest.approx(1.22)
+
+    calculator = TechnicalIndicatorCalculator()
+    calculator.store = store
+    indicators = json.loads(calculator._run(indicators="sma,rsi", pair="EUR/USD", timeframe="daily"))
+    assert indicators["bars"] == 121
+    assert indicators["latest"]["rsi_14"] == 100.0
+
+    assert json.loads(fetcher._run("EUR/USD", "2h"))["success"] is False
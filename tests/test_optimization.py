@@ -0,0 +1,142 @@
+"""
+Test suite for parameter sweeps and walk-forward optimization.
+
+The pool tests start real worker processes attached to shared memory.
+"""
+
+import sys
+import os
+import json
+
+import numpy as np
+import pytest
+
+# Add the src directory to the path so we can import our tools
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from forex_ai_agent.tools import optimization
+from forex_ai_agent.tools.backtest import run_backtest
+from forex_ai_agent.tools.optimization import (
+    SharedOHLC,
+    StrategyOptimizer,
+    apply_parameters,
+    optimize,
+    parameter_sets,
+    walk_forward_splits,
+)
+from forex_ai_agent.tools.strategy_tools import StrategyValidator
+
+TEMPLATE = {
+    "entry_rules": ["ema_{fast} crosses_above ema_{slow}"],
+    "exit_rules": ["ema_{fast} crosses_below ema_{slow}"],
+    "stop_loss": {"atr": "{stop}"},
+    "take_profit": {"rr": 2},
+}
+SPACE = {"fast": [5, 10], "slow": {"min": 20, "max": 40, "step": 10}, "stop": [2]}
+
+
+def random_walk(n=6000, seed=4):
+    rng = np.random.default_rng(seed)
+    close = 1.1 + np.cumsum(rng.normal(0, 0.002, n))
+    opens = np.concatenate(([close[0]], close[:-1]))
+    return {
+        "open": opens, "close": close,
+        "high": np.maximum(opens, close) + 0.001, "low": np.minimum(opens, close) - 0.001,
+        "time": np.arange(n) * 86400,
+    }
+
+
+def test_parameter_sets_and_substitution():
+    grid = parameter_sets(SPACE, constraints=["fast < slow"])
+    assert len(grid) == 6
+    assert {"fast": 10, "slow": 20, "stop": 2} in grid
+    assert parameter_sets({"fast": [5, 10, 30], "slow": [20]}, constraints=["fast < slow"]) == [
+        {"fast": 5, "slow": 20}, {"fast": 10, "slow": 20}]
+
+    assert parameter_sets({"fast": [10, 20], "slow": [20]}, constraints=["fast == slow"]) == [{"fast": 20, "slow": 20}]
+    with pytest.raises(ValueError, match="Unknown constraint operator: =<"):
+        parameter_sets(SPACE, constraints=["fast =< slow"])
+    with pytest.raises(ValueError):
+        parameter_sets(SPACE, constraints=["fast<slow"])
+
+    sampled = parameter_sets({"a": list(range(100)), "b": list(range(100))}, samples=25, seed=1)
+    assert len(sampled) == 25 == len({tuple(p.values()) for p in sampled})
+
+    strategy = apply_parameters(TEMPLATE, {"fast": 5, "slow": 30, "stop": 1.5})
+    assert strategy["entry_rules"] == ["ema_5 crosses_above ema_30"]
+    assert strategy["stop_loss"] == {"atr": 1.5}
+    assert TEMPLATE["stop_loss"] == {"atr": "{stop}"}
+
+
+def test_walk_forward_splits_cover_history():
+    splits = walk_forward_splits(1000, 4, train_fraction=0.75)
+    assert splits[0] == (0, 187, 187, 250)
+    assert [test_end for *_, test_end in splits][-1] == 1000
+    assert all(train_end == test_start for _, train_end, test_start, _ in splits)
+    assert {start for start, *_ in walk_forward_splits(1000, 4, anchored=True)} == {0}
+    with pytest.raises(ValueError):
+        walk_forward_splits(1000, 0)
+
+
+def test_first_entry_only_skips_warmup_trades():
+    data = random_walk()
+    strategy = apply_parameters(TEMPLATE, {"fast": 5, "slow": 20, "stop": 2})
+    trades, _ = run_backtest(data, strategy)
+    later, _ = run_backtest(data, strategy, first_entry=3000)
+    assert later.entry_bar.min() >= 3000
+    # Same indicator history: trades after the first one coincide with the full run
+    np.testing.assert_array_equal(later.entry_bar[1:], trades.entry_bar[trades.entry_bar >= later.exit_bar[0]])
+
+
+def test_shared_memory_round_trip():
+    data = random_walk(100)
+    with SharedOHLC(data) as shared:
+        shm, arrays = SharedOHLC.attach(shared.layout)
+        np.testing.assert_array_equal(arrays["close"], data["close"])
+        assert arrays["time"].dtype == np.int64 and arrays["time"][-1] == 99 * 86400
+        del arrays
+        shm.close()
+
+
+def test_pool_matches_in_process_results():
+    data = random_walk()
+    candidates = parameter_sets(SPACE, constraints=["fast < slow"])
+    serial = StrategyOptimizer(data, max_workers=1).sweep(TEMPLATE, candidates, min_trades=1)
+    pooled = StrategyOptimizer(data, max_workers=2).sweep(TEMPLATE, candidates, min_trades=1)
+    assert [r["params"] for r in serial] == [r["params"] for r in pooled]
+    assert [r["metrics"] for r in serial] == [r["metrics"] for r in pooled]
+    assert serial[0]["score"] >= serial[-1]["score"]
+
+    result = optimize(data, TEMPLATE, {"parameters": SPACE, "constraints": ["fast < slow"], "max_workers": 2,
+                                       "walk_forward": {"folds": 3}, "min_trades": 1})
+    folds = result["walk_forward"]["folds"]
+    assert result["mode"] == "walk_forward" and len(folds) == 3
+    assert all(fold["best_params"] in candidates for fold in folds)
+    assert result["walk_forward"]["out_of_sample"]["trade_count"] == sum(f["test_metrics"]["trade_count"] for f in folds)
+
+
+def test_validator_sweep_mode():
+    data = random_walk(2000)
+    strategy = {**TEMPLATE, "ohlc": {column: values.tolist() for column, values in data.items()}}
+    sweep = {"parameters": SPACE, "constraints": ["fast < slow"], "top": 2, "max_workers": 1, "objective": "expectancy"}
+    result = json.loads(StrategyValidator()._run(json.dumps(strategy), sweep=json.dumps(sweep)))
+    assert result["success"] is True
+    assert result["sweep"]["candidates"] == 6
+    assert len(result["sweep"]["top"]) == 2
+
+    bad = json.loads(StrategyValidator()._run(json.dumps(strategy), sweep=json.dumps({**sweep, "objective": "luck"})))
+    assert bad["success"] is False and "Unknown objective" in bad["error"]
+    bad = json.loads(StrategyValidator()._run(json.dumps(strategy), sweep=json.dumps({**sweep, "constraints": ["fast ~ slow"]})))
+    assert bad["success"] is False and "Unknown constraint operator: ~" in bad["error"]
+
+
+def test_validator_expands_the_sweep_once(monkeypatch):
+    data = random_walk(2000)
+    strategy = {**TEMPLATE, "ohlc": {column: values.tolist() for column, values in data.items()}}
+    sweep = {"parameters": SPACE, "samples": 3, "seed": 7, "max_workers": 1, "min_trades": 1}
+
+    def expanded_again(*args, **kwargs):
+        raise AssertionError("optimize must reuse the validator's parameter sets")
+    monkeypatch.setattr(optimization, "parameter_sets", expanded_again)
+    result = json.loads(StrategyValidator()._run(json.dumps(strategy), sweep=json.dumps(sweep)))
+    assert result["success"] is True and result["sweep"]["candidates"] == 3
@@ -0,0 +1,95 @@
+"""
+Test suite for the compact and CSV tool output modes.
+"""
+
+import sys
+import os
+import json
+
+import numpy as np
+
+# Add the src directory to the path so we can import our tools
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from forex_ai_agent.tools.historical_data import HistoricalDataFetcher
+from forex_ai_agent.tools.news_data import NewsAndSentimentFetcher
+from forex_ai_agent.tools.ohlc_store import OHLCStore
+from forex_ai_agent.tools.output import OutputProfile, estimate_tokens, render, to_csv
+
+
+def news_response(count):
+    return {"feed": [
+        {"title": f"Headline {i}", "url": f"https://example.com/{i}", "time_published": "20240101T120000",
+         "authors": ["A. Writer"], "summary": "Long summary " * 40, "source": "Wire",
+         "category_within_source": "Markets", "overall_sentiment_score": 0.123456789,
+         "overall_sentiment_label": "Somewhat-Bullish",
+         "ticker_sentiment": [{"ticker": "FOREX:USD", "relevance_score": "0.5", "ticker_sentiment_score": "0.1"}]}
+        for i in range(count)
+    ]}
+
+
+def test_full_mode_is_unchanged(monkeypatch):
+    monkeypatch.delenv("FOREX_AI_OUTPUT_MODE", raising=False)
+    result = {"success": True, "price": 1.0851234567, "items": [1, 2, 3]}
+    assert render(result, indent=2) == json.dumps(result, indent=2)
+    assert render(result) == json.dumps(result, separators=(",", ":"))
+
+
+def test_compact_projects_caps_and_rounds():
+    profile = OutputProfile(drop=("rows.*.note",), limits={"rows": 2, "series": -2})
+    result = {"rows": [{"id": i, "note": "x" * 100, "value": 1 / 3} for i in range(5)],
+              "series": [1, 2, 3, 4], "empty": [], "missing": None, "success": True}
+    compact = json.loads(render(result, profile, "compact"))
+    assert compact["rows"] == [{"id": 0, "value": 0.333333}, {"id": 1, "value": 0.333333}]
+    assert compact["series"] == [3, 4]
+    assert "empty" not in compact and "missing" not in compact
+    assert compact["_meta"]["omitted"] == {"rows": 3, "series": 2}
+    assert compact["_meta"]["approx_tokens"] >= estimate_tokens(json.dumps(compact, separators=(",", ":")))
+
+
+def test_size_cap_keeps_table_columns_aligned():
+    columns = {"time": list(range(1000)), "close": [1.1] * 1000}
+    capped = json.loads(render({"bars": columns}, OutputProfile(limits={"bars.*": -1000}), "compact", max_chars=500))
+    assert len(capped["bars"]["time"]) == len(capped["bars"]["close"]) < 1000
+    assert capped["bars"]["time"][-1] == 999
+    assert len(json.dumps(capped)) < 600
+
+
+def test_csv_tables():
+    assert to_csv({"time": [1, 2], "close": [1.5, 1.6]}) == "time,close\n1,1.5\n2,1.6\n"
+    assert to_csv([{"a": 1, "b": {"c": 2}}]) == "a,b.c\n1,2\n"
+    assert to_csv({"EUR/USD": {"rate": 1.1}}) == "key,rate\nEUR/USD,1.1\n"
+    assert to_csv({"a": [1], "b": [1, 2]}) is None
+
+
+def test_news_compact_and_csv_are_much_smaller():
+    fetcher = NewsAndSentimentFetcher()
+    data = news_response(200)
+    full = fetcher._format_response(data, "FOREX:USD", None, 200, "LATEST")
+
+    fetcher.output_mode = "compact"
+    compact = fetcher._format_response(data, "FOREX:USD", None, 200, "LATEST")
+    parsed = json.loads(compact)
+    assert len(parsed["articles"]) == 10
+    assert set(parsed["articles"][0]) == {"title", "time_published", "source",
+                                          "overall_sentiment_score", "overall_sentiment_label"}
+    assert parsed["sentiment_summary"]["average_sentiment_score"] == 0.1235
+    assert len(compact) * 20 < len(full)
+
+    fetcher.output_mode = "csv"
+    table = json.loads(fetcher._format_response(data, "FOREX:USD", None, 200, "LATEST"))["articles"]
+    assert table.splitlines()[0] == "title,time_published,source,overall_sentiment_score,overall_sentiment_label"
+    assert len(table.splitlines()) == 11
+
+
+def test_environment_selects_mode(monkeypatch, tmp_path):
+    store = OHLCStore(str(tmp_path))
+    times = np.arange(100) * 86400
+    store.append("EUR/USD", "daily", {"time": times, "open": times * 0 + 1.1, "high": times * 0 + 1.2,
+                                      "low": times * 0 + 1.0, "close": times * 0 + 1.15})
+    monkeypatch.setenv("FOREX_AI_OUTPUT_MODE", "csv")
+    result = json.loads(HistoricalDataFetcher(store=store)._run("EUR/USD", "daily", bars=100, refresh=False))
+    rows = result["bars"].splitlines()
+    assert rows[0] == "time,open,high,low,close,volume"
+    assert len(rows) == 31 and rows[-1].startswith("1970-04-10")
+    assert result["_meta"]["omitted"] == {"bars": 70}
@@ -0,0 +1,90 @@
+"""
+Test suite for the persistent on-disk market data cache.
+"""
+
+import sys
+import os
+
+# Add the src directory to the path so we can import our tools
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from forex_ai_agent.tools.alpha_vantage import AlphaVantageClient, RateLimiter
+from forex_ai_agent.tools.persistent_cache import PersistentCache, lazy_persistent_cache
+
+from test_alpha_vantage import QUOTE, FakeClock, FakeSession
+
+
+def test_entries_survive_reopen(tmp_path):
+    """A second cache instance (e.g. after a restart) sees stored entries"""
+    path = str(tmp_path / "cache.sqlite3")
+    PersistentCache(path).set("quote", {"rate": 1.085}, ttl=60)
+
+    reopened = PersistentCache(path)
+    assert reopened.get("quote") == {"rate": 1.085}
+    assert reopened.stats()["hits"] == 1
+
+
+def test_expired_entries_are_misses(tmp_path):
+    clock = FakeClock()
+    cache = PersistentCache(str(tmp_path / "cache.sqlite3"), clock=clock)
+    cache.set("quote", {"rate": 1.085}, ttl=30)
+
+    clock.now += 31
+    assert cache.get("quote") is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_lru_eviction_keeps_recently_used(tmp_path):
+    clock = FakeClock()
+    cache = PersistentCache(str(tmp_path / "cache.sqlite3"), max_entries=2, clock=clock)
+    cache.set("a", 1, ttl=60)
+    clock.now += 1
+    cache.set("b", 2, ttl=60)
+    clock.now += 1
+    cache.get("a")
+    clock.now += 1
+    cache.set("c", 3, ttl=60)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_client_reuses_disk_cache_across_instances(tmp_path):
+    """A fresh client with an empty memory cache is served from disk"""
+    path = str(tmp_path / "cache.sqlite3")
+    params = {"from_currency": "EUR", "to_currency": "USD"}
+
+    clients = []
+    for _ in range(2):
+        clock = FakeClock()
+        client = AlphaVantageClient(
+            api_key="test-key",
+            rate_limiter=RateLimiter(clock=clock, sleep=clock.sleep),
+            persistent_cache=PersistentCache(path),
+        )
+        client.session = FakeSession(QUOTE)
+        assert client.query("CURRENCY_EXCHANGE_RATE", params) == QUOTE
+        clients.append(client)
+
+    assert len(clients[0].session.calls) == 1
+    assert len(clients[1].session.calls) == 0
+    assert clients[1].cache_stats()["disk"]["hits"] == 1
+
+
+def test_lazy_cache_opens_on_first_query(tmp_path, monkeypatch):
+    """Creating the shared client does not create cache files; the first query does"""
+    monkeypatch.setenv("FOREX_AI_CACHE_DIR", str(tmp_path / "cache"))
+    clock = FakeClock()
+    client = AlphaVantageClient(
+        api_key="test-key",
+        rate_limiter=RateLimiter(clock=clock, sleep=clock.sleep),
+        persistent_cache=lazy_persistent_cache("alpha_vantage"),
+    )
+    client.session = FakeSession(QUOTE)
+    assert not (tmp_path / "cache").exists()
+
+    client.query("CURRENCY_EXCHANGE_RATE", {"from_currency": "EUR", "to_currency": "USD"})
+    assert (tmp_path / "cache" / "alpha_vantage.sqlite3").exists()
+    assert client.persistent_cache is client.persistent_cache
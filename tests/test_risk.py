@@ -0,0 +1,198 @@
+"""
+Test suite for position sizing, the batch portfolio mode of the risk calculator
+and the Monte Carlo risk-of-ruin simulator.
+
+Conversion rates are passed in, so no quotes are fetched.
+"""
+
+import sys
+import os
+import json
+
+import numpy as np
+import pytest
+
+# Add the src directory to the path so we can import our tools
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from forex_ai_agent.tools import strategy_tools
+from forex_ai_agent.tools.ohlc_store import OHLCStore
+from forex_ai_agent.tools.risk import (
+    RateBook,
+    TradeRequest,
+    allocate,
+    monte_carlo,
+    pair_correlations,
+    position_size,
+    simulate_paths,
+)
+from forex_ai_agent.tools.strategy_tools import MonteCarloRiskSimulator, RiskCalculator
+
+
+def test_position_size_in_quote_currency_account():
+    trade = TradeRequest(("EUR", "USD"), 1.0850, 1.0800, target=1.0950)
+    position = position_size(trade, 200.0, "USD", RateBook())
+    assert position["units"] == 40000
+    assert position["pip_value"] == pytest.approx(4.0)
+    assert position["pip_value_per_standard_lot"] == pytest.approx(10.0)
+    assert position["risk_reward"] == pytest.approx(2.0)
+    assert position["potential_profit"] == pytest.approx(400.0)
+    assert position["margin_required"] == pytest.approx(40000 * 1.085 / 30, abs=0.01)
+
+
+def test_cross_currency_accounts_convert_pip_values():
+    # USD/JPY in a USD account: JPY losses convert at 1/150
+    book = RateBook()
+    book.add(("USD", "JPY"), 150.0)
+    position = position_size(TradeRequest(("USD", "JPY"), 150.0, 149.5), 100.0, "USD", book)
+    assert position["units"] == 30000
+    assert position["pip_value_per_standard_lot"] == pytest.approx(1000 / 150, abs=1e-4)
+
+    # GBP/JPY in a EUR account: JPY -> EUR triangulated through USD
+    book = RateBook({("USD", "JPY"): 150.0, ("EUR", "USD"): 1.1})
+    rate, source = book.convert("JPY", "EUR")
+    assert rate == pytest.approx(1 / 165) and source == "cross:USD"
+
+    with pytest.raises(ValueError):
+        RateBook().convert("CHF", "USD")
+    # Short positions have their stop above the entry and rounding never exceeds the budget
+    short = position_size(TradeRequest(("EUR", "USD"), 1.08, 1.0833), 100.0, "USD", RateBook())
+    assert short["direction"] == "short" and short["risk_amount"] <= 100.0
+
+
+def test_batch_respects_portfolio_caps():
+    trades = [
+        TradeRequest(("EUR", "USD"), 1.085, 1.080),
+        TradeRequest(("GBP", "USD"), 1.270, 1.265),
+        TradeRequest(("AUD", "USD"), 0.660, 0.655),
+        TradeRequest(("NZD", "CAD"), 0.820, 0.815),
+    ]
+    book = RateBook({("USD", "CAD"): 1.35})
+    result = allocate(trades, 10000, "USD", book, risk_percent=2.0, max_portfolio_risk=5.0)
+    statuses = [p["status"] for p in result["positions"]]
+    # Short USD risk is capped at 4%, so AUD/USD only gets what is left
+    assert statuses[:3] == ["accepted", "accepted", "rejected"]
+    assert "USD_exposure" in result["positions"][2]["limited_by"]
+    assert result["positions"][3]["status"] == "reduced"
+    assert result["portfolio"]["total_risk_percent"] <= 5.0
+    assert result["portfolio"]["currency_exposure_percent"]["USD"] == pytest.approx(-4.0)
+
+
+def test_correlations_from_stored_history(tmp_path):
+    store = OHLCStore(str(tmp_path))
+    rng = np.random.default_rng(0)
+    times = np.arange(200) * 86400
+    common = rng.normal(0, 0.004, 200)
+    for symbol, noise in (("EUR/USD", 0.001), ("GBP/USD", 0.001), ("USD/JPY", 0.004)):
+        returns = common + rng.normal(0, noise, 200) if symbol != "USD/JPY" else rng.normal(0, noise, 200)
+        close = np.exp(np.cumsum(returns))
+        store.append(symbol, "daily", {"time": times, "open": close, "high": close, "low": close, "close": close})
+
+    matrix, source = pair_correlations([("EUR", "USD"), ("GBP", "USD"), ("USD", "JPY")], store)
+    assert source.startswith("returns:")
+    assert matrix[0, 1] > 0.8 and abs(matrix[0, 2]) < 0.3
+    fallback, source = pair_correlations([("EUR", "USD"), ("EUR", "CHF")], store)
+    assert source == "currency_overlap" and fallback[0, 1] == 0.5
+
+
+def test_risk_calculator_tool():
+    calculator = RiskCalculator()
+    single = json.loads(calculator._run(entry_price=0.86, stop_loss=0.865, account_balance=10000,
+                                        risk_percentage=1.0, pair="EUR/GBP", account_currency="EUR"))
+    assert single["success"] is True
+    assert single["direction"] == "short"
+    assert single["risk_amount"] <= 100.0
+
+    trades = [{"pair": "EUR/USD", "entry_price": 1.085, "stop_loss": 1.08, "take_profit": 1.095},
+              {"pair": "USD/CHF", "entry_price": 0.9, "stop_loss": 0.905, "risk_percent": 1}]
+    batch = json.loads(calculator._run(account_balance=10000, trades=json.dumps(trades), rates='{"USD/CHF": 0.9}'))
+    assert batch["success"] is True
+    assert [p["status"] for p in batch["positions"]] == ["accepted", "accepted"]
+    assert batch["positions"][1]["requested_risk_percent"] == 1.0
+
+    assert json.loads(calculator._run(entry_price=1.0, stop_loss=1.0, account_balance=1000))["success"] is False
+    missing = json.loads(calculator._run(entry_price=1.0, stop_loss=0.99, account_balance=1000,
+                                         pair="CHF/SEK", account_currency="NZD"))
+    assert missing["success"] is False
+
+
+def test_risk_calculator_reports_unexpected_rate_errors(monkeypatch):
+    class BrokenEngine:
+        def lookup(self, base, quote):
+            raise RuntimeError("cross rate engine unavailable")
+
+    monkeypatch.setattr(strategy_tools, "cross_rate_engine", BrokenEngine())
+    result = json.loads(RiskCalculator()._run(entry_price=1.0, stop_loss=0.99, account_balance=1000,
+                                              pair="CHF/SEK", account_currency="NZD"))
+    assert result == {"error": "Risk calculation error: cross rate engine unavailable", "success": False}
+
+
+def test_monte_carlo_matches_closed_form_cases():
+    # Every trade wins: no drawdown, no ruin, compounding growth
+    result = monte_carlo(win_rate=1.0, avg_win=1.0, risk_percent=1.0, trades=50, paths=1000, seed=1)
+    assert result["risk_of_ruin"] == 0.0
+    assert result["max_drawdown_pct"]["p99"] == pytest.approx(0.0, abs=1e-3)
+    assert result["final_return_pct"]["p50"] == pytest.approx((1.01 ** 50 - 1) * 100, abs=0.01)
+
+    # Every trade loses 10% of the starting balance: ruined at 50% after five trades
+    result = monte_carlo(win_rate=0.0, risk_percent=10.0, trades=10, paths=100, compounding=False, seed=1)
+    assert result["risk_of_ruin"] == 1.0
+    assert result["max_drawdown_pct"]["p50"] == pytest.approx(100.0)
+
+
+def test_monte_carlo_chunks_are_consistent():
+    options = dict(win_rate=0.45, avg_win=1.5, avg_loss=1.0, risk_percent=2.0, trades=100, paths=5000, seed=7)
+    whole = monte_carlo(**options)
+    chunked = list(simulate_paths(**options, chunk_paths=1000, block_elements=10_000))
+    assert len(chunked) == 5 and all(len(c[0]) == 1000 for c in chunked)
+    assert 0 < whole["risk_of_ruin"] < 0.05
+    # A riskier bet has deeper drawdowns
+    riskier = monte_carlo(**{**options, "risk_percent": 5.0})
+    assert riskier["max_drawdown_pct"]["p50"] > whole["max_drawdown_pct"]["p50"]
+    assert riskier["risk_of_ruin"] > whole["risk_of_ruin"]
+
+
+def exact_statistics(**options):
+    chunks = list(simulate_paths(**options))
+    drawdown = np.concatenate([c[0] for c in chunks]) * 100.0
+    final = (np.concatenate([c[1] for c in chunks]) - 1.0) * 100.0
+    return drawdown, final, np.concatenate([c[2] for c in chunks])
+
+
+def test_monte_carlo_reduces_chunks_as_they_arrive():
+    options = dict(win_rate=0.45, avg_win=1.5, avg_loss=1.0, risk_percent=3.0, trades=100, paths=6000,
+                   chunk_paths=1000, seed=11)
+    drawdown, final, ruined = exact_statistics(**options)
+    # Every path fits the quantile sample: the reduced statistics are exact
+    result = monte_carlo(**options)
+    assert result["paths"] == 6000
+    assert result["risk_of_ruin"] == round(float(ruined.mean()), 6)
+    assert result["probability_of_profit"] == round(float((final > 1e-4).mean()), 4)
+    assert result["max_drawdown_pct"]["p90"] == round(float(np.percentile(drawdown, 90)), 2)
+    assert result["final_return_pct"]["p25"] == round(float(np.percentile(final, 25)), 2)
+
+    # A sample of a third of the paths: counts stay exact, quantiles close
+    sampled = monte_carlo(sample_size=2000, **options)
+    assert sampled["risk_of_ruin"] == result["risk_of_ruin"]
+    assert sampled["probability_of_profit"] == result["probability_of_profit"]
+    for q in ("p50", "p90"):
+        assert sampled["max_drawdown_pct"][q] == pytest.approx(result["max_drawdown_pct"][q], rel=0.05)
+    assert sampled["final_return_pct"]["p50"] == pytest.approx(result["final_return_pct"]["p50"], abs=3.0)
+
+
+def test_monte_carlo_tool():
+    simulator = MonteCarloRiskSimulator()
+    result = json.loads(simulator._run(win_rate=0.4, avg_win=2.0, avg_loss=1.0, risk_percentage=1.0,
+                                       paths=100000, seed=3))
+    assert result["success"] is True
+    assert result["paths"] == 100000
+    assert result["expectancy_r"] == pytest.approx(0.2)
+    assert result["kelly_percent"] == pytest.approx(10.0)
+    assert result["elapsed_seconds"] < 1.0
+    assert set(result["max_drawdown_pct"]) == {"p50", "p75", "p90", "p95", "p99"}
+
+    resampled = json.loads(simulator._run(r_multiples="[2, -1, -1, 0.5]", paths=1000, seed=3))
+    assert resampled["resampled_trades"] == 4
+    assert resampled["expectancy_r"] == pytest.approx(0.125)
+    assert json.loads(simulator._run(r_multiples="[]"))["success"] is False
+    assert json.loads(simulator._run(avg_loss=0))["success"] is False
@@ -0,0 +1,98 @@
+"""
+Test suite for the per-ticker sentiment time series index and its tool.
+"""
+
+import sys
+import os
+import json
+
+import numpy as np
+import pytest
+
+# Add the src directory to the path so we can import our tools
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from forex_ai_agent.tools.news_data import TickerSentimentSeries
+from forex_ai_agent.tools.news_store import NewsStore, format_time_from, query_key
+from forex_ai_agent.tools.sentiment_index import SentimentIndex, TickerSeries
+
+HOUR = 3600
+
+
+def article(i, hour, mentions):
+    return {
+        "title": f"Headline {i}", "url": f"https://example.com/{i}",
+        "time_published": format_time_from(hour * HOUR) + "00", "overall_sentiment_score": 0.0,
+        "ticker_sentiment": [{"ticker": ticker, "relevance_score": str(relevance), "ticker_sentiment_score": str(score)}
+                             for ticker, relevance, score in mentions],
+    }
+
+
+def test_window_matches_brute_force():
+    rng = np.random.default_rng(3)
+    times = rng.integers(0, 100 * HOUR, 2000)
+    relevance = rng.random(2000).astype(np.float32)
+    score = rng.uniform(-1, 1, 2000).astype(np.float32)
+    series = TickerSeries()
+    # Two out-of-order chunks exercise the re-sort
+    series.extend(times[1000:], relevance[1000:], score[1000:])
+    series.extend(times[:1000], relevance[:1000], score[:1000])
+
+    start, end = 40 * HOUR, 46 * HOUR
+    mask = (times >= start) & (times <= end)
+    expected = np.dot(relevance[mask], score[mask]) / relevance[mask].sum()
+    window = series.window(start, end)
+    assert window["mentions"] == int(mask.sum())
+    assert window["weighted_sentiment"] == pytest.approx(expected, abs=1e-4)
+
+    strict = mask & (relevance >= 0.5)
+    filtered = series.window(start, end, min_relevance=0.5)
+    assert filtered["mentions"] == int(strict.sum())
+    assert filtered["weighted_sentiment"] == pytest.approx(np.dot(relevance[strict], score[strict]) / relevance[strict].sum(), abs=1e-4)
+
+    trend = series.buckets(start, end, 6)
+    assert sum(trend["mentions"]) == window["mentions"]
+    assert trend["start"][1] - trend["start"][0] == HOUR
+    assert series.window(200 * HOUR, 300 * HOUR)["weighted_sentiment"] is None
+
+
+def test_index_refreshes_incrementally_from_store(tmp_path):
+    store = NewsStore(str(tmp_path / "news.sqlite3"))
+    index = SentimentIndex(store)
+    store.add(query_key("FOREX:EUR", None), [
+        article(1, 10, [("FOREX:EUR", 1.0, 0.5), ("FOREX:USD", 0.5, -0.2)]),
+        article(2, 11, [("FOREX:EUR", 0.25, -0.5)]),
+    ])
+    assert index.refresh() == 3
+    assert index.refresh() == 0
+    store.add(query_key("FOREX:EUR", None), [article(3, 9, [("FOREX:EUR", 0.5, 0.1)])])
+    assert index.refresh() == 1
+    assert index.tickers() == ["FOREX:EUR", "FOREX:USD"]
+    assert index.series["FOREX:EUR"].times.tolist() == [9 * HOUR, 10 * HOUR, 11 * HOUR]
+    # (1.0 * 0.5 - 0.25 * 0.5) / 1.25
+    assert index.series["FOREX:EUR"].window(10 * HOUR, 11 * HOUR)["weighted_sentiment"] == pytest.approx(0.3)
+    assert index.latest() == 11 * HOUR
+
+    feed_only = SentimentIndex()
+    feed_only.add_feed([article(1, 10, [("forex:eur", 1.0, 0.5)])])
+    assert len(feed_only.series["FOREX:EUR"]) == 1
+
+
+def test_tool_summarizes_window(tmp_path):
+    store = NewsStore(str(tmp_path / "news.sqlite3"))
+    store.add(query_key("FOREX:EUR", None), [article(i, 100 + i, [("FOREX:EUR", 0.8, 0.3)]) for i in range(10)])
+    tool = TickerSentimentSeries()
+    tool.index = SentimentIndex(store)
+
+    result = json.loads(tool._run(tickers="FOREX:EUR,FOREX:GBP", window_hours=6, end=format_time_from(109 * HOUR), buckets=3))
+    assert result["success"] is True
+    assert result["tickers"]["FOREX:EUR"]["mentions"] == 7
+    assert result["tickers"]["FOREX:EUR"]["weighted_sentiment"] == pytest.approx(0.3)
+    assert result["tickers"]["FOREX:EUR"]["trend"]["mentions"] == [2, 2, 3]
+    assert result["tickers"]["FOREX:GBP"]["mentions"] == 0
+
+    csv_tool = TickerSentimentSeries(index=tool.index, output_mode="csv")
+    csv_result = json.loads(csv_tool._run(end=format_time_from(109 * HOUR)))
+    assert csv_result["tickers"].startswith("key,mentions,weighted_sentiment")
+
+    assert json.loads(tool._run(window_hours=0))["success"] is False
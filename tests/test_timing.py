@@ -0,0 +1,84 @@
+"""
+Test suite for crew task timing and critical path reporting.
+
+Task events are simulated with a fake clock, so no crew is run.
+"""
+
+import sys
+import os
+from types import SimpleNamespace
+
+# Add the src directory to the path so we can import our tools
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from forex_ai_agent.timing import TaskTimer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def run_schedule(timer, clock, schedule):
+    """Replay (time, 'start'|'end', task) events in time order."""
+    for at, kind, task in sorted(schedule, key=lambda event: event[0]):
+        clock.now = at
+        (timer.started if kind == "start" else timer.finished)(task)
+
+
+def make_tasks(*names):
+    return [SimpleNamespace(name=name) for name in names]
+
+
+def test_sequential_critical_path_is_every_task():
+    clock = FakeClock()
+    timer = TaskTimer(clock=clock)
+    chart, market, strategy = tasks = make_tasks("chart", "market", "strategy")
+    timer.watch(tasks)
+    run_schedule(timer, clock, [
+        (0, "start", chart), (10, "end", chart),
+        (10, "start", market), (12, "end", market),
+        (12, "start", strategy), (15, "end", strategy),
+    ])
+
+    report = timer.report()
+    assert report["critical_path"] == ["chart", "market", "strategy"]
+    assert report["wall_time"] == 15
+    assert report["parallel_speedup"] == 1.0
+
+
+def test_parallel_critical_path_follows_slowest_branch():
+    clock = FakeClock()
+    timer = TaskTimer(clock=clock)
+    chart, market, news, strategy = tasks = make_tasks("chart", "market", "news", "strategy")
+    timer.watch(tasks)
+    run_schedule(timer, clock, [
+        (0, "start", chart), (0.1, "start", market), (0.2, "start", news),
+        (2, "end", market), (4, "end", news), (10, "end", chart),
+        (10, "start", strategy), (13, "end", strategy),
+    ])
+
+    report = timer.report()
+    assert report["critical_path"] == ["chart", "strategy"]
+    assert report["critical_path_time"] == 13
+    assert report["wall_time"] == 13
+    assert report["parallel_speedup"] > 1.4
+    assert "* chart" in timer.format_report()
+
+
+def test_unwatched_tasks_are_ignored_and_watch_resets():
+    clock = FakeClock()
+    timer = TaskTimer(clock=clock)
+    (chart,) = make_tasks("chart")
+    timer.started(chart)
+    assert timer.report()["tasks"] == {}
+
+    timer.watch([chart])
+    run_schedule(timer, clock, [(1, "start", chart), (3, "end", chart)])
+    assert timer.report()["tasks"]["chart"]["duration"] == 2
+
+    timer.watch([chart])
+    assert timer.report()["tasks"] == {}
@@ -1,8 +1,10 @@
 """
 Test suite for trading tools (crypto, forex, and news data).
 
-This module tests all trading tools with real API calls using the Alpha Vantage API.
-Make sure your ALPHA_VANTAGE_API_KEY is set in your .env file before running tests.
+Under pytest the tools call the local mock server (forex_ai_agent.mock_server),
+so the tests run offline and without pauses. Set FOREX_AI_LIVE_TESTS=1, or run
+this module as a script, to make real API calls to Alpha Vantage; make sure
+your ALPHA_VANTAGE_API_KEY is set in your .env file first.
 """
 
 import sys
@@ -11,12 +13,57 @@ import json
 import time
 from datetime import datetime
 
+import pytest
+
 # Add the src directory to the path so we can import our tools
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from forex_ai_agent.tools.crypto_data import crypto_api_connector
 from forex_ai_agent.tools.forex_data import forex_data_fetcher
 from forex_ai_agent.tools.news_data import news_sentiment_fetcher
+from forex_ai_agent.tools.alpha_vantage import RateLimiter, alpha_vantage_client
+from forex_ai_agent.mock_server import MockServer
+
+# Server the tools call while the tests run offline; live runs pause between calls for the rate limits
+_mock_server = None
+
+
+@pytest.fixture(scope="module", autouse=True)
+def alpha_vantage_endpoint(tmp_path_factory):
+    """Point the shared client at a mock server, without quota and with a throwaway cache directory"""
+    global _mock_server
+    if os.getenv("FOREX_AI_LIVE_TESTS") == "1":
+        yield None
+        return
+    saved = {name: getattr(alpha_vantage_client, name)
+             for name in ("base_url", "_api_key", "rate_limiter", "_persistent_cache")}
+    cache_dir = os.environ.get("FOREX_AI_CACHE_DIR")
+    os.environ["FOREX_AI_CACHE_DIR"] = str(tmp_path_factory.mktemp("cache"))
+    with MockServer() as server:
+        _mock_server = server
+        alpha_vantage_client.base_url = f"{server.url}/query"
+        alpha_vantage_client._api_key = "mock"
+        alpha_vantage_client.rate_limiter = RateLimiter(10 ** 6, 10 ** 6)
+        alpha_vantage_client.persistent_cache = None
+        alpha_vantage_client.cache.clear()
+        try:
+            yield server
+        finally:
+            _mock_server = None
+            for name, value in saved.items():
+                setattr(alpha_vantage_client, name, value)
+            alpha_vantage_client.cache.clear()
+            news_sentiment_fetcher.store = None
+            if cache_dir is None:
+                os.environ.pop("FOREX_AI_CACHE_DIR", None)
+            else:
+                os.environ["FOREX_AI_CACHE_DIR"] = cache_dir
+
+
+def pause(seconds: float):
+    """Wait between real API calls to respect rate limits (not needed against the mock server)"""
+    if _mock_server is None:
+        time.sleep(seconds)
 
 
 def print_separator(title: str):
@@ -66,7 +113,7 @@ def test_crypto_data():
             print_result(f"Crypto: {test['name']}", result, success)
             
             # Add delay to respect API rate limits
-            time.sleep(2)
+            pause(2)
             
         except Exception as e:
             print_result(f"Crypto: {test['name']}", f"Error: {str(e)}", False)
@@ -98,7 +145,7 @@ def test_forex_data():
             print_result(f"Forex: {test['name']}", result, success)
             
             # Add delay to respect API rate limits
-            time.sleep(2)
+            pause(2)
             
         except Exception as e:
             print_result(f"Forex: {test['name']}", f"Error: {str(e)}", False)
@@ -158,7 +205,7 @@ def test_news_data():
             print_result(f"News: {test['name']}", result, success)
             
             # Add longer delay for news API (more complex)
-            time.sleep(3)
+            pause(3)
             
         except Exception as e:
             print_result(f"News: {test['name']}", f"Error: {str(e)}", False)
@@ -225,13 +272,13 @@ def quick_test():
         crypto_result = crypto_api_connector._run("BTC", "USD")
         crypto_data = json.loads(crypto_result)
         print(f"   Result: {'✅ Success' if crypto_data.get('success') else '❌ Failed'}")
-        time.sleep(2)
+        pause(2)
         
         print("\n2️⃣ Testing Forex Tool (EUR/USD)...")
         forex_result = forex_data_fetcher._run("EUR", "USD")
         forex_data = json.loads(forex_result)
         print(f"   Result: {'✅ Success' if forex_data.get('success') else '❌ Failed'}")
-        time.sleep(2)
+        pause(2)
         
         print("\n3️⃣ Testing News Tool (Bitcoin news)...")
         news_result = news_sentiment_fetcher._run(tickers="CRYPTO:BTC", limit=2)
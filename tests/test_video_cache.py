@@ -0,0 +1,167 @@
+"""
+Test suite for the content-addressed video analysis cache.
+
+The OpenAI client is replaced by a stub that counts calls.
+"""
+
+import sys
+import os
+import json
+import shutil
+from types import SimpleNamespace
+
+import pytest
+
+# Add the src directory to the path so we can import our tools
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+pytest.importorskip("cv2")
+
+from forex_ai_agent.tools.persistent_cache import PersistentCache, lazy_persistent_cache
+from forex_ai_agent.tools.video_analysis import VideoAnalysisTool
+from forex_ai_agent.tools.video_cache import VideoAnalysisCache, covers, hamming_distance
+
+from test_video_frames import scene_frames, write_video
+
+
+ANALYSIS = {"trading_pair": "EUR/USD", "timeframe": "1h", "confidence_score": 0.8}
+
+
+class StubCompletions:
+    def __init__(self, content):
+        self.content = content
+        self.calls = 0
+
+    def create(self, **kwargs):
+        self.calls += 1
+        message = SimpleNamespace(content=self.content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def make_tool(tmp_path, content=json.dumps(ANALYSIS)):
+    tool = VideoAnalysisTool()
+    completions = StubCompletions(content)
+    tool.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    tool.cache = VideoAnalysisCache(PersistentCache(str(tmp_path / "video.sqlite3")))
+    tool.scene_scan_interval = 0.5
+    return tool, completions
+
+
+@pytest.fixture
+def chart_video(tmp_path):
+    return write_video(tmp_path / "chart.avi", scene_frames([40, 120, 200]))
+
+
+def test_same_video_is_analyzed_once(tmp_path, chart_video):
+    tool, completions = make_tool(tmp_path)
+    first = json.loads(tool._run(chart_video))
+    second = json.loads(tool._run(chart_video))
+
+    assert completions.calls == 1
+    assert first["cache_hit"] is None
+    assert second["cache_hit"] == "video"
+    assert second["trading_pair"] == "EUR/USD"
+    assert second["frames_processed"] == first["frames_processed"] == 3
+    assert first["upload"]["image_tokens"] > 0
+    assert "upload" not in second
+
+
+def test_copied_video_hits_by_content(tmp_path, chart_video):
+    tool, completions = make_tool(tmp_path)
+    tool._run(chart_video)
+    copy = shutil.copy(chart_video, tmp_path / "renamed.avi")
+
+    assert json.loads(tool._run(str(copy)))["cache_hit"] == "video"
+    assert completions.calls == 1
+
+
+def test_settings_are_part_of_the_key(tmp_path, chart_video):
+    tool, completions = make_tool(tmp_path)
+    tool._run(chart_video, analysis_focus="patterns")
+    tool._run(chart_video, analysis_focus="levels")
+    assert completions.calls == 2
+
+    # Preprocessing and selection settings change what the LLM sees
+    tool.jpeg_quality -= 20
+    assert json.loads(tool._run(chart_video, analysis_focus="levels"))["cache_hit"] is None
+    # Selection settings miss the video key; the frames they pick are then looked up by content
+    tool.scene_min_change *= 2
+    assert json.loads(tool._run(chart_video, analysis_focus="levels"))["cache_hit"] == "frames"
+    assert completions.calls == 3
+
+
+def test_different_recording_with_same_frames_reuses_analysis(tmp_path, chart_video):
+    tool, completions = make_tool(tmp_path)
+    tool._run(chart_video)
+    # Longer final scene: different file, same keyframes
+    longer = write_video(tmp_path / "longer.avi", scene_frames([40, 120, 200]) + scene_frames([200], 10))
+
+    result = json.loads(tool._run(longer))
+    assert result["cache_hit"] == "frames"
+    assert completions.calls == 1
+
+
+def test_overlapping_recording_reuses_analysis(tmp_path, chart_video):
+    tool, completions = make_tool(tmp_path)
+    tool._run(chart_video)
+
+    # Trimmed at the start: a subset of the analyzed frames, ending on the same chart
+    trimmed = write_video(tmp_path / "trimmed.avi", scene_frames([120, 200]))
+    result = json.loads(tool._run(trimmed))
+    assert result["cache_hit"] == "similar_frames"
+    assert completions.calls == 1
+
+    # A new latest chart state needs a fresh analysis
+    extended = write_video(tmp_path / "extended.avi", scene_frames([120, 200, 77]))
+    assert json.loads(tool._run(extended))["cache_hit"] is None
+    assert completions.calls == 2
+
+
+def test_near_duplicate_frames_within_tolerance():
+    frame = "f" * 64
+    one_bit_off, far = "e" + "f" * 63, "0" * 64
+    assert hamming_distance(frame, one_bit_off) == 1
+    assert hamming_distance(frame, far) == 256
+
+    assert covers([far, frame], [one_bit_off], tolerance=2)
+    assert not covers([far, frame], [one_bit_off], tolerance=0)
+    # Every frame must be matched, and the last frames must match each other
+    assert not covers([frame], [far, frame])
+    assert not covers([frame, far], [frame])
+
+
+def test_failed_analysis_is_not_cached(tmp_path, chart_video):
+    tool, completions = make_tool(tmp_path)
+    completions.create = lambda **kwargs: (_ for _ in ()).throw(RuntimeError("rate limited"))
+    assert "error" in json.loads(tool._run(chart_video))
+
+    tool, completions = make_tool(tmp_path)
+    assert json.loads(tool._run(chart_video))["cache_hit"] is None
+    assert completions.calls == 1
+
+
+def test_chunked_mode_reuses_shared_chunks(tmp_path, chart_video):
+    tool, completions = make_tool(tmp_path)
+    tool.chunk_size = 1
+    result = json.loads(tool._run(chart_video))
+
+    assert completions.calls == 3
+    assert result["chunks"] == {"total": 3, "failed": 0}
+    assert result["upload"]["requests"] == 3
+    assert result["trading_pair"] == "EUR/USD"
+
+    # Two of the three scenes were seen before: only the new one is analyzed
+    overlapping = write_video(tmp_path / "overlap.avi", scene_frames([40, 120, 77]))
+    result = json.loads(tool._run(overlapping))
+    assert completions.calls == 4
+    assert result["upload"]["requests"] == 1
+
+
+def test_shared_cache_opens_on_first_use(tmp_path, monkeypatch):
+    monkeypatch.setenv("FOREX_AI_CACHE_DIR", str(tmp_path / "cache"))
+    cache = VideoAnalysisCache(lazy_persistent_cache("video_analysis"))
+    assert not (tmp_path / "cache").exists()
+
+    cache.set("video:x", ANALYSIS)
+    assert (tmp_path / "cache" / "video_analysis.sqlite3").exists()
+    assert cache.get("video:x") == ANALYSIS
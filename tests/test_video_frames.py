@@ -0,0 +1,138 @@
+"""
+Test suite for chart video frame extraction.
+
+Small synthetic videos are written with OpenCV, so no real recordings or
+API calls are needed.
+"""
+
+import sys
+import os
+
+import pytest
+
+# Add the src directory to the path so we can import our tools
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+cv2 = pytest.importorskip("cv2")
+import numpy as np
+
+from forex_ai_agent.tools.video_analysis import VideoAnalysisTool
+from forex_ai_agent.tools.video_frames import (
+    choose_mode, iter_frames, iter_keyframes, sample_indices, scan_indices, select_keyframes,
+)
+
+
+def write_video(path, frames, fps=10):
+    """Write BGR frames to an MJPG .avi file and return its path."""
+    height, width = frames[0].shape[:2]
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), fps, (width, height))
+    for frame in frames:
+        writer.write(frame)
+    writer.release()
+    return str(path)
+
+
+@pytest.fixture
+def gradient_video(tmp_path):
+    """50 frames whose brightness encodes the frame index."""
+    frames = [np.full((48, 64, 3), i * 5, dtype=np.uint8) for i in range(50)]
+    return write_video(tmp_path / "gradient.avi", frames)
+
+
+def test_sample_indices_cover_video():
+    assert sample_indices(50, 5) == [0, 12, 24, 36, 49]
+    assert sample_indices(3, 10) == [0, 1, 2]
+    assert sample_indices(0, 10) == []
+
+
+def test_choose_mode_by_sampling_density():
+    assert choose_mode([0, 10, 20], seek_gap_threshold=250) == "sequential"
+    assert choose_mode([0, 5000, 10000], seek_gap_threshold=250) == "seek"
+    assert choose_mode([0, 10, 20], mode="seek") == "seek"
+    with pytest.raises(ValueError):
+        choose_mode([0, 10], mode="random")
+
+
+def test_scan_of_long_videos_is_bounded_and_seeks():
+    # Two minutes at 25fps are scanned every second, in one sequential pass
+    short = scan_indices(3000, 25.0, interval=1.0, max_points=120)
+    assert short[:3] == [0, 25, 50] and choose_mode(short) == "sequential"
+    # A 30-minute recording is scanned at ~120 points, far enough apart to seek
+    long = scan_indices(45000, 25.0, interval=1.0, max_points=120)
+    assert len(long) <= 121 and long[-1] == 44999
+    assert choose_mode(long) == "seek"
+
+
+@pytest.mark.parametrize("mode", ["seek", "sequential"])
+def test_modes_yield_the_sampled_frames(gradient_video, mode):
+    frames = list(iter_frames(gradient_video, max_frames=5, mode=mode))
+
+    assert [index for index, _ in frames] == [0, 12, 24, 36, 49]
+    for index, frame in frames:
+        assert frame.mean() == pytest.approx(index * 5, abs=4)
+
+
+def test_sequential_mode_stops_after_last_target(gradient_video):
+    frames = list(iter_frames(gradient_video, mode="sequential", indices=[3, 7]))
+    assert [index for index, _ in frames] == [3, 7]
+
+
+def test_tool_encodes_streamed_frames(gradient_video):
+    tool = VideoAnalysisTool()
+    encoded = tool._encode_frames(tool._iter_frames(gradient_video, max_frames=4))
+
+    assert len(encoded) == 4
+    assert all(isinstance(frame, str) and frame for frame in encoded)
+
+
+def test_unreadable_video_raises(tmp_path):
+    path = tmp_path / "broken.avi"
+    path.write_bytes(b"not a video")
+    with pytest.raises(Exception, match="Error extracting frames"):
+        VideoAnalysisTool()._extract_frames(str(path))
+
+
+def scene_frames(colors, frames_per_scene=20):
+    """Static scenes, each lasting `frames_per_scene` frames: a colour and a bar whose position depends on it."""
+    frames = []
+    for color in colors:
+        frame = np.full((90, 160, 3), color, dtype=np.uint8)
+        x = color % 120
+        frame[20:70, x:x + 30] = 255 - color
+        frames += [frame] * frames_per_scene
+    return frames
+
+
+def test_static_video_yields_one_keyframe(tmp_path):
+    path = write_video(tmp_path / "static.avi", scene_frames([100], frames_per_scene=60))
+    keyframes = list(iter_keyframes(path, max_frames=10, scan_interval=0.5))
+    assert [index for index, _ in keyframes] == [0]
+
+
+def test_keyframes_at_scene_changes(tmp_path):
+    path = write_video(tmp_path / "scenes.avi", scene_frames([40, 120, 200]))
+    keyframes = list(iter_keyframes(path, max_frames=10, scan_interval=0.5))
+    assert [index for index, _ in keyframes] == [0, 20, 40]
+
+
+def test_keyframes_capped_by_largest_changes():
+    frames, frame = [], np.zeros((90, 160, 3), dtype=np.uint8)
+    # Each step paints a wider band, changing 10%, 50% and 20% of the frame
+    for i, columns in enumerate([0, 16, 96, 128]):
+        frame = frame.copy()
+        frame[:, :columns] = 255
+        frames.append((i, frame))
+
+    kept = select_keyframes(frames, max_frames=2)
+    # The first frame is always kept, plus the biggest change
+    assert [index for index, _ in kept] == [0, 2]
+
+
+def test_tool_uses_scene_selection(tmp_path):
+    path = write_video(tmp_path / "scenes.avi", scene_frames([40, 120, 200]))
+    tool = VideoAnalysisTool()
+    tool.scene_scan_interval = 0.5
+    assert len(tool._extract_frames(path, max_frames=10)) == 3
+
+    tool.frame_selection = "uniform"
+    assert len(tool._extract_frames(path, max_frames=10)) == 10